@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# benchmarks/fake_resolution_switcher.py
+# ResolutionSwitcher.exe の代わりに使用するシミュレーター (hz_core.simulator の CLI)
+#
+# 使い方:
+#   # 状態ファイルを作成 (モニター 2 台、呼び出しごとに 50ms の遅延、レート変更の 10% が一時的に失敗)
+#   python benchmarks/fake_resolution_switcher.py --init sim.json --monitor-count 2 --latency 0.05 --failure-probability 0.1
+#   # switcher_utility から使用する (ResolutionSwitcher.exe と同じ引数を受け付ける)
+#   export AUTOHZ_SIM_STATE=sim.json AUTOHZ_SWITCHER_PATH=benchmarks/fake_resolution_switcher.py
+#
+# 💡 呼び出しごとに別プロセスとなるため、レート変更は AUTOHZ_SIM_STATE の状態ファイルに保存される。
+#    状態ファイルが無い場合は、既定の構成 (モニター 1 台、遅延・失敗なし) で応答する。
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from hz_core.simulator import SimulatedDisplay  # noqa: E402
+
+STATE_ENV = "AUTOHZ_SIM_STATE"
+
+
+def _init_state(argv) -> int:
+    parser = argparse.ArgumentParser(description="Create a simulated display state file.")
+    parser.add_argument("--init", metavar="PATH", required=True)
+    parser.add_argument("--monitor-count", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0, help="呼び出しごとの遅延 (秒)")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="遅延に加える 0..N 秒の揺らぎ")
+    parser.add_argument("--failure-probability", type=float, default=0.0, help="レート変更が一時的に失敗する確率")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    display = SimulatedDisplay.default(
+        args.monitor_count,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        failure_probability=args.failure_probability,
+        seed=args.seed,
+    )
+    display.save(args.init)
+    print(f"Simulated display state written to {args.init} ({len(display.monitors)} monitor(s)).")
+    return 0
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if "--init" in argv:
+        return _init_state(argv)
+
+    state_path = os.environ.get(STATE_ENV)
+    if state_path and os.path.exists(state_path):
+        display = SimulatedDisplay.load(state_path)
+    else:
+        display = SimulatedDisplay.default()
+
+    returncode, stdout, stderr = display.run_cli(argv)
+    sys.stdout.write(stdout)
+    sys.stderr.write(stderr)
+
+    # レート変更の結果と呼び出し回数を保存する
+    if state_path:
+        display.save(state_path)
+    return returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main())
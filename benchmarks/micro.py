@@ -0,0 +1,374 @@
+# benchmarks/micro.py
+# 監視 tick を構成する処理 (プロセス取得・出力解析・ルール判定・翻訳・レート変更) のマイクロベンチマーク
+#
+#   python benchmarks/micro.py [--filter parse] [--output result.json] [--baseline previous.json]
+#
+# - 結果は JSON で出力する (1 回あたりの秒数の min / median / mean / max、ops/sec)
+# - --baseline に以前の結果を指定すると median を比較し、--tolerance を超えて遅くなったものを
+#   regressions として報告する (1 件でもあれば終了コード 1)
+# - 依存ライブラリ (psutil / PIL など) が無く準備に失敗したベンチマークは、error として記録される
+# - レート変更は hz_core.simulator のシミュレーターに対して行うため、実際のディスプレイには影響しない
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SRC_DIR = os.path.join(REPO_ROOT, 'src')
+sys.path.insert(0, SRC_DIR)
+
+from hz_core.fakes import FakeProcessScanner
+from hz_core.rules import RuleIndex
+from hz_core.simulator import SimulatedDisplay
+
+# ベンチマーク名 -> 準備関数 (計測対象の呼び出し可能オブジェクトを返す)
+BENCHMARKS: Dict[str, Callable[[argparse.Namespace], Callable[[], Any]]] = {}
+
+MONITOR_ID = r"\\.\DISPLAY1"
+
+
+def benchmark(name: str):
+    def register(setup: Callable[[argparse.Namespace], Callable[[], Any]]):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _synthetic_process_names(count: int) -> List[str]:
+    """一般的な Windows 環境に近い、重複を含むプロセス名の一覧。"""
+    common = ["svchost.exe", "RuntimeBroker.exe", "chrome.exe", "explorer.exe", "conhost.exe"]
+    return [common[i % len(common)] if i % 3 else f"process_{i}.exe" for i in range(count)]
+
+
+def _synthetic_settings(game_count: int) -> Dict[str, Any]:
+    return {
+        "selected_monitor_id": MONITOR_ID,
+        "target_resolution": "2560x1440",
+        "is_monitoring_enabled": True,
+        "default_low_rate": 60,
+        "use_global_high_rate": False,
+        "global_high_rate": 144,
+        "games": [
+            {"name": f"Game {i}", "process_name": f"game_{i}.exe", "high_rate": 144 if i % 2 else 120, "is_enabled": True}
+            for i in range(game_count)
+        ],
+    }
+
+
+# --- 1. プロセス取得 ---
+
+@benchmark("scan.get_running_processes_simple")
+def _bench_scan_real(args):
+    from switcher_utility import get_process_source, get_running_processes_simple
+    # 既定の取得元 (自動選択) を準備の段階で生成する (psutil が必要で無い場合は error として記録される)
+    get_process_source()
+    return get_running_processes_simple
+
+
+@benchmark("scan.synthetic_table")
+def _bench_scan_synthetic(args):
+    scanner = FakeProcessScanner(_synthetic_process_names(args.processes))
+    return scanner.running_process_names
+
+
+@benchmark("scan.psutil")
+def _bench_scan_psutil(args):
+    from hz_core.process_source import PsutilProcessSource
+    from hz_core.scanner import SourceProcessScanner
+    return SourceProcessScanner(PsutilProcessSource()).running_process_names
+
+
+@benchmark("scan.procfs")
+def _bench_scan_procfs(args):
+    from hz_core.process_source import ProcFsProcessSource
+    from hz_core.scanner import SourceProcessScanner
+    # 💡 /proc が無い環境 (Windows など) では生成時に失敗し、error として記録される
+    return SourceProcessScanner(ProcFsProcessSource()).running_process_names
+
+
+@benchmark("scan.procfs_cold")
+def _bench_scan_procfs_cold(args):
+    from hz_core.process_source import ProcFsProcessSource
+    from hz_core.scanner import SourceProcessScanner
+    source = ProcFsProcessSource()
+    scanner = SourceProcessScanner(source)
+
+    def run():
+        # exe のキャッシュが効かない初回 (監視開始直後) 相当
+        source._exe_cache.clear()
+        return scanner.running_process_names()
+    return run
+
+
+@benchmark("scan.procfs_detailed")
+def _bench_scan_procfs_detailed(args):
+    from hz_core.process_source import ProcFsProcessSource
+    source = ProcFsProcessSource()
+    return lambda: list(source.iter_processes(detailed=True))
+
+
+@benchmark("scan.synthetic_browser_heavy")
+def _bench_scan_browser_heavy(args):
+    from hz_core.process_source import SyntheticProcessSource
+    from hz_core.scanner import SourceProcessScanner
+    return SourceProcessScanner(SyntheticProcessSource.browser_heavy(seed=1)).running_process_names
+
+
+@benchmark("scan.synthetic_build_server")
+def _bench_scan_build_server(args):
+    from hz_core.process_source import SyntheticProcessSource
+    from hz_core.scanner import SourceProcessScanner
+    return SourceProcessScanner(SyntheticProcessSource.build_server(seed=1)).running_process_names
+
+
+# --- 2. ResolutionSwitcher の出力解析 ---
+
+@benchmark("parse.active_rates")
+def _bench_parse_active_rates(args):
+    from switcher_utility import parse_active_rates
+    output = SimulatedDisplay.default(args.monitors).render_monitors()
+    return lambda: parse_active_rates(output)
+
+
+@benchmark("parse.monitor_list")
+def _bench_parse_monitor_list(args):
+    from switcher_utility import parse_monitor_list
+    output = SimulatedDisplay.default(args.monitors).render_monitors()
+    return lambda: parse_monitor_list(output)
+
+
+@benchmark("parse.monitor_modes")
+def _bench_parse_monitor_modes(args):
+    from switcher_utility import parse_monitor_modes
+    output = SimulatedDisplay.default(args.monitors).render_modes(MONITOR_ID)
+    return lambda: parse_monitor_modes(output)
+
+
+# --- 3. ルール判定 (監視ループの判定部分) ---
+
+@benchmark("rules.evaluate_idle")
+def _bench_rules_idle(args):
+    index = RuleIndex.from_settings(_synthetic_settings(args.games))
+    names = set(_synthetic_process_names(args.processes))
+    return lambda: index.evaluate(names)
+
+
+@benchmark("rules.evaluate_game_running")
+def _bench_rules_game(args):
+    index = RuleIndex.from_settings(_synthetic_settings(args.games))
+    names = set(_synthetic_process_names(args.processes)) | {f"game_{args.games - 1}.exe"}
+    return lambda: index.evaluate(names)
+
+
+@benchmark("rules.from_settings")
+def _bench_rules_build(args):
+    settings = _synthetic_settings(args.games)
+    return lambda: RuleIndex.from_settings(settings)
+
+
+# --- 4. 翻訳 ---
+
+@benchmark("i18n.language_manager_get")
+def _bench_lang_get(args):
+    from hz_core.i18n import get_translation_catalog
+    lang = get_translation_catalog().load("en")
+    return lambda: lang.get("status_idle")
+
+
+@benchmark("i18n.language_manager_get_format")
+def _bench_lang_get_format(args):
+    from hz_core.i18n import get_translation_catalog
+    lang = get_translation_catalog().load("en")
+    return lambda: lang.get("status_game_running", game_name="Game 1", rate=144, hz="Hz")
+
+
+# --- 5. レート変更 / 監視 tick (シミュレーター + メモリ上のスキャナー) ---
+
+def _simulated_engine(args, data_dir: str, process_names: List[str]):
+    from hz_core.engine import MonitorEngine
+    from hz_core.rate_journal import RateJournal
+    from hz_core.simulator import SimulatedDisplayBackend
+
+    display = SimulatedDisplay.default(args.monitors, latency=args.latency)
+    engine = MonitorEngine(
+        _synthetic_settings(args.games),
+        display_backend=SimulatedDisplayBackend(display),
+        process_scanner=FakeProcessScanner(process_names),
+        rate_journal=RateJournal(os.path.join(data_dir, "rate_journal.jsonl")),
+    )
+    return engine
+
+
+@benchmark("engine.enforce_rate")
+def _bench_enforce_rate(args):
+    engine = _simulated_engine(args, args.data_dir, [])
+    rates = [144, 60]
+    counter = [0]
+
+    def run():
+        counter[0] += 1
+        return engine._enforce_rate(rates[counter[0] % 2], reason="benchmark")
+    return run
+
+
+@benchmark("engine.monitoring_tick_steady")
+def _bench_tick_steady(args):
+    engine = _simulated_engine(args, args.data_dir, _synthetic_process_names(args.processes))
+    stop_event = threading.Event()
+    # 💡 ドリフト確認は間隔が空くため、定常状態の tick からは除外する
+    engine.drift_reconciler.due = lambda: False
+    return lambda: engine._monitoring_tick(stop_event)
+
+
+@benchmark("engine.monitoring_tick_switch")
+def _bench_tick_switch(args):
+    engine = _simulated_engine(args, args.data_dir, _synthetic_process_names(args.processes))
+    scanner = engine.process_scanner
+    stop_event = threading.Event()
+    engine.drift_reconciler.due = lambda: False
+    game = f"game_{args.games - 1}.exe"
+    state = {"running": False}
+
+    def run():
+        # ゲームの起動と終了を交互に繰り返し、毎回レート変更が発生する tick を計測する
+        if state["running"]:
+            scanner.kill(game)
+        else:
+            scanner.start(game)
+        state["running"] = not state["running"]
+        engine._monitoring_tick(stop_event)
+    return run
+
+
+# --- 計測 ---
+
+def _measure(fn: Callable[[], Any], min_time: float, repeat: int) -> Dict[str, Any]:
+    """1 回の計測が min_time 秒以上となるループ回数を決め、repeat 回計測します。"""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+
+    per_call = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        per_call.append((time.perf_counter() - started) / loops)
+
+    median = statistics.median(per_call)
+    return {
+        "loops": loops,
+        "repeat": repeat,
+        "min": min(per_call),
+        "median": median,
+        "mean": statistics.mean(per_call),
+        "max": max(per_call),
+        "ops_per_sec": 1.0 / median if median > 0 else None,
+        "error": None,
+    }
+
+
+def run_benchmark(name: str, args: argparse.Namespace) -> Dict[str, Any]:
+    try:
+        fn = BENCHMARKS[name](args)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    try:
+        return _measure(fn, args.min_time, args.repeat)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> Dict[str, Any]:
+    """median を以前の結果と比較します。"""
+    previous = baseline.get("results", {})
+    ratios = {}
+    regressions = []
+    for name, result in results.items():
+        before = previous.get(name, {})
+        if result.get("error") or before.get("error") or not before.get("median"):
+            continue
+        ratio = result["median"] / before["median"]
+        ratios[name] = ratio
+        if ratio > 1.0 + tolerance:
+            regressions.append(name)
+    return {"tolerance": tolerance, "ratios": ratios, "regressions": regressions}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the monitoring tick.")
+    parser.add_argument("--filter", default=None, help="名前にこの文字列を含むベンチマークのみ実行する")
+    parser.add_argument("--list", action="store_true", help="ベンチマークの一覧を表示して終了する")
+    parser.add_argument("--min-time", type=float, default=0.1, help="1 回の計測の最短時間 (秒)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--processes", type=int, default=300, help="合成プロセス表のプロセス数")
+    parser.add_argument("--games", type=int, default=20, help="登録ゲーム数")
+    parser.add_argument("--monitors", type=int, default=2, help="シミュレーターのモニター数")
+    parser.add_argument("--latency", type=float, default=0.0, help="シミュレーターの呼び出しごとの遅延 (秒)")
+    parser.add_argument("--output", default=None, help="結果を書き込む JSON ファイル (既定: 標準出力)")
+    parser.add_argument("--baseline", default=None, help="比較する以前の結果 (JSON)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="regression とみなす median の増加率")
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if not args.filter or args.filter in name]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    # 💡 ログはハンドラに出力しない (INFO レコードの生成コストは計測に含める)
+    app_logger = logging.getLogger('AutoHzSwitcher')
+    app_logger.setLevel(logging.INFO)
+    app_logger.propagate = False
+    app_logger.addHandler(logging.NullHandler())
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        args.data_dir = data_dir
+        results = {name: run_benchmark(name, args) for name in names}
+
+    report = {
+        "benchmark": "micro",
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "created_at": time.time(),
+        "parameters": {
+            "processes": args.processes,
+            "games": args.games,
+            "monitors": args.monitors,
+            "latency": args.latency,
+            "min_time": args.min_time,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            report["comparison"] = compare(results, json.load(f), args.tolerance)
+        if report["comparison"]["regressions"]:
+            exit_code = 1
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+# benchmarks/replay_trace.py
+# 監視セッションのトレース (hz_core.trace) を判定ロジックに流し、記録時と同じ判定になるかを検証する
+#
+#   python benchmarks/replay_trace.py replay session.jsonl.gz [--output report.json]
+#   python benchmarks/replay_trace.py synthesize session.jsonl.gz [--hours 10] [--seed 1]
+#
+# - replay:     判定が 1 件でも異なれば終了コード 1。段階ごとの所要時間 (記録時 / 再生時) を JSON で出力する
+#               (トレースの記録: python src/headless.py --record-trace session.jsonl.gz)
+# - synthesize: 監視エンジンの tick を仮想時刻で実行し、指定時間分のセッションを記録する
+#               (ゲームの起動/終了・設定変更を含む。実際の待機は行わないため、10 時間分でも短時間で生成できる)
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SRC_DIR = os.path.join(REPO_ROOT, 'src')
+sys.path.insert(0, SRC_DIR)
+
+from hz_core.engine import MonitorEngine
+from hz_core.fakes import FakeDisplayBackend, FakeProcessScanner
+from hz_core.rate_journal import RateJournal
+from hz_core.trace import TraceRecorder, read_trace, replay_trace
+
+MONITOR_ID = r"\\.\DISPLAY1"
+
+
+class _VirtualClock:
+    """tick ごとに手動で進める時計。"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def synthesize(path: str, hours: float, seed: int) -> dict:
+    rng = random.Random(seed)
+    clock = _VirtualClock()
+    games = [{"name": f"Game {i}", "process_name": f"game_{i}.exe", "high_rate": rng.choice([120, 144, 165]), "is_enabled": True}
+             for i in range(8)]
+    settings = {
+        "selected_monitor_id": MONITOR_ID,
+        "target_resolution": "2560x1440",
+        "is_monitoring_enabled": True,
+        "default_low_rate": 60,
+        "use_global_high_rate": False,
+        "global_high_rate": 144,
+        "games": games,
+    }
+    background = [f"service_{i}.exe" for i in range(150)]
+    scanner = FakeProcessScanner(background, clock=clock)
+    backend = FakeDisplayBackend({MONITOR_ID: 60})
+    recorder = TraceRecorder(path, clock=clock)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        engine = MonitorEngine(
+            settings,
+            display_backend=backend,
+            process_scanner=scanner,
+            rate_journal=RateJournal(os.path.join(data_dir, "rate_journal.jsonl")),
+            trace_recorder=recorder,
+            clock=clock, # ドリフト確認も仮想時刻で進める
+        )
+        stop_event = threading.Event()
+        interval = engine.MONITOR_INTERVAL_SECONDS
+        ticks = int(hours * 3600 / interval)
+        running_game = None
+
+        started = time.perf_counter()
+        for tick in range(ticks):
+            clock.now = tick * interval
+            # 平均 30 分ごとにゲームを起動し、平均 40 分で終了する。バックグラウンドのプロセスも入れ替わる
+            if running_game is None and rng.random() < interval / 1800:
+                running_game = rng.choice(games)["process_name"]
+                scanner.start(running_game)
+            elif running_game is not None and rng.random() < interval / 2400:
+                scanner.kill(running_game)
+                running_game = None
+            if rng.random() < interval / 60:
+                victim = rng.choice(background)
+                scanner.kill(victim)
+                scanner.start(victim)
+            # 平均 2 時間ごとに設定を変更する
+            if rng.random() < interval / 7200:
+                rng.choice(games)["high_rate"] = rng.choice([120, 144, 165])
+                engine.apply_settings()
+            engine._monitoring_tick(stop_event)
+        elapsed = time.perf_counter() - started
+
+    recorder.close()
+    return {"ticks": ticks, "session_seconds": ticks * interval, "synthesize_seconds": elapsed, "bytes": os.path.getsize(path)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Record-and-replay driver for monitoring traces.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    replay_parser = sub.add_parser("replay", help="トレースを再生し、判定が一致するか検証する")
+    replay_parser.add_argument("path")
+    replay_parser.add_argument("--output", default=None, help="結果を書き込む JSON ファイル (既定: 標準出力)")
+    synth_parser = sub.add_parser("synthesize", help="仮想時刻で監視セッションを生成し、トレースに記録する")
+    synth_parser.add_argument("path")
+    synth_parser.add_argument("--hours", type=float, default=10.0)
+    synth_parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # 💡 ログはハンドラに出力しない
+    app_logger = logging.getLogger('AutoHzSwitcher')
+    app_logger.propagate = False
+    app_logger.addHandler(logging.NullHandler())
+
+    if args.command == "synthesize":
+        print(json.dumps(synthesize(args.path, args.hours, args.seed), indent=2))
+        return 0
+
+    started = time.perf_counter()
+    report = replay_trace(read_trace(args.path))
+    result = {
+        "benchmark": "replay_trace",
+        "trace": args.path,
+        "wall_seconds": time.perf_counter() - started,
+        **report.to_dict(),
+    }
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0 if report.identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
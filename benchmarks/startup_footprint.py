@@ -0,0 +1,160 @@
+# benchmarks/startup_footprint.py
+# ヘッドレス版と GUI 版の起動時間・常駐メモリ (RSS) を計測し、JSON で出力する
+#
+#   python benchmarks/startup_footprint.py [--runs 5] [--output result.json]
+#
+# - headless: headless.py を別プロセスで起動し、制御チャネルが応答するまでの時間と、その時点の RSS を計測する
+#             (設定・ログ・ジャーナルは一時フォルダに書き込むため、実際のユーザー設定には影響しない)
+# - gui:      main_app を import するまでの時間と RSS を計測する (tkinter / pystray / PIL / main_gui の読み込みコスト)
+#             Windows 以外では winreg 等が無いため import に失敗し、error として記録される
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SRC_DIR = os.path.join(REPO_ROOT, 'src')
+sys.path.insert(0, SRC_DIR)
+
+from hz_core.ipc import CONTROL_KEY_FILENAME, IPCError, load_control_authkey, send_command
+from hz_core.paths import APP_DIR_NAME
+
+READY_TIMEOUT_SECONDS = 30.0
+
+_GUI_IMPORT_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+try:
+    import main_app
+    error = None
+except Exception as e:
+    error = f"{type(e).__name__}: {e}"
+elapsed = time.perf_counter() - t
+try:
+    import psutil
+    rss = psutil.Process().memory_info().rss
+except Exception:
+    rss = None
+print(json.dumps({"import_seconds": elapsed, "rss_bytes": rss, "error": error}))
+"""
+
+
+def _isolated_env(data_dir: str) -> dict:
+    env = dict(os.environ)
+    env['LOCALAPPDATA'] = data_dir
+    env['PYTHONPATH'] = SRC_DIR + os.pathsep + env.get('PYTHONPATH', '')
+    return env
+
+
+def measure_headless() -> dict:
+    with tempfile.TemporaryDirectory() as data_dir:
+        address = (
+            rf"\\.\pipe\AutoHzSwitcher-bench-{os.getpid()}" if sys.platform == 'win32'
+            else os.path.join(data_dir, 'control.sock')
+        )
+        # 子プロセスのユーザーデータフォルダ (LOCALAPPDATA) に鍵を先に作成し、同じ鍵で接続する
+        os.makedirs(os.path.join(data_dir, APP_DIR_NAME), exist_ok=True)
+        authkey = load_control_authkey(os.path.join(data_dir, APP_DIR_NAME, CONTROL_KEY_FILENAME))
+        started = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, os.path.join(SRC_DIR, 'headless.py'), '--control-address', address],
+            env=_isolated_env(data_dir), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        try:
+            while True:
+                if proc.poll() is not None:
+                    return {"error": proc.stderr.read().decode(errors='replace').strip().splitlines()[-1:] or "exited"}
+                try:
+                    status = send_command("status", address=address, authkey=authkey)
+                except IPCError:
+                    if time.perf_counter() - started > READY_TIMEOUT_SECONDS:
+                        return {"error": "timeout waiting for control channel"}
+                    time.sleep(0.01)
+                    continue
+                if status.get("startup_seconds") is not None:
+                    break
+                time.sleep(0.01)
+
+            return {
+                "ready_seconds": time.perf_counter() - started,
+                "startup_seconds": status["startup_seconds"],
+                "rss_bytes": status["rss_bytes"],
+                "gui_modules_loaded": status["gui_modules_loaded"],
+                "error": None,
+            }
+        finally:
+            try:
+                send_command("shutdown", address=address, authkey=authkey)
+            except IPCError:
+                pass
+            try:
+                proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+def measure_gui_import() -> dict:
+    with tempfile.TemporaryDirectory() as data_dir:
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-c', _GUI_IMPORT_PROBE],
+            env=_isolated_env(data_dir), cwd=SRC_DIR, capture_output=True, text=True,
+        )
+        wall = time.perf_counter() - started
+    try:
+        data = json.loads(result.stdout.strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        return {"error": result.stderr.strip().splitlines()[-1:] or "no output"}
+    data["process_seconds"] = wall
+    return data
+
+
+def _summarize(samples: list, key: str) -> dict:
+    values = [s[key] for s in samples if s.get("error") is None and s.get(key) is not None]
+    if not values:
+        return {}
+    return {"min": min(values), "median": statistics.median(values), "max": max(values)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure headless vs GUI startup time and RSS.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", default=None, help="結果を書き込む JSON ファイル (既定: 標準出力)")
+    args = parser.parse_args()
+
+    headless = [measure_headless() for _ in range(args.runs)]
+    gui = [measure_gui_import() for _ in range(args.runs)]
+
+    report = {
+        "benchmark": "startup_footprint",
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "runs": args.runs,
+        "headless": {
+            "ready_seconds": _summarize(headless, "ready_seconds"),
+            "rss_bytes": _summarize(headless, "rss_bytes"),
+            "samples": headless,
+        },
+        "gui_import": {
+            "import_seconds": _summarize(gui, "import_seconds"),
+            "rss_bytes": _summarize(gui, "rss_bytes"),
+            "samples": gui,
+        },
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
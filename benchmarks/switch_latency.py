@@ -0,0 +1,349 @@
+# benchmarks/switch_latency.py
+# ゲーム起動から高レートへの切り替え / ゲーム終了からアイドルレートへの復帰までの時間 (エンドツーエンド) を計測する
+#
+#   python benchmarks/switch_latency.py [--iterations 50] [--intervals 0.25,0.5,1.0] [--scanners fake,psutil]
+#
+# - 監視エンジン (MonitorEngine。MainApplication の監視ループと同一) を実際の監視スレッドで動作させ、
+#   ディスプレイは hz_core.simulator のシミュレーター (--latency で外部ツールの応答時間を模擬) を使用する
+# - スキャナーごとのゲームの「起動」:
+#     fake   : メモリ上のプロセス表 (hz_core.fakes.FakeProcessScanner) に追加する
+#     psutil : 登録ゲームと同じ名前の実行ファイル (Python へのリンク) を実際に起動する
+#     procfs : psutil と同様に実際に起動し、/proc を直接読む取得元 (Linux のみ) で検出する
+#     synthetic : 入れ替わりの激しい数千プロセスの合成プロセス表 (hz_core.process_source) に追加する
+# - 各反復の開始タイミングは監視間隔内でランダムにずらす (ポーリングの位相による偏りを避けるため)
+# - 結果は JSON で出力する。detect = スキャナーがプロセスの出現/消滅を初めて観測するまで、
+#   switch = シミュレーターのレートが目標値へ変更されるまで (どちらもゲームの起動/終了時点から)
+
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SRC_DIR = os.path.join(REPO_ROOT, 'src')
+sys.path.insert(0, SRC_DIR)
+
+from hz_core.backend import DisplayBackend
+from hz_core.engine import MonitorEngine
+from hz_core.fakes import FakeProcessScanner
+from hz_core.rate_journal import RateJournal
+from hz_core.scanner import ProcessScanner
+from hz_core.simulator import SimulatedDisplay, SimulatedDisplayBackend
+
+MONITOR_ID = r"\\.\DISPLAY1"
+GAME_PROCESS_NAME = "benchgame.exe"
+HIGH_RATE = 144
+LOW_RATE = 60
+# 1 回の切り替えを待つ上限 (秒)
+SWITCH_TIMEOUT_SECONDS = 15.0
+
+
+class _ObservedScanner(ProcessScanner):
+    """スキャナーをラップし、対象プロセスの出現/消滅を初めて観測した時刻を記録します。"""
+
+    def __init__(self, inner: ProcessScanner, process_name: str):
+        self._inner = inner
+        self._process_name = process_name
+        self._lock = threading.Lock()
+        self._expect_present: Optional[bool] = None
+        self.observed_at: Optional[float] = None
+
+    def expect(self, present: bool):
+        with self._lock:
+            self._expect_present = present
+            self.observed_at = None
+
+    def running_process_names(self) -> Set[str]:
+        names = self._inner.running_process_names()
+        now = time.perf_counter()
+        with self._lock:
+            if self._expect_present is not None and self.observed_at is None:
+                if (self._process_name in names) == self._expect_present:
+                    self.observed_at = now
+        return names
+
+    def find_process_identity(self, process_name: str) -> Optional[Tuple[int, float]]:
+        return self._inner.find_process_identity(process_name)
+
+    def is_process_alive(self, pid: int, create_time: float) -> bool:
+        return self._inner.is_process_alive(pid, create_time)
+
+
+class _ObservedBackend(DisplayBackend):
+    """バックエンドをラップし、目標レートへの変更が成功した時刻を通知します。"""
+
+    def __init__(self, inner: DisplayBackend):
+        self._inner = inner
+        self._lock = threading.Lock()
+        self._target: Optional[int] = None
+        self.switched = threading.Event()
+        self.switched_at: Optional[float] = None
+
+    def expect(self, target_rate: int):
+        with self._lock:
+            self._target = target_rate
+            self.switched_at = None
+            self.switched.clear()
+
+    def get_active_rate(self, monitor_id: str, max_age: float = 0.0) -> Optional[int]:
+        return self._inner.get_active_rate(monitor_id, max_age=max_age)
+
+    def change_rate(self, target_rate: int, width: int, height: int, monitor_id: str) -> bool:
+        success = self._inner.change_rate(target_rate, width, height, monitor_id)
+        if success:
+            with self._lock:
+                if target_rate == self._target and self.switched_at is None:
+                    self.switched_at = time.perf_counter()
+                    self.switched.set()
+        return success
+
+
+class _FakeLauncher:
+    """メモリ上のプロセス表に対するゲームの起動/終了。"""
+
+    def __init__(self):
+        self.scanner = FakeProcessScanner()
+
+    def launch(self, process_name: str):
+        self.scanner.start(process_name)
+
+    def exit(self, process_name: str):
+        self.scanner.kill(process_name)
+
+    def close(self):
+        pass
+
+
+class _SyntheticLauncher:
+    """入れ替わり (churn) のある合成プロセス表に対するゲームの起動/終了。"""
+
+    def __init__(self):
+        from hz_core.process_source import SyntheticProcessSource
+        from hz_core.scanner import SourceProcessScanner
+        self.source = SyntheticProcessSource.build_server(seed=1)
+        self.scanner = SourceProcessScanner(self.source)
+
+    def launch(self, process_name: str):
+        self.source.start(process_name)
+
+    def exit(self, process_name: str):
+        self.source.kill(process_name)
+
+    def close(self):
+        pass
+
+
+class _RealProcessLauncher:
+    """登録ゲームと同じ名前の実行ファイル (Python へのリンク) を実際に起動/終了します。"""
+
+    def __init__(self, scanner: ProcessScanner, work_dir: str):
+        self.scanner = scanner
+        self._work_dir = work_dir
+        self._processes: Dict[str, subprocess.Popen] = {}
+
+    def _executable(self, process_name: str) -> str:
+        path = os.path.join(self._work_dir, process_name)
+        if not os.path.exists(path):
+            try:
+                os.symlink(sys.executable, path)
+            except (OSError, NotImplementedError):
+                shutil.copy2(sys.executable, path)
+        return path
+
+    def launch(self, process_name: str):
+        self._processes[process_name] = subprocess.Popen(
+            [self._executable(process_name), "-c", "import time; time.sleep(3600)"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+
+    def exit(self, process_name: str):
+        proc = self._processes.pop(process_name, None)
+        if proc is not None:
+            proc.kill()
+            proc.wait()
+
+    def close(self):
+        for name in list(self._processes):
+            self.exit(name)
+
+
+def _make_launcher(strategy: str, work_dir: str):
+    if strategy == "fake":
+        return _FakeLauncher()
+    if strategy == "psutil":
+        from hz_core.process_source import PsutilProcessSource
+        from hz_core.scanner import SourceProcessScanner
+        return _RealProcessLauncher(SourceProcessScanner(PsutilProcessSource()), work_dir)
+    if strategy == "procfs":
+        from hz_core.process_source import ProcFsProcessSource
+        from hz_core.scanner import SourceProcessScanner
+        return _RealProcessLauncher(SourceProcessScanner(ProcFsProcessSource()), work_dir)
+    if strategy == "synthetic":
+        return _SyntheticLauncher()
+    raise ValueError(f"Unknown scanner strategy: {strategy}")
+
+
+def _percentiles(values: List[float]) -> Dict[str, Any]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        # 線形補間による分位点
+        position = (len(ordered) - 1) * q
+        lower = int(position)
+        upper = min(lower + 1, len(ordered) - 1)
+        return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+    return {
+        "count": len(ordered),
+        "min": ordered[0],
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": ordered[-1],
+    }
+
+
+def _measure_transition(
+    engine_backend: _ObservedBackend,
+    scanner: _ObservedScanner,
+    action: Callable[[], None],
+    target_rate: int,
+    game_present: bool,
+) -> Tuple[Optional[float], Optional[float]]:
+    """ゲームの起動/終了を行い、(detect 秒, switch 秒) を返します。タイムアウトした場合は None。"""
+    engine_backend.expect(target_rate)
+    scanner.expect(game_present)
+    started = time.perf_counter()
+    action()
+
+    if not engine_backend.switched.wait(SWITCH_TIMEOUT_SECONDS):
+        return None, None
+
+    detect = scanner.observed_at - started if scanner.observed_at is not None else None
+    return detect, engine_backend.switched_at - started
+
+
+def run_scenario(strategy: str, interval: float, args: argparse.Namespace) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as work_dir:
+        try:
+            launcher = _make_launcher(strategy, work_dir)
+        except Exception as e:
+            return {"scanner": strategy, "interval": interval, "error": f"{type(e).__name__}: {e}"}
+
+        settings = {
+            "selected_monitor_id": MONITOR_ID,
+            "target_resolution": "2560x1440",
+            "is_monitoring_enabled": True,
+            "default_low_rate": LOW_RATE,
+            "use_global_high_rate": False,
+            "global_high_rate": HIGH_RATE,
+            "games": [{"name": "Bench Game", "process_name": GAME_PROCESS_NAME, "high_rate": HIGH_RATE, "is_enabled": True}],
+        }
+        display = SimulatedDisplay.default(latency=args.latency, latency_jitter=args.latency_jitter, seed=args.seed)
+        backend = _ObservedBackend(SimulatedDisplayBackend(display))
+        scanner = _ObservedScanner(launcher.scanner, GAME_PROCESS_NAME)
+        engine = MonitorEngine(
+            settings,
+            display_backend=backend,
+            process_scanner=scanner,
+            rate_journal=RateJournal(os.path.join(work_dir, "rate_journal.jsonl")),
+        )
+        engine.monitor_lifecycle.interval = interval
+
+        rng = random.Random(args.seed)
+        samples = {"launch": {"detect": [], "switch": []}, "exit": {"detect": [], "switch": []}}
+        timeouts = 0
+
+        try:
+            engine.start()
+            deadline = time.monotonic() + SWITCH_TIMEOUT_SECONDS
+            while not engine.is_monitoring and time.monotonic() < deadline:
+                time.sleep(0.01)
+            if not engine.is_monitoring:
+                return {"scanner": strategy, "interval": interval, "error": "monitoring thread did not start"}
+
+            for _ in range(args.iterations):
+                for phase, action, target_rate, present in (
+                    ("launch", lambda: launcher.launch(GAME_PROCESS_NAME), HIGH_RATE, True),
+                    ("exit", lambda: launcher.exit(GAME_PROCESS_NAME), LOW_RATE, False),
+                ):
+                    # 監視ループの位相に対して、ゲームの起動/終了のタイミングをランダムにずらす
+                    time.sleep(rng.uniform(0.0, interval))
+                    detect, switch = _measure_transition(backend, scanner, action, target_rate, present)
+                    if switch is None:
+                        timeouts += 1
+                        continue
+                    if detect is not None:
+                        samples[phase]["detect"].append(detect)
+                    samples[phase]["switch"].append(switch)
+        finally:
+            engine.shutdown()
+            launcher.close()
+
+        return {
+            "scanner": strategy,
+            "interval": interval,
+            "timeouts": timeouts,
+            "game_launch_to_high_rate": {key: _percentiles(values) for key, values in samples["launch"].items()},
+            "game_exit_to_idle_rate": {key: _percentiles(values) for key, values in samples["exit"].items()},
+            "error": None,
+        }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure detection-to-switch latency end to end.")
+    parser.add_argument("--iterations", type=int, default=50, help="シナリオごとのゲーム起動/終了の回数")
+    parser.add_argument("--intervals", default="0.25,0.5,1.0", help="比較する監視間隔 (秒、カンマ区切り)")
+    parser.add_argument("--scanners", default="fake,psutil", help="比較するスキャナー (カンマ区切り: fake, psutil, procfs, synthetic)")
+    parser.add_argument("--latency", type=float, default=0.05, help="シミュレーターの呼び出しごとの遅延 (秒)")
+    parser.add_argument("--latency-jitter", type=float, default=0.02, help="遅延に加える 0..N 秒の揺らぎ")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None, help="結果を書き込む JSON ファイル (既定: 標準出力)")
+    args = parser.parse_args()
+
+    intervals = [float(value) for value in args.intervals.split(",") if value]
+    strategies = [value.strip() for value in args.scanners.split(",") if value.strip()]
+
+    # 💡 ログはハンドラに出力しない
+    app_logger = logging.getLogger('AutoHzSwitcher')
+    app_logger.setLevel(logging.INFO)
+    app_logger.propagate = False
+    app_logger.addHandler(logging.NullHandler())
+
+    scenarios = [run_scenario(strategy, interval, args) for strategy in strategies for interval in intervals]
+
+    report = {
+        "benchmark": "switch_latency",
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "created_at": time.time(),
+        "parameters": {
+            "iterations": args.iterations,
+            "latency": args.latency,
+            "latency_jitter": args.latency_jitter,
+            "seed": args.seed,
+        },
+        "scenarios": scenarios,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+# headless.py
+# タスクトレイ / 設定画面を持たないヘッドレス版のエントリーポイント (無人運用の端末向け)
+#
+# 💡 このモジュールは tkinter / pystray / PIL / main_gui を import しない。
+#    読み込まれるのは hz_core (監視エンジン) と switcher_utility (psutil) のみ。
+#    操作はローカル IPC (hz_core.ipc) 経由で行う:
+#       python headless.py                     # 起動
+#       python headless.py --send status       # 実行中のインスタンスへコマンドを送る
+
+import time
+
+# 起動時間の計測の基準点 (import より前に記録する)
+_STARTED_AT = time.perf_counter()
+
+import argparse
+import logging
+import signal
+import sys
+import threading
+from typing import Any, Dict, List, Optional
+
+from hz_core import (
+    ConfigService,
+    LoadedConfig,
+    MetricsExporter,
+    MonitorEngine,
+    apply_log_levels,
+    get_log_levels,
+    get_settings_file_path,
+    load_config,
+    set_log_level,
+    setup_logging,
+)
+from hz_core.ipc import ControlServer, default_control_address, run_cli_command
+from hz_core.trace import TraceRecorder
+
+APP_LOGGER = logging.getLogger('AutoHzSwitcher')
+
+# 読み込まれていないことを status で確認する GUI 関連モジュール
+GUI_MODULES = ("tkinter", "pystray", "PIL", "main_gui")
+
+
+def _get_rss_bytes() -> Optional[int]:
+    """現在のプロセスの常駐メモリ (RSS) をバイト単位で返します。"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return None
+
+
+class HeadlessApplication:
+    """監視エンジンと制御チャネルのみで動作するアプリケーション本体。"""
+
+    def __init__(
+        self,
+        config_path: str,
+        control_address: Optional[str] = None,
+        trace_path: Optional[str] = None,
+        config: Optional[LoadedConfig] = None,
+    ):
+        self.config_path = config_path
+        # 💡 起動時に読み込んだ設定 (ロギング設定と共有) を受け取る。省略時はここで読み込む
+        if config is None:
+            config = load_config(config_path)
+        config.report()
+        self.config_service = ConfigService(config_path, settings=config.settings)
+        self.settings = self.config_service.settings
+        self.trace_recorder = TraceRecorder(trace_path) if trace_path else None
+        self.engine = MonitorEngine(self.settings, trace_recorder=self.trace_recorder)
+        self.control_server = ControlServer(
+            {
+                "status": self._cmd_status,
+                "set_monitoring": self._cmd_set_monitoring,
+                "force_rate": self._cmd_force_rate,
+                "reload_config": self._cmd_reload_config,
+                "set_log_level": self._cmd_set_log_level,
+                "shutdown": self._cmd_shutdown,
+            },
+            address=control_address,
+        )
+        # 💡 メトリクスの出力 (任意。設定の 'metrics_port' / 'metrics_textfile' で有効化する)
+        self.metrics_exporter: Optional[MetricsExporter] = None
+        self._stop_requested = threading.Event()
+        self.startup_seconds: Optional[float] = None
+
+    def run(self) -> int:
+        if not self.control_server.start():
+            APP_LOGGER.info("Another instance is already running. Exiting.")
+            if self.trace_recorder is not None:
+                self.trace_recorder.close()
+            return 1
+
+        self.engine.publish_initial_status()
+        # 監視スレッドの開始 (クラッシュ復帰判定を含め、バックグラウンドで実行され即座に戻る)
+        self.engine.start()
+        # 💡 設定ファイルの外部変更 (管理者のスクリプトによる編集など) を定期的に確認し、反映する
+        self.config_service.add_reload_listener(self._on_config_reloaded)
+        self.config_service.start_watching()
+        self._restart_metrics_exporter()
+
+        self.startup_seconds = time.perf_counter() - _STARTED_AT
+        rss = _get_rss_bytes()
+        APP_LOGGER.info(
+            "Headless monitor ready in %.3f s (RSS: %s MiB).",
+            self.startup_seconds, f"{rss / (1024 * 1024):.1f}" if rss else "unknown"
+        )
+
+        # 💡 Windows でも Ctrl+C に反応できるよう、短い間隔で待機する
+        while not self._stop_requested.wait(0.5):
+            pass
+
+        APP_LOGGER.info("Headless shutdown sequence initiated.")
+        self.engine.shutdown()
+        self.config_service.close()
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.close()
+        if self.trace_recorder is not None:
+            self.trace_recorder.close()
+        self.control_server.close()
+        APP_LOGGER.info("Headless monitor shut down.")
+        return 0
+
+    def _on_config_reloaded(self, changed_keys):
+        """[ConfigWatcher スレッド] 外部で編集された設定が settings に反映された後に呼ばれます。"""
+        self.engine.apply_settings()
+        if "is_monitoring_enabled" in changed_keys:
+            self._apply_monitoring_state(bool(self.settings.get("is_monitoring_enabled", False)))
+        if "log_level" in changed_keys or "log_levels" in changed_keys:
+            apply_log_levels(self.settings)
+        if "metrics_port" in changed_keys or "metrics_textfile" in changed_keys:
+            self._restart_metrics_exporter()
+
+    def _restart_metrics_exporter(self):
+        """設定に従ってメトリクスの出力を (再) 開始します。"""
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.close()
+        self.metrics_exporter = MetricsExporter.from_settings(self.settings)
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.start()
+
+    def _apply_monitoring_state(self, is_enabled: bool):
+        if is_enabled:
+            self.engine.start()
+        else:
+            self.engine.stop()
+            self.engine.publish_status(f"Status: MONITORING DISABLED ({self.engine.current_rate} Hz)", self.engine.current_rate)
+
+    def request_stop(self, *args):
+        self._stop_requested.set()
+
+    # --- 制御コマンド ---
+
+    def _cmd_status(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        record = self.engine.status_channel.latest()
+        return {
+            "status": record.text,
+            "rate": self.engine.current_rate,
+            "monitoring_enabled": bool(self.settings.get("is_monitoring_enabled", False)),
+            "lifecycle": self.engine.monitor_lifecycle.state.value,
+            "startup_seconds": self.startup_seconds,
+            "rss_bytes": _get_rss_bytes(),
+            "gui_modules_loaded": [name for name in GUI_MODULES if name in sys.modules],
+            "log_levels": get_log_levels(),
+            "metrics_endpoint": self.metrics_exporter.address if self.metrics_exporter is not None else None,
+        }
+
+    def _cmd_set_monitoring(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        is_enabled = bool(args.get("enabled", not self.settings.get("is_monitoring_enabled", False)))
+        self.settings["is_monitoring_enabled"] = is_enabled
+        self.config_service.save()
+        self._apply_monitoring_state(is_enabled)
+
+        APP_LOGGER.info("Monitoring state set via control channel: %s", is_enabled)
+        return {"monitoring_enabled": is_enabled}
+
+    def _cmd_force_rate(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        final_rate = self.engine.force_rate(int(args["rate"]), reason="ipc")
+        if final_rate is None:
+            raise RuntimeError(f"Failed to apply {args['rate']} Hz.")
+        # 監視中は、実行中のゲームの構成が変わるまで維持される (held=True)
+        return {"rate": final_rate, "held": self.engine.rate_override is not None}
+
+    def _cmd_reload_config(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        # 💡 ConfigService が外部変更を確認し、監視スレッドと共有している辞書を差し替えずに更新する。
+        #    保留中の書き込み (制御コマンドによる変更) は外部の編集を上書きせずに統合される
+        self.config_service.flush()
+        reloaded = self.config_service.check_for_changes()
+        self.engine.apply_settings()
+        return {"games": len(self.settings.get("games", [])), "reloaded": reloaded}
+
+    def _cmd_set_log_level(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        # 例: {"level": "DEBUG", "subsystem": "scanner"} / {"level": null, "subsystem": "scanner"} (全体に従う)
+        # 💡 設定ファイルには保存しない (再起動すると設定の値に戻る)
+        return {"log_levels": set_log_level(args.get("level"), args.get("subsystem"))}
+
+    def _cmd_shutdown(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        self.request_stop()
+        return {}
+
+
+def _parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Auto Hz Switcher (headless monitor)")
+    parser.add_argument("--headless", action="store_true", help="(main_app.py から起動する場合の切り替え用フラグ)")
+    parser.add_argument("--config", default=None, help="設定ファイルのパス (既定: %%LOCALAPPDATA%%/AutoHzSwitcher/hz_switcher_config.json)")
+    parser.add_argument("--control-address", default=None, help="制御チャネルのアドレス (既定: ユーザーごとの名前付きパイプ / Unix ソケット)")
+    parser.add_argument("--record-trace", metavar="PATH", default=None, help="監視セッションを JSONL トレースに記録する (.gz で圧縮)")
+    parser.add_argument("--send", metavar="COMMAND", default=None, help="実行中のインスタンスへコマンドを送って終了する")
+    parser.add_argument("--args", default="{}", help="--send と一緒に送る引数 (JSON)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    address = args.control_address or default_control_address()
+
+    if args.send:
+        return run_cli_command(args.send, args.args, address=address)
+
+    # 設定ファイルは 1 度だけ読み込み (移行・検証を含む)、ロギング設定とアプリケーションで共有する
+    config_path = args.config or get_settings_file_path()
+    config = load_config(config_path)
+    try:
+        setup_logging(config.settings)
+    except Exception as e:
+        # ロギング設定自体が失敗した場合、コンソールに直接エラーを出力
+        print(f"FATAL: Failed to set up logging: {e}", file=sys.stderr)
+        return 1
+
+    app = HeadlessApplication(config_path, control_address=address, trace_path=args.record_trace, config=config)
+
+    signal.signal(signal.SIGINT, app.request_stop)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, app.request_stop)
+
+    try:
+        return app.run()
+    except Exception as e:
+        APP_LOGGER.critical("A critical unhandled exception occurred in headless mode: %s", e, exc_info=True)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# hz_core/__init__.py
+# Auto Hz Switcher のコア (GUI / Tk / トレイに依存しない) コンポーネント群
+#
+# 💡 このパッケージ配下のモジュールは tkinter / pystray / PIL を import しないこと。
+#    監視スレッドやヘッドレス実行から安全に利用できるようにするため。
+#    また、import 時に psutil / pywin32 / 外部ツールを必要としない (既定の実装は生成時に読み込まれる)。
+#    メモリ上の実装 (Linux 上での動作確認・ベンチマーク用) は hz_core.fakes / hz_core.simulator にある。
+
+from hz_core.app_logging import apply_log_levels, get_log_levels, set_log_level, setup_logging
+from hz_core.backend import DisplayBackend, SwitcherUtilityBackend
+from hz_core.config_service import ConfigService
+from hz_core.decision import RateOverride, decide_target_rate, is_low_rate
+from hz_core.engine import MonitorEngine
+from hz_core.i18n import LanguageManager, TranslationCatalog, get_translation_catalog
+from hz_core.metrics import METRICS, Counter, Gauge, Histogram, MetricsExporter, MetricsRegistry, StateTimer, render_text
+from hz_core.monitor_lifecycle import LifecycleState, MonitorLifecycle
+from hz_core.paths import get_app_data_dir, get_log_dir, get_resource_path, get_settings_file_path
+from hz_core.platform import InstanceLock, StartupRegistrar, TrayFactory, TrayIcon
+from hz_core.process_source import (
+    NegativeCache,
+    ProcessInfo,
+    ProcessSource,
+    ProcFsProcessSource,
+    PsutilProcessSource,
+    SyntheticProcessSource,
+    TraceProcessSource,
+)
+from hz_core.rate_journal import JournalRecord, RateJournal, get_rate_journal_path
+from hz_core.reconciler import DriftEvent, DriftPolicy, DriftReconciler
+from hz_core.rules import GLOBAL_HIGH_RATE_NAME, RuleIndex, RuleMatch
+from hz_core.scanner import ProcessScanner, PsutilProcessScanner, SourceProcessScanner
+from hz_core.settings import (
+    CONFIG_VERSION,
+    LOG_SUBSYSTEMS,
+    LoadedConfig,
+    get_default_settings,
+    load_config,
+    load_settings,
+    save_settings,
+    validate_settings,
+    write_text_atomic,
+)
+from hz_core.status_channel import StatusChannel, StatusRecord
+
+__all__ = [
+    "CONFIG_VERSION",
+    "ConfigService",
+    "Counter",
+    "DisplayBackend",
+    "DriftEvent",
+    "DriftPolicy",
+    "DriftReconciler",
+    "GLOBAL_HIGH_RATE_NAME",
+    "Gauge",
+    "Histogram",
+    "InstanceLock",
+    "JournalRecord",
+    "LOG_SUBSYSTEMS",
+    "LanguageManager",
+    "LifecycleState",
+    "LoadedConfig",
+    "METRICS",
+    "MetricsExporter",
+    "MetricsRegistry",
+    "MonitorEngine",
+    "MonitorLifecycle",
+    "NegativeCache",
+    "ProcFsProcessSource",
+    "ProcessInfo",
+    "ProcessScanner",
+    "ProcessSource",
+    "PsutilProcessScanner",
+    "PsutilProcessSource",
+    "RateJournal",
+    "RateOverride",
+    "RuleIndex",
+    "RuleMatch",
+    "SourceProcessScanner",
+    "StartupRegistrar",
+    "StateTimer",
+    "StatusChannel",
+    "StatusRecord",
+    "SwitcherUtilityBackend",
+    "SyntheticProcessSource",
+    "TraceProcessSource",
+    "TranslationCatalog",
+    "TrayFactory",
+    "TrayIcon",
+    "apply_log_levels",
+    "decide_target_rate",
+    "get_app_data_dir",
+    "get_default_settings",
+    "get_log_dir",
+    "get_log_levels",
+    "get_rate_journal_path",
+    "get_resource_path",
+    "get_settings_file_path",
+    "get_translation_catalog",
+    "is_low_rate",
+    "load_config",
+    "load_settings",
+    "render_text",
+    "save_settings",
+    "set_log_level",
+    "setup_logging",
+    "validate_settings",
+    "write_text_atomic",
+]
@@ -0,0 +1,449 @@
+# hz_core/app_logging.py
+# ロギング設定 (Application Logger Setup)。GUI 版とヘッドレス版で共通
+#
+# 💡 ログの出力 (ファイル・コンソール) は QueueListener のスレッドで行い、監視スレッドや外部ツールの
+#    再試行処理など、ログを出力する側のスレッドはキューへの追加のみで戻る。
+#    同じメッセージの繰り返し (毎秒同じ失敗が続く場合など) は RepeatCollapsingHandler が
+#    "Last message repeated N times" の要約にまとめる。
+#
+# 💡 ローテーションは、ファイル名の変更と開き直しのみを行う (CompressingRotatingFileHandler)。
+#    古いログの圧縮 (gzip / zstd) と、合計サイズによる古いログの削除はバックグラウンドのスレッドで行う。
+#
+# 💡 ログレベルは実行中に変更できる (set_log_level)。全体は 'AutoHzSwitcher' ロガー、
+#    サブシステム (scanner / backend / gui) はその子ロガー 'AutoHzSwitcher.<名前>' のレベルで決まる。
+#    レベルの判定はロガーで行うため、無効なレベルのメッセージは書式化もキューへの追加も行われない。
+
+import atexit
+import gzip
+import logging
+import os
+import queue
+import re
+import shutil
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from hz_core.paths import get_log_dir, get_settings_file_path
+from hz_core.settings import LOG_LEVEL_NAMES, LOG_SUBSYSTEMS
+
+# アプリケーション本体のロガー名 (サブシステムのロガーはこの子)
+APP_LOGGER_NAME = 'AutoHzSwitcher'
+
+# 同じメッセージを 1 回だけ出力し、以降を数えるだけにする時間 (秒)
+REPEAT_WINDOW_SECONDS = 60.0
+# 記憶しておくメッセージの種類の上限 (超えた場合は古いものから要約を出力して忘れる)
+REPEAT_MAX_TRACKED = 512
+
+
+class RepeatCollapsingHandler(logging.Handler):
+    """
+    Forwards records to the target handlers, collapsing identical repeats.
+
+    - 同じロガー・レベル・本文のメッセージは、最初の 1 回を出力した後 window 秒間は出力せずに数える
+      (交互に出力される複数行の繰り返しもまとめられる)
+    - window 秒が経過した後に同じメッセージが来た場合、またはそれ以外のメッセージの処理時・close() 時に
+      期限切れのものがあれば、"Last message repeated N times in the last X s: ..." を元のレベルで出力する
+    - QueueListener のスレッドからのみ呼ばれる想定 (ロックは Handler の標準のものを使用)
+    """
+
+    def __init__(
+        self,
+        targets: List[logging.Handler],
+        window: float = REPEAT_WINDOW_SECONDS,
+        max_tracked: int = REPEAT_MAX_TRACKED,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__()
+        self.targets = targets
+        self.window = window
+        self.max_tracked = max_tracked
+        self._clock = clock
+        # (ロガー名, レベル, 本文) -> [最初に出力した時刻, 抑制した回数, 最後に抑制したレコード]
+        self._seen: Dict[Tuple[str, int, str], list] = {}
+        self._next_sweep = 0.0
+        self.suppressed = 0
+
+    def _forward(self, record: logging.LogRecord):
+        for target in self.targets:
+            if record.levelno >= target.level:
+                target.handle(record)
+
+    def _summary(self, entry: list, now: float):
+        started, count, last = entry
+        summary = logging.makeLogRecord(last.__dict__)
+        summary.msg = "Last message repeated %d times in the last %.0f s: %s"
+        summary.args = (count, now - started, last.getMessage())
+        summary.exc_info = None
+        summary.exc_text = None
+        summary.stack_info = None
+        self._forward(summary)
+
+    def _sweep(self, now: float):
+        """期限切れのメッセージの要約を出力し、忘れます。"""
+        for key in [key for key, entry in self._seen.items() if now - entry[0] >= self.window]:
+            entry = self._seen.pop(key)
+            if entry[1]:
+                self._summary(entry, now)
+        self._next_sweep = now + min(self.window, 5.0)
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            now = self._clock()
+            if now >= self._next_sweep:
+                self._sweep(now)
+
+            key = (record.name, record.levelno, record.getMessage())
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                entry[2] = record
+                self.suppressed += 1
+                return
+            if entry is not None and entry[1]:
+                self._summary(entry, now)
+
+            if len(self._seen) >= self.max_tracked:
+                oldest = min(self._seen, key=lambda k: self._seen[k][0])
+                dropped = self._seen.pop(oldest)
+                if dropped[1]:
+                    self._summary(dropped, now)
+            self._seen[key] = [now, 0, record]
+            self._forward(record)
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        for target in self.targets:
+            target.flush()
+
+    def close(self):
+        # 未出力の要約を出力してから閉じる
+        try:
+            now = self._clock()
+            for entry in self._seen.values():
+                if entry[1]:
+                    self._summary(entry, now)
+            self._seen.clear()
+        finally:
+            for target in self.targets:
+                target.close()
+            super().close()
+
+
+# ローテーション後のログ (圧縮済みを含む) の合計サイズの上限 (バイト)
+DEFAULT_LOG_RETENTION_BYTES = 50 * 1024 * 1024
+# 圧縮形式ごとの拡張子
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst", "none": ""}
+
+
+def _zstd_compressor():
+    """zstandard モジュールがあれば圧縮器を返します (任意の依存。無い場合は None)。"""
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard.ZstdCompressor(level=10)
+
+
+class _LogCompressor:
+    """
+    ローテーションされたログを、バックグラウンドのスレッドで圧縮し、保持サイズの上限を適用します。
+    圧縮中にアプリが終了した場合、未圧縮のログは次回起動時に圧縮される。
+    """
+
+    def __init__(self, base_path: str, compression: str, retention_bytes: int):
+        self.base_path = base_path
+        self.compression = compression
+        self.retention_bytes = retention_bytes
+        self._queue: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="LogCompressor", daemon=True)
+        self._thread.start()
+
+    def submit(self, segment_path: Optional[str]):
+        """圧縮するログを追加します (None の場合は、保持サイズの上限の適用のみ行う)。"""
+        self._queue.put(segment_path or "")
+
+    def segments(self) -> List[str]:
+        """ローテーション後のログのパスを古い順に返します (現在書き込み中のログは含まない)。"""
+        directory, base_name = os.path.split(self.base_path)
+        pattern = re.compile(re.escape(base_name) + r"\.[0-9][-0-9.]*(\.gz|\.zst)?$")
+        try:
+            names = [name for name in os.listdir(directory) if pattern.match(name)]
+        except OSError:
+            return []
+        paths = [os.path.join(directory, name) for name in names]
+        return sorted(paths, key=lambda path: (os.path.getmtime(path) if os.path.exists(path) else 0.0, path))
+
+    def _compress(self, path: str):
+        suffix = COMPRESSION_SUFFIXES.get(self.compression, "")
+        if not suffix or path.endswith((".gz", ".zst")) or not os.path.exists(path):
+            return
+        temp_path = path + suffix + ".tmp"
+        try:
+            with open(path, 'rb') as source:
+                if suffix == ".zst":
+                    compressor = _zstd_compressor()
+                    if compressor is None:
+                        # zstandard が無い場合は gzip で圧縮する
+                        suffix = ".gz"
+                        temp_path = path + suffix + ".tmp"
+                    else:
+                        with open(temp_path, 'wb') as target:
+                            compressor.copy_stream(source, target)
+                if suffix == ".gz":
+                    with gzip.open(temp_path, 'wb', compresslevel=6) as target:
+                        shutil.copyfileobj(source, target, 1024 * 1024)
+            # 元のログの更新時刻を引き継ぐ (古い順の判定に使う)
+            stat = os.stat(path)
+            os.utime(temp_path, (stat.st_atime, stat.st_mtime))
+            os.replace(temp_path, path + suffix)
+            os.unlink(path)
+        except OSError as e:
+            # 💡 ロギングの内部処理のため、ログには出力せず標準エラーへ (失敗したログは未圧縮のまま残る)
+            print(f"AutoHzSwitcher: failed to compress rotated log {path}: {e}", file=sys.stderr)
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
+    def _apply_retention(self):
+        segments = self.segments()
+        sizes = {}
+        for path in segments:
+            try:
+                sizes[path] = os.path.getsize(path)
+            except OSError:
+                sizes[path] = 0
+        total = sum(sizes.values())
+        # 古いものから削除する (最新のものは上限を超えていても 1 つは残す)
+        for path in segments[:-1]:
+            if total <= self.retention_bytes:
+                break
+            try:
+                os.unlink(path)
+                total -= sizes[path]
+            except OSError:
+                pass
+
+    def _run(self):
+        # 前回の実行で圧縮されずに残ったログ (旧形式の .1 ～ .4 を含む) を先に圧縮する
+        for path in self.segments():
+            self._compress(path)
+        self._apply_retention()
+        while True:
+            path = self._queue.get()
+            if path is None:
+                return
+            if path:
+                self._compress(path)
+            self._apply_retention()
+
+    def close(self, timeout: float = 5.0):
+        """残りの圧縮を待って (最大 timeout 秒) スレッドを停止します。"""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+
+class CompressingRotatingFileHandler(RotatingFileHandler):
+    """
+    A RotatingFileHandler whose rollover only renames the file; compression and
+    size-based retention happen on a background thread.
+
+    - ローテーション時は、現在のログを "<ログ名>.<日時>" に名前を変更して開き直すだけ (圧縮は待たない)
+    - 古いログは保持数ではなく合計サイズ (retention_bytes) で管理する
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        maxBytes: int,
+        retention_bytes: int = DEFAULT_LOG_RETENTION_BYTES,
+        compression: str = "gzip",
+        encoding: Optional[str] = None,
+    ):
+        # backupCount は使用しないが、RotatingFileHandler は 0 の場合にローテーションしないため 1 とする
+        super().__init__(filename, maxBytes=maxBytes, backupCount=1, encoding=encoding)
+        self.compressor = _LogCompressor(self.baseFilename, compression, retention_bytes)
+
+    def _segment_name(self) -> str:
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        candidate = f"{self.baseFilename}.{stamp}"
+        counter = 1
+        # 同じ秒に複数回ローテーションした場合は連番を付ける
+        while any(os.path.exists(candidate + suffix) for suffix in ("", ".gz", ".zst")):
+            candidate = f"{self.baseFilename}.{stamp}.{counter}"
+            counter += 1
+        return candidate
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        segment = None
+        if os.path.exists(self.baseFilename):
+            segment = self._segment_name()
+            try:
+                os.replace(self.baseFilename, segment)
+            except OSError:
+                # 💡 他のプロセスがファイルを開いている (Windows) 場合は、ローテーションせずに書き込みを続ける
+                segment = None
+        if not self.delay:
+            self.stream = self._open()
+        if segment is not None:
+            self.compressor.submit(segment)
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.compressor.close()
+
+
+def get_subsystem_logger(subsystem: str) -> logging.Logger:
+    """サブシステム (LOG_SUBSYSTEMS) のロガーを返します。"""
+    if subsystem not in LOG_SUBSYSTEMS:
+        raise ValueError(f"Unknown log subsystem: {subsystem!r} (expected one of {', '.join(LOG_SUBSYSTEMS)})")
+    return logging.getLogger(f"{APP_LOGGER_NAME}.{subsystem}")
+
+
+def set_log_level(level: Optional[str], subsystem: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """
+    実行中にログレベルを変更します (設定ファイルには保存しない)。変更後の get_log_levels() を返します。
+
+    subsystem を省略した場合は全体のレベルを変更する。
+    subsystem を指定して level に None を渡すと、そのサブシステムは全体のレベルに従う状態に戻る。
+    """
+    if level is None and subsystem is None:
+        raise ValueError("A log level is required when no subsystem is given.")
+    if level is not None and str(level).upper() not in LOG_LEVEL_NAMES:
+        raise ValueError(f"Unknown log level: {level!r} (expected one of {', '.join(LOG_LEVEL_NAMES)})")
+
+    logger = logging.getLogger(APP_LOGGER_NAME) if subsystem is None else get_subsystem_logger(subsystem)
+    logger.setLevel(logging.NOTSET if level is None else str(level).upper())
+    # 💡 DEBUG に下げた場合でも必ず残るよう、変更自体は WARNING で記録する
+    logging.getLogger(APP_LOGGER_NAME).warning(
+        "Log level changed at runtime: %s -> %s", subsystem or "global", level.upper() if level else "(inherit)"
+    )
+    return get_log_levels()
+
+
+def get_log_levels() -> Dict[str, Optional[str]]:
+    """現在のログレベルを返します ('global' と各サブシステム。全体に従うサブシステムは None)。"""
+    levels: Dict[str, Optional[str]] = {
+        "global": logging.getLevelName(logging.getLogger(APP_LOGGER_NAME).getEffectiveLevel())
+    }
+    for subsystem in LOG_SUBSYSTEMS:
+        level = get_subsystem_logger(subsystem).level
+        levels[subsystem] = logging.getLevelName(level) if level != logging.NOTSET else None
+    return levels
+
+
+def apply_log_levels(settings: Dict[str, Any]):
+    """設定の 'log_level' (全体) と 'log_levels' (サブシステムごと) をロガーに反映します。"""
+    log_level_str = str(settings.get('log_level', 'INFO')).upper()
+    logging.getLogger(APP_LOGGER_NAME).setLevel(getattr(logging, log_level_str, logging.INFO))
+    overrides = settings.get('log_levels') or {}
+    for subsystem in LOG_SUBSYSTEMS:
+        level = overrides.get(subsystem)
+        get_subsystem_logger(subsystem).setLevel(str(level).upper() if level else logging.NOTSET)
+
+
+# setup_logging() が開始したリスナー (再設定時・終了時に停止する)
+_listener: Optional[QueueListener] = None
+_listener_lock = threading.Lock()
+
+
+def shutdown_logging():
+    """キューに残っているログを書き出し、出力スレッドを停止します (終了時に atexit からも呼ばれる)。"""
+    global _listener
+    with _listener_lock:
+        listener, _listener = _listener, None
+    if listener is None:
+        return
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+atexit.register(shutdown_logging)
+
+
+def setup_logging(settings: Optional[Dict[str, Any]] = None):
+
+    # ------------------- ログレベルの読み込み -------------------
+    # 🚨 修正: 設定ファイルを別途読み込まず、起動時に 1 度だけ読み込んだ設定 (hz_core.settings.load_config) を受け取る。
+    #          省略された場合のみ、AppData の設定ファイルを読み込む
+    if settings is None:
+        from hz_core.settings import load_config
+        settings = load_config(get_settings_file_path(), write_back=False).settings
+    # 'log_level' キーを探し、なければデフォルトの 'INFO' を使用します。(値の検証は load_config 済み)
+    log_level_str = str(settings.get('log_level', 'INFO')).upper()
+
+    # 文字列を logging のレベル定数に変換。不正な文字列の場合は logging.INFO を使用
+    log_level = getattr(logging, log_level_str, logging.INFO)
+
+
+    # ログファイルのパスを決定 (C:\Users\<Username>\AppData\Local\AutoHzSwitcher\logs\)
+    # Note: log_dir は get_settings_file_path とは独立して、ログ専用のフォルダを指す
+    log_dir = get_log_dir()
+
+    # ------------------- ログファイルのローテーション設定 -------------------
+
+    # ログファイルの最大サイズ: 5 MB (5 * 1024 * 1024 バイト)
+    MAX_BYTES = 5 * 1024 * 1024
+    # 🚨 修正: 保持数 (旧: 4 世代) ではなく、圧縮後のログの合計サイズで保持する量を決める (既定: 50 MB)
+    retention_bytes = int(settings.get('log_retention_mb', DEFAULT_LOG_RETENTION_BYTES // (1024 * 1024))) * 1024 * 1024
+    compression = str(settings.get('log_compression', 'gzip'))
+
+    # ログファイル名 (ローテーションハンドラはタイムスタンプなしの固定名)
+    log_file_path_fixed = os.path.join(log_dir, "AutoHzSwitcher.log")
+
+    # ルートロガーを設定
+    root_logger = logging.getLogger()
+    # 🚨 外部ライブラリのログを抑制するため、警告レベル (WARNING) に設定
+    root_logger.setLevel(logging.WARNING)
+
+    # 既存のハンドラをクリア (二重ログ出力防止のため)。以前の出力スレッドは残りを書き出してから停止する
+    shutdown_logging()
+    if root_logger.hasHandlers():
+        root_logger.handlers.clear()
+
+    # 1. ファイルハンドラの設定 (ローテーション後のログはバックグラウンドで圧縮する)
+    file_handler = CompressingRotatingFileHandler(
+        log_file_path_fixed,
+        maxBytes=MAX_BYTES,
+        retention_bytes=retention_bytes,
+        compression=compression,
+        encoding='utf-8'
+    )
+
+    # 🚨 修正: ハンドラにはレベルを設定しない (判定はロガーで行い、実行中のレベル変更をそのまま反映するため)
+    file_formatter = logging.Formatter(
+        '%(asctime)s - %(levelname)s - %(module)s.%(funcName)s: %(message)s'
+    )
+    file_handler.setFormatter(file_formatter)
+
+    # 2. コンソールハンドラの設定 (ターミナルに出力)
+    console_handler = logging.StreamHandler()
+    console_formatter = logging.Formatter('%(levelname)s: %(message)s')
+    console_handler.setFormatter(console_formatter)
+
+    # 3. 💡 ファイル・コンソールへの出力は QueueListener のスレッドで行う (繰り返しは要約にまとめる)。
+    #    ルートロガーにはキューへの追加のみを行う QueueHandler を設定する
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    collapser = RepeatCollapsingHandler([file_handler, console_handler])
+    listener = QueueListener(log_queue, collapser, respect_handler_level=False)
+    root_logger.addHandler(QueueHandler(log_queue))
+    global _listener
+    with _listener_lock:
+        _listener = listener
+    listener.start()
+
+    # 🚨 アプリケーション本体のロガー (とサブシステムの子ロガー) に設定レベルを適用
+    # このロガーを main_app.py で使用することで、DEBUGログが出力される
+    apply_log_levels(settings)
+
+    logging.info("Logging initialized successfully with level: %s", logging.getLevelName(log_level))
@@ -0,0 +1,43 @@
+# hz_core/backend.py
+# ディスプレイ操作 (現在レートの取得・レート変更) のインターフェースと、ResolutionSwitcher を使う既定実装
+
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional
+
+# サブシステム 'backend' のロガー (ログレベルを個別に変更できる)
+APP_LOGGER = logging.getLogger('AutoHzSwitcher.backend')
+
+
+class DisplayBackend(ABC):
+    """監視エンジンがディスプレイを操作するためのインターフェース。"""
+
+    @abstractmethod
+    def get_active_rate(self, monitor_id: str, max_age: float = 0.0) -> Optional[int]:
+        """
+        指定モニターの現在のリフレッシュレートを返します。取得できない場合は None。
+        max_age > 0 の場合、その秒数以内に取得した値を再利用してもよい。
+        """
+
+    @abstractmethod
+    def change_rate(self, target_rate: int, width: int, height: int, monitor_id: str) -> bool:
+        """指定モニターのレートを変更します。成功した場合は True。"""
+
+
+class SwitcherUtilityBackend(DisplayBackend):
+    """
+    switcher_utility (ResolutionSwitcher.exe) を使う既定のバックエンド。
+
+    💡 switcher_utility は psutil に依存するため、hz_core の import 時ではなく
+       このクラスを生成したときに初めて読み込む。
+    """
+
+    def __init__(self):
+        import switcher_utility
+        self._utility = switcher_utility
+
+    def get_active_rate(self, monitor_id: str, max_age: float = 0.0) -> Optional[int]:
+        return self._utility.get_current_active_rate(monitor_id, max_age=max_age)
+
+    def change_rate(self, target_rate: int, width: int, height: int, monitor_id: str) -> bool:
+        return self._utility.change_rate(target_rate, width, height, monitor_id)
@@ -0,0 +1,307 @@
+# hz_core/config_service.py
+# 設定ファイルへの書き込みをまとめる設定サービス (遅延書き込み・変更検出・アトミックな置き換え・外部変更の再読み込み)
+#
+# 💡 GUI では、チェックボックスの切り替えやコンボボックスの変更のたびに設定の保存が呼ばれる。
+#    ConfigService.save() は「保存が必要」という印を付けるだけで、実際の書き込みは debounce 秒の間に
+#    来た保存要求をまとめて 1 回だけ行う。内容が前回の書き込みと同じであれば書き込まない。
+#    書き込みは一時ファイル + os.replace() で行うため、途中でクラッシュしても設定ファイルは壊れない。
+#
+# 💡 管理者がスクリプトで設定ファイルを編集した場合 (外部変更) は、ファイルの (mtime, size) の変化で検出し、
+#    再読み込み・検証した内容を settings に反映する。アプリ内で変更したキー (最後にファイルと同期した後に
+#    変更したもの) はそのまま残し、それ以外のキーは外部の内容を採用する。
+#    書き込みの直前にも外部変更を確認するため、古いメモリ上の内容で外部の編集を上書きすることはない。
+
+import copy
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from hz_core.settings import load_config, load_settings, serialize_settings, write_text_atomic
+
+APP_LOGGER = logging.getLogger('AutoHzSwitcher')
+
+# 保存要求をまとめる時間 (秒)
+DEFAULT_DEBOUNCE_SECONDS = 0.5
+# 保存要求が途切れなくても、最初の要求からこの倍数の時間が経てば書き込む
+MAX_DEBOUNCE_FACTOR = 5
+# 外部変更を確認する間隔 (秒)
+DEFAULT_WATCH_INTERVAL_SECONDS = 2.0
+
+# 再読み込みの通知を受け取る関数 (引数: 値が変わったキーの集合)
+ReloadListener = Callable[[Set[str]], None]
+
+_MISSING = object()
+
+
+class ConfigService:
+    """
+    Owns the settings dictionary and coalesces writes to the configuration file.
+
+    - settings は監視エンジン・GUI と共有する辞書 (参照は差し替えない)
+    - save() はどのスレッドから呼んでもよい。debounce 秒後に 1 回だけ書き込む (debounce=0 の場合は即座に書き込む)
+    - flush() は保留中の書き込みを即座に行う (終了時・設定の再読み込み前など)
+    - check_for_changes() は外部変更を確認し、あれば再読み込みする (start_watching() で定期的に実行できる)
+    - writes / skipped_writes / reloads: 実際の書き込み回数 / 内容が同じため省略した回数 / 外部変更の反映回数
+    """
+
+    def __init__(
+        self,
+        config_path: str,
+        settings: Optional[Dict[str, Any]] = None,
+        debounce: float = DEFAULT_DEBOUNCE_SECONDS,
+        timer_factory: Callable[[float, Callable[[], None]], Any] = threading.Timer,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.config_path = config_path
+        self.debounce = debounce
+        self._timer_factory = timer_factory
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._timer = None
+        self._dirty = False
+        self._dirty_since: Optional[float] = None
+        self._closed = False
+        # 💡 ファイルの状態は、内容を読むより先に記録する (読み込み中に変更された場合は、次の確認で検出される)
+        self._file_signature = self._stat_signature()
+        self.settings: Dict[str, Any] = settings if settings is not None else load_settings(config_path)
+        # 最後にファイルと同期した (読み込んだ / 書き込んだ) 時点の設定。アプリ内で変更したキーの判定に使う
+        self._synced: Dict[str, Any] = copy.deepcopy(self.settings)
+        # 前回書き込んだ (または読み込んだ) 内容。同じ内容の書き込みを省略するために使う
+        self._written_text: Optional[str] = self._read_current_text()
+        self._listeners: List[ReloadListener] = []
+        # 書き込み時に取り込んだ外部変更のうち、リスナーへ未通知のキー
+        self._pending_changes: Set[str] = set()
+        self._watch_stop: Optional[threading.Event] = None
+        self._watch_thread: Optional[threading.Thread] = None
+        self.writes = 0
+        self.skipped_writes = 0
+        self.reloads = 0
+        self.last_write_at: Optional[float] = None
+
+    def _read_current_text(self) -> Optional[str]:
+        try:
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _stat_signature(self) -> Optional[Tuple[int, int]]:
+        """変更検出用の (mtime_ns, size)。ファイルが無い場合は None。"""
+        try:
+            st = os.stat(self.config_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    @property
+    def is_dirty(self) -> bool:
+        return self._dirty
+
+    def update(self, new_settings: Dict[str, Any]):
+        """設定を更新し、保存を予約します。"""
+        with self._lock:
+            self.settings.update(new_settings)
+        self.save()
+
+    def save(self):
+        """保存を予約します。debounce 秒の間の保存要求は 1 回の書き込みにまとめられます。"""
+        with self._lock:
+            if self._closed:
+                APP_LOGGER.warning("Settings save requested after the config service was closed. Writing immediately.")
+                self._dirty = True
+                self._flush_locked()
+                return
+            now = self._clock()
+            if not self._dirty:
+                self._dirty_since = now
+            self._dirty = True
+            if self.debounce <= 0:
+                self._flush_locked()
+                return
+            # 💡 保存要求が続く間は書き込みを後ろへずらす (最後の要求から debounce 秒後に書き込む)。
+            #    ただし最初の要求から debounce * MAX_DEBOUNCE_FACTOR 秒を超えては遅らせない
+            delay = min(self.debounce, self._dirty_since + self.debounce * MAX_DEBOUNCE_FACTOR - now)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = self._timer_factory(max(delay, 0.0), self._on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+            self._flush_locked()
+
+    def flush(self) -> bool:
+        """保留中の書き込みを即座に行います。書き込みが失敗した場合のみ False。"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            return self._flush_locked()
+
+    def _flush_locked(self) -> bool:
+        if not self._dirty:
+            return True
+        # 🚨 外部で編集されていれば、先に取り込む (アプリ内で変更したキーのみを上書きする)。
+        #    変わったキーは、次の check_for_changes() でリスナーへ通知する
+        if self._stat_signature() != self._file_signature:
+            self._pending_changes |= self._reload_locked() or set()
+        text = self._serialize_locked()
+        if text is None:
+            return False
+        self._dirty = False
+        if text == self._written_text:
+            self.skipped_writes += 1
+            APP_LOGGER.debug("Settings unchanged since the last write. Skipping save to: %s", self.config_path)
+            return True
+        try:
+            write_text_atomic(self.config_path, text)
+        except OSError as e:
+            # 次の保存要求で再試行する
+            self._dirty = True
+            APP_LOGGER.error("Failed to write configuration file '%s': %s", self.config_path, e)
+            return False
+        self._written_text = text
+        self._file_signature = self._stat_signature()
+        self._synced = copy.deepcopy(self.settings)
+        self.writes += 1
+        self.last_write_at = time.time()
+        APP_LOGGER.info("Settings successfully saved to: %s", self.config_path)
+        return True
+
+    def _serialize_locked(self) -> Optional[str]:
+        # 💡 GUI スレッドが settings を更新している最中に書き出すと、辞書の反復中の変更で失敗することがある。
+        #    その場合は少し待ってやり直す
+        for attempt in range(3):
+            try:
+                return serialize_settings(self.settings)
+            except RuntimeError as e:
+                APP_LOGGER.debug("Settings changed while serializing (attempt %d): %s", attempt + 1, e)
+                time.sleep(0.01)
+        APP_LOGGER.error("Failed to serialize settings for '%s'. The save will be retried on the next change.", self.config_path)
+        return None
+
+    # ------------------------------------------------------------------
+    # 外部変更の検出と再読み込み
+    # ------------------------------------------------------------------
+
+    def add_reload_listener(self, listener: ReloadListener):
+        """外部変更を反映した後に呼び出す関数を登録します (check_for_changes() を呼んだスレッドで呼ばれる)。"""
+        self._listeners.append(listener)
+
+    def check_for_changes(self) -> bool:
+        """
+        設定ファイルの (mtime, size) を確認し、外部で変更されていれば再読み込みします。
+        反映した場合は True。変更が無い場合の負荷は os.stat() 1 回のみ。
+        """
+        with self._lock:
+            changed = self._pending_changes
+            self._pending_changes = set()
+            if self._stat_signature() != self._file_signature:
+                changed |= self._reload_locked(schedule_save=True) or set()
+        if not changed:
+            return False
+        for listener in list(self._listeners):
+            try:
+                listener(changed)
+            except Exception as e:
+                APP_LOGGER.warning("Config reload listener failed: %s", e)
+        return True
+
+    def _reload_locked(self, schedule_save: bool = False) -> Optional[Set[str]]:
+        """
+        外部の内容を読み込み、アプリ内の変更と統合して settings に反映します。値が変わったキーの集合を返します。
+        schedule_save=True の場合、アプリ内の変更を含む統合結果の書き込みを save() で予約します
+        (書き込みの直前に呼ばれる場合は False。呼び出し元がそのまま書き込む)。
+        """
+        signature = self._stat_signature()
+        config = load_config(self.config_path)
+        self._file_signature = signature
+        if not config.loaded_from_file:
+            # 削除された / 編集途中で壊れている場合は、現在の設定を維持する (次の保存で書き直される)
+            if config.problems:
+                APP_LOGGER.warning(
+                    "Configuration file '%s' changed but could not be loaded (%s). Keeping the current settings.",
+                    self.config_path, "; ".join(config.problems),
+                )
+            return None
+        for problem in config.problems:
+            APP_LOGGER.warning("Configuration '%s': %s.", self.config_path, problem)
+
+        # アプリ内で、最後の同期の後に変更したキー (外部の内容より優先する)
+        local_changes = {
+            key: value for key, value in self.settings.items()
+            if self._synced.get(key, _MISSING) != value
+        }
+        local_removals = [key for key in self._synced if key not in self.settings]
+
+        # 🚨 修正: 同期済みの状態は外部の内容そのもの。統合 (アプリ内の変更の上書き) は複製に対して行う
+        #    (同じ辞書を更新すると、未保存のアプリ内の変更まで同期済みとして記録され、次の再読み込みで失われる)
+        external = copy.deepcopy(config.settings)
+        merged = config.settings
+        conflicts = [key for key in local_changes if merged.get(key, _MISSING) not in (self._synced.get(key, _MISSING), local_changes[key])]
+        merged.update(copy.deepcopy(local_changes))
+        for key in local_removals:
+            merged.pop(key, None)
+
+        changed = {key for key in set(merged) | set(self.settings) if merged.get(key, _MISSING) != self.settings.get(key, _MISSING)}
+        # 💡 監視スレッドと共有している辞書を差し替えずに更新する。update() は 1 回の呼び出しで全キーを置き換えるため、
+        #    読み手が空の辞書や一部だけ更新された途中の状態を見ることはない (削除されたキーのみ後から取り除く)
+        self.settings.update(merged)
+        for key in [key for key in self.settings if key not in merged]:
+            del self.settings[key]
+
+        self._synced = external
+        self._written_text = self._read_current_text()
+        self.reloads += 1
+        if local_changes or local_removals:
+            # アプリ内の変更を含むため、統合後の内容を書き込む
+            if schedule_save:
+                self.save()
+            else:
+                self._dirty = True
+        if conflicts:
+            APP_LOGGER.warning(
+                "Configuration keys changed both externally and in the app: %s. Keeping the in-app values.",
+                ", ".join(sorted(conflicts)),
+            )
+        APP_LOGGER.info(
+            "Reloaded externally modified configuration from %s (changed keys: %s).",
+            self.config_path, ", ".join(sorted(changed)) or "none",
+        )
+        return changed
+
+    def start_watching(self, interval: float = DEFAULT_WATCH_INTERVAL_SECONDS):
+        """外部変更を interval 秒ごとに確認するスレッドを開始します (GUI 版は Tk のタイマーから check_for_changes() を呼ぶ)。"""
+        if self._watch_thread is not None:
+            return
+        self._watch_stop = threading.Event()
+
+        def watch(stop_event: threading.Event):
+            while not stop_event.wait(interval):
+                try:
+                    self.check_for_changes()
+                except Exception as e:
+                    APP_LOGGER.error("Failed to check the configuration file for changes: %s", e)
+
+        self._watch_thread = threading.Thread(target=watch, args=(self._watch_stop,), name="ConfigWatcher", daemon=True)
+        self._watch_thread.start()
+
+    def stop_watching(self):
+        if self._watch_thread is None:
+            return
+        self._watch_stop.set()
+        self._watch_thread.join(timeout=5.0)
+        self._watch_thread = None
+        self._watch_stop = None
+
+    def close(self) -> bool:
+        """外部変更の確認を止め、保留中の書き込みを行い、以降の保存は即座に書き込むようにします。"""
+        self.stop_watching()
+        with self._lock:
+            result = self.flush()
+            self._closed = True
+            return result
@@ -0,0 +1,63 @@
+# hz_core/decision.py
+# 監視ループのレート判定 (副作用のない純粋関数)
+
+from typing import FrozenSet, NamedTuple, Optional
+
+from hz_core.rules import RuleMatch
+
+
+def is_low_rate(rate: Optional[int], default_low_rate: int) -> bool:
+    """
+    低レートであると判定する許容範囲のチェック。
+    (59.94 Hz が 59 Hz として報告される場合を許容し、不必要な 60 Hz への切り替えを防ぐ)
+    """
+    return rate == default_low_rate or rate == (default_low_rate - 1)
+
+
+class RateOverride(NamedTuple):
+    """
+    A rate that takes precedence over the game rules until the set of running games changes.
+
+    - ドリフトの採用 (DriftPolicy.ADOPT) や制御コマンドの force_rate で設定される
+    - games は設定した時点で実行中だった登録ゲームのプロセス名 (RuleMatch.matched_processes)
+    """
+    rate: int
+    reason: str
+    games: FrozenSet[str]
+
+    @classmethod
+    def for_match(cls, rate: int, reason: str, match: RuleMatch) -> 'RateOverride':
+        return cls(rate, reason, match.matched_processes)
+
+    def applies_to(self, match: RuleMatch) -> bool:
+        """実行中のゲームの構成が、設定した時点から変わっていなければ True。"""
+        return self.games == match.matched_processes
+
+
+def decide_target_rate(
+    match: RuleMatch,
+    current_rate: Optional[int],
+    default_low_rate: int,
+    override: Optional[RateOverride] = None,
+) -> Optional[int]:
+    """
+    ルール評価結果と現在の内部期待レートから、適用すべきレートを決定します。
+    override が現在のゲームの構成に適用される場合は、ルールの代わりにそのレートを維持します。
+
+    Returns:
+        Optional[int]: レート変更が必要な場合はターゲットレート、不要な場合は None。
+    """
+    if override is not None and override.applies_to(match):
+        return override.rate if override.rate != current_rate else None
+
+    if match.is_any_game_running:
+        # ゲーム実行中: 高レートへの切り替えが必要か？
+        if match.required_rate != current_rate:
+            return match.required_rate
+        return None
+
+    # ゲーム実行なし、かつ現在のレートが (60Hz または 59Hz) ではない場合 (高レートからの復帰が必要)
+    if not is_low_rate(current_rate, default_low_rate):
+        return default_low_rate
+
+    return None
@@ -0,0 +1,1014 @@
+# hz_core/engine.py
+# 監視エンジン: プロセス監視・レート判定・レート変更・クラッシュ復帰・ドリフト補正
+#
+# 💡 tkinter / pystray / PIL に依存しないため、GUI 版 (main_app.py) とヘッドレス版 (headless.py) の
+#    どちらからも同じ監視ロジックを利用できる。表示 (トレイ / 設定画面) との連携は StatusChannel のみで行う。
+#    ディスプレイ操作 (DisplayBackend) とプロセス取得 (ProcessScanner) は注入可能で、既定の実装
+#    (switcher_utility / psutil) は生成時に初めて読み込まれる。hz_core.fakes と組み合わせれば Linux でも動作する。
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock, RLock, Thread
+from typing import Any, Callable, Dict, Optional
+
+from hz_core.backend import DisplayBackend, SwitcherUtilityBackend
+from hz_core.decision import RateOverride, decide_target_rate, is_low_rate
+from hz_core.metrics import METRICS, MetricsRegistry, StateTimer
+from hz_core.monitor_lifecycle import MonitorLifecycle
+from hz_core.rate_journal import RateJournal, get_rate_journal_path
+from hz_core.reconciler import DriftPolicy, DriftReconciler
+from hz_core.rules import RuleIndex, RuleMatch
+from hz_core.scanner import ProcessScanner, PsutilProcessScanner
+from hz_core.status_channel import StatusChannel, StatusRecord
+from hz_core.trace import TraceRecorder
+
+APP_LOGGER = logging.getLogger('AutoHzSwitcher')
+
+
+class MonitorEngine:
+    """
+    Owns the monitoring thread and every decision about the display refresh rate.
+
+    - settings は呼び出し側 (MainApplication / ヘッドレス版) と共有する辞書で、変更後は apply_settings() を呼ぶ。
+    - ステータスは status_channel に公開される。status_listener が指定されていれば、
+      新しいレコードが公開されるたびに (公開したスレッド上で) 呼び出される。
+    """
+
+    # 監視ループの間隔 (秒)
+    MONITOR_INTERVAL_SECONDS = 1.0
+    # 監視スレッド停止 (join) の上限時間 (秒)
+    MONITOR_STOP_TIMEOUT_SECONDS = 2.0
+    # 停止時のアイドルレート復帰処理の上限時間 (秒)
+    IDLE_RESTORE_TIMEOUT_SECONDS = 10.0
+    # ドリフト確認間隔 (秒): 自身のレート変更直後は短く、一致が続くと最長まで段階的に延ばす
+    DRIFT_FAST_INTERVAL_SECONDS = 2.0
+    DRIFT_SLOW_INTERVAL_SECONDS = 60.0
+    # ドリフト確認で再利用する全モニタースナップショットの有効期間 (秒)
+    DRIFT_SNAPSHOT_MAX_AGE_SECONDS = 1.0
+
+    def __init__(
+        self,
+        settings: Dict[str, Any],
+        status_listener: Optional[Callable[[StatusRecord], None]] = None,
+        initial_status: str = "Status: Initializing...",
+        display_backend: Optional[DisplayBackend] = None,
+        process_scanner: Optional[ProcessScanner] = None,
+        rate_journal: Optional[RateJournal] = None,
+        trace_recorder: Optional[TraceRecorder] = None,
+        clock: Callable[[], float] = time.monotonic,
+        metrics: MetricsRegistry = METRICS,
+    ):
+        self.settings = settings
+        self._status_listener = status_listener
+        
+        # 💡 プラットフォーム依存部分 (外部ツール / psutil)。省略時は既定の実装を使用する
+        self.display_backend = display_backend if display_backend is not None else SwitcherUtilityBackend()
+        self.process_scanner = process_scanner if process_scanner is not None else PsutilProcessScanner(metrics=metrics)
+        
+        # 💡 レート変更の試行 / 成功 / 失敗 (DisplayBackend の呼び出しごと) と、モニターごとの現在レート・
+        #    各レートで過ごした時間のメトリクス。現在レートは current_rate への代入時に更新される
+        self._metrics = metrics
+        self._switch_attempts = metrics.counter("autohz_switch_attempts_total", "Refresh-rate change calls to the display backend, by reason.")
+        self._switch_successes = metrics.counter("autohz_switch_successes_total", "Refresh-rate change calls that succeeded, by reason.")
+        self._switch_failures = metrics.counter("autohz_switch_failures_total", "Refresh-rate change calls that failed, by reason.")
+        self._rate_timer = StateTimer(
+            metrics.gauge("autohz_current_rate_hz", "Refresh rate the engine expects on the selected monitor."),
+            metrics.counter("autohz_rate_seconds_total", "Seconds spent at each refresh rate, by monitor."),
+            value_label="rate",
+        )
+        metrics.add_collector(self._rate_timer.collect)
+        
+        # 🚨 修正: 実際のモニターレート取得はクラッシュ復帰処理 (バックグラウンド) に一本化し、
+        #          起動を外部ツールの応答時間に依存させない。
+        #          復帰処理が完了するまでは、設定の低レートを暫定値として使用する。
+        self._current_rate: Optional[int] = None
+        self.current_rate = self.settings.get("default_low_rate", 60)
+        
+        # 💡 ルールより優先して維持するレート (ドリフトの採用 / 制御コマンドの force_rate)。
+        #    実行中のゲームの構成が変わると解除される
+        self._rate_override: Optional[RateOverride] = None
+        # 💡 レートの判定と適用 (外部ツールの呼び出し・ジャーナルの記録・current_rate の更新) を直列化する。
+        #    監視スレッド・制御チャネル・Tk スレッド・停止フックのどこから呼ばれても、同時に 2 つの変更は行わない
+        self._rate_lock = RLock()
+        
+        # 🚨 修正: 監視スレッドは Tk 変数に直接触れず、StatusChannel にのみ書き込む。
+        self.status_channel = StatusChannel(initial_status)
+        self._last_status_message = ""
+
+        # 🚨 修正: 監視スレッドの起動/停止は MonitorLifecycle に一元化する
+        #          (停止時のアイドルレート復帰は停止遷移ごとに 1 度だけ、専用の期限付きで実行される)
+        self.monitor_lifecycle = MonitorLifecycle(
+            self._monitoring_tick,
+            interval=self.MONITOR_INTERVAL_SECONDS,
+            stop_timeout=self.MONITOR_STOP_TIMEOUT_SECONDS,
+            shutdown_hook=self._restore_idle_rate_on_stop,
+            shutdown_hook_timeout=self.IDLE_RESTORE_TIMEOUT_SECONDS,
+            metrics=metrics,
+        )
+        
+        # 💡 監視ループ・即時再評価・クラッシュ復帰判定で共有するルールインデックス (設定保存時に再構築)
+        self.rule_index = RuleIndex.from_settings(self.settings)
+        
+        # 💡 適用したレート変更の記録 (再起動時、前回セッションの最終状態からクラッシュ復帰の要否を即座に判定する)
+        self.rate_journal = rate_journal if rate_journal is not None else RateJournal(get_rate_journal_path())
+        
+        # 💡 外部要因によるレート変化 (ドリフト) の検出。監視スレッドの tick から、適応的な間隔で実行される
+        self.drift_reconciler = DriftReconciler(
+            self._read_active_rate_for_drift,
+            policy=DriftPolicy.from_setting(self.settings.get("drift_policy", DriftPolicy.CORRECT.value)),
+            fast_interval=self.DRIFT_FAST_INTERVAL_SECONDS,
+            slow_interval=self.DRIFT_SLOW_INTERVAL_SECONDS,
+            metrics=metrics,
+            clock=clock, # 💡 トレースの生成・再生時は仮想時刻を注入する
+        )
+        
+        # 💡 監視セッションの記録 (任意。再現調査・判定ロジック変更時の比較用。hz_core.trace を参照)
+        self.trace_recorder = trace_recorder
+        if self.trace_recorder is not None:
+            self.trace_recorder.record_settings(self.settings)
+        
+        # 起動時のクラッシュ復帰処理 (バックグラウンド) の管理
+        self._startup_lock = Lock()
+        self._startup_thread: Optional[Thread] = None
+        self._shutdown_requested = Event()
+
+    # --- 公開 API ---
+
+    @property
+    def is_monitoring(self) -> bool:
+        return self.monitor_lifecycle.is_running
+
+    @property
+    def current_rate(self) -> Optional[int]:
+        """選択中のモニターの現在のレート (内部期待値)。"""
+        return self._current_rate
+
+    @current_rate.setter
+    def current_rate(self, rate: Optional[int]):
+        self._current_rate = rate
+        self._rate_timer.set(rate, monitor=self.settings.get("selected_monitor_id") or "none")
+
+    def apply_settings(self):
+        """settings の変更 (ゲーム / レート / ドリフトポリシー / 対象モニター) を監視ロジックへ反映します。"""
+        self.current_rate = self._current_rate
+        self.rule_index = RuleIndex.from_settings(self.settings)
+        self.drift_reconciler.policy = DriftPolicy.from_setting(self.settings.get("drift_policy", DriftPolicy.CORRECT.value))
+        if self.trace_recorder is not None:
+            self.trace_recorder.record_settings(self.settings)
+
+    def publish_initial_status(self):
+        """起動直後のステータス (IDLE / MONITORING DISABLED) を公開します。"""
+        is_monitoring_enabled = self.settings.get("is_monitoring_enabled", True)
+        
+        # 監視ステータステキストの決定 (大文字固定)
+        new_status_value = "Status: IDLE" if is_monitoring_enabled else "Status: MONITORING DISABLED"
+        
+        self.publish_status(new_status_value, self.current_rate)
+        APP_LOGGER.info("Initial operational status set to: %s", new_status_value)
+
+    def publish_status(self, text: str, rate: Optional[int] = None) -> bool:
+        """
+        Publishes a status record to the StatusChannel. Safe to call from any thread.
+        The status listener (e.g. the tray tooltip) is notified only when the record changed.
+        """
+        if not self.status_channel.publish(text, rate):
+            return False
+        
+        if self._status_listener is not None:
+            try:
+                self._status_listener(self.status_channel.latest())
+            except Exception as e:
+                APP_LOGGER.warning("Status listener failed: %s", e)
+        return True
+
+    def force_rate(self, target_rate: int, reason: str = "manual") -> Optional[int]:
+        """
+        監視判定とは無関係に、指定したレートを適用します。成功した場合は実際のレートを返します。
+        監視中は、実行中のゲームの構成が変わるまでこのレートを維持します (次の tick で元に戻さない)。
+        """
+        with self._rate_lock:
+            final_rate = self._enforce_rate(target_rate, cancel_event=self._shutdown_requested, reason=reason)
+            if final_rate is not None and self.is_monitoring:
+                match = self.rule_index.evaluate(self._get_running_process_names())
+                self._set_rate_override(RateOverride.for_match(final_rate, reason, match))
+        return final_rate
+
+    @property
+    def rate_override(self) -> Optional[RateOverride]:
+        """現在ルールより優先して維持しているレート (無い場合は None)。"""
+        return self._rate_override
+
+    def shutdown(self):
+        """アプリケーション終了時に呼び出します。起動時の復帰処理を打ち切り、監視を停止します。"""
+        # 起動時のクラッシュ復帰処理が実行中の場合、監視スレッドを開始させない
+        self._shutdown_requested.set()
+        
+        # 🚨 修正: MonitorLifecycle に委譲。停止とアイドルレート復帰はそれぞれ上限時間付きで 1 度だけ実行される
+        self.monitor_lifecycle.stop()
+        self._rate_timer.collect()
+        self._metrics.remove_collector(self._rate_timer.collect)
+
+    # --- 監視ロジック ---
+
+    def _get_running_process_names(self) -> set:
+        """実行中プロセス名の集合を返します。(取得失敗時は空集合。ProcessScanner に委譲)"""
+        return self.process_scanner.running_process_names()
+
+    def start(self):
+        """
+        Starts the crash-recovery probe and then the monitoring thread in the background.
+        Returns immediately, so application startup (e.g. the tray icon) never waits for the ResolutionSwitcher helper.
+        """
+        # 既に監視中の場合は、クラッシュ復帰判定を含めて何もしない (冪等)
+        if self.monitor_lifecycle.is_running:
+            APP_LOGGER.debug("Monitoring thread is already running. Skipping pre-monitoring initialization.")
+            return
+        
+        # 監視の再開時は、停止前に採用したレートを引き継がない
+        self.clear_rate_override()
+
+        with self._startup_lock:
+            if self._startup_thread is not None and self._startup_thread.is_alive():
+                APP_LOGGER.debug("Startup recovery is already in progress. Skipping duplicate request.")
+                return
+            
+            self._startup_thread = Thread(
+                target=self._recover_and_start_monitoring, name="HzStartupRecovery", daemon=True
+            )
+            self._startup_thread.start()
+        
+        APP_LOGGER.debug("Startup recovery thread launched.")
+
+    def _probe_startup_state(self):
+        """
+        現在の実レート取得 (外部ツール) とプロセス一覧の取得を並列に実行します。
+
+        Returns:
+            tuple: (active_rate, running_process_names)。プロセス取得に失敗した場合、running_process_names は None。
+        """
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="HzRecoveryProbe") as pool:
+            rate_future = pool.submit(self.get_active_monitor_rate)
+            process_future = pool.submit(self._get_running_process_names)
+            
+            active_rate = rate_future.result()
+            try:
+                running_process_names = process_future.result()
+            except Exception as e:
+                APP_LOGGER.error("Process scan failed during startup probe: %s", e)
+                running_process_names = None
+        
+        return active_rate, running_process_names
+
+    def _recover_and_start_monitoring(self):
+        """
+        [バックグラウンドスレッド] Crash recovery: if the monitor is stuck at a high rate while no registered
+        game is running, forces the idle rate. Then starts the monitoring thread.
+        """
+        # 🚨 DEBUG: 関数開始を記録
+        APP_LOGGER.debug("Starting pre-monitoring thread initialization (crash recovery logic).")
+        
+        # 0. 初期設定値の取得
+        default_low_rate = self.settings.get("default_low_rate", 60)
+        
+        with self._rate_lock:
+            # 1. 前回セッションの最終状態をジャーナルから確認し、現実と一致すればディスプレイへの問い合わせを省略する
+            journal_rate = self._recover_from_journal(default_low_rate)
+            
+            if journal_rate is not None:
+                self.current_rate = journal_rate
+                APP_LOGGER.info("Startup state confirmed by rate journal. Current rate set to %d Hz.", journal_rate)
+            else:
+                # 2. ジャーナルが無い、または現実と食い違う場合のみ、ディスプレイを問い合わせて復帰処理を行う
+                self._probe_and_recover(default_low_rate)
+
+        # ----------------------------------------------------------------------
+        # 3. GUIの初期化と監視スレッドの起動
+        # ----------------------------------------------------------------------
+        
+        # GUIステータスを初期化... (既存ロジックはそのまま)
+        
+        # 復帰処理中にアプリケーション終了が要求された場合は監視を開始しない
+        if self._shutdown_requested.is_set():
+            APP_LOGGER.info("Shutdown requested during startup recovery. Monitoring thread will not be started.")
+            return
+        
+        # 監視スレッドの起動 (MonitorLifecycle が二重起動を防止する)
+        if self.monitor_lifecycle.start():
+            # 🚨 修正: print() を APP_LOGGER.info() に置き換え
+            APP_LOGGER.info("Monitoring thread started.")
+            
+        # 🚨 DEBUG: 関数終了を記録
+        APP_LOGGER.debug("Pre-monitoring thread initialization completed.")
+
+    def _recover_from_journal(self, default_low_rate: int) -> Optional[int]:
+        """
+        レート状態ジャーナルの最終レコードを、プロセス表と照合して検証します。
+
+        Returns:
+            Optional[int]: ジャーナルと現実が一致した場合はそのレート。
+                           ジャーナルが無い、または食い違う場合は None (ディスプレイへの問い合わせが必要)。
+        """
+        record = self.rate_journal.last_record()
+        
+        if record is None:
+            APP_LOGGER.info("No rate journal record found. Probing display for crash recovery.")
+            return None
+        
+        APP_LOGGER.debug(
+            "Last rate journal record: %d Hz (reason=%s, game=%s, pid=%s).",
+            record.rate, record.reason, record.game_name, record.game_pid
+        )
+        
+        # 前回セッションが低レートで終わっている場合、高レートのまま取り残されている可能性はない
+        if is_low_rate(record.rate, default_low_rate):
+            return record.rate
+        
+        # 高レートの場合、それを要求したゲームが (PID 再利用ではなく) 同一プロセスとして実行中なら一致
+        if record.game_pid is not None and record.game_create_time is not None:
+            if self.process_scanner.is_process_alive(record.game_pid, record.game_create_time):
+                return record.rate
+        
+        APP_LOGGER.info(
+            "Rate journal disagrees with the process table (last record: %d Hz for %s). Probing display.",
+            record.rate, record.game_name or record.reason
+        )
+        return None
+
+    def _probe_and_recover(self, default_low_rate: int):
+        """
+        ディスプレイの実レートとプロセス一覧から、高レートのまま取り残されているかを判定し、
+        必要であれば低レートへ強制的に戻します。self.current_rate を設定します。
+        """
+        # 2.1 現在の実レートとプロセス一覧を並列に取得
+        probe_started = time.monotonic()
+        active_rate, running_process_names = self._probe_startup_state()
+        APP_LOGGER.debug("Startup probe completed in %.3f seconds.", time.monotonic() - probe_started)
+        
+        # 🚨 DEBUG: 取得した実レートと設定の低レートを記録
+        APP_LOGGER.debug(
+            "Initial active rate detected: %s Hz. Default low rate: %d Hz.", 
+            active_rate, 
+            default_low_rate
+        )
+        
+        # ----------------------------------------------------------------------
+        # 🚨 プロセスチェックの実行とエラーハンドリング
+        # ----------------------------------------------------------------------
+        # 🚨 修正: 以前の _check_for_running_games は存在しない "game_profiles" キーを参照していたため常に False だった。
+        #          監視ループと同じ RuleIndex で判定する。
+        if running_process_names is None:
+            # 🚨 修正: print() を APP_LOGGER.error() に置き換え、メッセージを英語化
+            APP_LOGGER.error("Fatal process check error occurred. Skipping forced recovery logic.")
+            # エラー時、強制復帰をスキップするため is_any_game_running_now を True に設定するロジックは維持
+            is_any_game_running_now = True 
+        else:
+            is_any_game_running_now = self.rule_index.evaluate(running_process_names).is_any_game_running
+            # 🚨 DEBUG: ゲーム実行状況を記録
+            APP_LOGGER.debug("Registered game running at startup: %s", is_any_game_running_now)
+            
+        # ----------------------------------------------------------------------
+        # 2.2 強制終了・クラッシュからの復帰ロジックの判定
+        # ----------------------------------------------------------------------
+        
+        is_high_rate_stuck = False
+        
+        if active_rate is not None:
+            # 高レートだがゲームは動いていない状態を「スタック」と判定
+            if not is_low_rate(active_rate, default_low_rate) and not is_any_game_running_now:
+                is_high_rate_stuck = True
+        
+        # 🚨 DEBUG: スタック判定の結果を記録
+        APP_LOGGER.debug("is_high_rate_stuck calculated as: %s", is_high_rate_stuck)
+        
+        # 2.3 復帰処理の実行と self.current_rate の設定
+        
+        if is_high_rate_stuck:
+            
+            # 🚨 修正: print() を APP_LOGGER.info() に置き換え、メッセージを英語化
+            APP_LOGGER.info(
+                "Detected crash/reboot recovery scenario. Monitor is stuck at %d Hz. Attempting forced return.",
+                active_rate
+            )
+            
+            # 強制的に低レートへ変更を試行 (終了要求があれば再試行を打ち切る)
+            final_rate = self._enforce_rate(default_low_rate, cancel_event=self._shutdown_requested, reason="recovery")
+
+            if final_rate is not None:
+                # 🚨 修正: print() を APP_LOGGER.info() に置き換え
+                APP_LOGGER.info(
+                    "Crash recovery successful. Current rate set to %d Hz.", 
+                    final_rate
+                )
+            else:
+                # 失敗した場合、監視スレッドに委ねる
+                self.current_rate = default_low_rate
+                # 🚨 修正: print() を APP_LOGGER.error() に置き換え
+                APP_LOGGER.error(
+                    "Crash recovery failed. Initial current_rate set to default low rate (%d Hz).",
+                    default_low_rate
+                )
+            
+        elif active_rate is not None:
+            # 正常な起動時 (ゲーム実行中を含む) の初期化
+            self.current_rate = active_rate 
+            # 🚨 修正: print() を APP_LOGGER.info() に置き換え
+            APP_LOGGER.info(
+                "Normal startup initialization. Active rate set to %d Hz.", 
+                active_rate
+            )
+        
+        else:
+            # active_rate が None の場合 (レート取得失敗時)
+            self.current_rate = default_low_rate
+            # 🚨 修正: print() を APP_LOGGER.warning() に置き換え
+            APP_LOGGER.warning(
+                "Initial rate acquisition failed. Current rate set to default %d Hz.",
+                default_low_rate
+            )
+
+    def _monitoring_tick(self, stop_event: Event):
+        """
+        One monitoring iteration (called periodically by MonitorLifecycle on the monitoring thread).
+        Checks configured processes and applies the highest required refresh rate.
+        Publishes the current status to self.status_channel (never touches Tk from this thread).
+        """
+        # 💡 判定から適用までを 1 つの単位とする (force_rate などが途中で割り込んで、古い判定で上書きされないように)
+        with self._rate_lock:
+            self._monitoring_tick_locked(stop_event)
+
+    def _monitoring_tick_locked(self, stop_event: Event):
+        
+        is_monitoring_enabled = self.settings.get("is_monitoring_enabled", False)
+        
+        # 1. 監視OFF時の処理
+        if not is_monitoring_enabled:
+            # 🚨 INFO: 監視が停止していることを一度だけログに記録 (ノイズ防止のため)
+            if self._last_status_message != "Monitoring Disabled":
+                APP_LOGGER.info("Monitoring is currently disabled by user settings. Sleeping...")
+                self._last_status_message = "Monitoring Disabled"
+            
+            return
+        
+        # 監視再開時（_last_status_messageがDisabledだった場合）のINFOログ
+        if self._last_status_message == "Monitoring Disabled":
+            APP_LOGGER.info("Monitoring re-enabled. Resuming scan.")
+            self._last_status_message = ""
+            
+        
+        rule_index = self.rule_index
+        global_high_rate_value = rule_index.global_high_rate
+        use_global_high_rate = rule_index.use_global_high_rate
+        default_low_rate = rule_index.default_low_rate
+        
+        scan_started = time.perf_counter()
+        running_processes = self._get_running_process_names()
+        scan_seconds = time.perf_counter() - scan_started
+        
+        # 🚨 DEBUG: 検出された実行中プロセスを記録
+        #APP_LOGGER.debug("Running processes detected: %s", running_processes)
+        
+        # 2. 実行中のゲームと必要な最高レートを特定 (RuleIndex に委譲)
+        match = rule_index.evaluate(running_processes)
+        is_any_game_running = match.is_any_game_running
+        highest_required_rate = match.required_rate
+        current_game_name = match.game_name
+        
+        current_log_message = "" 
+        current_status_tag = "IDLE" 
+        
+        if match.uses_global_high_rate:
+            # 🚨 修正: 日本語のログメッセージを英語に変換
+            current_log_message = f"Applying Global High Rate ({global_high_rate_value}Hz)."
+            current_status_tag = f"Global High"
+        elif current_game_name:
+            # 🚨 修正: 日本語のログメッセージを英語に変換
+            current_log_message = f"High rate game ({current_game_name}) is running. Applying specific rate ({highest_required_rate}Hz)."
+            current_status_tag = f"Game: {current_game_name}"
+
+        # 🚨 DEBUG: 実行中のゲーム処理結果を記録
+        #APP_LOGGER.debug(
+        #    "Scan complete. Game running: %s, Highest required rate: %d Hz.",
+        #    is_any_game_running,
+        #    highest_required_rate
+        #)
+
+        # 3. ターゲットレートを決定し (hz_core.decision)、レート変更を実行
+        target_rate = decide_target_rate(match, self.current_rate, default_low_rate, self._active_override(match))
+        
+        if self.trace_recorder is not None:
+            self.trace_recorder.record_tick(running_processes, self.current_rate, target_rate, scan_seconds)
+        
+        if is_any_game_running:
+            # ゲーム実行中: 高レートへの切り替えが必要か？
+            if target_rate is not None: 
+                # 🚨 修正: print() を APP_LOGGER.info() に置き換え、メッセージを英語化
+                APP_LOGGER.info(
+                    "High rate game (%s) running. Switching rate to %d Hz.", 
+                    current_game_name, target_rate
+                )
+            
+            elif current_log_message and self._last_status_message != current_log_message:
+                # 🚨 修正: print() を APP_LOGGER.info() に置き換え、既に高レートにいるがステータスが変わった場合を記録
+                APP_LOGGER.info(current_log_message)
+                self._last_status_message = current_log_message
+            
+        elif target_rate is not None:
+            # ゲーム実行なし、かつ現在のレートが (60Hz または 59Hz) ではない場合 (高レートからの復帰が必要)
+            current_status_tag = "Returning to IDLE" 
+            # 🚨 修正: print() を APP_LOGGER.info() に置き換え、メッセージを英語化
+            APP_LOGGER.info(
+                "All games exited. Returning to default low rate (%d Hz).", 
+                target_rate
+            )
+            self._last_status_message = "" 
+            
+        else:
+            # ゲーム実行なし、かつ既に低レートにいる場合 (59Hz/60Hzで安定待機)
+            current_status_tag = "IDLE"
+            self._last_status_message = "" 
+            
+        
+        # 3.0 レート変更が不要な (安定している) 場合のみ、外部要因によるドリフトを確認する
+        if target_rate is None and self.drift_reconciler.due():
+            self._reconcile_drift(match, default_low_rate, stop_event)
+        
+        # 3.1 レート変更の実行
+        if target_rate is not None:
+            # 既に設定されているレートと同じ場合は、処理をスキップ (点滅バグ解消)
+            if self.current_rate == target_rate: 
+                # 🚨 DEBUG: スキップ理由を明確に記録
+                APP_LOGGER.debug(
+                    "Rate change skipped: Target rate %d Hz already matches current internal rate %d Hz.",
+                    target_rate, self.current_rate
+                )
+                return 
+            
+            # 🚨 修正: _enforce_rate を呼び出し、戻り値 (int or None) を受け取る
+            # 💡 停止要求があれば再試行の待機を打ち切る (停止レイテンシの上限を保つため)
+            owner_process = match.process_name if target_rate != default_low_rate else None
+            final_rate = self._enforce_rate(
+                target_rate,
+                cancel_event=stop_event,
+                reason="game" if owner_process else "idle",
+                owner_process=owner_process,
+            )
+            
+            # 🚨 INFO: レート変更の試行結果を記録
+            APP_LOGGER.info("Rate change attempt to %d Hz completed. Final OS rate: %s", target_rate, final_rate)
+            
+            # 🚨 修正: final_rate が None でない場合 (変更成功) のみ処理を続行
+            if final_rate is not None:
+                # 💡 内部期待値 (current_rate) は _enforce_rate が OS から取得した実際のレートで更新済み
+                
+                if is_any_game_running:
+                    self._last_status_message = current_log_message
+                else:
+                    self._last_status_message = ""
+                    
+                # レート変更が成功したため、current_status_tagを更新
+                if target_rate == default_low_rate:
+                    current_status_tag = "IDLE"
+                elif use_global_high_rate and target_rate == global_high_rate_value:
+                    current_status_tag = f"Global High" 
+                elif is_any_game_running and current_game_name:
+                    current_status_tag = f"Game: {current_game_name}"
+            else:
+                # 🚨 ERROR: レート変更失敗を記録
+                APP_LOGGER.error("Rate change failed for target %d Hz. Internal state (current_rate) remains %d Hz.", target_rate, self.current_rate)
+
+        
+        # 4. 毎ループ、ステータスを StatusChannel に公開 (GUI / トレイが各自のタイミングで読み出す)
+        # 🚨 修正 (表示の安定化): display_rate は常に self.current_rate (内部期待値) を使用
+        display_rate = self.current_rate 
+
+        if not is_any_game_running:
+            # ゲームが動いていない場合は、表示レートに関わらずIDLEタグを使用
+            current_status_tag = "IDLE" 
+
+        # 最終的なステータスメッセージを公開 (内容が変わらない場合、publish は何もしない)
+        self.publish_status(f"Status: {current_status_tag} ({display_rate} Hz)", display_rate)
+        
+        # 5. 監視間隔の待機は MonitorLifecycle が Event.wait() で行う
+
+    def _active_override(self, match: RuleMatch) -> Optional[RateOverride]:
+        """現在のゲームの構成に適用されるレートの上書きを返します。構成が変わっていれば解除します。"""
+        override = self._rate_override
+        if override is not None and not override.applies_to(match):
+            APP_LOGGER.info("Running games changed. Releasing the %s override (%d Hz).", override.reason, override.rate)
+            self._set_rate_override(None)
+            override = None
+        return override
+
+    def clear_rate_override(self):
+        """レートの上書きを解除します (次の判定からルールに従う)。"""
+        self._set_rate_override(None)
+
+    def _set_rate_override(self, override: Optional[RateOverride]):
+        """レートの上書きを設定/解除し、トレースに記録します (再生時の判定も同じ上書きを使うため)。"""
+        if override == self._rate_override:
+            return
+        self._rate_override = override
+        if self.trace_recorder is not None:
+            self.trace_recorder.record_override(override)
+
+    def _read_active_rate_for_drift(self) -> Optional[int]:
+        """ドリフト確認用の実レート取得。直近の全モニタースナップショットがあれば外部ツールを起動しない。"""
+        monitor_id = self.settings.get("selected_monitor_id")
+        if not monitor_id:
+            return None
+        started = time.perf_counter()
+        rate = self.display_backend.get_active_rate(monitor_id, max_age=self.DRIFT_SNAPSHOT_MAX_AGE_SECONDS)
+        self._trace_call("get_active_rate_drift", started, rate, rate is not None)
+        return rate
+
+    def _reconcile_drift(self, match: RuleMatch, default_low_rate: int, stop_event: Event):
+        """
+        [監視スレッド] 実レートと内部期待値 (self.current_rate) を比較し、
+        ドリフトを検出した場合は設定されたポリシーに従って補正または採用します。
+        """
+        event = self.drift_reconciler.check(self.current_rate)
+        if event is None:
+            return
+        
+        if event.policy is DriftPolicy.ADOPT:
+            # 観測したレートを新しい期待値として受け入れる。decide_target_rate が元に戻さないよう、
+            # 実行中のゲームの構成が変わるまで上書きとして維持する
+            self.current_rate = event.observed_rate
+            self._set_rate_override(RateOverride.for_match(event.observed_rate, "drift-adopt", match))
+            self._record_applied_rate(event.observed_rate, "drift-adopt")
+            APP_LOGGER.info("Adopted externally changed rate: %d Hz.", event.observed_rate)
+            return
+        
+        # 期待値へ戻す。低レート帯 (59/60 Hz) の場合は設定の低レートを適用する
+        is_expected_low = is_low_rate(event.expected_rate, default_low_rate)
+        corrected_rate = default_low_rate if is_expected_low else event.expected_rate
+        
+        final_rate = self._enforce_rate(
+            corrected_rate,
+            cancel_event=stop_event,
+            reason="drift-correct",
+            owner_process=None if is_expected_low else match.process_name,
+        )
+        
+        if final_rate is not None:
+            APP_LOGGER.info("Drift corrected. Rate restored to %d Hz.", final_rate)
+        else:
+            APP_LOGGER.error("Failed to correct drift back to %d Hz.", corrected_rate)
+
+    def _enforce_rate(
+        self,
+        target_rate: int,
+        cancel_event: Optional[Event] = None,
+        reason: str = "manual",
+        owner_process: Optional[str] = None,
+    ) -> Optional[int]:
+        """
+        Applies the specified rate under the rate lock and, on success, updates self.current_rate
+        to the confirmed rate. See _apply_rate_with_retries for the retry behaviour.
+        """
+        with self._rate_lock:
+            final_rate = self._apply_rate_with_retries(target_rate, cancel_event, reason, owner_process)
+            if final_rate is not None:
+                self.current_rate = final_rate
+            return final_rate
+
+    def _apply_rate_with_retries(
+        self,
+        target_rate: int,
+        cancel_event: Optional[Event],
+        reason: str,
+        owner_process: Optional[str],
+    ) -> Optional[int]:
+        """
+        Forcibly applies the specified rate, including retry logic.
+        Returns the confirmed active rate upon success, or None on failure.
+        If cancel_event is set (e.g. monitoring is being stopped), remaining retries are abandoned.
+        Successful changes are recorded in the rate journal with the reason and the owning game process.
+        """
+        # 🚨 DEBUG: 関数開始を記録
+        APP_LOGGER.debug("Attempting to enforce rate change. Target rate: %d Hz.", target_rate)
+
+        MAX_RETRIES = 3
+        RETRY_DELAY = 1.0
+
+        monitor_id = self.settings.get("selected_monitor_id")
+        resolution = self.settings.get("target_resolution")
+        
+        if not monitor_id or not resolution:
+            # 🚨 修正: print() を APP_LOGGER.error() に置き換え、メッセージを英語化
+            APP_LOGGER.error(
+                "Monitor ID (%s) or Resolution (%s) not set. Cannot change rate to %d Hz.", 
+                monitor_id, resolution, target_rate
+            )
+            return None
+        
+        try:
+            width, height = map(int, resolution.split('x'))
+        except ValueError:
+            # 🚨 修正: print() を APP_LOGGER.error() に置き換え、メッセージを英語化
+            APP_LOGGER.error("Invalid resolution format: %s. Cannot change rate.", resolution)
+            return None
+            
+        # 🚨 INFO: 試行する設定を記録
+        APP_LOGGER.info(
+            "Starting rate change attempt for Monitor ID %s: %dx%d @ %d Hz.", 
+            monitor_id, width, height, target_rate
+        )
+            
+        # 再試行ループの導入
+        for attempt in range(1, MAX_RETRIES + 1):
+            
+            # 🚨 修正: print() を APP_LOGGER.info() に置き換え、メッセージを英語化
+            APP_LOGGER.info(
+                "Attempting to change rate to %d Hz (Attempt %d/%d).", 
+                target_rate, attempt, MAX_RETRIES
+            )
+            
+            # 🚨 修正: コマンド文字列は DEBUG が有効な場合のみ組み立てる (無効時は書式化のコストをかけない)
+            APP_LOGGER.debug(
+                "Executing command: \"ResolutionSwitcher\" --monitor %s --width %s --height %s --refresh %s",
+                monitor_id, width, height, target_rate
+            )
+            
+            # 💡 実際の変更は DisplayBackend に委譲 (既定: switcher_utility.change_rate)
+            call_started = time.perf_counter()
+            self._switch_attempts.inc(reason=reason)
+            success = self.display_backend.change_rate(target_rate, width, height, monitor_id)
+            self._trace_call("change_rate", call_started, target_rate, success)
+            if success:
+                self._switch_successes.inc(reason=reason)
+            else:
+                self._switch_failures.inc(reason=reason)
+            
+            if success:
+                # 🚨 修正: print() を APP_LOGGER.info() に置き換え、メッセージを英語化
+                APP_LOGGER.info(
+                    "Monitor %s successfully changed to %d Hz on attempt %d. Confirming actual rate...", 
+                    monitor_id, target_rate, attempt
+                )
+                
+                # ----------------------------------------------------------------------
+                # 成功した直後に、OSが実際に設定したレートを取得し直す
+                # ----------------------------------------------------------------------
+                actual_rate = self.get_active_monitor_rate() 
+                
+                if actual_rate is not None:
+                    # 🚨 修正: print() を APP_LOGGER.info() に置き換え
+                    APP_LOGGER.info("OS reported final rate as %d Hz. Operation successful.", actual_rate)
+                    self._record_applied_rate(actual_rate, reason, owner_process)
+                    return actual_rate # OSが設定した実際のレートを返す
+                else:
+                    # リアルレート取得に失敗した場合でも、目標レートをフォールバックとして返す
+                    # 🚨 修正: print() を APP_LOGGER.warning() に置き換え
+                    APP_LOGGER.warning(
+                        "Failed to confirm actual rate after change. Assuming target rate %d Hz.",
+                        target_rate
+                    )
+                    self._record_applied_rate(target_rate, reason, owner_process)
+                    return target_rate
+                # ----------------------------------------------------------------------
+                
+            
+            # 失敗した場合の処理
+            # 🚨 修正: print() を APP_LOGGER.warning() に置き換え、メッセージを英語化
+            APP_LOGGER.warning(
+                "Failed to change rate to %d Hz on attempt %d. Retrying.", 
+                target_rate, attempt
+            )
+            
+            if attempt < MAX_RETRIES:
+                # 最終試行でなければ、待機して再試行
+                # 🚨 修正: print() を APP_LOGGER.debug() に置き換え (待機は頻繁に起こるため)
+                APP_LOGGER.debug("Waiting for %.1f seconds before next retry...", RETRY_DELAY)
+                
+                # 💡 中断イベントが渡された場合は Event.wait() で待機し、中断要求に即座に反応する
+                if cancel_event is not None:
+                    if cancel_event.wait(RETRY_DELAY):
+                        APP_LOGGER.warning("Rate change to %d Hz cancelled after attempt %d.", target_rate, attempt)
+                        return None
+                else:
+                    time.sleep(RETRY_DELAY)
+            
+        # 全ての再試行が失敗した場合
+        # 🚨 修正: print() を APP_LOGGER.error() に置き換え
+        APP_LOGGER.error(
+            "Rate change to %d Hz failed after %d attempts. Critical failure.", 
+            target_rate, MAX_RETRIES
+        )
+        
+        # 致命的なエラーとして、GUIやトレイアイコンに通知することを検討 (ここはロジック変更なし)
+        
+        return None # 全ての試行が失敗
+
+    def _trace_call(self, op: str, started: float, rate: Optional[int], ok: bool):
+        """外部ツールの呼び出しをトレースに記録します (記録しない場合は何もしない)。"""
+        if self.trace_recorder is not None:
+            self.trace_recorder.record_call(op, time.perf_counter() - started, rate=rate, ok=ok)
+
+    def _record_applied_rate(self, rate: int, reason: str, owner_process: Optional[str] = None):
+        """適用したレートを、所有ゲームの PID / 起動時刻とともにレート状態ジャーナルへ記録します。"""
+        game_pid = None
+        game_create_time = None
+        
+        if owner_process:
+            identity = self.process_scanner.find_process_identity(owner_process)
+            if identity is not None:
+                game_pid, game_create_time = identity
+        
+        self.rate_journal.append(
+            rate,
+            reason,
+            game_pid=game_pid,
+            game_create_time=game_create_time,
+            game_name=owner_process,
+        )
+        
+        # 自身のレート変更直後はドリフト確認を短い間隔に戻す
+        self.drift_reconciler.notify_switch()
+
+    def evaluate_now(self, probe_display: bool = False):
+        """
+        Immediately checks the current game execution status and changes the monitor rate 
+        based on settings, typically triggered by GUI/tray operations 
+        (e.g., rate recovery when a game is deleted).
+        If probe_display is True (e.g. the settings window is open), the published status uses the
+        rate read back from the display instead of the internal expected rate.
+        """
+        with self._rate_lock:
+            self._evaluate_now_locked(probe_display)
+
+    def _evaluate_now_locked(self, probe_display: bool):
+        # 🚨 DEBUG: 関数開始を記録
+        APP_LOGGER.debug("Immediate rate check and application started (triggered by UI/config change).")
+        
+        # 1. 前提条件のチェック
+        if not self.settings.get("is_monitoring_enabled", False):
+            # 🚨 修正: print() を APP_LOGGER.info() に置き換え、メッセージを英語化
+            APP_LOGGER.info("Monitoring is disabled. Skipping immediate rate check.")
+            
+            # モニタリングOFFの場合も実レートを取得してステータス更新
+            # (外部コマンド呼び出しを伴うため、実レートの取得は GUI 表示時のみ)
+            display_rate = self.current_rate
+            if probe_display:
+                active_rate = self.get_active_monitor_rate()
+                if active_rate is not None:
+                    display_rate = active_rate
+                
+            # 🚨 DEBUG: ステータス更新を記録
+            APP_LOGGER.debug("Status published for disabled monitoring: %s Hz.", display_rate)
+            
+            self.publish_status(f"Status: MONITORING DISABLED ({display_rate} Hz)", display_rate)
+            return
+
+        default_low_rate = self.rule_index.default_low_rate
+        
+        # 設定の変更による再評価は、採用していたレートより優先する
+        self.clear_rate_override()
+        
+        # プロセス取得に失敗する可能性を考慮（ただし_get_running_process_names内でエラー処理される）
+        running_processes = self._get_running_process_names()
+        
+        # 2. 実行中の最高レートを決定 (監視ループと同じ RuleIndex を使用)
+        match = self.rule_index.evaluate(running_processes)
+        is_any_game_running = match.is_any_game_running
+        highest_required_rate = match.required_rate
+        current_game_name = match.game_name
+                     
+        # ----------------------------------------------------
+        # 💡 デバッグログ 1: 判定結果と現在の状態
+        # ----------------------------------------------------
+        # 🚨 修正: print() を APP_LOGGER.debug() に置き換え
+        APP_LOGGER.debug(
+            "Check Results: Game Running=%s, Required Rate=%d Hz, Current Rate=%d Hz.",
+            is_any_game_running, highest_required_rate, self.current_rate
+        )
+
+
+        # 3. レート変更の必要性を判断
+        target_rate = None
+        
+        if is_any_game_running:
+            # ゲーム実行中: 最高レートが必要
+            if highest_required_rate != self.current_rate: 
+                target_rate = highest_required_rate
+                # 🚨 修正: print() を APP_LOGGER.debug() に置き換え
+                APP_LOGGER.debug("Action: Switching to High Rate: %d Hz", target_rate)
+        else:
+            # IDLE状態: 低レートが必要
+            
+            # (A) 内部状態が既に低Hzでない場合
+            if self.current_rate != default_low_rate: 
+                target_rate = default_low_rate
+                # 🚨 修正: print() を APP_LOGGER.debug() に置き換え
+                APP_LOGGER.debug("Action: Switching to Low Rate (IDLE): %d Hz (1st Check)", target_rate)
+            
+            # (B) 内部状態が既に低Hzだが、GUIからの強制再評価の場合 (ゲーム削除時)
+            elif self.current_rate == default_low_rate:
+                target_rate = default_low_rate
+                # 🚨 修正: print() を APP_LOGGER.debug() に置き換え
+                APP_LOGGER.debug("Action: Re-applying Low Rate (IDLE) due to config change: %d Hz (Forced Re-apply)", target_rate)
+            
+        
+        # 4. レート変更の実行
+        if target_rate is not None:
+            # 🚨 INFO: 変更試行を記録 (即時変更は重要)
+            APP_LOGGER.info("Attempting immediate rate change to %d Hz.", target_rate)
+            
+            final_rate = self._enforce_rate(
+                target_rate,
+                reason="settings",
+                owner_process=match.process_name if target_rate != default_low_rate else None,
+            )
+            
+            if final_rate is not None:
+                # 🚨 修正: print() を APP_LOGGER.info() に置き換え
+                APP_LOGGER.info("Immediate rate change successful. Current rate set to %d Hz.", final_rate)
+            else:
+                # 🚨 修正: print() を APP_LOGGER.error() に置き換え
+                APP_LOGGER.error("Immediate rate change failed for %d Hz.", target_rate)
+
+        # 5. ステータスを公開（修正済みロジック）
+        # 💡 GUI 表示中は self.current_rate の代わりに実レートを取得し、フォールバックを使用
+        display_rate = self.current_rate
+        if probe_display:
+            active_rate = self.get_active_monitor_rate() 
+            if active_rate is not None:
+                display_rate = active_rate
+        
+        is_idle_rate = is_low_rate(display_rate, default_low_rate)
+        
+        if is_any_game_running:
+            current_status_tag = "Game: " + current_game_name if current_game_name else "Game Running"
+        elif is_idle_rate:
+            current_status_tag = "IDLE"
+        else:
+            current_status_tag = "Pending..."
+            
+        new_status_message = f"Status: {current_status_tag} ({display_rate} Hz)"
+        
+        if self.publish_status(new_status_message, display_rate):
+             APP_LOGGER.debug("Status published by immediate check: %s", new_status_message)
+                 
+        # 🚨 DEBUG: 関数終了を記録
+        APP_LOGGER.debug("Immediate rate check and application completed.")
+
+    def get_active_monitor_rate(self) -> Optional[int]:
+        """
+        設定されたモニターの実リフレッシュレートを取得します。
+        (取得値は switcher_utility 側で適切な整数値に丸められている前提)
+        """
+        monitor_id = self.settings.get("selected_monitor_id")
+        if not monitor_id:
+            return None
+            
+        # 💡 DisplayBackend に委譲 (既定: switcher_utility.get_current_active_rate)
+        started = time.perf_counter()
+        rate = self.display_backend.get_active_rate(monitor_id)
+        self._trace_call("get_active_rate", started, rate, rate is not None)
+        
+        # 🚨 デバッグログを追加 (整数値またはNoneが返ってくることを想定)
+        APP_LOGGER.debug("Monitor rate retrieved from utility: %s Hz", rate)
+        
+        return rate
+
+    def stop(self):
+        """
+        Stops the monitoring thread via MonitorLifecycle.
+        The display is reset to the idle rate exactly once per stop (see _restore_idle_rate_on_stop).
+        """
+        
+        # 🚨 DEBUG: 関数開始を記録
+        APP_LOGGER.debug("Attempting to stop monitoring thread.")
+        
+        # 🚨 修正: 以前は存在しない self.monitor_thread を参照していたため、join が一度も行われていなかった
+        if self.monitor_lifecycle.stop():
+            APP_LOGGER.info("Monitoring thread shutdown sequence finished.")
+        else:
+            APP_LOGGER.warning("Monitoring thread shutdown sequence exceeded its deadline.")
+
+        # 🚨 DEBUG: 関数終了を記録
+        APP_LOGGER.debug("_stop_monitoring_thread completed.")
+
+    def _restore_idle_rate_on_stop(self, cancel_event: Event):
+        """
+        [MonitorLifecycle の停止フック] 監視停止時にディスプレイをアイドルレートへ戻します。
+        MonitorLifecycle により、停止遷移ごとに 1 度だけ、専用の期限付きで呼び出されます。
+        """
+        # 低レートへの復帰 (外部コマンド実行) 💥 _enforce_rate() を使用 💥
+        idle_rate = self.settings.get("default_low_rate", 60) 
+        self.clear_rate_override()
+        
+        try:
+            APP_LOGGER.info("Resetting display rate to idle rate (%s Hz).", idle_rate)
+
+            # 実際のレート変更メソッド _enforce_rate() を呼び出す
+            final_rate = self._enforce_rate(idle_rate, cancel_event=cancel_event, reason="shutdown") 
+
+            if final_rate is not None:
+                APP_LOGGER.info("Successfully reset display rate to idle rate. Final rate: %d Hz", final_rate)
+            else:
+                APP_LOGGER.error("Failed to reset display rate to idle rate (%s Hz): _enforce_rate returned None.", idle_rate)
+
+        except Exception as e:
+            APP_LOGGER.error("Failed to reset display rate to idle rate (%s Hz): %s", idle_rate, e)
@@ -0,0 +1,159 @@
+# hz_core/fakes.py
+# プラットフォーム依存部分のメモリ上の実装 (Linux 上での動作確認・ベンチマーク用)
+#
+# 💡 外部ツール (ResolutionSwitcher.exe) / psutil / winreg / win32event / pystray を一切使用しない。
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from hz_core.backend import DisplayBackend
+from hz_core.platform import InstanceLock, StartupRegistrar, TrayIcon
+from hz_core.scanner import ProcessScanner
+
+
+class FakeDisplayBackend(DisplayBackend):
+    """
+    モニターごとのレートをメモリ上に保持するディスプレイバックエンド。
+
+    - supported_rates を指定した場合、それ以外のレートへの変更は失敗する。
+    - change_calls には (target_rate, width, height, monitor_id) が呼び出し順に記録される。
+    """
+
+    def __init__(self, rates: Optional[Dict[str, int]] = None, supported_rates: Optional[Iterable[int]] = None):
+        self._lock = threading.Lock()
+        self.rates: Dict[str, int] = dict(rates or {})
+        self.supported_rates: Optional[Set[int]] = set(supported_rates) if supported_rates is not None else None
+        self.change_calls: List[Tuple[int, int, int, str]] = []
+
+    def get_active_rate(self, monitor_id: str, max_age: float = 0.0) -> Optional[int]:
+        with self._lock:
+            return self.rates.get(monitor_id)
+
+    def change_rate(self, target_rate: int, width: int, height: int, monitor_id: str) -> bool:
+        with self._lock:
+            self.change_calls.append((target_rate, width, height, monitor_id))
+            if self.supported_rates is not None and target_rate not in self.supported_rates:
+                return False
+            self.rates[monitor_id] = target_rate
+            return True
+
+
+class FakeProcessScanner(ProcessScanner):
+    """
+    実行中プロセスをメモリ上で管理するスキャナー。
+
+    start() / kill() でプロセスの起動・終了を模擬する。PID は起動ごとに新しく採番される。
+    """
+
+    def __init__(self, process_names: Iterable[str] = (), clock: Callable[[], float] = time.time):
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._next_pid = 1000
+        self._processes: Dict[int, Tuple[str, float]] = {}
+        self.scan_count = 0
+        for name in process_names:
+            self.start(name)
+
+    def start(self, process_name: str) -> int:
+        """プロセスを起動したことにし、その PID を返します。"""
+        with self._lock:
+            pid = self._next_pid
+            self._next_pid += 1
+            self._processes[pid] = (process_name, self._clock())
+            return pid
+
+    def kill(self, process_name: str) -> int:
+        """指定した名前のプロセスをすべて終了したことにし、終了した数を返します。"""
+        with self._lock:
+            pids = [pid for pid, (name, _) in self._processes.items() if name == process_name]
+            for pid in pids:
+                del self._processes[pid]
+            return len(pids)
+
+    def running_process_names(self) -> Set[str]:
+        with self._lock:
+            self.scan_count += 1
+            return {name for name, _ in self._processes.values()}
+
+    def find_process_identity(self, process_name: str) -> Optional[Tuple[int, float]]:
+        with self._lock:
+            for pid, (name, create_time) in self._processes.items():
+                if name.lower() == process_name.lower():
+                    return pid, create_time
+        return None
+
+    def is_process_alive(self, pid: int, create_time: float) -> bool:
+        with self._lock:
+            entry = self._processes.get(pid)
+        return entry is not None and abs(entry[1] - create_time) < 0.01
+
+
+class InMemoryStartupRegistrar(StartupRegistrar):
+    """自動起動の登録内容をメモリ上に保持します。"""
+
+    def __init__(self):
+        self.command: Optional[str] = None
+
+    def register(self, command: str) -> bool:
+        self.command = command
+        return True
+
+    def unregister(self) -> bool:
+        self.command = None
+        return True
+
+    def is_registered(self) -> bool:
+        return self.command is not None
+
+
+class InMemoryInstanceLock(InstanceLock):
+    """
+    同じ名前のロックを、同一プロセス内で 1 つだけ取得できるようにします。
+    (プロセス間の多重起動は検出しない。テスト・ベンチマーク用)
+    """
+
+    _held: Set[str] = set()
+    _held_lock = threading.Lock()
+
+    def __init__(self, name: str):
+        self.name = name
+        self._acquired = False
+
+    def acquire(self) -> bool:
+        with self._held_lock:
+            if self.name in self._held:
+                return False
+            self._held.add(self.name)
+            self._acquired = True
+            return True
+
+    def release(self):
+        with self._held_lock:
+            if self._acquired:
+                self._held.discard(self.name)
+                self._acquired = False
+
+
+class InMemoryTray(TrayIcon):
+    """タスクトレイの代わりに、ツールチップとメニューを保持するだけのアイコン。"""
+
+    def __init__(self, name: str, image: Any = None, title: str = "", menu: Any = None,
+                 action: Optional[Callable[..., None]] = None):
+        self.name = name
+        self.image = image
+        self.title = title
+        self.menu = menu
+        self.action = action
+        self._stopped = threading.Event()
+
+    def run(self):
+        self._stopped.wait()
+
+    def stop(self):
+        self._stopped.set()
+
+    def click(self):
+        """アイコンのクリック (既定の操作) を模擬します。"""
+        if self.action is not None:
+            self.action(self, None)
@@ -0,0 +1,226 @@
+# hz_core/i18n.py
+# 言語リソース (lang/*.json) の翻訳カタログ。タスクトレイ (main_app) と設定画面 (main_gui) で共有する
+#
+# 💡 各言語のファイルはプロセス内で 1 度だけ読み込み、英語 (en.json) を下敷きにした 1 つの辞書に統合する。
+#    翻訳されていないキーは英語の文字列がそのまま入るため、取得時にフォールバックの判定は不要。
+#    {placeholder} を含む文字列は読み込み時に分解 (コンパイル) しておき、取得時に毎回解析しない。
+
+import json
+import logging
+import os
+import string
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from hz_core.paths import get_resource_path
+
+APP_LOGGER = logging.getLogger('AutoHzSwitcher')
+
+# キーが翻訳されていない言語で使う言語
+FALLBACK_LANGUAGE = "en"
+# どの言語にも無いキーを取得した場合の表示 (既定の文字列が渡されなかった場合)
+MISSING_KEY_PREFIX = "MISSING_KEY: "
+# en.json も読み込めない場合の最低限の文字列 (トレイメニューが完全に壊れないため)
+MINIMAL_RESOURCES = {"tray_title": "Auto Hz Switcher", "settings": "Settings", "exit": "Exit"}
+# languages.json が読み込めない場合の言語一覧
+DEFAULT_LANGUAGES = {"ja": "Japanese", "en": "English"}
+
+_FORMATTER = string.Formatter()
+
+
+class CompiledTemplate:
+    """
+    A "{placeholder}" translation string parsed once at load time.
+
+    - render() は str.format と同じ結果を返す (書式指定・変換 (!r など)・属性参照にも対応)
+    - 書式として不正な文字列 (閉じていない { など) は、そのまま返す
+    """
+
+    __slots__ = ("text", "_parts")
+
+    def __init__(self, text: str):
+        self.text = text
+        self._parts: Optional[List[Tuple[str, Optional[str], str, Optional[str]]]]
+        try:
+            self._parts = list(_FORMATTER.parse(text))
+        except ValueError:
+            self._parts = None
+
+    @property
+    def field_names(self) -> List[str]:
+        return [field for _, field, _, _ in (self._parts or ()) if field is not None]
+
+    def render(self, values: Dict[str, Any]) -> str:
+        """プレースホルダーを values で置き換えます。足りない値がある場合は KeyError を送出します。"""
+        if self._parts is None:
+            return self.text
+        pieces = []
+        for literal, field, spec, conversion in self._parts:
+            pieces.append(literal)
+            if field is None:
+                continue
+            if field in values:
+                value = values[field]
+            else:
+                # "{game.name}" のような参照 (見つからない場合は KeyError)
+                value = _FORMATTER.get_field(field, (), values)[0]
+            if conversion:
+                value = _FORMATTER.convert_field(value, conversion)
+            pieces.append(format(value, spec) if spec else str(value))
+        return "".join(pieces)
+
+
+class LanguageManager:
+    """
+    Compiled translations for one language, shared by the tray and the GUI.
+
+    - resources: 英語を下敷きにした、この言語の全キーの辞書 (読み取り専用として扱う)
+    - get(): 辞書の参照 1 回で返す。{placeholder} の置き換えは、引数が渡された場合のみ行う
+    - 生成は TranslationCatalog.load() から行う (言語ごとに 1 つのインスタンスを共有する)
+    """
+
+    def __init__(self, language_code: str, resources: Dict[str, str]):
+        self.language_code = language_code
+        self.resources = resources
+        self.templates: Dict[str, CompiledTemplate] = {
+            key: CompiledTemplate(text) for key, text in resources.items() if "{" in text
+        }
+
+    def get(self, key: str, default: Optional[str] = None, **kwargs) -> str:
+        """Retrieves the text corresponding to the key and replaces placeholders."""
+        text = self.resources.get(key)
+        if text is None:
+            # どの言語にも無いキー (翻訳ファイルの追加漏れ) の場合のみ、ここを通る
+            APP_LOGGER.debug("Attempted to retrieve missing language key: %s (Lang: %s)", key, self.language_code)
+            text = default or f"{MISSING_KEY_PREFIX}{key}"
+            if not kwargs:
+                return text
+            template = CompiledTemplate(text)
+        elif not kwargs:
+            return text
+        else:
+            template = self.templates.get(key)
+            if template is None:
+                return text
+
+        try:
+            return template.render(kwargs)
+        except (KeyError, AttributeError, IndexError) as e:
+            # 渡された kwargs が翻訳文字列内のプレースホルダーをすべて満たさない場合の保険
+            APP_LOGGER.error(
+                "Missing format key '%s' required by translation text for key '%s'. Returning raw text.",
+                e, key
+            )
+            return text
+
+
+class TranslationCatalog:
+    """
+    Loads each language of a lang/ directory at most once.
+
+    - load(code): その言語の LanguageManager を返す (初回のみファイルを読み込む。スレッドセーフ)
+    - available_languages(): languages.json の {コード: 表示名} を返す (初回のみ読み込む)
+    """
+
+    def __init__(self, lang_dir: str, fallback_language: str = FALLBACK_LANGUAGE):
+        self.lang_dir = lang_dir
+        self.fallback_language = fallback_language
+        self._lock = threading.Lock()
+        self._languages: Dict[str, LanguageManager] = {}
+        self._raw: Dict[str, Optional[Dict[str, str]]] = {}
+        self._available: Optional[Dict[str, str]] = None
+        self.file_loads = 0
+
+    def _read_json(self, filename: str) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self.lang_dir, filename)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            APP_LOGGER.warning("Language file '%s' not found.", path)
+            return None
+        except (OSError, ValueError) as e:
+            APP_LOGGER.error("Error loading language file '%s': %s", path, e)
+            return None
+        if not isinstance(data, dict):
+            APP_LOGGER.error("Language file '%s' does not contain a JSON object.", path)
+            return None
+        self.file_loads += 1
+        APP_LOGGER.info("Successfully loaded language resources from: %s", path)
+        return data
+
+    def _raw_locked(self, language_code: str) -> Optional[Dict[str, str]]:
+        if language_code not in self._raw:
+            data = self._read_json(f"{language_code}.json")
+            self._raw[language_code] = (
+                {key: value for key, value in data.items() if isinstance(value, str)} if data is not None else None
+            )
+        return self._raw[language_code]
+
+    def load(self, language_code: str) -> LanguageManager:
+        """指定した言語の翻訳を返します。翻訳の無いキーは英語、ファイルが無い言語は英語のみになります。"""
+        with self._lock:
+            manager = self._languages.get(language_code)
+            if manager is not None:
+                return manager
+
+            fallback = self._raw_locked(self.fallback_language)
+            if fallback is None:
+                APP_LOGGER.error("Default language file '%s.json' not found. Using minimal resources.", self.fallback_language)
+                fallback = MINIMAL_RESOURCES
+            resources = dict(fallback)
+            if language_code != self.fallback_language:
+                translated = self._raw_locked(language_code)
+                if translated is None:
+                    APP_LOGGER.warning("Language '%s' is unavailable. Defaulting to English.", language_code)
+                else:
+                    resources.update(translated)
+
+            manager = LanguageManager(language_code, resources)
+            self._languages[language_code] = manager
+            return manager
+
+    def available_languages(self) -> Dict[str, str]:
+        """使用可能な言語とその表示名 (languages.json) を返します。"""
+        with self._lock:
+            if self._available is None:
+                data = self._read_json("languages.json")
+                if data is None:
+                    APP_LOGGER.warning("languages.json not found or failed to load. Using hardcoded default.")
+                    data = DEFAULT_LANGUAGES
+                self._available = {str(code): str(name) for code, name in data.items()}
+            return dict(self._available)
+
+    def clear(self):
+        """読み込み済みの言語を破棄します (次回の load() でファイルを読み直す)。"""
+        with self._lock:
+            self._languages.clear()
+            self._raw.clear()
+            self._available = None
+
+
+_catalog: Optional[TranslationCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_translation_catalog() -> TranslationCatalog:
+    """
+    プロセス内で共有する翻訳カタログを返します (トレイと設定画面で同じものを使う)。
+    最初の呼び出しでプロジェクトの lang/ フォルダ (PyInstaller 環境では展開先) から生成する。
+
+    🚨 修正: 呼び出し側ごとに lang_dir を渡せると、2 回目以降に異なるフォルダを渡しても黙って無視されるため、
+       引数を廃止した。別のフォルダを使う場合は set_translation_catalog() で差し替える。
+    🚨 修正: lang/ の場所は hz_core.paths で解決する (hz_core からアプリ側のモジュールを import しない)。
+    """
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = TranslationCatalog(get_resource_path("lang"))
+        return _catalog
+
+
+def set_translation_catalog(catalog: Optional[TranslationCatalog]):
+    """共有する翻訳カタログを差し替えます (None の場合は次回の呼び出しで生成し直す)。"""
+    global _catalog
+    with _catalog_lock:
+        _catalog = catalog
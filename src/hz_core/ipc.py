@@ -0,0 +1,393 @@
+# hz_core/ipc.py
+# ローカル IPC による制御チャネル (Windows: 名前付きパイプ / Linux: Unix ドメインソケット)
+#
+# 💡 multiprocessing.connection を使用するため、追加の依存ライブラリは不要。
+#    メッセージは pickle ではなく JSON (send_bytes / recv_bytes) でやり取りする。
+#
+# 💡 GUI 版・ヘッドレス版の両方が同じチャネルを提供する。2 つ目に起動されたインスタンスは、
+#    重いモジュール (tkinter / pystray / PIL) を読み込む前に forward_command_line() で
+#    実行中のインスタンスへコマンドを渡して終了する。
+#
+# 🚨 修正: 接続時のハンドシェイクには、ユーザーごとにランダム生成した鍵 (ユーザーデータフォルダの control.key) を使用する。
+#    Windows の名前付きパイプは既定の DACL で作成されるため他ユーザーからも接続自体はできるが、鍵を知らない
+#    プロセスはハンドシェイクで拒否される。Unix ソケットは作成者のみがアクセスできるディレクトリ (0700) に作成する。
+#
+# 🚨 修正: ハンドシェイク・要求・応答の受信はすべて期限付き (poll) で行う。サーバーは接続ごとに短命のスレッドで
+#    受信するため、何も送らない接続があっても他のクライアントを待たせない。クライアント側も応答が無い
+#    インスタンスを待ち続けず、IPCTimeoutError で呼び出し側 (通常起動へのフォールバック / 非 0 終了) へ返す。
+
+import argparse
+import getpass
+import json
+import logging
+import os
+import secrets
+import stat
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener, answer_challenge, deliver_challenge
+from typing import Any, Callable, Dict, List, Optional
+
+from hz_core.paths import get_app_data_dir
+
+APP_LOGGER = logging.getLogger('AutoHzSwitcher')
+
+# 接続時のハンドシェイクに使用する鍵ファイル (ユーザーデータフォルダ内、作成者のみ読み書き可)
+CONTROL_KEY_FILENAME = 'control.key'
+_CONTROL_KEY_BYTES = 32
+
+# ハンドシェイクと要求の受信の期限 (サーバー・クライアント共通)。期限内に何も送らない接続は切断する
+HANDSHAKE_TIMEOUT_SECONDS = 5.0
+# クライアントが応答を待つ既定の期限 (ハンドラの実行時間を含む。レート変更のリトライにも足りる長さ)
+DEFAULT_RESPONSE_TIMEOUT_SECONDS = 30.0
+
+# コマンドハンドラ: 引数辞書を受け取り、JSON 化可能な辞書を返す
+CommandHandler = Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+class IPCError(Exception):
+    """制御チャネルへの接続、またはコマンド実行に失敗した場合の例外。"""
+
+
+class NoInstanceError(IPCError):
+    """制御チャネルで待ち受けているインスタンスが無い (接続できない) 場合の例外。"""
+
+
+class IPCTimeoutError(IPCError):
+    """インスタンスが期限内にハンドシェイク・応答を返さない場合の例外。"""
+
+
+class _DeadlineConnection:
+    """
+    Wraps a Connection so that every recv_bytes() waits at most until a shared deadline.
+
+    - multiprocessing の answer_challenge / deliver_challenge にもそのまま渡せる (send_bytes / recv_bytes のみ使用)。
+    - 期限を過ぎた場合は TimeoutError を送出する。
+    """
+
+    def __init__(self, conn: Connection, timeout: float):
+        self._conn = conn
+        self._deadline = time.monotonic() + timeout
+
+    def extend(self, timeout: float):
+        """以降の受信の期限を、現在時刻から timeout 秒後に設定し直します。"""
+        self._deadline = time.monotonic() + timeout
+
+    def send_bytes(self, buf: bytes):
+        self._conn.send_bytes(buf)
+
+    def recv_bytes(self, maxlength: Optional[int] = None) -> bytes:
+        if not self._conn.poll(max(0.0, self._deadline - time.monotonic())):
+            raise TimeoutError("timed out waiting for data")
+        return self._conn.recv_bytes(maxlength)
+
+
+def load_control_authkey(key_path: Optional[str] = None) -> bytes:
+    """
+    制御チャネルのハンドシェイクに使用する鍵を返します (鍵ファイルが無ければランダムに生成して保存します)。
+    場所: %LOCALAPPDATA%/AutoHzSwitcher/control.key
+
+    💡 Windows ではファイルのモード指定は効かないが、ユーザーデータフォルダ自体が既定で本人のみアクセスできる ACL を持つ。
+
+    Raises:
+        IPCError: 鍵ファイルの作成・読み込みに失敗した場合。
+    """
+    key_path = key_path or os.path.join(get_app_data_dir(), CONTROL_KEY_FILENAME)
+    try:
+        if not os.path.exists(key_path):
+            _create_control_key(key_path)
+        with open(key_path, 'rb') as f:
+            key = f.read().strip()
+    except OSError as e:
+        raise IPCError(f"Failed to load control channel key {key_path}: {e}") from e
+
+    if not key:
+        raise IPCError(f"Control channel key {key_path} is empty.")
+    return key
+
+
+def _create_control_key(key_path: str):
+    """鍵を一時ファイル (0600) に書き込んでから配置します。同時に起動したインスタンスが先に配置した鍵は上書きしない。"""
+    fd, temp_path = tempfile.mkstemp(prefix='control-', suffix='.key.tmp', dir=os.path.dirname(key_path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(secrets.token_hex(_CONTROL_KEY_BYTES).encode('ascii'))
+        try:
+            os.link(temp_path, key_path)
+        except FileExistsError:
+            pass
+    finally:
+        os.unlink(temp_path)
+
+
+def _ensure_private_dir(path: str):
+    """Unix ソケットを置くディレクトリを、作成者のみがアクセスできる状態 (0700) で用意します。"""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise IPCError(f"Control socket directory {path} is not a directory owned by the current user.")
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        os.chmod(path, 0o700)
+
+
+def default_control_address() -> str:
+    """現在のユーザー用の制御チャネルのアドレスを返します。"""
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "default"
+
+    if sys.platform == 'win32':
+        return rf"\\.\pipe\AutoHzSwitcher-{user}"
+
+    runtime_dir = os.getenv('XDG_RUNTIME_DIR') or os.path.join(os.path.expanduser('~'), '.cache')
+    socket_dir = os.path.join(runtime_dir, f"AutoHzSwitcher-{user}")
+    _ensure_private_dir(socket_dir)
+    return os.path.join(socket_dir, "control.sock")
+
+
+def send_command(
+    command: str,
+    args: Optional[Dict[str, Any]] = None,
+    address: Optional[str] = None,
+    authkey: Optional[bytes] = None,
+    timeout: float = DEFAULT_RESPONSE_TIMEOUT_SECONDS,
+) -> Dict[str, Any]:
+    """
+    実行中のインスタンスへコマンドを送り、応答を返します。
+
+    Args:
+        authkey: ハンドシェイクの鍵 (省略時は load_control_authkey() の鍵)
+        timeout: コマンド送信後、応答を待つ期限 (秒)。ハンドシェイクは HANDSHAKE_TIMEOUT_SECONDS 以内
+
+    Raises:
+        NoInstanceError: インスタンスが起動していない場合。
+        IPCTimeoutError: インスタンスが期限内に応答しない場合。
+        IPCError: 応答が不正、またはコマンドが失敗した場合。
+    """
+    address = address or default_control_address()
+    authkey = authkey or load_control_authkey()
+    try:
+        # 💡 Windows の名前付きパイプは、全インスタンスが使用中の間 Client() 内で最大 20 秒待機する
+        conn = Client(address)
+    except (OSError, EOFError, ValueError) as e:
+        raise NoInstanceError(f"No instance is listening at {address}: {e}") from e
+
+    with conn:
+        try:
+            channel = _DeadlineConnection(conn, min(HANDSHAKE_TIMEOUT_SECONDS, timeout))
+            answer_challenge(channel, authkey)
+            deliver_challenge(channel, authkey)
+
+            channel.send_bytes(json.dumps({"command": command, "args": args or {}}).encode('utf-8'))
+            channel.extend(timeout)
+            response = json.loads(channel.recv_bytes().decode('utf-8'))
+        except TimeoutError as e:
+            raise IPCTimeoutError(f"Instance at {address} did not respond to '{command}' in time.") from e
+        except AuthenticationError as e:
+            # 別ユーザー (または鍵の異なるインスタンス) が同じアドレスで待ち受けている
+            raise IPCError(f"Control channel at {address} rejected the handshake: {e}") from e
+        except (OSError, EOFError, ValueError) as e:
+            raise IPCError(f"Failed to send '{command}' to {address}: {e}") from e
+
+    if not response.get("ok", False):
+        raise IPCError(response.get("error", f"Command '{command}' failed."))
+    return response.get("result") or {}
+
+
+def forward_to_running_instance(
+    command: str,
+    args: Optional[Dict[str, Any]] = None,
+    address: Optional[str] = None,
+    timeout: float = HANDSHAKE_TIMEOUT_SECONDS,
+) -> Optional[Dict[str, Any]]:
+    """
+    実行中のインスタンスがあればコマンドを送り、応答を返します。
+    インスタンスが無い、または期限内に応答しない場合は None (呼び出し側は通常どおり起動する)。
+
+    Raises:
+        IPCError: インスタンスはあるが、コマンドが失敗した場合。
+    """
+    try:
+        return send_command(command, args, address=address, timeout=timeout)
+    except NoInstanceError:
+        return None
+    except IPCTimeoutError as e:
+        APP_LOGGER.warning("%s Starting normally instead.", e)
+        return None
+
+
+def run_cli_command(
+    command: str,
+    args_json: str = "{}",
+    address: Optional[str] = None,
+    timeout: float = DEFAULT_RESPONSE_TIMEOUT_SECONDS,
+) -> int:
+    """--send の処理: コマンドを送って結果を JSON で標準出力へ書き、終了コードを返します。"""
+    try:
+        result = send_command(command, json.loads(args_json), address=address, timeout=timeout)
+    except (IPCError, ValueError) as e:
+        # 💡 IPCTimeoutError (応答しないインスタンス) もここで非 0 終了になる
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return 0
+
+
+def forward_command_line(argv: List[str], default_command: str = "open_settings") -> Optional[int]:
+    """
+    GUI 版の起動直後 (重い import の前) に呼ばれ、実行中のインスタンスへ処理を引き継ぎます。
+
+    - "--send COMMAND [--args JSON]" 指定時: コマンドを送り、終了コードを返す (インスタンスが無ければ 1)
+    - それ以外: 実行中のインスタンスがあれば default_command (設定画面を前面に表示) を送って 0 を返す
+    - 実行中のインスタンスが無い、または期限内に応答しない場合は None を返す (呼び出し側はそのまま起動する)
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--send", default=None)
+    parser.add_argument("--args", default="{}")
+    parser.add_argument("--control-address", default=None)
+    options, _ = parser.parse_known_args(argv)
+    address = options.control_address or default_control_address()
+
+    if options.send:
+        return run_cli_command(options.send, options.args, address=address)
+
+    try:
+        if forward_to_running_instance(default_command, address=address) is None:
+            return None
+    except IPCError as e:
+        # 実行中のインスタンスはあるが、コマンドが失敗した場合も 2 つ目は起動しない
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+class ControlServer:
+    """
+    Serves control commands from other local processes on a background thread.
+
+    - 接続ごとに短命のスレッドでハンドシェイク・要求の受信を行い、期限内に要求を送らない接続は切断する。
+    - ハンドラの呼び出しは 1 件ずつ直列化する (ハンドラは短時間で戻ること)。
+    - 未知のコマンドやハンドラの例外は、エラー応答としてクライアントへ返す。
+    - 同じアドレスで既にインスタンスが応答する場合、start() は False を返す (多重起動の検出に利用できる)。
+    """
+
+    def __init__(
+        self,
+        handlers: Dict[str, CommandHandler],
+        address: Optional[str] = None,
+        authkey: Optional[bytes] = None,
+    ):
+        self.address = address or default_control_address()
+        self._authkey = authkey or load_control_authkey()
+        self._handlers = dict(handlers)
+        self._handlers.setdefault("ping", lambda args: {"pong": True})
+        self._handlers.setdefault("commands", lambda args: {"commands": sorted(self._handlers)})
+        self._listener: Optional[Listener] = None
+        self._thread: Optional[threading.Thread] = None
+        self._closing = threading.Event()
+        self._dispatch_lock = threading.Lock()
+
+    def register(self, command: str, handler: CommandHandler):
+        """コマンドを追加します (start() の後でも追加できる)。"""
+        self._handlers[command] = handler
+
+    def start(self) -> bool:
+        """制御チャネルの待ち受けを開始します。既に別のインスタンスが待ち受けている場合は False。"""
+        try:
+            send_command("ping", address=self.address, authkey=self._authkey, timeout=HANDSHAKE_TIMEOUT_SECONDS)
+            APP_LOGGER.info("Another instance is already serving control channel at %s.", self.address)
+            return False
+        except IPCError:
+            pass
+
+        # Unix ドメインソケットの場合、前回の異常終了で残ったソケットファイルを削除する
+        if sys.platform != 'win32' and os.path.exists(self.address):
+            try:
+                os.unlink(self.address)
+            except OSError as e:
+                APP_LOGGER.warning("Failed to remove stale control socket %s: %s", self.address, e)
+
+        # 💡 ハンドシェイクは accept() 内ではなく接続ごとのスレッドで行う (_handle_connection)
+        if sys.platform == 'win32':
+            self._listener = Listener(self.address)
+        else:
+            # 🚨 修正: bind() の時点で作成者のみがアクセスできるソケットにする (作成後の chmod では間に合わない)
+            previous_umask = os.umask(0o177)
+            try:
+                self._listener = Listener(self.address)
+            finally:
+                os.umask(previous_umask)
+
+        self._thread = threading.Thread(target=self._serve, name="HzControlServer", daemon=True)
+        self._thread.start()
+        APP_LOGGER.info("Control channel listening at %s.", self.address)
+        return True
+
+    def close(self):
+        """待ち受けを終了します。"""
+        if self._listener is None or self._closing.is_set():
+            return
+
+        self._closing.set()
+        # accept() で待機中のスレッドを起こすため、自分自身に接続する
+        try:
+            send_command("ping", address=self.address, authkey=self._authkey, timeout=HANDSHAKE_TIMEOUT_SECONDS)
+        except IPCError:
+            pass
+
+        try:
+            self._listener.close()
+        except OSError:
+            pass
+
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        APP_LOGGER.info("Control channel closed.")
+
+    def _serve(self):
+        while not self._closing.is_set():
+            try:
+                conn = self._listener.accept()
+            except Exception as e:
+                if self._closing.is_set():
+                    break
+                # 個々の接続の問題で待ち受けを止めない
+                APP_LOGGER.warning("Control channel accept failed: %s", e)
+                continue
+
+            threading.Thread(
+                target=self._handle_connection, args=(conn,), name="HzControlConnection", daemon=True
+            ).start()
+
+    def _handle_connection(self, conn: Connection):
+        with conn:
+            try:
+                channel = _DeadlineConnection(conn, HANDSHAKE_TIMEOUT_SECONDS)
+                deliver_challenge(channel, self._authkey)
+                answer_challenge(channel, self._authkey)
+                request = json.loads(channel.recv_bytes().decode('utf-8'))
+                with self._dispatch_lock:
+                    response = self._dispatch(request.get("command", ""), request.get("args") or {})
+                channel.send_bytes(json.dumps(response).encode('utf-8'))
+            except TimeoutError:
+                APP_LOGGER.warning("Dropped a control channel connection that sent no request in time.")
+            except AuthenticationError as e:
+                APP_LOGGER.warning("Control channel handshake failed: %s", e)
+            except (OSError, EOFError, ValueError) as e:
+                APP_LOGGER.warning("Control channel request failed: %s", e)
+
+    def _dispatch(self, command: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        handler = self._handlers.get(command)
+        if handler is None:
+            return {"ok": False, "error": f"Unknown command: {command}"}
+
+        APP_LOGGER.debug("Control command received: %s %s", command, args)
+        try:
+            return {"ok": True, "result": handler(args)}
+        except Exception as e:
+            APP_LOGGER.error("Control command '%s' failed: %s", command, e)
+            return {"ok": False, "error": str(e)}
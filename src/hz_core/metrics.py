@@ -0,0 +1,397 @@
+# hz_core/metrics.py
+# アプリケーション内部のカウンター / ゲージ / ヒストグラムを保持する軽量メトリクスレジストリと、その出力
+#
+# 💡 計測側 (inc / set / observe) は辞書の更新 1 回のみで、常に有効にしておける。
+#    テキスト形式 (Prometheus の text exposition format) への変換は、出力を要求されたときにだけ行う。
+#    出力先はローカルの HTTP エンドポイント (127.0.0.1 のみ) または定期的に書き換えるテキストファイル
+#    (node_exporter の textfile collector などで収集する)。どちらも既定では無効。
+
+import bisect
+import logging
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+APP_LOGGER = logging.getLogger('AutoHzSwitcher')
+
+# ラベルの組 (キー順にソート済み) -> 値
+_LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> _LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _Metric:
+    """ラベル付きの数値を保持するメトリクスの基底クラス。"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[_LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[Dict[str, str], float]]:
+        """(ラベル辞書, 値) のリストを返します。"""
+        with self._lock:
+            items = list(self._values.items())
+        return [(dict(key), value) for key, value in items]
+
+
+class Counter(_Metric):
+    """単調増加するカウンター。"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """任意の値を設定できるゲージ。"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def remove(self, **labels):
+        """指定したラベルの値を削除します (例: 使われなくなったモニターの現在レート)。"""
+        key = _label_key(labels)
+        with self._lock:
+            self._values.pop(key, None)
+
+
+# 秒単位の所要時間用の既定のバケット (外部ツールの起動は数十 ms ～ 数秒かかる)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values over fixed buckets.
+
+    - observe() はバケットの二分探索と加算のみ (観測値そのものは保持しない)
+    - get() / samples() は観測回数を返す。バケットごとの累積値は snapshot() で取得する
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets: Tuple[float, ...] = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+        # ラベルの組 -> [バケットごとの件数 (最後は +Inf), 合計]
+        self._series: Dict[_LabelKey, List[Any]] = {}
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+            self._values[key] = self._values.get(key, 0.0) + 1
+
+    def snapshot(self) -> List[Tuple[Dict[str, str], List[Tuple[float, int]], float, int]]:
+        """(ラベル辞書, [(上限, 累積件数), ...], 合計, 件数) のリストを返します。最後の上限は +Inf。"""
+        with self._lock:
+            items = [(key, list(series[0]), series[1]) for key, series in self._series.items()]
+        result = []
+        for key, counts, total in items:
+            cumulative = 0
+            buckets = []
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                buckets.append((bound, cumulative))
+            result.append((dict(key), buckets, total, cumulative))
+        return result
+
+
+class StateTimer:
+    """
+    Publishes the current value of a state and accumulates the time spent in each value.
+
+    - set(value, **labels): 現在値をゲージに設定し、直前の値で過ごした秒数を seconds カウンターに加算する
+      (カウンターのラベルは labels + {value_label: 値})。値が None の場合はゲージから削除する
+    - 現在の値で過ごしている途中の時間は、出力の直前 (MetricsRegistry.collect()) に加算される
+    """
+
+    def __init__(self, gauge: Gauge, seconds: Counter, value_label: str, clock: Callable[[], float] = time.monotonic):
+        self._gauge = gauge
+        self._seconds = seconds
+        self._value_label = value_label
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._value: Any = None
+        self._labels: Dict[str, str] = {}
+        self._since = clock()
+
+    def _flush_locked(self, now: float):
+        if self._value is not None and now > self._since:
+            labels = dict(self._labels)
+            labels[self._value_label] = self._value
+            self._seconds.inc(now - self._since, **labels)
+        self._since = now
+
+    def set(self, value: Any, **labels):
+        with self._lock:
+            if value == self._value and labels == self._labels:
+                return
+            self._flush_locked(self._clock())
+            if labels != self._labels:
+                self._gauge.remove(**self._labels)
+            self._value = value
+            self._labels = labels
+            if value is None:
+                self._gauge.remove(**labels)
+            else:
+                self._gauge.set(value, **labels)
+
+    def collect(self):
+        with self._lock:
+            self._flush_locked(self._clock())
+
+
+class MetricsRegistry:
+    """
+    Process-wide registry of named metrics.
+
+    同じ名前で 2 回登録した場合は既存のメトリクスを返すため、各モジュールはインポート時に
+    自分のメトリクスを宣言しておくだけでよい。
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, help_text: str, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, help_text, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric '{name}' is already registered as {metric.kind}.")
+            return metric
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        return self._register(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str = "") -> Gauge:
+        return self._register(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help_text, buckets=buckets)
+
+    def add_collector(self, collector: Callable[[], None]):
+        """出力の直前に呼び出す関数を登録します (経過時間など、出力時点の値を反映するため)。"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[[], None]):
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def collect(self):
+        """登録済みの collector を呼び出します。"""
+        with self._lock:
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                collector()
+            except Exception as e:
+                APP_LOGGER.debug("Metrics collector %r failed: %s", collector, e)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def metrics(self) -> List[_Metric]:
+        """登録済みメトリクスを名前順に返します。"""
+        with self._lock:
+            return [self._metrics[name] for name in sorted(self._metrics)]
+
+
+# アプリケーション全体で共有するデフォルトレジストリ
+METRICS = MetricsRegistry()
+
+
+# ----------------------------------------------------------------------
+# 出力 (Prometheus text exposition format)
+# ----------------------------------------------------------------------
+
+# HTTP エンドポイントの待ち受けアドレス (他の端末からは接続できない)
+METRICS_HOST = "127.0.0.1"
+# テキストファイルを書き換える間隔 (秒)
+METRICS_TEXTFILE_INTERVAL_SECONDS = 15.0
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(str(value))}"' for key, value in sorted(labels.items())) + "}"
+
+
+def render_text(registry: MetricsRegistry = METRICS) -> str:
+    """レジストリの全メトリクスをテキスト形式で返します。"""
+    registry.collect()
+    lines: List[str] = []
+    for metric in registry.metrics():
+        if metric.help_text:
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.help_text)}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if isinstance(metric, Histogram):
+            for labels, buckets, total, count in sorted(metric.snapshot(), key=lambda item: sorted(item[0].items())):
+                for bound, cumulative in buckets:
+                    bucket_labels = dict(labels)
+                    bucket_labels["le"] = _format_value(bound)
+                    lines.append(f"{metric.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{metric.name}_count{_format_labels(labels)} {count}")
+            continue
+        for labels, value in sorted(metric.samples(), key=lambda item: sorted(item[0].items())):
+            lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path: str, registry: MetricsRegistry = METRICS):
+    """テキスト形式の出力をファイルへアトミックに書き込みます (収集側が書き込み途中の内容を読まない)。"""
+    from hz_core.settings import write_text_atomic
+    write_text_atomic(path, render_text(registry))
+
+
+class MetricsExporter:
+    """
+    Exports a registry on a localhost HTTP endpoint and/or a periodically rewritten textfile.
+
+    - port: METRICS_HOST (127.0.0.1) の GET /metrics で応答する。0 の場合は HTTP を使用しない
+    - textfile_path: interval 秒ごと、および close() 時に書き換える。None / "" の場合は書き込まない
+    - http.server はポートが指定された場合のみ start() で読み込む
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry = METRICS,
+        port: int = 0,
+        textfile_path: Optional[str] = None,
+        interval: float = METRICS_TEXTFILE_INTERVAL_SECONDS,
+    ):
+        self.registry = registry
+        self.port = port
+        self.textfile_path = textfile_path or None
+        self.interval = interval
+        self._server = None
+        self._threads: List[threading.Thread] = []
+        self._stop_event = threading.Event()
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any], registry: MetricsRegistry = METRICS) -> Optional["MetricsExporter"]:
+        """設定 ('metrics_port' / 'metrics_textfile') から生成します。どちらも無効な場合は None。"""
+        port = int(settings.get("metrics_port", 0) or 0)
+        textfile_path = settings.get("metrics_textfile") or None
+        if not port and not textfile_path:
+            return None
+        return cls(registry, port=port, textfile_path=textfile_path)
+
+    @property
+    def address(self) -> Optional[Tuple[str, int]]:
+        """HTTP エンドポイントの (ホスト, ポート)。起動していない場合は None。"""
+        return self._server.server_address[:2] if self._server is not None else None
+
+    def start(self) -> bool:
+        """出力を開始します。HTTP エンドポイントを開けなかった場合は False (テキストファイルの出力は続ける)。"""
+        ok = True
+        if self.port:
+            ok = self._start_http()
+        if self.textfile_path:
+            thread = threading.Thread(target=self._textfile_loop, name="MetricsTextfileThread", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+            APP_LOGGER.info("Writing metrics to %s every %.0f s.", self.textfile_path, self.interval)
+        return ok
+
+    def _start_http(self) -> bool:
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self.registry
+
+        class _MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = render_text(registry).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                APP_LOGGER.debug("Metrics request from %s: %s", self.address_string(), format % args)
+
+        try:
+            server = ThreadingHTTPServer((METRICS_HOST, self.port), _MetricsHandler)
+        except OSError as e:
+            APP_LOGGER.error("Failed to open the metrics endpoint on %s:%d: %s", METRICS_HOST, self.port, e)
+            return False
+        server.daemon_threads = True
+        self._server = server
+        thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.5}, name="MetricsHttpThread", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        APP_LOGGER.info("Serving metrics on http://%s:%d/metrics", *self.address)
+        return True
+
+    def _write_textfile(self):
+        try:
+            write_textfile(self.textfile_path, self.registry)
+        except OSError as e:
+            APP_LOGGER.warning("Failed to write metrics textfile '%s': %s", self.textfile_path, e)
+
+    def _textfile_loop(self):
+        self._write_textfile()
+        while not self._stop_event.wait(self.interval):
+            self._write_textfile()
+
+    def close(self):
+        """出力を停止します (テキストファイルには最後の値を書き込む)。"""
+        self._stop_event.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
+        if self.textfile_path:
+            self._write_textfile()
@@ -0,0 +1,227 @@
+# hz_core/monitor_lifecycle.py
+# 監視スレッドの起動・停止を一元管理するライフサイクル管理クラス
+
+import logging
+import threading
+import time
+from enum import Enum
+from typing import Callable, Optional
+
+from hz_core.metrics import METRICS, MetricsRegistry
+
+APP_LOGGER = logging.getLogger('AutoHzSwitcher')
+
+
+class LifecycleState(Enum):
+    """監視スレッドの状態。"""
+    STOPPED = "stopped"
+    RUNNING = "running"
+    STOPPING = "stopping"
+
+
+class MonitorLifecycle:
+    """
+    Owns the monitoring thread and guarantees bounded start/stop latency.
+
+    - start() / stop() は冪等で、どのスレッドから何度呼んでも安全。
+    - 監視間隔の待機は time.sleep() ではなく Event.wait() で行うため、stop() 要求に即座に反応する。
+    - 起動ごとに新しい停止イベントを発行するため、停止に時間がかかった古いスレッドが
+      次の起動で誤って再開されることはない。
+    - stop() の所要時間は最大で stop_timeout + shutdown_hook_timeout 秒に制限される。
+      停止フック (例: アイドルレートへの復帰) は停止遷移 1 回につき 1 度だけ、専用の期限付きで実行される。
+    - 🚨 修正: 期限内に終了しなかったスレッドは、実際に終了するまで STOPPING のまま扱う (終了時に STOPPED へ)。
+      その間の start() は古いスレッドの終了を最大 stop_timeout 秒待ち、終了しなければ起動しない
+      (tick のループが 2 つ同時に動くことはない)。
+    """
+
+    def __init__(
+        self,
+        tick: Callable[[threading.Event], None],
+        interval: float = 1.0,
+        stop_timeout: float = 2.0,
+        shutdown_hook: Optional[Callable[[threading.Event], None]] = None,
+        shutdown_hook_timeout: float = 10.0,
+        name: str = "HzMonitorThread",
+        metrics: MetricsRegistry = METRICS,
+    ):
+        self._tick = tick
+        self.interval = interval
+        self.stop_timeout = stop_timeout
+        self._shutdown_hook = shutdown_hook
+        self.shutdown_hook_timeout = shutdown_hook_timeout
+        self._name = name
+        self._tick_duration = metrics.histogram("autohz_tick_duration_seconds", "Wall-clock duration of one monitoring tick.")
+
+        self._lock = threading.Lock()
+        self._state = LifecycleState.STOPPED
+        self._thread: Optional[threading.Thread] = None
+        # 現在の起動世代のスレッドが _run() を抜けたときにセットされるイベント
+        self._thread_done: Optional[threading.Event] = None
+        # stop() が期限内に終了を確認できず、スレッドの終了時に STOPPED へ遷移させる場合は True
+        self._lingering = False
+        # 停止済みの状態を表すため、初期イベントはセット済みにしておく
+        self._stop_event = threading.Event()
+        self._stop_event.set()
+
+    # --- 状態参照 ---
+
+    @property
+    def state(self) -> LifecycleState:
+        return self._state
+
+    @property
+    def is_running(self) -> bool:
+        return self._state is LifecycleState.RUNNING
+
+    @property
+    def stop_event(self) -> threading.Event:
+        """現在の起動世代の停止イベント。監視処理内の中断可能な待機に利用します。"""
+        return self._stop_event
+
+    # --- 起動 / 停止 ---
+
+    def start(self) -> bool:
+        """
+        監視スレッドを起動します。既に起動中、または停止処理中の場合は何もしません。
+
+        Returns:
+            bool: 新しくスレッドを起動した場合は True。
+        """
+        with self._lock:
+            lingering = self._thread if self._lingering else None
+        if lingering is not None and lingering is not threading.current_thread():
+            APP_LOGGER.info("Waiting up to %.1fs for the previous monitoring thread to exit.", self.stop_timeout)
+            lingering.join(self.stop_timeout)
+
+        with self._lock:
+            if self._state is LifecycleState.RUNNING:
+                APP_LOGGER.debug("Monitor lifecycle start requested, but it is already running.")
+                return False
+            if self._state is LifecycleState.STOPPING:
+                if self._lingering:
+                    APP_LOGGER.warning("Monitor lifecycle start requested, but the previous monitoring thread is still running. Ignored.")
+                else:
+                    APP_LOGGER.warning("Monitor lifecycle start requested while stopping. Ignored.")
+                return False
+
+            stop_event = threading.Event()
+            thread_done = threading.Event()
+            thread = threading.Thread(target=self._run, args=(stop_event, thread_done), name=self._name, daemon=True)
+            self._stop_event = stop_event
+            self._thread = thread
+            self._thread_done = thread_done
+            self._state = LifecycleState.RUNNING
+            thread.start()
+
+        APP_LOGGER.info("Monitor lifecycle started (interval: %.2fs).", self.interval)
+        return True
+
+    def stop(self) -> bool:
+        """
+        監視スレッドを停止し、停止フックを 1 度だけ実行します。既に停止済み / 停止処理中の場合は何もしません。
+
+        Returns:
+            bool: スレッドと停止フックがそれぞれの期限内に完了した場合は True。
+        """
+        with self._lock:
+            if self._state is not LifecycleState.RUNNING:
+                APP_LOGGER.debug("Monitor lifecycle stop requested, but state is %s. No action required.", self._state.value)
+                return True
+            self._state = LifecycleState.STOPPING
+            thread = self._thread
+            thread_done = self._thread_done
+            stop_event = self._stop_event
+
+        APP_LOGGER.info("Signaling monitoring thread to stop.")
+        stop_event.set()
+
+        completed_in_time = True
+        if thread is not None and thread is not threading.current_thread():
+            started = time.monotonic()
+            thread.join(self.stop_timeout)
+            APP_LOGGER.debug("Monitoring thread join attempted. Duration: %.3f seconds.", time.monotonic() - started)
+
+            if thread.is_alive():
+                APP_LOGGER.warning("Monitoring thread did not terminate within %.1fs. Leaving it to exit on its own.", self.stop_timeout)
+                completed_in_time = False
+            else:
+                APP_LOGGER.info("Monitoring thread terminated cleanly.")
+
+        if not self._run_shutdown_hook():
+            completed_in_time = False
+
+        with self._lock:
+            # 🚨 修正: 古いスレッドがまだ tick を実行中の場合は STOPPED にしない (終了時に _run() が遷移させる)。
+            #    監視スレッド自身からの stop() は、tick から戻った時点でループを抜けるため待たない
+            if (thread is not None and thread is not threading.current_thread()
+                    and thread_done is not None and not thread_done.is_set()):
+                self._lingering = True
+                APP_LOGGER.warning("Monitor lifecycle remains stopping until the previous monitoring thread exits.")
+                return False
+            self._thread = None
+            self._thread_done = None
+            self._state = LifecycleState.STOPPED
+
+        APP_LOGGER.info("Monitor lifecycle stopped.")
+        return completed_in_time
+
+    # --- 内部処理 ---
+
+    def _run(self, stop_event: threading.Event, thread_done: threading.Event):
+        """監視スレッド本体。停止イベントがセットされるまで tick を一定間隔で呼び出します。"""
+        try:
+            self._loop(stop_event)
+        finally:
+            with self._lock:
+                thread_done.set()
+                if self._lingering and self._thread_done is thread_done:
+                    # stop() が期限切れで残したスレッドが、ここでようやく終了した
+                    self._lingering = False
+                    self._thread = None
+                    self._thread_done = None
+                    self._state = LifecycleState.STOPPED
+                    APP_LOGGER.info("Previous monitoring thread exited. Monitor lifecycle stopped.")
+
+    def _loop(self, stop_event: threading.Event):
+        APP_LOGGER.debug("Monitoring loop started.")
+
+        while not stop_event.is_set():
+            tick_started = time.monotonic()
+            try:
+                self._tick(stop_event)
+            except Exception as e:
+                # 1 回の tick の失敗で監視全体を止めない
+                APP_LOGGER.error("Unhandled exception in monitoring tick: %s", e, exc_info=True)
+            tick_seconds = time.monotonic() - tick_started
+            self._tick_duration.observe(tick_seconds)
+
+            # 💡 tick の所要時間を差し引いて周期を保ちつつ、停止要求には即座に反応する
+            remaining = self.interval - tick_seconds
+            if remaining > 0:
+                stop_event.wait(remaining)
+
+        APP_LOGGER.info("Process monitoring loop stopped.")
+
+    def _run_shutdown_hook(self) -> bool:
+        """停止フックを専用スレッドで実行し、shutdown_hook_timeout 秒まで完了を待ちます。"""
+        if self._shutdown_hook is None:
+            return True
+
+        # 停止フック自身にも中断手段を渡す (期限超過後に残りの再試行を打ち切れるように)
+        hook_cancel_event = threading.Event()
+
+        def guarded_hook():
+            try:
+                self._shutdown_hook(hook_cancel_event)
+            except Exception as e:
+                APP_LOGGER.error("Monitor shutdown hook failed: %s", e, exc_info=True)
+
+        worker = threading.Thread(target=guarded_hook, name=f"{self._name}-ShutdownHook", daemon=True)
+        worker.start()
+        worker.join(self.shutdown_hook_timeout)
+
+        if worker.is_alive():
+            hook_cancel_event.set()
+            APP_LOGGER.error("Monitor shutdown hook did not complete within %.1fs deadline. Abandoned.", self.shutdown_hook_timeout)
+            return False
+        return True
@@ -0,0 +1,49 @@
+# hz_core/paths.py
+# ユーザーデータ (設定ファイル・ログ・ジャーナル) と同梱リソース (言語ファイル・アイコン) の場所
+
+import os
+import sys
+
+APP_DIR_NAME = 'AutoHzSwitcher'
+SETTINGS_FILENAME = 'hz_switcher_config.json'
+
+
+def get_resource_path(relative_path: str) -> str:
+    """
+    同梱リソース (lang/, images/, bin/) の絶対パスを返します。
+    PyInstaller 環境では展開先 (sys._MEIPASS)、通常の Python 環境ではプロジェクトルート (src/ の親) を基準にする。
+    """
+    if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
+        base_path = sys._MEIPASS
+    else:
+        # このファイルは src/hz_core/ にあるため、2 つ上がプロジェクトルート
+        base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    return os.path.join(base_path, relative_path)
+
+
+def get_app_data_dir() -> str:
+    """
+    アプリケーション固有のデータフォルダを返します (存在しなければ作成します)。
+    場所: %LOCALAPPDATA%/AutoHzSwitcher (LOCALAPPDATA が無い環境ではホームディレクトリ直下)
+    """
+    app_data_dir = os.path.join(os.getenv('LOCALAPPDATA', os.path.expanduser('~')), APP_DIR_NAME)
+    os.makedirs(app_data_dir, exist_ok=True)
+    return app_data_dir
+
+
+def get_settings_file_path() -> str:
+    """
+    ユーザー設定ファイル (hz_switcher_config.json) の絶対パスを返す。
+    場所: %LOCALAPPDATA%/AutoHzSwitcher/hz_switcher_config.json
+    """
+    return os.path.join(get_app_data_dir(), SETTINGS_FILENAME)
+
+
+def get_log_dir() -> str:
+    """
+    ログ専用のフォルダを返します (存在しなければ作成します)。
+    場所: %LOCALAPPDATA%/AutoHzSwitcher/logs
+    """
+    log_dir = os.path.join(get_app_data_dir(), 'logs')
+    os.makedirs(log_dir, exist_ok=True)
+    return log_dir
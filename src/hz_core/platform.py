@@ -0,0 +1,59 @@
+# hz_core/platform.py
+# OS 依存機能 (スタートアップ登録 / 多重起動防止 / タスクトレイ) のインターフェース
+#
+# 💡 Windows 向けの実装は platform_windows.py、テストやベンチマーク用のメモリ上の実装は hz_core.fakes にある。
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional
+
+
+class StartupRegistrar(ABC):
+    """OS ログイン時の自動起動の登録・解除。"""
+
+    @abstractmethod
+    def register(self, command: str) -> bool:
+        """自動起動するコマンドを登録します。成功した場合は True。"""
+
+    @abstractmethod
+    def unregister(self) -> bool:
+        """自動起動の登録を解除します。既に登録されていない場合も True。"""
+
+    @abstractmethod
+    def is_registered(self) -> bool:
+        """自動起動が登録されているかを返します。"""
+
+
+class InstanceLock(ABC):
+    """アプリケーションの多重起動を防止するためのロック。"""
+
+    @abstractmethod
+    def acquire(self) -> bool:
+        """ロックを取得します。既に別のインスタンスが保持している場合は False。"""
+
+    @abstractmethod
+    def release(self):
+        """ロックを解放します (取得していない場合は何もしない)。"""
+
+
+class TrayIcon(ABC):
+    """
+    タスクトレイのアイコン。
+
+    - title はツールチップ、menu はメニュー (実装依存のオブジェクト) で、任意のスレッドから更新できる。
+    - run() はアイコンが停止するまでブロックする。
+    """
+
+    title: str
+    menu: Any
+
+    @abstractmethod
+    def run(self):
+        """アイコンを表示し、stop() が呼ばれるまでイベントを処理します。"""
+
+    @abstractmethod
+    def stop(self):
+        """アイコンを停止します。"""
+
+
+# トレイアイコンの生成関数: (name, image, title, menu, action) -> TrayIcon
+TrayFactory = Callable[[str, Any, str, Any, Optional[Callable[..., None]]], TrayIcon]
@@ -0,0 +1,550 @@
+# hz_core/process_source.py
+# 実行中プロセスの取得元 (psutil / Linux の /proc / 記録したトレース / 合成) の共通インターフェース
+#
+# 💡 監視ループのスキャナー (hz_core.scanner.SourceProcessScanner) と、GUI のプロセス選択画面
+#    (switcher_utility.get_running_processes_detailed) の両方がこのインターフェース越しにプロセスを取得する。
+#    psutil は PsutilProcessSource を生成したときに初めて読み込む。
+
+import os
+import random
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from hz_core.metrics import METRICS, MetricsRegistry
+
+
+class ProcessInfo(NamedTuple):
+    """1 つのプロセスの情報。取得できなかった項目は None (cpu_percent は 0.0)。"""
+    pid: int
+    name: Optional[str]
+    exe: Optional[str]
+    create_time: Optional[float] = None
+    # 以下は detailed=True の場合のみ取得される
+    cpu_percent: float = 0.0
+    memory_rss: Optional[int] = None
+
+
+class ProcessSource(ABC):
+    """
+    実行中プロセスの取得元。
+
+    - iter_processes() は、取得中に終了したプロセスや権限不足のプロセスを読み飛ばし、例外を送出しない
+      (取得元そのものが利用できない場合のみ例外を送出する)。
+    - detailed=True の場合、CPU 使用率とメモリ使用量も取得する (GUI のプロセス選択画面用。監視ループでは使用しない)。
+    """
+
+    @abstractmethod
+    def iter_processes(self, detailed: bool = False) -> Iterator[ProcessInfo]:
+        """実行中プロセスを順に返します。"""
+
+    def get_process(self, pid: int) -> Optional[ProcessInfo]:
+        """指定した PID のプロセスを返します。存在しない場合は None。"""
+        for info in self.iter_processes():
+            if info.pid == pid:
+                return info
+        return None
+
+    def find_by_name(self, process_name: str) -> Optional[ProcessInfo]:
+        """指定した名前のプロセスを 1 つ返します。存在しない場合は None。"""
+        for info in self.iter_processes():
+            if info.name == process_name:
+                return info
+        return None
+
+    def is_process_alive(self, pid: int, create_time: float) -> bool:
+        """指定した PID のプロセスが、同じ起動時刻で現在も実行中かを返します (PID の再利用を区別する)。"""
+        info = self.get_process(pid)
+        return info is not None and info.create_time is not None and abs(info.create_time - create_time) < 0.01
+
+
+# ----------------------------------------------------------------------
+# 取得できない属性のキャッシュ
+# ----------------------------------------------------------------------
+
+# プロセスそのものを読み飛ばす (ゾンビプロセス) ことを表す属性名
+PROCESS_ATTRIBUTE = "process"
+
+_NO_DENIED: FrozenSet[str] = frozenset()
+
+
+class NegativeCache:
+    """
+    Remembers which attributes of a process could not be read (AccessDenied / zombie).
+
+    - キーは (pid, create_time)。PID が再利用されると起動時刻が変わるため、新しいプロセスは改めて読みに行く
+    - システムプロセスの exe など、毎 tick 例外を送出して失敗する取得を省略するために使う
+    - hits = キャッシュにより取得を省略した回数、misses = キャッシュに無く実際に取得した回数。
+      メトリクスへの反映はスキャンごとに 1 回 (prune() の呼び出し時) にまとめて行う
+    - 監視スレッドと GUI のプロセス選択画面から同時に使われるため、更新は排他する
+    """
+
+    def __init__(self, metrics: MetricsRegistry = METRICS):
+        self._entries: Dict[Tuple[int, float], FrozenSet[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._reported_hits = 0
+        self._reported_misses = 0
+        self._hit_counter = metrics.counter("autohz_process_negative_cache_hits_total", "Process attribute reads skipped by the negative cache.")
+        self._miss_counter = metrics.counter("autohz_process_negative_cache_misses_total", "Process attribute reads not covered by the negative cache.")
+        self._size_gauge = metrics.gauge("autohz_process_negative_cache_entries", "Processes with known inaccessible attributes.")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, pid: int, create_time: Optional[float]) -> FrozenSet[str]:
+        """取得できないと記録済みの属性の集合を返します。記録があれば hits、無ければ misses に計上します。"""
+        denied = self._entries.get((pid, create_time), _NO_DENIED) if create_time is not None else _NO_DENIED
+        if denied:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return denied
+
+    def add(self, pid: int, create_time: Optional[float], attribute: str):
+        """attribute が取得できないことを記録します。起動時刻が不明な場合は PID の再利用を区別できないため記録しない。"""
+        if create_time is None:
+            return
+        key = (pid, create_time)
+        with self._lock:
+            self._entries[key] = self._entries.get(key, _NO_DENIED) | {attribute}
+
+    def prune(self, alive_pids: Iterable[int]):
+        """終了したプロセスのエントリを破棄し、カウンターをメトリクスへ反映します。"""
+        alive = alive_pids if isinstance(alive_pids, (set, frozenset)) else set(alive_pids)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] not in alive]:
+                del self._entries[key]
+            hits, misses = self.hits, self.misses
+            self._hit_counter.inc(hits - self._reported_hits)
+            self._miss_counter.inc(misses - self._reported_misses)
+            self._reported_hits, self._reported_misses = hits, misses
+            self._size_gauge.set(len(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# ----------------------------------------------------------------------
+# psutil
+# ----------------------------------------------------------------------
+
+class PsutilProcessSource(ProcessSource):
+    """
+    psutil.process_iter によるプロセス取得 (Windows / Linux 共通の既定の実装)。
+
+    💡 exe は process_iter の属性に含めず、NegativeCache を確認してから個別に取得する。
+       システムプロセスの exe は毎回 AccessDenied となり、psutil 内部で例外の送出と捕捉が繰り返されるため。
+    """
+
+    SIMPLE_FIELDS = ['pid', 'name', 'create_time']
+    DETAILED_FIELDS = ['pid', 'name', 'create_time', 'cpu_percent', 'memory_info']
+
+    def __init__(self, negative_cache: Optional[NegativeCache] = None):
+        import psutil
+        self._psutil = psutil
+        self.negative_cache = negative_cache or NegativeCache()
+
+    def _read_exe(self, proc, pid: int, create_time: Optional[float]) -> Tuple[Optional[str], bool]:
+        """(exe, プロセスを読み飛ばすか)。取得できなかった属性は NegativeCache に記録する。"""
+        psutil = self._psutil
+        cache = self.negative_cache
+        denied = cache.lookup(pid, create_time)
+        if denied:
+            return None, PROCESS_ATTRIBUTE in denied
+        try:
+            return proc.exe() or None, False
+        except psutil.ZombieProcess:
+            cache.add(pid, create_time, PROCESS_ATTRIBUTE)
+            return None, True
+        except psutil.AccessDenied:
+            cache.add(pid, create_time, "exe")
+            return None, False
+        except psutil.NoSuchProcess:
+            return None, True
+
+    def iter_processes(self, detailed: bool = False) -> Iterator[ProcessInfo]:
+        psutil = self._psutil
+        if detailed:
+            # CPU 使用率の計測の基準点を設定する
+            try:
+                psutil.cpu_percent(interval=None)
+            except Exception:
+                pass
+
+        seen_pids = set()
+        for proc in psutil.process_iter(self.DETAILED_FIELDS if detailed else self.SIMPLE_FIELDS):
+            try:
+                info = proc.info
+                pid = info.get('pid')
+                create_time = info.get('create_time')
+                seen_pids.add(pid)
+                exe, skip = self._read_exe(proc, pid, create_time)
+                if skip:
+                    continue
+                memory_rss = None
+                if detailed:
+                    # namedtuple または dict の場合に .rss / ['rss'] が存在するか安全にチェック
+                    mem_info = info.get('memory_info')
+                    if mem_info:
+                        memory_rss = getattr(mem_info, 'rss', None)
+                        if memory_rss is None and isinstance(mem_info, dict):
+                            memory_rss = mem_info.get('rss')
+                yield ProcessInfo(pid, info.get('name'), exe, create_time, info.get('cpu_percent') or 0.0, memory_rss)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+        self.negative_cache.prune(seen_pids)
+
+    def get_process(self, pid: int) -> Optional[ProcessInfo]:
+        psutil = self._psutil
+        try:
+            proc = psutil.Process(pid)
+            if proc.status() == psutil.STATUS_ZOMBIE:
+                return None
+            return ProcessInfo(pid, proc.name(), None, proc.create_time())
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return None
+
+
+# ----------------------------------------------------------------------
+# Linux /proc
+# ----------------------------------------------------------------------
+
+class ProcFsProcessSource(ProcessSource):
+    """
+    Linux の /proc を直接読むプロセス取得 (psutil を必要としない)。
+
+    - name は /proc/<pid>/stat の comm。カーネルが 15 文字に切り詰めるため、その場合は実行ファイル名を使用する
+    - exe は /proc/<pid>/exe のリンク先。権限が無い場合は None
+    - create_time は起動時刻 (エポック秒)。ゾンビプロセスは返さない
+
+    💡 監視ループでは毎 tick 全プロセスを読むため、1 プロセスあたりのシステムコールを最小限にしている:
+       - PID の列挙は os.scandir (stat を伴わない)
+       - stat は os.open + 1 回の os.readv で、使い回すバッファに読み込む (ファイルオブジェクトを生成しない)
+       - exe の readlink 結果は (pid, starttime) ごとにキャッシュする (PID が再利用されても誤らない)
+       - 読めなかった exe (権限不足・カーネルスレッド) は NegativeCache に記録し、PID が再利用されるまで読みに行かない
+    💡 監視スレッドと GUI のプロセス選択画面が同じインスタンスを共有するため、exe キャッシュと CPU 計測値の
+       参照・更新・破棄は _cache_lock で排他する (readlink などのシステムコールはロックの外で行う)
+    """
+
+    # カーネルが comm を切り詰める長さ (TASK_COMM_LEN - 1)
+    COMM_MAX_LENGTH = 15
+    # /proc/<pid>/stat の読み込みバッファ (通常 300 バイト程度。comm は最大 64 バイト)
+    STAT_BUFFER_SIZE = 4096
+
+    def __init__(self, proc_root: str = "/proc", negative_cache: Optional[NegativeCache] = None):
+        if not os.path.isdir(proc_root):
+            raise OSError(f"{proc_root} is not available on this platform ({sys.platform}).")
+        self.proc_root = proc_root
+        self._clock_ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._boot_time = self._read_boot_time()
+        self._buffer = bytearray(self.STAT_BUFFER_SIZE)
+        self._buffer_lock = threading.Lock()
+        # exe キャッシュと CPU 計測値を保護するロック
+        self._cache_lock = threading.Lock()
+        # exe の readlink 結果: (pid, starttime) -> exe
+        self._exe_cache: Dict[Tuple[int, int], str] = {}
+        self.negative_cache = negative_cache or NegativeCache()
+        self.exe_cache_hits = 0
+        self.exe_cache_misses = 0
+        # CPU 使用率の計算用: pid -> (起動時刻, CPU 時間の累計 (tick), 計測時刻)
+        self._cpu_samples: Dict[int, Tuple[float, int, float]] = {}
+
+    def _read_boot_time(self) -> float:
+        try:
+            with open(os.path.join(self.proc_root, "stat"), 'rb') as f:
+                for line in f:
+                    if line.startswith(b"btime "):
+                        return float(line.split()[1])
+        except OSError:
+            pass
+        return 0.0
+
+    def _read_stat(self, pid: int) -> Optional[Tuple[str, str, int, int, int]]:
+        """(comm, state, CPU 時間の累計 (tick), starttime (tick), rss (ページ数))。読めない場合は None。"""
+        try:
+            fd = os.open(f"{self.proc_root}/{pid}/stat", os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            # 💡 バッファは全プロセスで共有するため、読み込みから解析までを排他する
+            with self._buffer_lock:
+                size = os.readv(fd, [self._buffer])
+                data = bytes(self._buffer[:size])
+        except OSError:
+            return None
+        finally:
+            os.close(fd)
+        # comm は括弧で囲まれ、空白や括弧を含むことがあるため、最後の ')' で区切る
+        start = data.find(b"(")
+        end = data.rfind(b")")
+        if start < 0 or end < 0:
+            return None
+        comm = data[start + 1:end].decode('utf-8', 'replace')
+        fields = data[end + 2:].split()
+        # fields[0] = state (3 番目のフィールド)、utime = 14、stime = 15、starttime = 22、rss = 24
+        try:
+            return comm, fields[0].decode(), int(fields[11]) + int(fields[12]), int(fields[19]), int(fields[21])
+        except (IndexError, ValueError):
+            return None
+
+    def _read_exe(self, pid: int, start_ticks: int, create_time: float) -> Optional[str]:
+        key = (pid, start_ticks)
+        with self._cache_lock:
+            exe = self._exe_cache.get(key)
+            if exe is not None:
+                self.exe_cache_hits += 1
+                return exe
+            self.exe_cache_misses += 1
+        if self.negative_cache.lookup(pid, create_time):
+            return None
+        try:
+            exe = os.readlink(f"{self.proc_root}/{pid}/exe")
+        except OSError:
+            # 権限不足、またはカーネルスレッド (exe を持たない)。どちらも PID が再利用されるまで変わらない
+            # (読み込みの途中で終了したプロセスのエントリは、次のスキャンで破棄される)
+            self.negative_cache.add(pid, create_time, "exe")
+            return None
+        # 実行中に置き換えられた実行ファイルには " (deleted)" が付く
+        if exe.endswith(" (deleted)"):
+            exe = exe[:-10]
+        with self._cache_lock:
+            self._exe_cache[key] = exe
+        return exe
+
+    def _build(self, pid: int, detailed: bool) -> Optional[ProcessInfo]:
+        stat = self._read_stat(pid)
+        if stat is None:
+            return None
+        comm, state, cpu_ticks, start_ticks, rss_pages = stat
+        if state == "Z":
+            return None
+
+        create_time = self._boot_time + start_ticks / self._clock_ticks
+        exe = self._read_exe(pid, start_ticks, create_time)
+        name = comm
+        if exe and len(comm) >= self.COMM_MAX_LENGTH:
+            base = os.path.basename(exe)
+            if base.startswith(comm):
+                name = base
+
+        if not detailed:
+            return ProcessInfo(pid, name, exe, create_time)
+
+        now = time.monotonic()
+        cpu_percent = 0.0
+        with self._cache_lock:
+            previous = self._cpu_samples.get(pid)
+            self._cpu_samples[pid] = (create_time, cpu_ticks, now)
+        if previous is not None and previous[0] == create_time and now > previous[2]:
+            cpu_percent = (cpu_ticks - previous[1]) / self._clock_ticks / (now - previous[2]) * 100.0
+        return ProcessInfo(pid, name, exe, create_time, cpu_percent, rss_pages * self._page_size)
+
+    def _pids(self) -> List[int]:
+        with os.scandir(self.proc_root) as entries:
+            return [int(entry.name) for entry in entries if entry.name.isdigit()]
+
+    def iter_processes(self, detailed: bool = False) -> Iterator[ProcessInfo]:
+        pids = self._pids()
+        alive = set(pids)
+        # 終了したプロセスのキャッシュと CPU 計測値を破棄する
+        with self._cache_lock:
+            if len(self._exe_cache) > len(alive):
+                for key in [key for key in self._exe_cache if key[0] not in alive]:
+                    del self._exe_cache[key]
+                # PID が再利用された古いエントリが溜まった場合は、作り直す
+                if len(self._exe_cache) > 2 * len(alive):
+                    self._exe_cache.clear()
+            if detailed:
+                for pid in [pid for pid in self._cpu_samples if pid not in alive]:
+                    del self._cpu_samples[pid]
+        for pid in pids:
+            info = self._build(pid, detailed)
+            if info is not None:
+                yield info
+        self.negative_cache.prune(alive)
+
+    def get_process(self, pid: int) -> Optional[ProcessInfo]:
+        return self._build(pid, detailed=False)
+
+
+# ----------------------------------------------------------------------
+# 記録したトレース (hz_core.trace)
+# ----------------------------------------------------------------------
+
+class TraceProcessSource(ProcessSource):
+    """
+    記録したトレースのプロセス集合を、iter_processes() の呼び出しごとに 1 tick ずつ再現します。
+    トレースの終端に達した後は、最後のプロセス集合を返し続けます (exhausted が True になる)。
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]]):
+        self._records = iter(records)
+        self._names: Set[str] = set()
+        self._pending_repeats = 0
+        self._pids: Dict[str, int] = {}
+        self.exhausted = False
+        self.ticks = 0
+
+    def _advance(self):
+        if self._pending_repeats > 0:
+            self._pending_repeats -= 1
+            return
+        for record in self._records:
+            kind = record.get("k")
+            if kind == "tick":
+                self._names.difference_update(record.get("-", ()))
+                self._names.update(record.get("+", ()))
+                return
+            if kind == "idle":
+                self._pending_repeats = record.get("n", 1) - 1
+                return
+        self.exhausted = True
+
+    def iter_processes(self, detailed: bool = False) -> Iterator[ProcessInfo]:
+        self._advance()
+        self.ticks += 1
+        for name in sorted(self._names):
+            # PID はトレースに記録されないため、名前ごとに固定の番号を割り当てる
+            pid = self._pids.setdefault(name, 10000 + len(self._pids))
+            yield ProcessInfo(pid, name, f"C:\\Trace\\{name}", 0.0)
+
+    def get_process(self, pid: int) -> Optional[ProcessInfo]:
+        # 💡 iter_processes() は tick を進めるため、現在のプロセス集合から探す
+        for name, known_pid in self._pids.items():
+            if known_pid == pid and name in self._names:
+                return ProcessInfo(pid, name, f"C:\\Trace\\{name}", 0.0)
+        return None
+
+    def find_by_name(self, process_name: str) -> Optional[ProcessInfo]:
+        if process_name not in self._names:
+            return None
+        return self.get_process(self._pids.setdefault(process_name, 10000 + len(self._pids)))
+
+
+# ----------------------------------------------------------------------
+# 合成 (大量のプロセス・高頻度の起動/終了)
+# ----------------------------------------------------------------------
+
+class SyntheticProcessSource(ProcessSource):
+    """
+    Models a large, high-churn process table without needing such a machine.
+
+    - process_count 個のプロセスから開始し、iter_processes() の呼び出しごとに churn の割合のプロセスが
+      終了し、同数が新しく起動する (PID と起動時刻は新しく割り当てられる)
+    - 起動するプロセス名は name_pool から重み付きで選ばれる (プリセット: browser_heavy / build_server)
+    - start() / kill() で、ゲームなど特定のプロセスの起動/終了を模擬できる (churn の対象にはならない)
+    - start() / kill() は監視スレッド以外から呼び出してよい
+    """
+
+    DESKTOP_POOL: Sequence[Tuple[str, float]] = (
+        ("svchost.exe", 30.0), ("RuntimeBroker.exe", 5.0), ("conhost.exe", 5.0),
+        ("explorer.exe", 1.0), ("dllhost.exe", 3.0), ("backgroundTaskHost.exe", 2.0),
+    )
+    BROWSER_POOL: Sequence[Tuple[str, float]] = (("chrome.exe", 60.0), ("msedgewebview2.exe", 20.0)) + tuple(DESKTOP_POOL)
+    BUILD_POOL: Sequence[Tuple[str, float]] = (
+        ("cl.exe", 40.0), ("link.exe", 5.0), ("MSBuild.exe", 8.0), ("conhost.exe", 20.0),
+        ("python.exe", 5.0), ("git.exe", 5.0),
+    ) + tuple(DESKTOP_POOL)
+
+    def __init__(
+        self,
+        process_count: int = 2000,
+        churn: float = 0.05,
+        name_pool: Optional[Sequence[Tuple[str, float]]] = None,
+        unique_name_ratio: float = 0.2,
+        seed: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if not 0.0 <= churn <= 1.0:
+            raise ValueError(f"churn must be between 0 and 1: {churn}")
+        self.churn = churn
+        self._pool = list(name_pool or self.DESKTOP_POOL)
+        self._pool_names = [name for name, _ in self._pool]
+        self._pool_weights = [weight for _, weight in self._pool]
+        self._unique_name_ratio = unique_name_ratio
+        self._random = random.Random(seed)
+        self._clock = clock
+        self._next_pid = 4
+        self._lock = threading.Lock()
+        self._processes: Dict[int, ProcessInfo] = {}
+        # start() で起動したプロセス (churn の対象外)
+        self._pinned: Set[int] = set()
+        self.spawned = 0
+        self.exited = 0
+        for _ in range(process_count):
+            self._spawn()
+
+    @classmethod
+    def browser_heavy(cls, process_count: int = 1500, churn: float = 0.08, **kwargs) -> "SyntheticProcessSource":
+        """数百のレンダラープロセスを持つブラウザを含むデスクトップ。"""
+        return cls(process_count, churn, name_pool=cls.BROWSER_POOL, **kwargs)
+
+    @classmethod
+    def build_server(cls, process_count: int = 4000, churn: float = 0.25, **kwargs) -> "SyntheticProcessSource":
+        """コンパイラープロセスが短時間で大量に起動/終了するビルドサーバー。"""
+        return cls(process_count, churn, name_pool=cls.BUILD_POOL, **kwargs)
+
+    def _spawn(self, name: Optional[str] = None) -> int:
+        pid = self._next_pid
+        self._next_pid += 4
+        if name is None:
+            if self._random.random() < self._unique_name_ratio:
+                name = f"tool_{pid}.exe"
+            else:
+                name = self._random.choices(self._pool_names, self._pool_weights)[0]
+        self._processes[pid] = ProcessInfo(pid, name, f"C:\\Synthetic\\{name}", self._clock(), 0.0, 10 * 1024 * 1024)
+        self.spawned += 1
+        return pid
+
+    def _churn(self):
+        count = int(round(len(self._processes) * self.churn))
+        if count <= 0:
+            return
+        candidates = [pid for pid in self._processes if pid not in self._pinned]
+        for pid in self._random.sample(candidates, min(count, len(candidates))):
+            del self._processes[pid]
+            self.exited += 1
+        for _ in range(count):
+            self._spawn()
+
+    def start(self, process_name: str) -> int:
+        """指定した名前のプロセスを起動したことにし、その PID を返します。"""
+        with self._lock:
+            pid = self._spawn(process_name)
+            self._pinned.add(pid)
+            return pid
+
+    def kill(self, process_name: str) -> int:
+        """start() で起動した、指定した名前のプロセスをすべて終了したことにします。"""
+        with self._lock:
+            pids = [pid for pid in self._pinned if self._processes[pid].name == process_name]
+            for pid in pids:
+                del self._processes[pid]
+                self._pinned.discard(pid)
+            return len(pids)
+
+    def iter_processes(self, detailed: bool = False) -> Iterator[ProcessInfo]:
+        with self._lock:
+            self._churn()
+            return iter(list(self._processes.values()))
+
+    def get_process(self, pid: int) -> Optional[ProcessInfo]:
+        with self._lock:
+            return self._processes.get(pid)
+
+    def find_by_name(self, process_name: str) -> Optional[ProcessInfo]:
+        # 💡 iter_processes() はプロセスの入れ替えを伴うため、現在のプロセス表から探す
+        with self._lock:
+            for info in self._processes.values():
+                if info.name == process_name:
+                    return info
+        return None
@@ -0,0 +1,177 @@
+# hz_core/rate_journal.py
+# 適用したレート変更を記録する追記専用ジャーナル (再起動時のクラッシュ復帰判定を高速化するため)
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from hz_core.paths import get_app_data_dir
+
+APP_LOGGER = logging.getLogger('AutoHzSwitcher')
+
+# ジャーナルのファイル名 (%LOCALAPPDATA%/AutoHzSwitcher/ 以下に置く)
+RATE_JOURNAL_FILENAME = "rate_journal.jsonl"
+
+# このサイズを超えたら、最終レコードのみを残してファイルを作り直す (コンパクション)
+DEFAULT_MAX_JOURNAL_BYTES = 64 * 1024
+
+# 最終レコードの読み出し時に、末尾から読み込むバイト数 (1レコードは数百バイト程度)
+_TAIL_READ_BYTES = 4096
+
+
+class JournalRecord(NamedTuple):
+    """ジャーナル 1 行分のレコード。"""
+    seq: int
+    rate: int
+    reason: str
+    game_pid: Optional[int]
+    game_create_time: Optional[float]
+    game_name: Optional[str]
+    written_at: float
+
+    def to_line(self) -> bytes:
+        return (json.dumps(self._asdict(), ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8')
+
+    @classmethod
+    def from_line(cls, line: bytes) -> Optional['JournalRecord']:
+        """1 行を解析します。途中で書き込みが途切れた行など、解析できない行は None を返します。"""
+        try:
+            data = json.loads(line.decode('utf-8'))
+            return cls(
+                seq=int(data["seq"]),
+                rate=int(data["rate"]),
+                reason=str(data.get("reason", "")),
+                game_pid=data.get("game_pid"),
+                game_create_time=data.get("game_create_time"),
+                game_name=data.get("game_name"),
+                written_at=float(data.get("written_at", 0.0)),
+            )
+        except (ValueError, KeyError, TypeError, UnicodeDecodeError):
+            return None
+
+
+def get_rate_journal_path() -> str:
+    """
+    レート状態ジャーナルのフルパスを返します。
+    場所: %LOCALAPPDATA%/AutoHzSwitcher/rate_journal.jsonl (設定ファイルと同じフォルダ)
+    """
+    return os.path.join(get_app_data_dir(), RATE_JOURNAL_FILENAME)
+
+
+class RateJournal:
+    """
+    Append-only, fsync'd journal of applied refresh-rate changes.
+
+    - append() は 1 レコード = 1 行の JSON を追記し、flush + fsync してから戻る。
+      書き込み途中で電源断が起きても、壊れるのは末尾の 1 行だけで、last_record() はそれを読み飛ばす。
+    - ファイルが max_bytes を超えたら、最終レコードのみを一時ファイルに書き出し os.replace() で置き換える。
+      置き換えはアトミックなので、どの時点で中断しても「旧ファイル」か「新ファイル」のどちらかが残る。
+    - 起動時の読み出しは末尾の数 KB のみを読むため、ファイルサイズに依存しない。
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_JOURNAL_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._last: Optional[JournalRecord] = None
+        self._loaded = False
+        # 末尾の行が途中で途切れている場合、次の追記の前に改行を補う
+        self._torn_tail = False
+
+    def last_record(self) -> Optional[JournalRecord]:
+        """最後に記録されたレコードを返します。ジャーナルが存在しない・読めない場合は None。"""
+        with self._lock:
+            return self._load_last_locked()
+
+    def append(
+        self,
+        rate: int,
+        reason: str,
+        game_pid: Optional[int] = None,
+        game_create_time: Optional[float] = None,
+        game_name: Optional[str] = None,
+    ) -> Optional[JournalRecord]:
+        """
+        レート変更を 1 件追記します。ディスクへの書き込みに失敗してもアプリの動作は継続させるため、
+        例外は送出せずログに記録し None を返します。
+        """
+        with self._lock:
+            previous = self._load_last_locked()
+            record = JournalRecord(
+                seq=(previous.seq + 1) if previous else 1,
+                rate=int(rate),
+                reason=reason,
+                game_pid=game_pid,
+                game_create_time=game_create_time,
+                game_name=game_name,
+                written_at=time.time(),
+            )
+
+            try:
+                with open(self.path, 'ab') as f:
+                    if self._torn_tail:
+                        f.write(b"\n")
+                    f.write(record.to_line())
+                    f.flush()
+                    os.fsync(f.fileno())
+                    size = f.tell()
+            except OSError as e:
+                APP_LOGGER.error("Failed to append to rate journal (%s): %s", self.path, e)
+                return None
+
+            self._last = record
+            self._torn_tail = False
+            APP_LOGGER.debug("Rate journal: recorded %d Hz (reason=%s, pid=%s).", record.rate, reason, game_pid)
+
+            if size > self.max_bytes:
+                self._compact_locked(record)
+
+            return record
+
+    def _load_last_locked(self) -> Optional[JournalRecord]:
+        if self._loaded:
+            return self._last
+
+        self._loaded = True
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                f.seek(max(0, size - _TAIL_READ_BYTES))
+                tail = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            APP_LOGGER.warning("Failed to read rate journal (%s): %s", self.path, e)
+            return None
+
+        self._torn_tail = bool(tail) and not tail.endswith(b"\n")
+
+        # 末尾から順に、最初に解析できた行を最終レコードとする (途切れた行は読み飛ばす)
+        for line in reversed(tail.splitlines()):
+            record = JournalRecord.from_line(line) if line.strip() else None
+            if record is not None:
+                self._last = record
+                break
+
+        if size > self.max_bytes and self._last is not None:
+            self._compact_locked(self._last)
+
+        return self._last
+
+    def _compact_locked(self, last: JournalRecord):
+        """最終レコードのみを含むファイルにアトミックに置き換えます。"""
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(last.to_line())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self._torn_tail = False
+            APP_LOGGER.debug("Rate journal compacted to its last record (seq=%d).", last.seq)
+        except OSError as e:
+            APP_LOGGER.warning("Failed to compact rate journal (%s): %s", self.path, e)
@@ -0,0 +1,117 @@
+# hz_core/reconciler.py
+# 外部要因 (ユーザー操作、ドライバー更新、他ツール) によるリフレッシュレートの変化 (ドリフト) を検出する
+
+import logging
+import time
+from enum import Enum
+from typing import Callable, NamedTuple, Optional
+
+from hz_core.metrics import METRICS, MetricsRegistry
+
+APP_LOGGER = logging.getLogger('AutoHzSwitcher')
+
+
+class DriftPolicy(Enum):
+    """ドリフト検出時の対応方針。"""
+    CORRECT = "correct"  # 期待レートへ戻す
+    ADOPT = "adopt"      # 観測したレートを新しい期待値として受け入れる
+
+    @classmethod
+    def from_setting(cls, value) -> 'DriftPolicy':
+        try:
+            return cls(value)
+        except ValueError:
+            APP_LOGGER.warning("Unknown drift policy '%s'. Falling back to '%s'.", value, cls.CORRECT.value)
+            return cls.CORRECT
+
+
+class DriftEvent(NamedTuple):
+    """検出されたドリフト 1 件。"""
+    expected_rate: int
+    observed_rate: int
+    policy: DriftPolicy
+
+
+class DriftReconciler:
+    """
+    Re-reads the active rate on an adaptive schedule and reports drift from the expected rate.
+
+    - 自身のレート変更直後 (notify_switch) は fast_interval で確認し、一致が続くたびに間隔を
+      backoff_factor 倍にして slow_interval まで伸ばす。ドリフト検出時は fast_interval に戻す。
+    - 実レートの読み出しは read_rate に委譲する (全モニターのスナップショットキャッシュを再利用する想定)。
+    - 期待値との差が tolerance 以内 (59.94 Hz が 59 / 60 として報告される場合など) はドリフトとみなさない。
+    - 実際の補正 / 採用は呼び出し側が DriftEvent を受けて行う (このクラスはディスプレイを変更しない)。
+    """
+
+    def __init__(
+        self,
+        read_rate: Callable[[], Optional[int]],
+        policy: DriftPolicy = DriftPolicy.CORRECT,
+        fast_interval: float = 2.0,
+        slow_interval: float = 60.0,
+        backoff_factor: float = 2.0,
+        tolerance: int = 1,
+        metrics: MetricsRegistry = METRICS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._read_rate = read_rate
+        self.policy = policy
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self.backoff_factor = backoff_factor
+        self.tolerance = tolerance
+        self._clock = clock
+
+        self._interval = fast_interval
+        self._next_check = clock() + fast_interval
+
+        self._checks = metrics.counter("autohz_drift_checks_total", "Active-rate reconciliation reads.")
+        self._events = metrics.counter("autohz_drift_events_total", "Detected refresh-rate drift events by policy action.")
+        self._interval_gauge = metrics.gauge("autohz_drift_check_interval_seconds", "Current drift reconciliation interval.")
+        self._interval_gauge.set(self._interval)
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    def notify_switch(self):
+        """自身がレートを変更した直後に呼び出し、確認間隔を最短に戻します。"""
+        self._reset_to_fast()
+
+    def due(self) -> bool:
+        return self._clock() >= self._next_check
+
+    def check(self, expected_rate: int) -> Optional[DriftEvent]:
+        """
+        実レートを読み出し、期待値と比較します。
+
+        Returns:
+            Optional[DriftEvent]: ドリフトを検出した場合はイベント。一致・読み出し失敗時は None。
+        """
+        observed = self._read_rate()
+        self._checks.inc()
+
+        if observed is None:
+            # 読み出し失敗はドリフトとみなさず、現在の間隔のまま次回に再試行する
+            self._next_check = self._clock() + self._interval
+            return None
+
+        if abs(observed - expected_rate) <= self.tolerance:
+            self._interval = min(self._interval * self.backoff_factor, self.slow_interval)
+            self._interval_gauge.set(self._interval)
+            self._next_check = self._clock() + self._interval
+            return None
+
+        event = DriftEvent(expected_rate, observed, self.policy)
+        self._events.inc(action=self.policy.value)
+        APP_LOGGER.warning(
+            "Refresh rate drift detected: expected %d Hz, observed %d Hz (policy: %s).",
+            expected_rate, observed, self.policy.value
+        )
+        self._reset_to_fast()
+        return event
+
+    def _reset_to_fast(self):
+        self._interval = self.fast_interval
+        self._interval_gauge.set(self._interval)
+        self._next_check = self._clock() + self._interval
@@ -0,0 +1,121 @@
+# hz_core/rules.py
+# 登録ゲーム設定から作成する、プロセス名 → 必要レートの検索インデックス
+
+import logging
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+APP_LOGGER = logging.getLogger('AutoHzSwitcher')
+
+# RuleIndex.evaluate() で Global High Rate 適用時に返すゲーム名
+GLOBAL_HIGH_RATE_NAME = "Global High Rate"
+
+
+class RuleMatch(NamedTuple):
+    """実行中プロセス集合に対する評価結果。"""
+    is_any_game_running: bool
+    required_rate: int
+    game_name: Optional[str]
+    uses_global_high_rate: bool
+    # 採用されたルールのプロセス名 (レート状態ジャーナルにゲームの PID を記録するために使用)
+    process_name: Optional[str] = None
+    # 実行中の登録ゲームのプロセス名の集合 (採用したレートの上書きを、ゲームの構成が変わるまで維持するために使用)
+    matched_processes: FrozenSet[str] = frozenset()
+
+
+class RuleIndex:
+    """
+    Immutable lookup index built from settings["games"].
+
+    監視ループ、即時再評価 (GUI 操作時)、起動時のクラッシュ復帰判定のすべてが、このインデックスを通して
+    「どのゲームが実行中で、どのレートが必要か」を判定する。判定規則は以前の監視ループと同一:
+
+    - 有効 (is_enabled) なゲームのうち、process_name が実行中プロセス名と完全一致するものを対象とする
+    - use_global_high_rate が有効なら、最初に一致した時点で global_high_rate を採用する
+    - そうでなければ、default_low_rate より高い high_rate の最大値を採用する (同値の場合は先に登録されたゲーム)
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[Tuple[str, str, int]],
+        default_low_rate: int = 60,
+        use_global_high_rate: bool = False,
+        global_high_rate: int = 144,
+    ):
+        # process_name -> [(登録順, ゲーム名, high_rate, process_name), ...]
+        self._by_process: Dict[str, List[Tuple[int, str, int, str]]] = {}
+        for order, (process_name, game_name, high_rate) in enumerate(entries):
+            self._by_process.setdefault(process_name, []).append((order, game_name, high_rate, process_name))
+
+        self.default_low_rate = default_low_rate
+        self.use_global_high_rate = use_global_high_rate
+        self.global_high_rate = global_high_rate
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> 'RuleIndex':
+        """設定辞書からインデックスを作成します。無効なゲームや process_name が空のゲームは除外されます。"""
+        entries = []
+        for game in settings.get("games", []):
+            if not game.get("is_enabled", False):
+                continue
+
+            process_name = game.get("process_name")
+            if not process_name:
+                continue
+
+            try:
+                high_rate = int(game.get("high_rate", 144))
+            except (TypeError, ValueError):
+                APP_LOGGER.warning("Invalid high_rate for game '%s'. Skipping rule.", game.get("name", process_name))
+                continue
+
+            entries.append((process_name, game.get("name", process_name), high_rate))
+
+        index = cls(
+            entries,
+            default_low_rate=settings.get("default_low_rate", 60),
+            use_global_high_rate=settings.get("use_global_high_rate", False),
+            global_high_rate=int(settings.get("global_high_rate", 144) or 144),
+        )
+        APP_LOGGER.debug("Rule index built: %d enabled process rules.", len(index))
+        return index
+
+    def __len__(self) -> int:
+        return sum(len(rules) for rules in self._by_process.values())
+
+    @property
+    def process_names(self) -> frozenset:
+        """インデックスに登録されているプロセス名の集合。"""
+        return frozenset(self._by_process)
+
+    def evaluate(self, running_process_names: Iterable[str]) -> RuleMatch:
+        """実行中プロセス名の集合を評価し、必要なレートを返します。"""
+        if not isinstance(running_process_names, (set, frozenset)):
+            running_process_names = set(running_process_names)
+
+        # 💡 登録ルール数は実行中プロセス数より十分小さいため、ルール側から検索する
+        matched = [
+            rule
+            for process_name, rules in self._by_process.items()
+            if process_name in running_process_names
+            for rule in rules
+        ]
+
+        if not matched:
+            return RuleMatch(False, self.default_low_rate, None, False)
+
+        matched.sort()
+        matched_processes = frozenset(rule[3] for rule in matched)
+
+        if self.use_global_high_rate:
+            return RuleMatch(True, self.global_high_rate, GLOBAL_HIGH_RATE_NAME, True, matched[0][3], matched_processes)
+
+        required_rate = self.default_low_rate
+        game_name = None
+        owner_process = None
+        for _, name, high_rate, process_name in matched:
+            if high_rate > required_rate:
+                required_rate = high_rate
+                game_name = name
+                owner_process = process_name
+
+        return RuleMatch(True, required_rate, game_name, False, owner_process, matched_processes)
@@ -0,0 +1,126 @@
+# hz_core/scanner.py
+# 実行中プロセスの取得 (監視ループ / クラッシュ復帰判定 / レート状態ジャーナル用) のインターフェースと既定実装
+
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional, Set, Tuple
+
+from hz_core.metrics import METRICS, MetricsRegistry
+from hz_core.process_source import ProcessSource
+
+# サブシステム 'scanner' のロガー (ログレベルを個別に変更できる)
+APP_LOGGER = logging.getLogger('AutoHzSwitcher.scanner')
+
+
+class ProcessScanner(ABC):
+    """監視エンジンが実行中プロセスを調べるためのインターフェース。"""
+
+    @abstractmethod
+    def running_process_names(self) -> Set[str]:
+        """実行中プロセス名の集合を返します。失敗した場合は空集合 (監視ループを止めないため例外は送出しない)。"""
+
+    @abstractmethod
+    def find_process_identity(self, process_name: str) -> Optional[Tuple[int, float]]:
+        """指定した名前のプロセスを 1 つ探し、(pid, create_time) を返します。見つからない場合は None。"""
+
+    @abstractmethod
+    def is_process_alive(self, pid: int, create_time: float) -> bool:
+        """指定した PID のプロセスが、同じ起動時刻で現在も実行中かを返します。"""
+
+
+class _ScanMetrics:
+    """スキャナー共通のメトリクス (スキャンしたプロセス数 / 失敗の種類ごとの件数)。"""
+
+    def __init__(self, metrics: MetricsRegistry):
+        self.scanned = metrics.counter("autohz_processes_scanned_total", "Processes returned by monitoring scans.")
+        self.last_scan = metrics.gauge("autohz_processes_last_scan", "Processes returned by the most recent monitoring scan.")
+        self.errors = metrics.counter("autohz_scan_errors_total", "Failed process scans and lookups by exception type.")
+
+    def record_scan(self, count: int):
+        self.scanned.inc(count)
+        self.last_scan.set(count)
+
+    def record_error(self, error: BaseException, operation: str = "scan"):
+        self.errors.inc(type=type(error).__name__, operation=operation)
+
+
+class PsutilProcessScanner(ProcessScanner):
+    """
+    switcher_utility (既定の ProcessSource。Linux では /proc、それ以外は psutil) を使う既定のスキャナー。
+
+    💡 psutil は hz_core の import 時ではなく、このクラスを生成したときに初めて読み込む。
+    """
+
+    def __init__(self, metrics: MetricsRegistry = METRICS):
+        import switcher_utility
+        self._utility = switcher_utility
+        self._metrics = _ScanMetrics(metrics)
+        # 既定の取得元をここで生成する (psutil が必要で無い場合は、監視開始前にこの時点で失敗させる)
+        switcher_utility.get_process_source()
+
+    def running_process_names(self) -> Set[str]:
+        """
+        Retrieves all currently running process names from the switcher_utility.
+        (Uses the lightweight get_running_processes_simple)
+        """
+        process_names = set()
+        try:
+            # 💡 修正: 軽量版の関数を呼び出す
+            # 軽量版の戻り値は List[Dict[str, str]] で、各辞書が {'name': '...', 'path': '...'} を持つ
+            processes = self._utility.get_running_processes_simple()
+            for proc in processes:
+                process_names.add(proc.get('name'))
+
+            self._metrics.record_scan(len(processes))
+            return process_names
+
+        except Exception as e:
+            # 🚨 修正: print() を APP_LOGGER.error() に置き換え、メッセージを英語化し、例外を記録
+            APP_LOGGER.error("Failed to retrieve process names: %s", e)
+            self._metrics.record_error(e)
+            # エラー時も空のセットを返せば、監視ループが停止することはない
+            return set()
+
+    def find_process_identity(self, process_name: str) -> Optional[Tuple[int, float]]:
+        return self._utility.find_process_identity(process_name)
+
+    def is_process_alive(self, pid: int, create_time: float) -> bool:
+        return self._utility.is_process_alive(pid, create_time)
+
+
+class SourceProcessScanner(ProcessScanner):
+    """任意の ProcessSource (hz_core.process_source) を使うスキャナー。switcher_utility / psutil を必要としない。"""
+
+    def __init__(self, source: ProcessSource, metrics: MetricsRegistry = METRICS):
+        self.source = source
+        self._metrics = _ScanMetrics(metrics)
+
+    def running_process_names(self) -> Set[str]:
+        try:
+            # switcher_utility.get_running_processes_simple と同様、実行ファイルのパスが取得できたプロセスのみ対象とする
+            names = [info.name for info in self.source.iter_processes() if info.name and info.exe]
+        except Exception as e:
+            APP_LOGGER.error("Failed to retrieve process names: %s", e)
+            self._metrics.record_error(e)
+            return set()
+        self._metrics.record_scan(len(names))
+        return set(names)
+
+    def find_process_identity(self, process_name: str) -> Optional[Tuple[int, float]]:
+        try:
+            info = self.source.find_by_name(process_name)
+        except Exception as e:
+            APP_LOGGER.debug("Failed to resolve process identity for %s: %s", process_name, e)
+            self._metrics.record_error(e, "find_process")
+            return None
+        if info is None or info.create_time is None:
+            return None
+        return info.pid, info.create_time
+
+    def is_process_alive(self, pid: int, create_time: float) -> bool:
+        try:
+            return self.source.is_process_alive(pid, create_time)
+        except Exception as e:
+            APP_LOGGER.debug("Failed to verify process %s: %s", pid, e)
+            self._metrics.record_error(e, "is_alive")
+            return False
@@ -0,0 +1,291 @@
+# hz_core/settings.py
+# 設定ファイルの読み込み・保存 (GUI 版とヘッドレス版で共通)
+
+import json
+import logging
+import os
+import re
+import tempfile
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+APP_LOGGER = logging.getLogger('AutoHzSwitcher')
+
+
+# 設定ファイルの形式の版。形式を変更した場合は値を上げ、MIGRATIONS に移行処理を追加する
+CONFIG_VERSION = 1
+
+LOG_LEVEL_NAMES = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+# サブシステムごとにログレベルを変更できる範囲 ('log_levels' のキー。ロガー名は 'AutoHzSwitcher.<名前>')
+LOG_SUBSYSTEMS = ("scanner", "backend", "gui")
+
+
+def get_default_settings() -> Dict[str, Any]:
+    """デフォルト設定を返します。（複数ゲーム対応）"""
+    return {
+        "config_version": CONFIG_VERSION,
+        "selected_monitor_id": "",
+        "target_resolution": "",
+        "is_monitoring_enabled": False,
+        "default_low_rate": 60,
+        "use_global_high_rate": False,
+        "global_high_rate": 144,
+        "drift_policy": "correct", # 外部要因でレートが変わった場合: "correct" (元に戻す) / "adopt" (受け入れる)
+        "gui_close_mode": "hide", # 設定画面を閉じた場合: "hide" (非表示のまま保持) / "teardown" (破棄してメモリを解放)
+        "language": "English", # 🚨 修正: 言語コードを追加
+        "games": []
+    }
+
+
+# ----------------------------------------------------------------------
+# 移行 (旧形式 -> 新形式)。MIGRATIONS[n] は版 n の設定を版 n + 1 に変換する
+# ----------------------------------------------------------------------
+
+def _migrate_v0_to_v1(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """単一ゲーム (target_process_name / high_rate / low_rate) の形式を 'games' リストに変換します。"""
+    if settings.get('target_process_name') and not settings.get('games'):
+        settings['games'] = [{
+            "name": settings.get("target_process_name", "Game 1"),
+            "process_name": settings["target_process_name"],
+            "high_rate": settings.get("high_rate", 144),
+            "low_rate_on_exit": settings.get("low_rate", 60),
+            "is_enabled": True
+        }]
+    # 変換後は参照されない旧キーを削除する
+    for key in ("target_process_name", "high_rate", "low_rate"):
+        settings.pop(key, None)
+    return settings
+
+
+MIGRATIONS: Dict[int, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    0: _migrate_v0_to_v1,
+}
+
+
+# ----------------------------------------------------------------------
+# スキーマ (キー -> (許可する型, 値の検証)。不正な値はデフォルト値に置き換える)
+# ----------------------------------------------------------------------
+
+def _is_rate(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and 0 < value <= 1000
+
+
+def _is_log_levels(value: Dict[str, Any]) -> bool:
+    return all(
+        key in LOG_SUBSYSTEMS and isinstance(level, str) and level.upper() in LOG_LEVEL_NAMES
+        for key, level in value.items()
+    )
+
+
+SETTINGS_SCHEMA: Dict[str, Tuple[Tuple[type, ...], Optional[Callable[[Any], bool]]]] = {
+    "config_version": ((int,), None),
+    "selected_monitor_id": ((str,), None),
+    "target_resolution": ((str,), lambda v: v == "" or bool(re.fullmatch(r"\d+x\d+", v))),
+    "is_monitoring_enabled": ((bool,), None),
+    "is_startup_enabled": ((bool,), None),
+    "default_low_rate": ((int,), _is_rate),
+    "use_global_high_rate": ((bool,), None),
+    "global_high_rate": ((int,), _is_rate),
+    "drift_policy": ((str,), lambda v: v in ("correct", "adopt")),
+    "gui_close_mode": ((str,), lambda v: v in ("hide", "teardown")),
+    "language": ((str,), None),
+    "language_code": ((str,), None),
+    "log_level": ((str,), lambda v: v.upper() in LOG_LEVEL_NAMES),
+    "log_levels": ((dict,), _is_log_levels),
+    "log_compression": ((str,), lambda v: v in ("gzip", "zstd", "none")),
+    "log_retention_mb": ((int,), lambda v: 0 < v <= 10240),
+    "metrics_port": ((int,), lambda v: 0 <= v <= 65535), # 0: HTTP エンドポイントを使用しない (127.0.0.1 のみで待ち受ける)
+    "metrics_textfile": ((str,), None), # "": テキストファイルを書き出さない
+    "games": ((list,), None),
+}
+
+# 'games' の各要素の必須キー
+GAME_SCHEMA: Dict[str, Tuple[Tuple[type, ...], Optional[Callable[[Any], bool]]]] = {
+    "name": ((str,), None),
+    "process_name": ((str,), lambda v: bool(v.strip())),
+    "high_rate": ((int,), _is_rate),
+    "is_enabled": ((bool,), None),
+}
+
+
+def _coerce(value: Any, rule: Tuple[Tuple[type, ...], Optional[Callable[[Any], bool]]]) -> Any:
+    """数値を要求するキーに、文字列 ("144") や小数 (144.0) で書かれた値を整数に変換します。"""
+    if int in rule[0] and isinstance(value, (str, float)) and not isinstance(value, bool):
+        try:
+            number = float(value)
+        except ValueError:
+            return value
+        if number.is_integer():
+            return int(number)
+    return value
+
+
+def _check(value: Any, rule: Tuple[Tuple[type, ...], Optional[Callable[[Any], bool]]]) -> bool:
+    types, validator = rule
+    # bool は int のサブクラスのため、int を要求するキーに true/false が書かれていないか個別に確認する
+    if isinstance(value, bool) and bool not in types:
+        return False
+    return isinstance(value, types) and (validator is None or validator(value))
+
+
+def validate_settings(settings: Dict[str, Any]) -> List[str]:
+    """
+    スキーマに従って設定を検証し、不正な値をデフォルト値に置き換えます (settings を直接変更する)。
+    見つかった問題の説明のリストを返します。未知のキーはそのまま残します。
+    """
+    problems: List[str] = []
+    defaults = get_default_settings()
+
+    for key, rule in SETTINGS_SCHEMA.items():
+        if key not in settings:
+            continue
+        settings[key] = _coerce(settings[key], rule)
+        if not _check(settings[key], rule):
+            problems.append(f"Invalid value for '{key}': {settings[key]!r}")
+            if key in defaults:
+                settings[key] = defaults[key]
+            else:
+                del settings[key]
+
+    games = []
+    for index, game in enumerate(settings.get("games", [])):
+        if not isinstance(game, dict):
+            problems.append(f"Ignoring game entry #{index}: not an object")
+            continue
+        for key, rule in GAME_SCHEMA.items():
+            if key in game:
+                game[key] = _coerce(game[key], rule)
+        invalid = [key for key, rule in GAME_SCHEMA.items() if key in game and not _check(game[key], rule)]
+        if "process_name" in invalid or not game.get("process_name"):
+            problems.append(f"Ignoring game entry #{index}: missing or invalid 'process_name'")
+            continue
+        for key in invalid:
+            problems.append(f"Invalid value for games[{index}].{key}: {game[key]!r}")
+            del game[key]
+        games.append(game)
+    settings["games"] = games
+    return problems
+
+
+# ----------------------------------------------------------------------
+# 読み込み
+# ----------------------------------------------------------------------
+
+class LoadedConfig(NamedTuple):
+    """load_config() の結果。"""
+    path: str
+    settings: Dict[str, Any]
+    # 設定ファイルが存在し、読み込めた場合は True
+    loaded_from_file: bool
+    # 適用した移行の版 (例: [0] = 版 0 -> 1)
+    migrations: List[int]
+    # 検証で見つかった問題 (置き換え済み)
+    problems: List[str]
+    # 移行後の形式をファイルへ書き戻した場合は True
+    written_back: bool
+
+    @property
+    def log_level(self) -> str:
+        return str(self.settings.get("log_level", "INFO")).upper()
+
+    def report(self):
+        """読み込み結果をログに出力します (ロギング設定後に呼び出す)。"""
+        if not self.loaded_from_file:
+            if self.problems:
+                # 🚨 壊れた設定ファイルは上書きしない (ユーザーが修復できるように残す)
+                APP_LOGGER.error("Failed to load configuration file '%s' (%s). Using default settings.", self.path, "; ".join(self.problems))
+            else:
+                APP_LOGGER.info("Configuration file '%s' not found. Using default settings.", self.path)
+            return
+        for version in self.migrations:
+            APP_LOGGER.info("Migrated configuration from version %d to %d.", version, version + 1)
+        if self.written_back:
+            APP_LOGGER.info("Upgraded configuration written back to: %s", self.path)
+        for problem in self.problems:
+            APP_LOGGER.warning("Configuration '%s': %s.", self.path, problem)
+        APP_LOGGER.info("Settings successfully loaded from: %s", self.path)
+
+
+def load_config(config_path: str, write_back: bool = True) -> LoadedConfig:
+    """
+    設定ファイルを 1 回だけ読み込み、移行・検証を行ってデフォルト設定と統合します。
+
+    - 旧形式の設定は MIGRATIONS で最新の版まで変換し、write_back=True の場合は 1 度だけ書き戻す
+      (以降の読み込みでは移行の確認は版の比較のみ)
+    - ファイルが無い・JSON として読めない場合はデフォルト設定を返す (壊れたファイルは上書きしない)
+    - ロギング設定より前に呼び出されるため、結果のログ出力は report() で行う
+    """
+    settings = get_default_settings()
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            loaded = json.load(f)
+    except FileNotFoundError:
+        return LoadedConfig(config_path, settings, False, [], [], False)
+    except (OSError, ValueError) as e:
+        return LoadedConfig(config_path, settings, False, [], [f"Unreadable configuration file: {e}"], False)
+    if not isinstance(loaded, dict):
+        return LoadedConfig(config_path, settings, False, [], ["The configuration file is not a JSON object"], False)
+
+    version = loaded.get("config_version", 0)
+    if not isinstance(version, int) or isinstance(version, bool) or version < 0:
+        version = 0
+    migrations = []
+    while version < CONFIG_VERSION:
+        loaded = MIGRATIONS[version](loaded)
+        migrations.append(version)
+        version += 1
+    loaded["config_version"] = max(version, CONFIG_VERSION)
+
+    settings.update(loaded)
+    problems = validate_settings(settings)
+
+    written_back = False
+    if migrations and write_back:
+        written_back = save_settings(config_path, settings, quiet=True)
+    return LoadedConfig(config_path, settings, True, migrations, problems, written_back)
+
+
+def load_settings(config_path: str) -> Dict[str, Any]:
+    """Load the configuration file, returning default settings if it does not exist or fails to load."""
+    config = load_config(config_path)
+    config.report()
+    return config.settings
+
+
+def serialize_settings(settings: Dict[str, Any]) -> str:
+    """設定ファイルの内容 (JSON 文字列) を返します。"""
+    return json.dumps(settings, indent=4)
+
+
+def write_text_atomic(path: str, text: str):
+    """
+    一時ファイルに書き込んで fsync し、os.replace() で置き換えます。
+    書き込み途中でクラッシュしても、設定ファイルは古い内容か新しい内容のどちらかになる (壊れない)。
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def save_settings(config_path: str, settings: Dict[str, Any], quiet: bool = False) -> bool:
+    """設定を JSON ファイルへアトミックに書き込みます。成功した場合は True。"""
+    try:
+        write_text_atomic(config_path, serialize_settings(settings))
+
+        if not quiet:
+            APP_LOGGER.info("Settings successfully saved to: %s", config_path)
+        return True
+
+    except IOError as e:
+        APP_LOGGER.error("Failed to write configuration file '%s': %s", config_path, e)
+        return False
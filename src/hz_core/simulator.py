@@ -0,0 +1,297 @@
+# hz_core/simulator.py
+# ResolutionSwitcher.exe を模擬するディスプレイシミュレーター (負荷試験・再試行ポリシーの計測・結合テスト用)
+#
+# 💡 モニター構成・呼び出しごとの遅延・一時的な失敗の確率・小数レート (59.94 Hz など) を設定できる。
+#    - SimulatedDisplayBackend: MonitorEngine に注入するプロセス内の DisplayBackend
+#    - run_cli(): --monitors / --monitor / レート変更の CLI 出力を再現する
+#      (benchmarks/fake_resolution_switcher.py から使用。AUTOHZ_SWITCHER_PATH で switcher_utility に差し込める)
+
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from hz_core.backend import DisplayBackend
+
+
+def _format_rate(rate: float) -> str:
+    """144.0 -> "144" / 59.94 -> "59.94" (ResolutionSwitcher の出力形式)"""
+    return f"{rate:g}"
+
+
+class SimulatedMonitor:
+    """シミュレーター上の 1 台のモニター。modes は {"WxH": [レート, ...]}。"""
+
+    def __init__(self, monitor_id: str, name: str, modes: Dict[str, List[float]],
+                 resolution: Optional[str] = None, rate: Optional[float] = None):
+        if not modes:
+            raise ValueError(f"Monitor {monitor_id} has no display modes.")
+        self.monitor_id = monitor_id
+        self.name = name
+        self.modes = {res: sorted((float(r) for r in rates), reverse=True) for res, rates in modes.items()}
+        self.resolution = resolution or next(iter(self.modes))
+        # 既定の現在レートは、その解像度の最も低いレート
+        self.rate = float(rate) if rate is not None else self.modes[self.resolution][-1]
+
+    def find_mode(self, width: int, height: int, refresh: int) -> Optional[float]:
+        """
+        指定したモードに対応する実レートを返します。存在しない場合は None。
+        (--refresh 59 は 59.94 Hz のモードにも一致する。整数の完全一致を優先する)
+        """
+        rates = self.modes.get(f"{width}x{height}")
+        if not rates:
+            return None
+        if float(refresh) in rates:
+            return float(refresh)
+        for rate in rates:
+            if int(rate) == refresh:
+                return rate
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.monitor_id,
+            "name": self.name,
+            "modes": self.modes,
+            "resolution": self.resolution,
+            "rate": self.rate,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SimulatedMonitor":
+        return cls(data["id"], data.get("name", "Generic PnP Monitor"), data["modes"],
+                   resolution=data.get("resolution"), rate=data.get("rate"))
+
+
+class SimulatedDisplay:
+    """
+    Models a set of monitors behind the ResolutionSwitcher CLI.
+
+    - latency / latency_jitter: 呼び出し 1 回ごとの遅延 (秒)。ジッターは 0..latency_jitter の一様分布
+    - failure_probability: レート変更が一時的に失敗する確率 (0.0 - 1.0)。問い合わせは失敗しない
+    - seed を指定すると、遅延と失敗の発生順が再現可能になる
+    - call_counts には "monitors" / "monitor" / "set" ごとの呼び出し回数が記録される
+    """
+
+    def __init__(
+        self,
+        monitors: List[SimulatedMonitor],
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        failure_probability: float = 0.0,
+        seed: Optional[int] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if not 0.0 <= failure_probability <= 1.0:
+            raise ValueError(f"failure_probability must be between 0 and 1: {failure_probability}")
+        self.monitors: Dict[str, SimulatedMonitor] = {m.monitor_id: m for m in monitors}
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.failure_probability = failure_probability
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.call_counts: Dict[str, int] = {"monitors": 0, "monitor": 0, "set": 0}
+
+    # --- 構成 ---
+
+    @classmethod
+    def default(cls, monitor_count: int = 1, **kwargs) -> "SimulatedDisplay":
+        """
+        一般的な構成のシミュレーターを返します。
+        1 台目: 2560x1440 (165/144/120/60/59.94 Hz)、2 台目以降: 1920x1080 (75/60/59.94 Hz)
+        """
+        monitors = [SimulatedMonitor(
+            r"\\.\DISPLAY1", "Generic Gaming Monitor",
+            {"2560x1440": [165, 144, 120, 60, 59.94], "1920x1080": [144, 120, 60, 59.94]},
+            resolution="2560x1440", rate=60,
+        )]
+        for index in range(2, monitor_count + 1):
+            monitors.append(SimulatedMonitor(
+                rf"\\.\DISPLAY{index}", "Generic PnP Monitor",
+                {"1920x1080": [75, 60, 59.94]},
+                resolution="1920x1080", rate=60,
+            ))
+        return cls(monitors, **kwargs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "latency": self.latency,
+            "latency_jitter": self.latency_jitter,
+            "failure_probability": self.failure_probability,
+            "seed": self.seed,
+            "call_counts": dict(self.call_counts),
+            "monitors": [m.to_dict() for m in self.monitors.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], **kwargs) -> "SimulatedDisplay":
+        display = cls(
+            [SimulatedMonitor.from_dict(m) for m in data.get("monitors", [])],
+            latency=data.get("latency", 0.0),
+            latency_jitter=data.get("latency_jitter", 0.0),
+            failure_probability=data.get("failure_probability", 0.0),
+            seed=data.get("seed"),
+            **kwargs,
+        )
+        display.call_counts.update(data.get("call_counts", {}))
+        # 💡 状態ファイルから復元した場合 (CLI の呼び出しごと) も、seed 付きなら呼び出し回数に応じて
+        #    乱数列を進め、毎回同じ結果にならず、かつ再現可能にする
+        if display.seed is not None:
+            display._random.seed(f"{display.seed}:{sum(display.call_counts.values())}")
+        return display
+
+    @classmethod
+    def load(cls, path: str) -> "SimulatedDisplay":
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def save(self, path: str):
+        """状態ファイルへ書き込みます (一時ファイル + os.replace。CLI の並行呼び出しで壊れた状態を読まないため)。"""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".sim-", dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, indent=2)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    # --- 操作 ---
+
+    def _delay(self):
+        delay = self.latency
+        if self.latency_jitter > 0:
+            delay += self._random.uniform(0.0, self.latency_jitter)
+        if delay > 0:
+            self._sleep(delay)
+
+    def active_rate(self, monitor_id: str) -> Optional[float]:
+        """指定モニターの現在の実レート (小数を含む) を返します。"""
+        with self._lock:
+            self.call_counts["monitors"] += 1
+            monitor = self.monitors.get(monitor_id)
+        self._delay()
+        return monitor.rate if monitor is not None else None
+
+    def set_mode(self, monitor_id: str, width: int, height: int, refresh: int) -> Tuple[bool, str]:
+        """
+        モードを変更します。
+
+        Returns:
+            tuple: (成功したか, メッセージ)。存在しないモードや一時的な失敗の場合は False。
+        """
+        with self._lock:
+            self.call_counts["set"] += 1
+            is_transient_failure = self._random.random() < self.failure_probability
+        self._delay()
+
+        monitor = self.monitors.get(monitor_id)
+        if monitor is None:
+            return False, f"Monitor not found: {monitor_id}"
+
+        rate = monitor.find_mode(width, height, refresh)
+        if rate is None:
+            return False, f"Unsupported display mode: {width}x{height} @ {refresh}Hz"
+        if is_transient_failure:
+            return False, "ChangeDisplaySettingsEx failed: DISP_CHANGE_FAILED (simulated)"
+
+        with self._lock:
+            monitor.resolution = f"{width}x{height}"
+            monitor.rate = rate
+        return True, f"Display mode changed: {width}x{height} @ {_format_rate(rate)}Hz"
+
+    # --- CLI 出力の再現 ---
+
+    def render_monitors(self) -> str:
+        """ResolutionSwitcher --monitors の出力を返します。"""
+        with self._lock:
+            self.call_counts["monitors"] += 1
+            lines = []
+            for monitor in self.monitors.values():
+                lines.append(f"[{monitor.name}]")
+                lines.append(f"ID: {monitor.monitor_id}")
+                lines.append(f"Resolution: {monitor.resolution} @ {_format_rate(monitor.rate)}Hz")
+                lines.append("")
+        self._delay()
+        return "\n".join(lines)
+
+    def render_modes(self, monitor_id: str) -> Optional[str]:
+        """ResolutionSwitcher --monitor <ID> の出力を返します。モニターが存在しない場合は None。"""
+        with self._lock:
+            self.call_counts["monitor"] += 1
+            monitor = self.monitors.get(monitor_id)
+        self._delay()
+        if monitor is None:
+            return None
+
+        lines = [f"[{monitor.name}]", f"ID: {monitor.monitor_id}", "", "[Available Modes]"]
+        for resolution, rates in monitor.modes.items():
+            for rate in rates:
+                lines.append(f"  {resolution} @ {_format_rate(rate)}Hz")
+        return "\n".join(lines)
+
+    def run_cli(self, argv: List[str]) -> Tuple[int, str, str]:
+        """
+        ResolutionSwitcher の CLI を再現します。
+
+        Returns:
+            tuple: (終了コード, 標準出力, 標準エラー出力)
+        """
+        args = list(argv)
+
+        def take(flag: str) -> Optional[str]:
+            if flag not in args:
+                return None
+            index = args.index(flag)
+            if index + 1 >= len(args):
+                raise ValueError(f"Missing value for {flag}")
+            return args[index + 1]
+
+        try:
+            if "--monitors" in args:
+                return 0, self.render_monitors() + "\n", ""
+
+            monitor_id = take("--monitor")
+            if monitor_id is None:
+                return 2, "", "Usage: ResolutionSwitcher --monitors | --monitor <ID> [--width W --height H --refresh R]\n"
+
+            refresh = take("--refresh")
+            if refresh is None:
+                output = self.render_modes(monitor_id)
+                if output is None:
+                    return 1, "", f"Monitor not found: {monitor_id}\n"
+                return 0, output + "\n", ""
+
+            width, height = int(take("--width") or 0), int(take("--height") or 0)
+            success, message = self.set_mode(monitor_id, width, height, int(float(refresh)))
+        except ValueError as e:
+            return 2, "", f"{e}\n"
+
+        if success:
+            return 0, message + "\n", ""
+        return 1, "", message + "\n"
+
+
+class SimulatedDisplayBackend(DisplayBackend):
+    """SimulatedDisplay をプロセス内で直接操作する DisplayBackend (外部プロセスを起動しない)。"""
+
+    def __init__(self, display: Optional[SimulatedDisplay] = None):
+        self.display = display if display is not None else SimulatedDisplay.default()
+
+    def get_active_rate(self, monitor_id: str, max_age: float = 0.0) -> Optional[int]:
+        rate = self.display.active_rate(monitor_id)
+        # switcher_utility の解析と同様に、小数レートは整数に切り捨てる
+        return int(rate) if rate is not None else None
+
+    def change_rate(self, target_rate: int, width: int, height: int, monitor_id: str) -> bool:
+        success, _ = self.display.set_mode(monitor_id, width, height, target_rate)
+        return success
@@ -0,0 +1,59 @@
+# hz_core/status_channel.py
+# 監視スレッドから Tk / タスクトレイへステータスを受け渡すための単一スロット・メールボックス
+
+import itertools
+import logging
+import time
+from typing import NamedTuple, Optional
+
+APP_LOGGER = logging.getLogger('AutoHzSwitcher')
+
+
+class StatusRecord(NamedTuple):
+    """公開されたステータス1件分のレコード。"""
+    seq: int
+    text: str
+    rate: Optional[int]
+    published_at: float
+
+
+class StatusChannel:
+    """
+    Single-slot, last-value-wins mailbox for status records.
+
+    - 書き込み側 (監視スレッド等) は publish() で最新レコードを差し替えるだけで、Tk には一切触れない。
+    - 読み出し側 (Tk の after() タイマー、トレイのツールチップ) は、自分が最後に見た seq を保持し、
+      poll() で新しいレコードがあるときだけ受け取る。途中の更新は自然にまとめられる (バッチ化)。
+    - スロットの差し替えは参照の代入 1 回のみなので、GIL の下でロックなしに安全に行える。
+    """
+
+    def __init__(self, initial_text: str = "", initial_rate: Optional[int] = None):
+        # 💡 itertools.count の next() は C 実装でアトミックなため、複数スレッドから publish しても seq は重複しない
+        self._seq_counter = itertools.count(1)
+        self._slot = StatusRecord(0, initial_text, initial_rate, time.monotonic())
+
+    def publish(self, text: str, rate: Optional[int] = None) -> bool:
+        """
+        ステータスを公開します。直前の内容と同一の場合は何もしません。
+
+        Returns:
+            bool: 新しいレコードとして公開された場合は True。
+        """
+        current = self._slot
+        if current.text == text and current.rate == rate:
+            return False
+
+        self._slot = StatusRecord(next(self._seq_counter), text, rate, time.monotonic())
+        APP_LOGGER.debug("Status published: %s", text)
+        return True
+
+    def latest(self) -> StatusRecord:
+        """現在スロットにある最新レコードを返します。"""
+        return self._slot
+
+    def poll(self, last_seen_seq: int) -> Optional[StatusRecord]:
+        """last_seen_seq より新しいレコードがあればそれを返し、なければ None を返します。"""
+        record = self._slot
+        if record.seq != last_seen_seq:
+            return record
+        return None
@@ -0,0 +1,296 @@
+# hz_core/trace.py
+# 監視セッションの記録 (JSONL トレース) と再生
+#
+# 💡 現地で発生した問題の再現や、判定ロジック変更時の比較に使用する。
+#    - TraceRecorder: 監視エンジンから、設定の版・プロセス集合の差分・判定結果・外部ツール呼び出しの所要時間を記録する
+#    - replay_trace(): 記録を判定ロジック (RuleIndex + hz_core.decision) に流し、記録時と同じ判定になるかを検証する
+#    トレースの時刻はすべて注入された clock (既定: time.monotonic) の値で、再生時は待機せずに進める (仮想時刻)。
+#
+# 形式 (1 行 1 レコード、"k" がレコードの種類。パスが .gz で終わる場合は gzip 圧縮):
+#    {"k": "header", "v": 1, "t": 0.0, "wall": 1700000000.0}
+#    {"k": "settings", "t": ..., "ver": 1, "settings": {...}}
+#    {"k": "tick", "t": ..., "+": [...], "-": [...], "cur": 60, "dec": 144, "scan": 0.0123}
+#    {"k": "idle", "t": ..., "n": 120, "cur": 60, "scan": 1.234}    # 変化の無い tick の連続 (n 回分をまとめる)
+#    {"k": "call", "t": ..., "op": "change_rate", "rate": 144, "ok": true, "dur": 0.081}
+#    {"k": "override", "t": ..., "rate": 144, "reason": "ipc", "games": ["game.exe"]}   # force_rate / ドリフトの採用
+#    {"k": "override", "t": ..., "rate": null}                                         # 上書きの解除
+
+import gzip
+import io
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from hz_core.decision import RateOverride, decide_target_rate
+from hz_core.rules import RuleIndex
+
+APP_LOGGER = logging.getLogger('AutoHzSwitcher')
+
+TRACE_FORMAT_VERSION = 1
+
+# 判定に影響する設定項目 (トレースにはこれだけを記録する)
+TRACED_SETTING_KEYS = ("default_low_rate", "use_global_high_rate", "global_high_rate", "drift_policy", "games")
+
+
+def _open_trace(path: str, mode: str):
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, mode + "b"), encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class TraceRecorder:
+    """
+    Writes a compact JSONL trace of a monitoring session. Safe to call from any thread.
+
+    変化の無い tick (プロセス集合の差分なし・判定なし・期待レート不変) は 1 レコードにまとめて書き込む。
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.monotonic):
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._file = _open_trace(path, 'w')
+        self._started = clock()
+        self._previous_names: Set[str] = set()
+        self._settings_version = 0
+        # まとめ書き待ちの、変化の無い tick
+        self._idle_count = 0
+        self._idle_scan_seconds = 0.0
+        self._idle_rate: Optional[int] = None
+        self._idle_last_t = 0.0
+        self._write({"k": "header", "v": TRACE_FORMAT_VERSION, "t": 0.0, "wall": time.time()})
+        APP_LOGGER.info("Recording monitoring trace to %s.", path)
+
+    def _now(self) -> float:
+        return round(self._clock() - self._started, 6)
+
+    def _write(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record, separators=(',', ':'), ensure_ascii=False))
+        self._file.write("\n")
+
+    def _flush_idle_locked(self):
+        if self._idle_count:
+            self._write({
+                "k": "idle", "t": self._idle_last_t, "n": self._idle_count,
+                "cur": self._idle_rate, "scan": round(self._idle_scan_seconds, 6),
+            })
+            self._idle_count = 0
+            self._idle_scan_seconds = 0.0
+
+    def record_settings(self, settings: Dict[str, Any]):
+        """判定に影響する設定を、新しい版として記録します。"""
+        snapshot = {key: settings.get(key) for key in TRACED_SETTING_KEYS}
+        with self._lock:
+            if self._file is None:
+                return
+            self._flush_idle_locked()
+            self._settings_version += 1
+            self._write({"k": "settings", "t": self._now(), "ver": self._settings_version, "settings": snapshot})
+
+    def record_tick(self, process_names: Iterable[str], current_rate: Optional[int], decision: Optional[int], scan_seconds: float):
+        """1 回の tick の入力 (プロセス集合・期待レート) と判定結果を記録します。"""
+        names = set(process_names)
+        t = self._now()
+        with self._lock:
+            if self._file is None:
+                return
+            added = names - self._previous_names
+            removed = self._previous_names - names
+            self._previous_names = names
+
+            if not added and not removed and decision is None and current_rate == self._idle_rate:
+                self._idle_count += 1
+                self._idle_scan_seconds += scan_seconds
+                self._idle_last_t = t
+                return
+
+            self._flush_idle_locked()
+            record: Dict[str, Any] = {"k": "tick", "t": t, "cur": current_rate, "dec": decision, "scan": round(scan_seconds, 6)}
+            if added:
+                record["+"] = sorted(added)
+            if removed:
+                record["-"] = sorted(removed)
+            self._write(record)
+            # 判定により期待レートが変わる可能性があるため、次の tick からまとめ直す
+            self._idle_rate = current_rate if decision is None else None
+
+    def record_call(self, op: str, duration: float, rate: Optional[int] = None, ok: bool = True):
+        """外部ツール (ディスプレイバックエンド) の呼び出しと所要時間を記録します。"""
+        with self._lock:
+            if self._file is None:
+                return
+            self._flush_idle_locked()
+            self._write({"k": "call", "t": self._now(), "op": op, "rate": rate, "ok": ok, "dur": round(duration, 6)})
+            # 呼び出し後は期待レートが変わっている可能性がある
+            self._idle_rate = None
+
+    def record_override(self, override: Optional[RateOverride]):
+        """レートの上書き (hz_core.decision.RateOverride) の設定、または解除 (None) を記録します。"""
+        record: Dict[str, Any] = {"k": "override", "t": self._now(), "rate": None}
+        if override is not None:
+            record.update(rate=override.rate, reason=override.reason, games=sorted(override.games))
+        with self._lock:
+            if self._file is None:
+                return
+            self._flush_idle_locked()
+            self._write(record)
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is None:
+                return
+            self._flush_idle_locked()
+            self._file.close()
+            self._file = None
+        APP_LOGGER.info("Monitoring trace closed: %s", self.path)
+
+
+def read_trace(path: str) -> Iterator[Dict[str, Any]]:
+    """トレースのレコードを順に返します。(異常終了で途中までしか書かれていない最終行は無視する)"""
+    with _open_trace(path, 'r') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                APP_LOGGER.warning("Skipping unreadable trace line in %s.", path)
+
+
+class ReplayMismatch:
+    """記録時と再生時で判定が異なった tick。"""
+
+    __slots__ = ("t", "current_rate", "recorded", "replayed", "process_count")
+
+    def __init__(self, t: float, current_rate: Optional[int], recorded: Optional[int], replayed: Optional[int], process_count: int):
+        self.t = t
+        self.current_rate = current_rate
+        self.recorded = recorded
+        self.replayed = replayed
+        self.process_count = process_count
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class ReplayReport:
+    """再生結果: 判定の一致/不一致と、段階ごとの所要時間 (記録時 / 再生時)。"""
+
+    def __init__(self):
+        self.ticks = 0
+        self.decisions = 0
+        self.settings_versions = 0
+        self.session_seconds = 0.0
+        self.mismatches: List[ReplayMismatch] = []
+        # 再生時の段階ごとの所要時間 (秒)
+        self.replay_seconds: Dict[str, float] = {"apply_delta": 0.0, "build_rules": 0.0, "evaluate": 0.0, "decide": 0.0}
+        # 記録時の段階ごとの所要時間 (秒) と呼び出し回数
+        self.recorded_seconds: Dict[str, float] = {"scan": 0.0}
+        self.recorded_calls: Dict[str, int] = {}
+        self.failed_calls: Dict[str, int] = {}
+
+    @property
+    def identical(self) -> bool:
+        return not self.mismatches
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "identical": self.identical,
+            "ticks": self.ticks,
+            "decisions": self.decisions,
+            "settings_versions": self.settings_versions,
+            "session_seconds": self.session_seconds,
+            "replay_seconds": dict(self.replay_seconds),
+            "recorded_seconds": dict(self.recorded_seconds),
+            "recorded_calls": dict(self.recorded_calls),
+            "failed_calls": dict(self.failed_calls),
+            "mismatches": [m.to_dict() for m in self.mismatches[:100]],
+            "mismatch_count": len(self.mismatches),
+        }
+
+
+def replay_trace(
+    records: Iterable[Dict[str, Any]],
+    decide: Callable[..., Optional[int]] = decide_target_rate,
+    clock: Callable[[], float] = time.perf_counter,
+) -> ReplayReport:
+    """
+    Feeds a recorded trace through the decision logic and compares every decision.
+
+    記録時と同様に、override レコードのレートの上書きを判定に渡す (実行中のゲームの構成が変われば解除する)。
+
+    Args:
+        records: read_trace() の結果
+        decide: 判定関数 (既定: hz_core.decision.decide_target_rate)。変更後のロジックとの比較に差し替えられる。
+                (match, current_rate, default_low_rate, override) を受け取ること
+        clock: 再生時の段階ごとの所要時間の計測に使用する時計
+    """
+    report = ReplayReport()
+    names: Set[str] = set()
+    rule_index: Optional[RuleIndex] = None
+    override: Optional[RateOverride] = None
+    stages = report.replay_seconds
+
+    for record in records:
+        kind = record.get("k")
+        report.session_seconds = max(report.session_seconds, record.get("t", 0.0))
+
+        if kind == "settings":
+            started = clock()
+            rule_index = RuleIndex.from_settings(record.get("settings") or {})
+            stages["build_rules"] += clock() - started
+            report.settings_versions += 1
+            continue
+
+        if kind == "override":
+            rate = record.get("rate")
+            override = None if rate is None else RateOverride(
+                rate, record.get("reason", ""), frozenset(record.get("games") or ())
+            )
+            continue
+
+        if kind == "call":
+            op = record.get("op", "unknown")
+            report.recorded_seconds[op] = report.recorded_seconds.get(op, 0.0) + record.get("dur", 0.0)
+            report.recorded_calls[op] = report.recorded_calls.get(op, 0) + 1
+            if not record.get("ok", True):
+                report.failed_calls[op] = report.failed_calls.get(op, 0) + 1
+            continue
+
+        if kind not in ("tick", "idle") or rule_index is None:
+            continue
+
+        started = clock()
+        if kind == "tick":
+            names.difference_update(record.get("-", ()))
+            names.update(record.get("+", ()))
+        stages["apply_delta"] += clock() - started
+
+        report.recorded_seconds["scan"] += record.get("scan", 0.0)
+        current_rate = record.get("cur")
+        recorded = record.get("dec") if kind == "tick" else None
+        # まとめられた tick も、1 回ずつ判定する (入力は同一)
+        repeat = record.get("n", 1) if kind == "idle" else 1
+
+        for _ in range(repeat):
+            started = clock()
+            match = rule_index.evaluate(names)
+            if override is not None and not override.applies_to(match):
+                override = None
+            evaluated = clock()
+            replayed = decide(match, current_rate, rule_index.default_low_rate, override)
+            stages["decide"] += clock() - evaluated
+            stages["evaluate"] += evaluated - started
+
+            report.ticks += 1
+            if replayed is not None:
+                report.decisions += 1
+            if replayed != recorded:
+                report.mismatches.append(ReplayMismatch(record.get("t", 0.0), current_rate, recorded, replayed, len(names)))
+
+    return report
@@ -1,32 +1,60 @@
 # main_app.py (修正後)
 
+import sys
+
+# 💡 --headless 指定時は、tkinter / pystray / PIL / main_gui を読み込む前にヘッドレス版へ切り替える
+#    (無人運用の端末向け。操作はローカル IPC 経由。詳細は headless.py を参照)
+if __name__ == "__main__" and "--headless" in sys.argv[1:]:
+    from headless import main as headless_main
+    sys.exit(headless_main(sys.argv[1:]))
+
+# 💡 既にインスタンスが実行中の場合は、tkinter / pystray / PIL を読み込む前に制御チャネル (hz_core.ipc) へ
+#    処理を引き継いで終了する (既定: 設定画面を前面に表示。"--send COMMAND --args JSON" で任意のコマンド)
+if __name__ == "__main__":
+    from hz_core.ipc import forward_command_line
+    _forwarded_exit_code = forward_command_line(sys.argv[1:])
+    if _forwarded_exit_code is not None:
+        sys.exit(_forwarded_exit_code)
+
+import argparse
 import tkinter as tk
-from threading import Thread, Event
+import threading
+from threading import Thread
 import pystray
 from PIL import Image
-import sys
-import json
 import os
+import gc
 import time
-import psutil
 import logging
-import winreg # Windowsレジストリ操作用の標準モジュール
-import win32event 
-import winerror
-import win32api
-from logging.handlers import RotatingFileHandler
-from datetime import datetime
 from typing import Dict, Any, Optional
-from switcher_utility import get_monitor_capabilities, change_rate, get_current_active_rate, get_running_processes_simple, resource_path # <- resource_path を追加
 
 # 監視用ライブラリ (psutil) は switcher_utility.py に移動するため削除
 # import psutil  <-- 削除
 
-# 開発中のGUIクラスとユーティリティをインポート
-from main_gui import HzSwitcherApp 
-# from switcher_utility import get_monitor_capabilities, get_all_process_names, change_rate, get_current_active_rate 
-# 💡 修正: get_all_process_names を削除し、get_running_processes_simple を追加
-from switcher_utility import get_monitor_capabilities, change_rate, get_current_active_rate, get_running_processes_simple
+# 💡 GUIクラス (main_gui.HzSwitcherApp) は、設定画面を初めて開くときに import する (起動時間・常駐メモリの削減)
+# 💡 監視ロジック・設定・ロギング設定は GUI 非依存の hz_core に集約 (ヘッドレス版と共通)
+from hz_core import (
+    LOG_SUBSYSTEMS,
+    ConfigService,
+    LoadedConfig,
+    MetricsExporter,
+    MonitorEngine,
+    StatusRecord,
+    apply_log_levels,
+    get_default_settings,
+    get_log_levels,
+    get_resource_path,
+    get_settings_file_path,
+    load_config,
+    load_settings,
+    set_log_level,
+    setup_logging,
+)
+from hz_core.i18n import LanguageManager, get_translation_catalog
+from hz_core.ipc import ControlServer, IPCError, forward_to_running_instance
+from hz_core.platform import InstanceLock, StartupRegistrar, TrayFactory
+# 💡 OS 依存機能 (レジストリ / ミューテックス / pystray) は hz_core.platform のインターフェース越しに使用する
+from platform_windows import MutexInstanceLock, PystrayTray, RegistryStartupRegistrar
 
 MUTEX_NAME = "Global\\AutoHzSwitcher_SingleInstance_Mutex"
 
@@ -38,61 +66,19 @@ APP_LOGGER = logging.getLogger('AutoHzSwitcher')
 def _get_resource_path(relative_path: str) -> str:
     """
     PyInstallerでバンドルされたリソース（言語ファイル、アイコンなど）の絶対パスを取得する。
+    💡 パスの解決は hz_core.paths に集約 (翻訳カタログと同じ基準を使う)
     """
-    try:
-        # PyInstallerがファイルを実行している場合、リソースは_MEIPASSで指定された場所にある
-        base_path = sys._MEIPASS
-    except AttributeError:
-        # 通常のPython実行時
-        # 💥 修正: スクリプトがあるディレクトリ（src/）の親ディレクトリ（プロジェクトルート）をベースパスとする
-        base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-        
-    return os.path.join(base_path, relative_path)
+    return get_resource_path(relative_path)
 
 # ----------------------------------------------------------------------
 # ユーティリティ: 言語リソースの読み込み (PyInstaller対応パスに修正)
 # ----------------------------------------------------------------------
-def _load_language_resources(lang_code: str) -> Dict[str, str]:
+def _load_language_resources(lang_code: str) -> LanguageManager:
     """
-    指定された言語コードのリソースをファイルからロードする。
-    失敗した場合、en.jsonにフォールバックし、それも失敗した場合は空の辞書を返す。
+    指定された言語コードのリソースを返す (設定画面と共有する翻訳カタログから取得)。
+    💡 各言語のファイルは 1 度だけ読み込まれ、翻訳の無いキーは英語 (en.json) の文字列になる。
     """
-    
-    # 💥 修正: ファイルパスに 'lang/' フォルダを追加
-    filename = f"lang/{lang_code}.json"
-    path = _get_resource_path(filename)
-    
-    # ファイルが存在しない場合、en.jsonにフォールバック
-    if not os.path.exists(path):
-        
-        # 🚨 WARNING: ファイルが見つからないことをログに記録
-        APP_LOGGER.warning("Language file '%s' not found. Defaulting to English (en.json).", path)
-        
-        # 💥 修正: en.json のパスにも 'lang/' フォルダを追加
-        path = _get_resource_path("lang/en.json")
-        
-        # 'en.json'も存在しない場合、処理を中断
-        if not os.path.exists(path):
-            # 🚨 ERROR: デフォルトファイルも見つからないことをログに記録
-            APP_LOGGER.error("Default language file 'en.json' not found. Returning empty resources.")
-            
-            # 最終的なフォールバック（トレイメニューが完全に壊れないための最低限のキー）
-            return {"tray_title": "Auto Hz Switcher", "settings": "Settings", "exit": "Exit"}
-    
-    try:
-        # ファイルを開いてJSONデータをロード
-        with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            
-            # 🚨 INFO: 読み込み成功をログに記録
-            APP_LOGGER.info("Successfully loaded language resources from: %s", path)
-            return data
-            
-    except Exception as e:
-        # 🚨 ERROR: 読み込み中のJSONパースエラーなどをログに記録
-        APP_LOGGER.error("Error loading language file '%s': %s. Returning empty resources.", path, e)
-        # 読み込み失敗時の最終フォールバック
-        return {}
+    return get_translation_catalog().load(lang_code)
 
 # ----------------------------------------------------------------------
 # 注意:
@@ -103,102 +89,9 @@ def _load_language_resources(lang_code: str) -> Dict[str, str]:
 # ----------------------------------------------------------------------
 
 # ----------------------------------------------------------------------
-# ロギング設定 (Application Logger Setup)
+# 💡 ロギング設定 (setup_logging) と設定ファイルのパス (get_settings_file_path) は
+#    ヘッドレス版と共通化するため hz_core に移動 (上記で import 済み)
 # ----------------------------------------------------------------------
-def setup_logging():
-    
-    # ------------------- ログレベルの読み込み -------------------
-    # 🚨 修正: AppData から設定ファイルのフルパスを取得する
-    config_file_path = get_settings_file_path() 
-    log_level_str = 'INFO' # デフォルトレベルは INFO
-    
-    try:
-        # 設定ファイルを読み込む
-        with open(config_file_path, 'r', encoding='utf-8') as f:
-            config_data = json.load(f)
-            # 'log_level' キーを直接探し、なければデフォルトの 'INFO' を返します。
-            log_level_str = config_data.get('log_level', 'INFO').upper()
-            
-    except FileNotFoundError:
-        pass
-    except json.JSONDecodeError:
-        pass
-    except Exception:
-        pass
-        
-    # 文字列を logging のレベル定数に変換。不正な文字列の場合は logging.INFO を使用
-    log_level = getattr(logging, log_level_str, logging.INFO)
-    
-    
-    # ログファイルのパスを決定 (C:\Users\<Username>\AppData\Local\AutoHzSwitcher\logs\)
-    # Note: log_dir は get_settings_file_path とは独立して、ログ専用のフォルダを指す
-    log_dir = os.path.join(os.getenv('LOCALAPPDATA', os.path.expanduser('~')), 'AutoHzSwitcher', 'logs')
-    os.makedirs(log_dir, exist_ok=True)
-    
-    # ------------------- ログファイルのローテーション設定 -------------------
-    
-    # ログファイルの最大サイズ: 5 MB (5 * 1024 * 1024 バイト)
-    MAX_BYTES = 5 * 1024 * 1024 
-    # ローテーションで保持するファイル数: 5世代まで (現在のファイル + 4つの古いファイル)
-    BACKUP_COUNT = 4 
-
-    # ログファイル名 (ローテーションハンドラはタイムスタンプなしの固定名)
-    log_file_path_fixed = os.path.join(log_dir, "AutoHzSwitcher.log")
-    
-    # ルートロガーを設定
-    root_logger = logging.getLogger()
-    # 🚨 外部ライブラリのログを抑制するため、警告レベル (WARNING) に設定
-    root_logger.setLevel(logging.WARNING) 
-
-    # 既存のハンドラをクリア (二重ログ出力防止のため)
-    if root_logger.hasHandlers():
-        root_logger.handlers.clear()
-        
-    # 1. ファイルハンドラの設定 (RotatingFileHandler)
-    file_handler = RotatingFileHandler(
-        log_file_path_fixed,
-        maxBytes=MAX_BYTES,
-        backupCount=BACKUP_COUNT,
-        encoding='utf-8'
-    )
-    
-    # ハンドラにはアプリケーションが使用する設定レベルを適用
-    file_handler.setLevel(log_level) 
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(levelname)s - %(module)s.%(funcName)s: %(message)s'
-    )
-    file_handler.setFormatter(file_formatter)
-    root_logger.addHandler(file_handler)
-    
-    # 2. コンソールハンドラの設定 (ターミナルに出力)
-    console_handler = logging.StreamHandler()
-    # ハンドラにもアプリケーションが使用する設定レベルを適用
-    console_handler.setLevel(log_level) 
-    console_formatter = logging.Formatter('%(levelname)s: %(message)s')
-    console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
-    
-    # 🚨 アプリケーション本体のロガーを取得し、設定レベルを適用
-    # このロガーを main_app.py で使用することで、DEBUGログが出力される
-    app_logger = logging.getLogger('AutoHzSwitcher') 
-    app_logger.setLevel(log_level) 
-    
-    logging.info("Logging initialized successfully with level: %s", logging.getLevelName(log_level))
-
-def get_settings_file_path():
-    """
-    ユーザー設定ファイル (hz_switcher_config.json) の絶対パスを返す。
-    場所: %LOCALAPPDATA%/AutoHzSwitcher/hz_switcher_config.json
-    """
-    # Windows の AppData\Local フォルダを取得
-    appdata_local = os.getenv('LOCALAPPDATA', os.path.expanduser('~'))
-    
-    # アプリケーション固有のディレクトリを作成 (例: C:\Users\User\AppData\Local\AutoHzSwitcher)
-    app_config_dir = os.path.join(appdata_local, 'AutoHzSwitcher')
-    os.makedirs(app_config_dir, exist_ok=True)
-    
-    # 設定ファイルパスを返す
-    return os.path.join(app_config_dir, 'hz_switcher_config.json')
 
 
 # ----------------------------------------------------------------------
@@ -215,28 +108,55 @@ class MainApplication:
     
     # -----------------------------------------------
 
+    # 設定画面表示中に StatusChannel から Tk 変数へ反映する間隔 (ミリ秒)
+    STATUS_DRAIN_INTERVAL_MS = 250
+    # 設定ファイルの外部変更 (管理者のスクリプトによる編集など) を確認する間隔 (ミリ秒)
+    CONFIG_POLL_INTERVAL_MS = 2000
+    # 制御チャネルのコマンドを Tk スレッドで実行する際の待ち時間の上限 (秒)
+    CONTROL_COMMAND_TIMEOUT_SECONDS = 10.0
+    # Windows のトレイツールチップの最大文字数 (終端文字を除く)
+    TRAY_TITLE_MAX_LENGTH = 127
+
     # (前提) main_app.py の冒頭で APP_LOGGER が定義されていること
     # APP_LOGGER = logging.getLogger('AutoHzSwitcher') 
-    def __init__(self):
+    def __init__(
+        self,
+        startup_registrar: Optional[StartupRegistrar] = None,
+        tray_factory: Optional[TrayFactory] = None,
+        config: Optional[LoadedConfig] = None,
+        control_address: Optional[str] = None,
+    ):
         
         # 🚨 DEBUG: 初期化開始を記録
         APP_LOGGER.debug("Application initialization started.")
         
         # -------------------------------------------------------------
         # ★★★ 修正箇所: ここを整理します ★★★
-        # main()関数でミューテックスオブジェクトが設定される場所
-        self.mutex = None 
+        # main()関数で多重起動防止ロックが設定される場所
+        self.instance_lock: Optional[InstanceLock] = None 
+        
+        # 💡 OS 依存機能 (省略時は Windows 向けの実装)
+        self.startup_registrar = startup_registrar if startup_registrar is not None else RegistryStartupRegistrar()
+        self._tray_factory = tray_factory if tray_factory is not None else PystrayTray
         # 🚨 修正: 二重終了フラグは不要になったため削除します
         # self.is_shutting_down = False
         # -------------------------------------------------------------
 
         # 🚨 修正: config_path に AppData のフルパスを設定する
-        self.config_path = get_settings_file_path()
+        # 💡 設定ファイルは起動時に 1 度だけ読み込み (ロギング設定と共有)、渡されなかった場合のみここで読み込む
+        if config is None:
+            config = load_config(get_settings_file_path())
+        self.config_path = config.path
+        config.report()
         
-        self.stop_event = Event()
-        self.current_rate: Optional[int] = None 
+        # 💡 設定ファイルへの書き込みは ConfigService がまとめて行う (遅延書き込み・変更検出・アトミックな置き換え)
+        self.config_service = ConfigService(self.config_path, settings=config.settings)
+        self.settings = self.config_service.settings
         
-        self.settings = self._load_settings()
+        # 🚨 修正: 監視・レート判定・クラッシュ復帰・ドリフト補正は MonitorEngine に集約する。
+        #          ステータスは engine.status_channel に公開され、変更時にトレイのツールチップへ反映される。
+        self.engine = MonitorEngine(self.settings, status_listener=self._on_status_published)
+        self.status_channel = self.engine.status_channel
         
         # -------------------------------------------------------------
         # 💥 修正 (V5/V6.1): 言語コードの動的決定とバリデーション
@@ -291,154 +211,62 @@ class MainApplication:
         self.gui_app_instance = None
         
         # 💡 初期値は画像を参考に 'Status: Initializing...' のまま
+        # 🚨 修正: 監視スレッドは Tk 変数に直接触れず、StatusChannel にのみ書き込む。
+        #          status_message (Tk 変数) は Tk スレッドの after() タイマーからのみ更新する。
         self.status_message = tk.StringVar(value="Status: Initializing...")
-        
-        self._last_status_message = ""
+        self._status_seen_by_gui = -1
+        self._status_seen_by_tray = -1
+        self._status_drain_job = None
         
         # _setup_tray_icon に渡す静的文字列がここで確定している (V3/V6.1)
         self._setup_tray_icon() # setup_trayを_setup_tray_iconにリネーム
 
-        # --------------------------------------------------------------------------------------
-        # 🚨 修正: current_rateの初期値設定を、実際のモニターレート取得に置き換える
-        # --------------------------------------------------------------------------------------
-        
-        APP_LOGGER.info("Performing initial active monitor rate check (This may take ~2 seconds)...")
-        initial_rate = self._get_active_monitor_rate() 
-        
-        # 🚨 DEBUG: 初期レート取得関数の結果を記録
-        APP_LOGGER.debug("Result from _get_active_monitor_rate: %s", initial_rate)
-        
-        default_low_rate = self.settings.get("default_low_rate", 60)
+        # 💥 修正: 初期化完了後のステータスを公開する (実レートはクラッシュ復帰処理がバックグラウンドで確定する)
+        APP_LOGGER.info("Provisional current_rate set to: %d Hz (confirmed by startup recovery).", self.current_rate)
+        self.engine.publish_initial_status()
 
-        # 実際のレートが取得できた場合はそれを使い、失敗した場合は設定の低レート(60)を使用
-        if initial_rate is not None:
-            self.current_rate = initial_rate
-        else:
-            self.current_rate = default_low_rate
-            # 🚨 修正: print() を APP_LOGGER.warning() に置き換え、メッセージを英語化
-            APP_LOGGER.warning(
-                "Failed to get active monitor rate at startup. Using default low rate (%d Hz) from settings.",
-                default_low_rate
-            )
-            
-        # 🚨 修正: print() を APP_LOGGER.info() に置き換え、メッセージを英語化
-        APP_LOGGER.info("Initial self.current_rate set to: %d Hz.", self.current_rate)
-        # --------------------------------------------------------------------------------------
-
-        # 監視スレッドの開始
+        # 監視スレッドの開始 (クラッシュ復帰判定を含め、バックグラウンドで実行され即座に戻る)
         self._start_monitoring_thread()
-        
-        # 🚨 DEBUG: 初期化完了を記録
-        APP_LOGGER.debug("Application initialization completed successfully.")
-        
-        # ----------------------------------------------------------------------
-        # 💥 修正: 初期化完了後のステータスを更新し、レート情報を追加する
-        # ----------------------------------------------------------------------
-        is_monitoring_enabled = self.settings.get("is_monitoring_enabled", True)
-        
-        # レート表示文字列の作成 (例: " (144 Hz)" または "")
-        if self.current_rate is not None:
-            current_rate_display = f" ({self.current_rate} Hz)" 
-        else:
-            current_rate_display = ""
 
-        # 監視ステータステキストの決定 (大文字固定)
-        if is_monitoring_enabled:
-            # 監視が有効な場合
-            new_status_text = "IDLE" 
-        else:
-            # 監視が無効な場合
-            new_status_text = "MONITORING DISABLED" 
+        # 💡 設定ファイルの外部変更の確認 (Tk スレッドのタイマーで os.stat() のみ。変更時は再読み込みして反映する)
+        self.config_service.add_reload_listener(self._on_config_reloaded)
+        self._config_poll_job = self.root.after(self.CONFIG_POLL_INTERVAL_MS, self._poll_config_file)
+
+        # 💡 ローカルの制御チャネル (2 つ目のインスタンス・スクリプトからの操作)。待ち受けは run() で開始する
+        self.control_server = ControlServer(
+            {
+                "status": self._cmd_status,
+                "open_settings": self._cmd_open_settings,
+                "set_monitoring": self._cmd_set_monitoring,
+                "toggle_monitoring": lambda args: self._cmd_set_monitoring({}),
+                "force_rate": self._cmd_force_rate,
+                "reload_config": self._cmd_reload_config,
+                "set_log_level": self._cmd_set_log_level,
+                "shutdown": self._cmd_shutdown,
+            },
+            address=control_address,
+        )
 
-        # 最終的な表示文字列の構築 (例: "Status: MONITORING DISABLED (59 Hz)")
-        # 💡 'Status: ' のプレフィックスは画像に合わせて Title Case で固定
-        new_status_value = f"Status: {new_status_text}"
+        # 💡 メトリクスの出力 (任意。設定の 'metrics_port' / 'metrics_textfile' で有効化する)。開始は run() で行う
+        self.metrics_exporter: Optional[MetricsExporter] = None
         
-        self.status_message.set(new_status_value)
-        APP_LOGGER.info("Initial operational status set to: %s", new_status_value)
-        # ----------------------------------------------------------------------
+        # 🚨 DEBUG: 初期化完了を記録
+        APP_LOGGER.debug("Application initialization completed successfully.")
     
     def _load_available_languages(self) -> Dict[str, str]:
         """使用可能な言語とその表示名を外部ファイル (languages.json) からロードします。"""
         
-        # --- ★★★ 修正箇所 ★★★ ---
-        # 💥 修正: lang/ フォルダを追加
-        languages_file_path = _get_resource_path("lang/languages.json") 
-        # --------------------------
-        
-        if os.path.exists(languages_file_path):
-            try:
-                with open(languages_file_path, 'r', encoding='utf-8') as f:
-                    APP_LOGGER.debug("Loading available languages from: %s", languages_file_path)
-                    return json.load(f)
-            except Exception as e:
-                APP_LOGGER.error("Failed to load languages.json: %s", e)
-        
-        # 失敗時/ファイルが存在しない場合のフォールバック (これは残しておく)
-        APP_LOGGER.warning("languages.json not found or failed to load. Using hardcoded default.")
-        return {
-            "ja": "Japanese",
-            "en": "English"
-        }
+        # 💡 翻訳カタログ (hz_core.i18n) が 1 度だけ読み込む。失敗時は {"ja", "en"} にフォールバックする
+        return get_translation_catalog().available_languages()
     
     # --- 設定管理メソッド ---
     def _get_default_settings(self) -> Dict[str, Any]:
         """デフォルト設定を返します。（複数ゲーム対応）"""
-        return {
-            "selected_monitor_id": "",
-            "target_resolution": "",
-            "is_monitoring_enabled": False,
-            "default_low_rate": 60,
-            "use_global_high_rate": False, 
-            "global_high_rate": 144,      
-            "language": "English", # 🚨 修正: 言語コードを追加
-            "games": [] 
-        }
-
-    # (前提) main_app.py の冒頭で APP_LOGGER が定義されていること
-    # APP_LOGGER = logging.getLogger('AutoHzSwitcher') 
+        return get_default_settings()
 
     def _load_settings(self) -> Dict[str, Any]:
         """Load the configuration file, returning default settings if it does not exist or fails to load."""
-        
-        # 🚨 DEBUG: 関数開始を記録
-        APP_LOGGER.debug("Starting to load application settings from: %s", self.config_path)
-
-        default_settings = self._get_default_settings()
-        
-        if os.path.exists(self.config_path):
-            # 🚨 INFO: 設定ファイルが見つかったことを記録
-            APP_LOGGER.info("Configuration file found at: %s. Attempting to load.", self.config_path)
-            try:
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    loaded_settings = json.load(f)
-                    settings = {**default_settings, **loaded_settings}
-                    
-                    # 古い設定構造からの移行ロジック
-                    if 'target_process_name' in loaded_settings and not loaded_settings.get('games'):
-                        # 🚨 修正: print() を APP_LOGGER.info() に置き換え、メッセージを英語化
-                        APP_LOGGER.info("Detected old configuration structure. Converting to new 'games' list format.")
-                        
-                        new_game_entry = {
-                            "name": loaded_settings.get("target_process_name", "Game 1"),
-                            "process_name": loaded_settings["target_process_name"],
-                            "high_rate": loaded_settings.get("high_rate", 144),
-                            "low_rate_on_exit": loaded_settings.get("low_rate", 60),
-                            "is_enabled": True
-                        }
-                        settings['games'].append(new_game_entry)
-                        
-                    # 🚨 INFO: 正常終了を記録
-                    APP_LOGGER.info("Settings successfully loaded and merged with defaults.")
-                    return settings
-            except json.JSONDecodeError:
-                # 🚨 修正: print() を APP_LOGGER.error() に置き換え、メッセージを英語化
-                APP_LOGGER.error("Failed to decode JSON from configuration file '%s'. Using default settings.", self.config_path)
-                return default_settings
-        else:
-            # 🚨 INFO: 設定ファイルが見つからないことを記録
-            APP_LOGGER.info("Configuration file '%s' not found. Using default settings.", self.config_path)
-            return default_settings
+        return load_settings(self.config_path)
 
     def save_settings(self, new_settings: dict):
         """Save the settings to the configuration file and update instance variables."""
@@ -449,6 +277,9 @@ class MainApplication:
         # 既存の設定を新しい設定で更新する
         self.settings.update(new_settings) 
         
+        # ゲーム/レート設定が変わった可能性があるため、監視エンジンへ反映する (ルールインデックスの再構築など)
+        self.engine.apply_settings()
+        
         # 🚨 修正箇所: languageキーではなく、language_codeキーを参照する
         # self.language_code には、常に 'ja' または 'en' のコードが入るようにする
         self.language_code = self.settings.get('language_code', 'en')
@@ -457,491 +288,13 @@ class MainApplication:
         # ログメッセージも、language_codeを正しく表示するように修正
         APP_LOGGER.info("Attempting to save configuration to '%s'. Language code set to: %s", self.config_path, self.language_code)
 
-        try:
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, indent=4)
-                
-            APP_LOGGER.info("Settings successfully saved to: %s", self.config_path)
-            
-            # ----------------------------------------------------------------------
-            # 🚨 修正 E: この行を削除/コメントアウトします。（元のコードの指示通り）
-            # self.current_rate = self.settings.get("default_low_rate", 60) 
-            # ----------------------------------------------------------------------
-            
-        except IOError as e:
-            APP_LOGGER.error("Failed to write configuration file '%s': %s", self.config_path, e)
+        # 🚨 修正: 即座に書き込まず、短時間の保存要求をまとめてアトミックに書き込む (内容が同じなら書き込まない)
+        self.config_service.save()
 
         # 🚨 DEBUG: 関数終了を記録
         APP_LOGGER.debug("save_settings execution completed.")
             
 
-    def _get_running_process_names(self) -> set:
-        """
-        Retrieves all currently running process names from the switcher_utility.
-        (Uses the lightweight get_running_processes_simple)
-        """
-        # 🚨 DEBUG: 関数開始を記録
-        #APP_LOGGER.debug("Attempting to retrieve running process names.")
-        
-        process_names = set()
-        try:
-            # 💡 修正: 軽量版の関数を呼び出す
-            running_processes_simple = get_running_processes_simple() 
-            
-            # 軽量版の戻り値は List[Dict[str, str]] で、各辞書が {'name': '...', 'path': '...'} を持つ
-            for proc in running_processes_simple:
-                process_names.add(proc.get('name'))
-                
-            # 🚨 DEBUG: 取得したプロセス名の数を記録
-            #APP_LOGGER.debug("Successfully retrieved %d running process names.", len(process_names))
-            
-            return process_names
-            
-        except Exception as e:
-            # 🚨 修正: print() を APP_LOGGER.error() に置き換え、メッセージを英語化し、例外を記録
-            APP_LOGGER.error("Failed to retrieve process names: %s", e)
-            # エラー時も空のセットを返せば、監視ループが停止することはない
-            return set()
-
-    def _start_monitoring_thread(self):
-        """
-        Performs initialization before starting the monitoring thread, 
-        including crash recovery rate checks and forced rate changes.
-        """
-        # 🚨 DEBUG: 関数開始を記録
-        APP_LOGGER.debug("Starting pre-monitoring thread initialization (crash recovery logic).")
-        
-        # 0. 初期設定値の取得
-        default_low_rate = self.settings.get("default_low_rate", 60)
-        
-        # 1. 現在の実レートを取得
-        active_rate = self._get_active_monitor_rate() 
-        
-        # 🚨 DEBUG: 取得した実レートと設定の低レートを記録
-        APP_LOGGER.debug(
-            "Initial active rate detected: %s Hz. Default low rate: %d Hz.", 
-            active_rate, 
-            default_low_rate
-        )
-        
-        # ----------------------------------------------------------------------
-        # 🚨 プロセスチェックの実行とエラーハンドリング
-        # ----------------------------------------------------------------------
-        is_any_game_running_now = False
-        try:
-            is_any_game_running_now = self._check_for_running_games() 
-            # 🚨 DEBUG: ゲーム実行状況を記録
-            APP_LOGGER.debug("Result of _check_for_running_games: %s", is_any_game_running_now)
-            
-        except Exception as e:
-            # 🚨 修正: print() を APP_LOGGER.error() に置き換え、メッセージを英語化
-            APP_LOGGER.error(
-                "Fatal process check error occurred. Skipping forced recovery logic: %s", 
-                e
-            )
-            # エラー時、強制復帰をスキップするため is_any_game_running_now を True に設定するロジックは維持
-            is_any_game_running_now = True 
-            
-        # ----------------------------------------------------------------------
-        # 2. 強制終了・クラッシュからの復帰ロジックの判定
-        # ----------------------------------------------------------------------
-        
-        is_high_rate_stuck = False
-        
-        if active_rate is not None:
-            is_at_low_rate_range = (
-                active_rate == default_low_rate or 
-                active_rate == (default_low_rate - 1)
-            )
-            
-            # 高レートだがゲームは動いていない状態を「スタック」と判定
-            if not is_at_low_rate_range and not is_any_game_running_now:
-                is_high_rate_stuck = True
-        
-        # 🚨 DEBUG: スタック判定の結果を記録
-        APP_LOGGER.debug("is_high_rate_stuck calculated as: %s", is_high_rate_stuck)
-        
-        # 3. 復帰処理の実行と self.current_rate の設定
-        
-        if is_high_rate_stuck:
-            
-            # 🚨 修正: print() を APP_LOGGER.info() に置き換え、メッセージを英語化
-            APP_LOGGER.info(
-                "Detected crash/reboot recovery scenario. Monitor is stuck at %d Hz. Attempting forced return.",
-                active_rate
-            )
-            
-            # 強制的に低レートへ変更を試行
-            final_rate = self._enforce_rate(default_low_rate)
-
-            if final_rate is not None:
-                self.current_rate = final_rate
-                # 🚨 修正: print() を APP_LOGGER.info() に置き換え
-                APP_LOGGER.info(
-                    "Crash recovery successful. Current rate set to %d Hz.", 
-                    final_rate
-                )
-            else:
-                # 失敗した場合、監視スレッドに委ねる
-                self.current_rate = default_low_rate
-                # 🚨 修正: print() を APP_LOGGER.error() に置き換え
-                APP_LOGGER.error(
-                    "Crash recovery failed. Initial current_rate set to default low rate (%d Hz).",
-                    default_low_rate
-                )
-            
-        elif active_rate is not None:
-            # 正常な起動時 (ゲーム実行中を含む) の初期化
-            self.current_rate = active_rate 
-            # 🚨 修正: print() を APP_LOGGER.info() に置き換え
-            APP_LOGGER.info(
-                "Normal startup initialization. Active rate set to %d Hz.", 
-                active_rate
-            )
-        
-        else:
-            # active_rate が None の場合 (レート取得失敗時)
-            self.current_rate = default_low_rate
-            # 🚨 修正: print() を APP_LOGGER.warning() に置き換え
-            APP_LOGGER.warning(
-                "Initial rate acquisition failed. Current rate set to default %d Hz.",
-                default_low_rate
-            )
-
-        # ----------------------------------------------------------------------
-        # 4. GUIの初期化と監視スレッドの起動
-        # ----------------------------------------------------------------------
-        
-        # GUIステータスを初期化... (既存ロジックはそのまま)
-        
-        # 監視スレッドの起動
-        if not hasattr(self, 'monitoring_thread') or not self.monitoring_thread.is_alive():
-            import threading
-            self.monitoring_thread = threading.Thread(target=self._monitoring_loop)
-            self.monitoring_thread.daemon = True
-            self.monitoring_thread.start()
-            # 🚨 修正: print() を APP_LOGGER.info() に置き換え
-            APP_LOGGER.info("Monitoring thread started.")
-            
-        # 🚨 DEBUG: 関数終了を記録
-        APP_LOGGER.debug("Pre-monitoring thread initialization completed.")
-
-
-    def _monitoring_loop(self):
-        """
-        Continuously monitors configured processes and applies the highest required refresh rate.
-        Reflects the current status in self.status_message.
-        """
-        # 🚨 DEBUG: 監視ループの開始を記録
-        APP_LOGGER.debug("Monitoring loop started.")
-        
-        while not self.stop_event.is_set(): 
-            
-            is_monitoring_enabled = self.settings.get("is_monitoring_enabled", False)
-            
-            # 1. 監視OFF時の処理
-            if not is_monitoring_enabled:
-                # 🚨 INFO: 監視が停止していることを一度だけログに記録 (ノイズ防止のため)
-                if self._last_status_message != "Monitoring Disabled":
-                    APP_LOGGER.info("Monitoring is currently disabled by user settings. Sleeping...")
-                    self._last_status_message = "Monitoring Disabled"
-                
-                time.sleep(1)
-                continue
-            
-            # 監視再開時（_last_status_messageがDisabledだった場合）のINFOログ
-            if self._last_status_message == "Monitoring Disabled":
-                APP_LOGGER.info("Monitoring re-enabled. Resuming scan.")
-                self._last_status_message = ""
-                
-            
-            global_high_rate_value = self.settings.get("global_high_rate", 144)
-            use_global_high_rate = self.settings.get("use_global_high_rate", False)
-            default_low_rate = self.settings.get("default_low_rate", 60)
-            
-            running_processes = self._get_running_process_names()
-            
-            # 🚨 DEBUG: 検出された実行中プロセスを記録
-            #APP_LOGGER.debug("Running processes detected: %s", running_processes)
-            
-            highest_required_rate = default_low_rate 
-            is_any_game_running = False
-            
-            current_log_message = "" 
-            current_status_tag = "IDLE" 
-            current_game_name = None 
-            
-            # 2. 実行中のゲームと必要な最高レートを特定
-            for game in self.settings.get("games", []):
-                if not game.get("is_enabled", False):
-                    continue
-                
-                process_name = game.get("process_name")
-                high_rate = game.get("high_rate", 144)
-                
-                if process_name and process_name in running_processes:
-                    is_any_game_running = True
-                    
-                    if use_global_high_rate:
-                        highest_required_rate = global_high_rate_value
-                        current_game_name = "Global High Rate"
-                        
-                        # 🚨 修正: 日本語のログメッセージを英語に変換
-                        current_log_message = f"Applying Global High Rate ({global_high_rate_value}Hz)."
-                        
-                        current_status_tag = f"Global High"
-                        break 
-                        
-                    if high_rate > highest_required_rate:
-                        highest_required_rate = high_rate
-                        current_game_name = game.get('name', process_name)
-                        
-                        # 🚨 修正: 日本語のログメッセージを英語に変換
-                        current_log_message = f"High rate game ({current_game_name}) is running. Applying specific rate ({highest_required_rate}Hz)."
-                        
-                        current_status_tag = f"Game: {current_game_name}"
-
-            # 🚨 DEBUG: 実行中のゲーム処理結果を記録
-            #APP_LOGGER.debug(
-            #    "Scan complete. Game running: %s, Highest required rate: %d Hz.",
-            #    is_any_game_running,
-            #    highest_required_rate
-            #)
-
-            # 3. ターゲットレートを決定し、レート変更を実行
-            target_rate = None
-            
-            # 低レートであると判定する許容範囲のチェック (59 Hz を許容し、不必要な 60 Hz への切り替えを防ぐ)
-            is_at_low_rate = (
-                self.current_rate == default_low_rate or 
-                self.current_rate == (default_low_rate - 1)
-            )
-            
-            if is_any_game_running:
-                # ゲーム実行中: 高レートへの切り替えが必要か？
-                if highest_required_rate != self.current_rate: 
-                    target_rate = highest_required_rate
-                    # 🚨 修正: print() を APP_LOGGER.info() に置き換え、メッセージを英語化
-                    APP_LOGGER.info(
-                        "High rate game (%s) running. Switching rate to %d Hz.", 
-                        current_game_name, target_rate
-                    )
-                
-                elif current_log_message and self._last_status_message != current_log_message:
-                    # 🚨 修正: print() を APP_LOGGER.info() に置き換え、既に高レートにいるがステータスが変わった場合を記録
-                    APP_LOGGER.info(current_log_message)
-                    self._last_status_message = current_log_message
-                
-            elif not is_any_game_running and not is_at_low_rate:
-                # ゲーム実行なし、かつ現在のレートが (60Hz または 59Hz) ではない場合 (高レートからの復帰が必要)
-                target_rate = default_low_rate
-                current_status_tag = "Returning to IDLE" 
-                # 🚨 修正: print() を APP_LOGGER.info() に置き換え、メッセージを英語化
-                APP_LOGGER.info(
-                    "All games exited. Returning to default low rate (%d Hz).", 
-                    target_rate
-                )
-                self._last_status_message = "" 
-                
-            elif not is_any_game_running and is_at_low_rate:
-                # ゲーム実行なし、かつ既に低レートにいる場合 (59Hz/60Hzで安定待機)
-                current_status_tag = "IDLE"
-                self._last_status_message = "" 
-                pass
-                
-            
-            # 3.1 レート変更の実行
-            if target_rate is not None:
-                # 既に設定されているレートと同じ場合は、処理をスキップ (点滅バグ解消)
-                if self.current_rate == target_rate: 
-                    # 🚨 DEBUG: スキップ理由を明確に記録
-                    APP_LOGGER.debug(
-                        "Rate change skipped: Target rate %d Hz already matches current internal rate %d Hz.",
-                        target_rate, self.current_rate
-                    )
-                    continue 
-                
-                # 🚨 修正: _enforce_rate を呼び出し、戻り値 (int or None) を受け取る
-                final_rate = self._enforce_rate(target_rate)
-                
-                # 🚨 INFO: レート変更の試行結果を記録
-                APP_LOGGER.info("Rate change attempt to %d Hz completed. Final OS rate: %s", target_rate, final_rate)
-                
-                # 🚨 修正: final_rate が None でない場合 (変更成功) のみ処理を続行
-                if final_rate is not None:
-                    # レート変更が成功したら、OSから取得した実際のレートで内部期待値を更新
-                    self.current_rate = final_rate 
-                    
-                    if is_any_game_running:
-                        self._last_status_message = current_log_message
-                    else:
-                        self._last_status_message = ""
-                        
-                    # レート変更が成功したため、current_status_tagを更新
-                    if target_rate == default_low_rate:
-                        current_status_tag = "IDLE"
-                    elif use_global_high_rate and target_rate == global_high_rate_value:
-                        current_status_tag = f"Global High" 
-                    elif is_any_game_running and current_game_name:
-                        current_status_tag = f"Game: {current_game_name}"
-                else:
-                    # 🚨 ERROR: レート変更失敗を記録
-                    APP_LOGGER.error("Rate change failed for target %d Hz. Internal state (current_rate) remains %d Hz.", target_rate, self.current_rate)
-
-            
-            # 4. 毎ループ、GUIのステータス表示を更新 
-            if self.gui_app_instance:
-                
-                # 🚨 DEBUG: GUI更新の前にステータス変数を記録
-                #APP_LOGGER.debug(
-                #    "GUI update check. Status Tag: %s, Current Rate: %d Hz.", 
-                #    current_status_tag, self.current_rate
-                #)
-
-                # 🚨 修正 (表示の安定化): display_rate は常に self.current_rate (内部期待値) を使用
-                display_rate = self.current_rate 
-                
-                is_idle_rate = (
-                    display_rate == default_low_rate or 
-                    display_rate == (default_low_rate - 1)
-                )
-
-                if is_any_game_running:
-                    # ゲーム実行中のステータスはそのまま 
-                    pass 
-                else: 
-                    # ゲームが動いていない場合は、表示レートに関わらずIDLEタグを使用
-                    current_status_tag = "IDLE" 
-
-                # 最終的なステータスメッセージを設定
-                new_status_message = f"Status: {current_status_tag} ({display_rate} Hz)"
-                
-                # メッセージが変更されたときのみ更新を実行
-                if self.status_message.get() != new_status_message:
-                    self.status_message.set(new_status_message)
-                    # 🚨 修正: print() を APP_LOGGER.debug() に置き換え、メッセージを英語化
-                    APP_LOGGER.debug("GUI Status Updated to: %s", new_status_message)
-            
-            # 5. 監視間隔の待機
-            time.sleep(1) 
-            
-        # 🚨 修正: print() を APP_LOGGER.info() に置き換え、メッセージを英語化
-        APP_LOGGER.info("Process monitoring loop stopped.")
-
-# ---------------------------------------------------------------------------------
-
-    def _switch_rate(self, target_rate: int) -> bool:
-        """
-        レート変更を実行し、成功した場合に self.current_rate を更新します。
-        """
-        if self._enforce_rate(target_rate):
-            self.current_rate = target_rate
-            return True
-        return False 
-
-    
-    def _enforce_rate(self, target_rate: int) -> Optional[int]:
-        """
-        Forcibly applies the specified rate, including retry logic.
-        Returns the confirmed active rate upon success, or None on failure.
-        """
-        # 🚨 DEBUG: 関数開始を記録
-        APP_LOGGER.debug("Attempting to enforce rate change. Target rate: %d Hz.", target_rate)
-
-        MAX_RETRIES = 3
-        RETRY_DELAY = 1.0
-
-        monitor_id = self.settings.get("selected_monitor_id")
-        resolution = self.settings.get("target_resolution")
-        
-        if not monitor_id or not resolution:
-            # 🚨 修正: print() を APP_LOGGER.error() に置き換え、メッセージを英語化
-            APP_LOGGER.error(
-                "Monitor ID (%s) or Resolution (%s) not set. Cannot change rate to %d Hz.", 
-                monitor_id, resolution, target_rate
-            )
-            return None
-        
-        try:
-            width, height = map(int, resolution.split('x'))
-        except ValueError:
-            # 🚨 修正: print() を APP_LOGGER.error() に置き換え、メッセージを英語化
-            APP_LOGGER.error("Invalid resolution format: %s. Cannot change rate.", resolution)
-            return None
-            
-        # 🚨 INFO: 試行する設定を記録
-        APP_LOGGER.info(
-            "Starting rate change attempt for Monitor ID %s: %dx%d @ %d Hz.", 
-            monitor_id, width, height, target_rate
-        )
-            
-        # 再試行ループの導入
-        for attempt in range(1, MAX_RETRIES + 1):
-            
-            # 🚨 修正: print() を APP_LOGGER.info() に置き換え、メッセージを英語化
-            APP_LOGGER.info(
-                "Attempting to change rate to %d Hz (Attempt %d/%d).", 
-                target_rate, attempt, MAX_RETRIES
-            )
-            
-            command_str = f"\"ResolutionSwitcher\" --monitor {monitor_id} --width {width} --height {height} --refresh {target_rate}"
-            # 🚨 修正: print() を APP_LOGGER.debug() に置き換え (デバッグ用)
-            APP_LOGGER.debug("Executing command: %s", command_str)
-            
-            # change_rate は switcher_utility からインポートされていることを前提とします。
-            success = change_rate(target_rate, width, height, monitor_id)
-            
-            if success:
-                # 🚨 修正: print() を APP_LOGGER.info() に置き換え、メッセージを英語化
-                APP_LOGGER.info(
-                    "Monitor %s successfully changed to %d Hz on attempt %d. Confirming actual rate...", 
-                    monitor_id, target_rate, attempt
-                )
-                
-                # ----------------------------------------------------------------------
-                # 成功した直後に、OSが実際に設定したレートを取得し直す
-                # ----------------------------------------------------------------------
-                actual_rate = self._get_active_monitor_rate() 
-                
-                if actual_rate is not None:
-                    # 🚨 修正: print() を APP_LOGGER.info() に置き換え
-                    APP_LOGGER.info("OS reported final rate as %d Hz. Operation successful.", actual_rate)
-                    return actual_rate # OSが設定した実際のレートを返す
-                else:
-                    # リアルレート取得に失敗した場合でも、目標レートをフォールバックとして返す
-                    # 🚨 修正: print() を APP_LOGGER.warning() に置き換え
-                    APP_LOGGER.warning(
-                        "Failed to confirm actual rate after change. Assuming target rate %d Hz.",
-                        target_rate
-                    )
-                    return target_rate
-                # ----------------------------------------------------------------------
-                
-            
-            # 失敗した場合の処理
-            # 🚨 修正: print() を APP_LOGGER.warning() に置き換え、メッセージを英語化
-            APP_LOGGER.warning(
-                "Failed to change rate to %d Hz on attempt %d. Retrying.", 
-                target_rate, attempt
-            )
-            
-            if attempt < MAX_RETRIES:
-                # 最終試行でなければ、待機して再試行
-                # 🚨 修正: print() を APP_LOGGER.debug() に置き換え (待機は頻繁に起こるため)
-                APP_LOGGER.debug("Waiting for %.1f seconds before next retry...", RETRY_DELAY)
-                time.sleep(RETRY_DELAY)
-            
-        # 全ての再試行が失敗した場合
-        # 🚨 修正: print() を APP_LOGGER.error() に置き換え
-        APP_LOGGER.error(
-            "Rate change to %d Hz failed after %d attempts. Critical failure.", 
-            target_rate, MAX_RETRIES
-        )
-        
-        # 致命的なエラーとして、GUIやトレイアイコンに通知することを検討 (ここはロジック変更なし)
-        
-        return None # 全ての試行が失敗
-
     # --- トレイとGUI管理メソッド ---
     
     def _get_tray_menu_items(self):
@@ -976,6 +329,13 @@ class MainApplication:
                 self.toggle_monitoring
             ),
             pystray.Menu.SEPARATOR,
+
+            # 💡 ログレベル (実行中に変更する。再起動せずに現場の問題を調べるため)
+            pystray.MenuItem(
+                self.lang.get('menu_log_level', 'Log Level'),
+                self._get_log_level_menu()
+            ),
+            pystray.Menu.SEPARATOR,
             
             # 3. 終了（静的変数を使わず、毎回 self.lang から取得）
             pystray.MenuItem(
@@ -984,6 +344,43 @@ class MainApplication:
             )
         )
 
+    def _get_log_level_menu(self):
+        """トレイの「ログレベル」サブメニュー (全体のレベルと、サブシステムごとの DEBUG の切り替え)。"""
+
+        def global_level_item(level: str):
+            return pystray.MenuItem(
+                level,
+                lambda icon, item: self.change_log_level(level),
+                checked=lambda item: get_log_levels()["global"] == level,
+                radio=True
+            )
+
+        def subsystem_debug_item(subsystem: str):
+            # 有効な場合は解除し、全体のレベルに従う状態に戻す
+            return pystray.MenuItem(
+                f"DEBUG: {subsystem}",
+                lambda icon, item: self.change_log_level(
+                    None if get_log_levels()[subsystem] == "DEBUG" else "DEBUG", subsystem
+                ),
+                checked=lambda item: get_log_levels()[subsystem] == "DEBUG"
+            )
+
+        return pystray.Menu(
+            *[global_level_item(level) for level in ("DEBUG", "INFO", "WARNING", "ERROR")],
+            pystray.Menu.SEPARATOR,
+            *[subsystem_debug_item(subsystem) for subsystem in LOG_SUBSYSTEMS]
+        )
+
+    def change_log_level(self, level: Optional[str], subsystem: Optional[str] = None) -> Dict[str, Any]:
+        """
+        ログレベルを実行中に変更します (トレイメニュー・制御チャネルから呼ばれる)。
+        💡 設定ファイルには保存しない (調査用の一時的な変更のため。再起動すると設定の値に戻る)。
+        """
+        levels = set_log_level(level, subsystem)
+        if hasattr(self, 'icon'):
+            self.icon.update_menu()
+        return levels
+
     def _setup_tray_icon(self):
         """Sets up the system tray icon and menu."""
         # 🚨 DEBUG: 関数開始を記録
@@ -1022,11 +419,11 @@ class MainApplication:
         
         menu = self._get_tray_menu_items()
         
-        self.icon = pystray.Icon("AutoHzSwitcher", 
-                                 image, 
-                                 "Auto Hz Switcher", 
-                                 menu,
-                                 action=self.open_gui)
+        self.icon = self._tray_factory("AutoHzSwitcher", 
+                                       image, 
+                                       "Auto Hz Switcher", 
+                                       menu,
+                                       self.open_gui)
         
         # ★★★ ここに追加 ★★★
         if hasattr(self, 'icon'):
@@ -1097,16 +494,12 @@ class MainApplication:
             # 🚨 DEBUG: メニューオブジェクトの置き換えを記録
             APP_LOGGER.debug("Tray menu object replaced with new language items.")
             
-            try:
-                # アイコンのタイトルを更新
-                tray_title = self.lang.get('tray_title', 'Auto Hz Switcher')
-                self.icon.title = tray_title
-                
-                # 強制更新の専用メソッドは公開されていないため、ここではメニューを置き換えるのみとします。
-                
-            except Exception as e:
-                # 🚨 修正: print() を APP_LOGGER.warning() に置き換え、メッセージを英語化し、例外を記録
-                APP_LOGGER.warning("Failed to update pystray icon title: %s.", e)
+            # アイコンのタイトル (ツールチップ) を新しい言語で作り直す
+            # 💡 既読 seq をリセットし、StatusChannel の最新レコードで強制的に再描画させる
+            self._status_seen_by_tray = -1
+            self._sync_tray_title()
+            
+            # 強制更新の専用メソッドは公開されていないため、ここではメニューを置き換えるのみとします。
                 
             # 🚨 修正: print() を APP_LOGGER.info() に置き換え、メッセージを英語化
             APP_LOGGER.info(
@@ -1148,6 +541,11 @@ class MainApplication:
         
         # pystrayアイコン実行スレッドの開始
         Thread(target=self.icon.run, daemon=True).start()
+
+        # 制御チャネルの待ち受け開始 (ヘッドレス版など、別のインスタンスが使用中の場合は待ち受けずに続行)
+        if not self.control_server.start():
+            APP_LOGGER.warning("Control channel is in use by another process. Remote commands are unavailable.")
+        self._restart_metrics_exporter()
         
         # 🚨 修正: print() を APP_LOGGER.info() に置き換え、メッセージを英語化
         APP_LOGGER.info("Application running in system tray. Starting main GUI loop.")
@@ -1184,11 +582,18 @@ class MainApplication:
             if hasattr(self, 'gui_app_instance') and hasattr(self.gui_app_instance, '_update_monitoring_state_from_settings'):
                 self.gui_app_instance._update_monitoring_state_from_settings()
             
+            # ウィンドウ表示中のみ StatusChannel の読み出しタイマーを回す
+            self._start_status_drain()
             return
 
-        # ウィンドウが存在しない場合（初回表示時）
+        # ウィンドウが存在しない場合（初回表示時、または teardown 後の再表示時）
+        # 💡 GUIモジュール (ttk スタイル、画像、フォント) は初回表示時にのみ読み込む
+        opened_at = time.perf_counter()
+        from main_gui import HzSwitcherApp
+        
         self.gui_window = tk.Toplevel(self.root)
         self.gui_app_instance = HzSwitcherApp(self.gui_window, self)
+        APP_LOGGER.info("Settings window built in %.3f seconds.", time.perf_counter() - opened_at)
         
         # --- 🚨 新規ウィンドウ生成時にも最前面化処理を追加（最確実な対策） ---
         self.gui_window.lift() 
@@ -1200,6 +605,155 @@ class MainApplication:
         self.gui_window.focus_force() 
         # ------------------------------------------------------------------
 
+        # ウィンドウ表示中のみ StatusChannel の読み出しタイマーを回す
+        self._start_status_drain()
+
+    def on_gui_closed(self):
+        """
+        [Tk スレッド] 設定画面が閉じられた (非表示にされた) ときに HzSwitcherApp から呼び出されます。
+        gui_close_mode が "teardown" の場合、ウィンドウを破棄して Tk リソースとメモリを解放します。
+        """
+        if self.settings.get("gui_close_mode", "hide") != "teardown":
+            APP_LOGGER.debug("Settings window hidden. Keeping it built for the next open.")
+            return
+        
+        # 閉じるボタンのイベント処理中に自身を破棄しないよう、次のアイドル時に実行する
+        self.root.after_idle(self._teardown_gui)
+
+    def _teardown_gui(self):
+        """[Tk スレッド] 設定画面を破棄し、GC を実行して常駐メモリを起動直後の水準に戻します。"""
+        # 再表示されていた場合は破棄しない
+        try:
+            if self.gui_window and self.gui_window.winfo_exists() and self.gui_window.state() != 'withdrawn':
+                return
+        except tk.TclError:
+            pass
+        
+        if self._status_drain_job is not None:
+            try:
+                self.root.after_cancel(self._status_drain_job)
+            except tk.TclError:
+                pass
+            self._status_drain_job = None
+        
+        if self.gui_window is not None:
+            try:
+                self.gui_window.destroy()
+            except tk.TclError as e:
+                APP_LOGGER.warning("Failed to destroy settings window: %s", e)
+        
+        self.gui_window = None
+        self.gui_app_instance = None
+        # 次回表示時に最新のステータスを必ず反映させる
+        self._status_seen_by_gui = -1
+        
+        collected = gc.collect()
+        APP_LOGGER.info("Settings window torn down. GC collected %d objects.", collected)
+
+    # --- ステータス公開 (StatusChannel) ---
+
+    @property
+    def current_rate(self) -> Optional[int]:
+        """監視エンジンが保持する内部期待レート。"""
+        return self.engine.current_rate
+
+    def _publish_status(self, text: str, rate: Optional[int] = None) -> bool:
+        """
+        Publishes a status record to the StatusChannel. Safe to call from any thread.
+        Tk variables are never touched here; the tray tooltip is refreshed only when the record changed.
+        """
+        return self.engine.publish_status(text, rate)
+
+    def _on_status_published(self, record: StatusRecord):
+        """[任意のスレッド] MonitorEngine が新しいステータスを公開したときに呼び出されます。"""
+        self._sync_tray_title()
+
+    def _sync_tray_title(self):
+        """StatusChannel の最新レコードをトレイのツールチップに反映します。(pystray は任意のスレッドから更新可能)"""
+        record = self.status_channel.poll(self._status_seen_by_tray)
+        if record is None or not hasattr(self, 'icon'):
+            return
+        
+        self._status_seen_by_tray = record.seq
+        tray_title = f"{self.lang.get('tray_title', 'Auto Hz Switcher')}\n{record.text}"
+        
+        try:
+            self.icon.title = tray_title[:self.TRAY_TITLE_MAX_LENGTH]
+        except Exception as e:
+            APP_LOGGER.warning("Failed to update pystray icon title: %s.", e)
+
+    def _start_status_drain(self):
+        """[Tk スレッド] 設定画面の表示に合わせて、StatusChannel の読み出しタイマーを開始します。"""
+        if self._status_drain_job is None:
+            self._drain_status_channel()
+
+    def _drain_status_channel(self):
+        """
+        [Tk スレッド] StatusChannel に新しいレコードがあれば Tk 変数へ反映し、タイマーを再設定します。
+        設定画面が非表示 (withdrawn) または破棄済みの場合はタイマーを停止します。
+        """
+        self._status_drain_job = None
+        
+        try:
+            is_visible = bool(
+                self.gui_window and self.gui_window.winfo_exists() and self.gui_window.state() != 'withdrawn'
+            )
+        except tk.TclError:
+            is_visible = False
+        
+        if not is_visible:
+            APP_LOGGER.debug("Settings window is hidden. Status drain timer paused.")
+            return
+        
+        record = self.status_channel.poll(self._status_seen_by_gui)
+        if record is not None:
+            self._status_seen_by_gui = record.seq
+            self.status_message.set(record.text)
+        
+        self._status_drain_job = self.root.after(self.STATUS_DRAIN_INTERVAL_MS, self._drain_status_channel)
+
+    def _poll_config_file(self):
+        """[Tk スレッド] 設定ファイルの外部変更を確認し、タイマーを再設定します。"""
+        try:
+            self.config_service.check_for_changes()
+        except Exception as e:
+            APP_LOGGER.error("Failed to check the configuration file for changes: %s", e)
+        self._config_poll_job = self.root.after(self.CONFIG_POLL_INTERVAL_MS, self._poll_config_file)
+
+    def _on_config_reloaded(self, changed_keys):
+        """
+        [Tk スレッド] 外部で編集された設定が settings に反映された後に呼ばれます。
+        監視ロジック・トレイ・設定画面を新しい設定に合わせます。
+        実行中のゲームのセッションは中断しない (レートは次の監視 tick で新しいルールにより判定される)。
+        """
+        APP_LOGGER.info("Applying externally modified settings: %s", ", ".join(sorted(changed_keys)))
+        self.engine.apply_settings()
+
+        if "is_monitoring_enabled" in changed_keys:
+            self._update_monitoring_state(bool(self.settings.get("is_monitoring_enabled", False)))
+
+        if "log_level" in changed_keys or "log_levels" in changed_keys:
+            apply_log_levels(self.settings)
+
+        if "metrics_port" in changed_keys or "metrics_textfile" in changed_keys:
+            self._restart_metrics_exporter()
+
+        # 設定画面が開いていれば、表示中の値を新しい設定に合わせる (古い表示内容で上書き保存しないため)
+        if self.gui_app_instance and self.gui_window and self.gui_window.winfo_exists():
+            try:
+                self.gui_app_instance._load_initial_values()
+                self.gui_app_instance._draw_game_list()
+            except Exception as e:
+                APP_LOGGER.warning("Failed to refresh the settings window after a config reload: %s", e)
+
+    def _restart_metrics_exporter(self):
+        """設定に従ってメトリクスの出力を (再) 開始します。"""
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.close()
+        self.metrics_exporter = MetricsExporter.from_settings(self.settings)
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.start()
+
     def quit_application(self, icon=None, item=None): # iconとitemを引数に追加 (pystrayのコールバックに合わせる)
         """Completely shuts down the application."""
         
@@ -1209,17 +763,14 @@ class MainApplication:
         APP_LOGGER.info("Application shutdown sequence initiated.")
         
         # 1. 監視スレッドへの停止通知と終了待ち (これは重要なので維持)
-        self.stop_event.set() 
-        APP_LOGGER.debug("stop_event set to signal monitoring thread to stop.")
-        
-        if hasattr(self, 'monitoring_thread') and self.monitoring_thread.is_alive():
-            APP_LOGGER.info("Waiting for monitoring thread to terminate.")
-            self.monitoring_thread.join(timeout=1) 
-            
-            if self.monitoring_thread.is_alive():
-                 APP_LOGGER.warning("Monitoring thread did not terminate within timeout.")
-            else:
-                 APP_LOGGER.info("Monitoring thread terminated cleanly.")
+        # 🚨 修正: MonitorEngine に委譲。起動時の復帰処理を打ち切り、停止とアイドルレート復帰はそれぞれ上限時間付きで 1 度だけ実行される
+        self.engine.shutdown()
+
+        # 保留中の設定の書き込みを終える
+        self.config_service.close()
+        self.control_server.close()
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.close()
                  
         # 2. システムトレイアイコンの停止 (これは重要なので維持)
         if hasattr(self, 'icon'):
@@ -1244,226 +795,102 @@ class MainApplication:
 
         # 🚨 以前の CRITICAL ログ出力や sys.exit(0) は main() に移譲したため、空のまま
 
+    # --- 制御チャネルのコマンド (HzControlServer スレッドから呼ばれる) ---
+
+    def _call_on_tk_thread(self, func, *args):
+        """[制御チャネルのスレッド] func を Tk スレッドで実行し、結果を待って返します (例外はそのまま送出)。"""
+        done = threading.Event()
+        outcome: Dict[str, Any] = {}
+
+        def run():
+            try:
+                outcome["result"] = func(*args)
+            except Exception as e:
+                outcome["error"] = e
+            finally:
+                done.set()
+
+        self.root.after(0, run)
+        if not done.wait(self.CONTROL_COMMAND_TIMEOUT_SECONDS):
+            raise TimeoutError(f"The UI thread did not respond within {self.CONTROL_COMMAND_TIMEOUT_SECONDS:.0f} seconds.")
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("result")
+
+    def _cmd_status(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        record = self.status_channel.latest()
+        return {
+            "status": record.text,
+            "rate": self.current_rate,
+            "monitoring_enabled": bool(self.settings.get("is_monitoring_enabled", False)),
+            "lifecycle": self.engine.monitor_lifecycle.state.value,
+            "settings_open": self.gui_app_instance is not None,
+            "log_levels": get_log_levels(),
+            "metrics_endpoint": self.metrics_exporter.address if self.metrics_exporter is not None else None,
+        }
+
+    def _cmd_open_settings(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        # 2 つ目のインスタンスの起動時に送られる (既存の設定画面を前面に表示する)
+        self.open_gui()
+        return {}
+
+    def _cmd_set_monitoring(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        # "enabled" を省略した場合は切り替え (トレイメニューの操作と同じ処理を Tk スレッドで行う)
+        def apply():
+            is_enabled = bool(args.get("enabled", not self.settings.get("is_monitoring_enabled", False)))
+            if is_enabled != bool(self.settings.get("is_monitoring_enabled", False)):
+                self.toggle_monitoring()
+            return is_enabled
+
+        is_enabled = self._call_on_tk_thread(apply)
+        APP_LOGGER.info("Monitoring state set via control channel: %s", is_enabled)
+        return {"monitoring_enabled": is_enabled}
+
+    def _cmd_force_rate(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        # 💡 レート変更は外部ツールの完了を待つため、Tk スレッドではなく制御チャネルのスレッドで実行する
+        final_rate = self.engine.force_rate(int(args["rate"]), reason="ipc")
+        if final_rate is None:
+            raise RuntimeError(f"Failed to apply {args['rate']} Hz.")
+        # 監視中は、実行中のゲームの構成が変わるまで維持される (held=True)
+        return {"rate": final_rate, "held": self.engine.rate_override is not None}
+
+    def _cmd_reload_config(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        # 再読み込みの通知 (_on_config_reloaded) は Tk スレッドで受け取る必要がある
+        def reload():
+            self.config_service.flush()
+            return self.config_service.check_for_changes()
+
+        reloaded = self._call_on_tk_thread(reload)
+        return {"games": len(self.settings.get("games", [])), "reloaded": reloaded}
+
+    def _cmd_set_log_level(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        return {"log_levels": self.change_log_level(args.get("level"), args.get("subsystem"))}
+
+    def _cmd_shutdown(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        # 応答を返した後に Tk スレッドで終了する (終了処理は制御チャネル自体も閉じるため、ここでは待たない)
+        self.root.after(0, self.quit_application)
+        return {}
+
     def check_and_apply_rate_based_on_games(self):
         """
         Immediately checks the current game execution status and changes the monitor rate 
         based on settings, typically triggered by GUI/tray operations 
         (e.g., rate recovery when a game is deleted).
         """
-        # 🚨 DEBUG: 関数開始を記録
-        APP_LOGGER.debug("Immediate rate check and application started (triggered by UI/config change).")
-        
-        # 1. 前提条件のチェック
-        if not self.settings.get("is_monitoring_enabled", False):
-            # 🚨 修正: print() を APP_LOGGER.info() に置き換え、メッセージを英語化
-            APP_LOGGER.info("Monitoring is disabled. Skipping immediate rate check.")
-            
-            # モニタリングOFFの場合も実レートを取得してステータス更新
-            if self.gui_app_instance:
-                active_rate = self._get_active_monitor_rate()
-                display_rate = active_rate if active_rate is not None else self.current_rate
-                
-                # 🚨 DEBUG: GUIステータス更新を記録
-                APP_LOGGER.debug("GUI status updated for disabled monitoring: %d Hz.", display_rate)
-                
-                self.status_message.set(f"Status: MONITORING DISABLED ({display_rate} Hz)")
-            return
-
-        global_high_rate_value = self.settings.get("global_high_rate", 144)
-        use_global_high_rate = self.settings.get("use_global_high_rate", False)
-        default_low_rate = self.settings.get("default_low_rate", 60)
-        
-        # プロセス取得に失敗する可能性を考慮（ただし_get_running_process_names内でエラー処理される）
-        running_processes = self._get_running_process_names()
-        
-        highest_required_rate = default_low_rate 
-        is_any_game_running = False
-        current_game_name = None 
-        
-        # 2. 実行中の最高レートを決定 (ロジック変更なし)
-        for game in self.settings.get("games", []):
-            if not game.get("is_enabled", False):
-                continue
-            
-            process_name = game.get("process_name")
-            high_rate = game.get("high_rate", 144)
-            
-            if process_name and process_name in running_processes:
-                is_any_game_running = True
-                
-                if use_global_high_rate:
-                    highest_required_rate = int(global_high_rate_value)
-                    current_game_name = "Global High Rate"
-                    break 
-                
-                if high_rate > highest_required_rate:
-                    highest_required_rate = high_rate
-                    current_game_name = game.get('name', process_name)
-                     
-        # ----------------------------------------------------
-        # 💡 デバッグログ 1: 判定結果と現在の状態
-        # ----------------------------------------------------
-        # 🚨 修正: print() を APP_LOGGER.debug() に置き換え
-        APP_LOGGER.debug(
-            "Check Results: Game Running=%s, Required Rate=%d Hz, Current Rate=%d Hz.",
-            is_any_game_running, highest_required_rate, self.current_rate
-        )
-
+        # 💡 設定画面の表示中は、ステータス表示に実レート (外部ツールで取得) を使用する
+        self.engine.evaluate_now(probe_display=self.gui_app_instance is not None)
 
-        # 3. レート変更の必要性を判断
-        target_rate = None
-        
-        if is_any_game_running:
-            # ゲーム実行中: 最高レートが必要
-            if highest_required_rate != self.current_rate: 
-                target_rate = highest_required_rate
-                # 🚨 修正: print() を APP_LOGGER.debug() に置き換え
-                APP_LOGGER.debug("Action: Switching to High Rate: %d Hz", target_rate)
-        else:
-            # IDLE状態: 低レートが必要
-            
-            # (A) 内部状態が既に低Hzでない場合
-            if self.current_rate != default_low_rate: 
-                target_rate = default_low_rate
-                # 🚨 修正: print() を APP_LOGGER.debug() に置き換え
-                APP_LOGGER.debug("Action: Switching to Low Rate (IDLE): %d Hz (1st Check)", target_rate)
-            
-            # (B) 内部状態が既に低Hzだが、GUIからの強制再評価の場合 (ゲーム削除時)
-            elif self.current_rate == default_low_rate:
-                target_rate = default_low_rate
-                # 🚨 修正: print() を APP_LOGGER.debug() に置き換え
-                APP_LOGGER.debug("Action: Re-applying Low Rate (IDLE) due to config change: %d Hz (Forced Re-apply)", target_rate)
-            
-        
-        # 4. レート変更の実行
-        if target_rate is not None:
-            # 🚨 INFO: 変更試行を記録 (即時変更は重要)
-            APP_LOGGER.info("Attempting immediate rate change to %d Hz.", target_rate)
-            
-            final_rate = self._enforce_rate(target_rate)
-            
-            if final_rate is not None:
-                # 成功したら self.current_rate を更新
-                self.current_rate = final_rate 
-                # 🚨 修正: print() を APP_LOGGER.info() に置き換え
-                APP_LOGGER.info("Immediate rate change successful. Current rate set to %d Hz.", final_rate)
-            else:
-                # 🚨 修正: print() を APP_LOGGER.error() に置き換え
-                APP_LOGGER.error("Immediate rate change failed for %d Hz.", target_rate)
-
-        # 5. GUIのステータス表示を更新（修正済みロジック）
-        if self.gui_app_instance:
-            # 💡 self.current_rate の代わりに実レートを取得し、フォールバックを使用
-            active_rate = self._get_active_monitor_rate() 
-            display_rate = active_rate if active_rate is not None else self.current_rate
-            
-            is_idle_rate = (
-                display_rate == default_low_rate or 
-                display_rate == (default_low_rate - 1)
-            )
-            
-            if is_any_game_running:
-                current_status_tag = "Game: " + current_game_name if current_game_name else "Game Running"
-            elif is_idle_rate:
-                current_status_tag = "IDLE"
-            else:
-                current_status_tag = "Pending..."
-                
-            new_status_message = f"Status: {current_status_tag} ({display_rate} Hz)"
-            
-            # MainApplication 自身の status_message を更新
-            if self.status_message.get() != new_status_message:
-                 self.status_message.set(new_status_message)
-                 APP_LOGGER.debug("GUI Status updated by immediate check: %s", new_status_message)
-                 
-        # 🚨 DEBUG: 関数終了を記録
-        APP_LOGGER.debug("Immediate rate check and application completed.")
+    def _get_active_monitor_rate(self) -> Optional[int]:
+        """設定されたモニターの実リフレッシュレートを取得します。"""
+        return self.engine.get_active_monitor_rate()
 
-    def _get_active_monitor_rate(self) -> int | None:
-        """
-        設定されたモニターの実リフレッシュレートを取得します。
-        (取得値は switcher_utility 側で適切な整数値に丸められている前提)
-        """
-        # NOTE: このメソッドを使用するには、main_app.py の冒頭で
-        #       switcher_utility の get_current_active_rate をインポートしている必要があります。
-        
-        monitor_id = self.settings.get("selected_monitor_id")
-        if not monitor_id:
-            return None
-            
-        # 💡 switcher_utilityから新しい関数を呼び出す
-        rate = get_current_active_rate(monitor_id)
-        
-        # 🚨 デバッグログを追加 (整数値またはNoneが返ってくることを想定)
-        APP_LOGGER.debug("Monitor rate retrieved from utility: %s Hz", rate)
-        
-        return rate
-    
-    # main_app.py の MainApp クラスに以下のメソッドを追加
+    def _start_monitoring_thread(self):
+        """監視スレッドを (クラッシュ復帰判定を含め) バックグラウンドで開始します。即座に戻ります。"""
+        self.engine.start()
 
     def _stop_monitoring_thread(self):
-        """Stops the monitoring thread and waits for it to terminate, then resets the display rate."""
-        
-        # 🚨 DEBUG: 関数開始を記録
-        APP_LOGGER.debug("Attempting to stop monitoring thread.")
-        
-        # 1. スレッド停止とJOIN
-        if hasattr(self, 'monitor_thread') and self.monitor_thread and self.monitor_thread.is_alive():
-            # 🚨 INFO: 処理の意図を記録
-            APP_LOGGER.info("Signaling monitoring thread to stop.")
-            self.stop_event.set()
-            
-            # --- 診断用ログ A ---
-            start_time_join = time.time()
-            
-            # スレッドが終了するまで最大1秒待機
-            self.monitor_thread.join(timeout=1) 
-            join_duration = time.time() - start_time_join
-            
-            # 🚨 修正: print() を APP_LOGGER.debug() に置き換え
-            APP_LOGGER.debug("Thread Join attempted. Duration: %.2f seconds.", join_duration) 
-            # --------------------
-            
-            # 終了チェック
-            if self.monitor_thread.is_alive():
-                 # 🚨 WARNING: タイムアウトを記録
-                 APP_LOGGER.warning("Monitoring thread failed to terminate within timeout.")
-            else:
-                 # 🚨 INFO: 正常終了を記録
-                 APP_LOGGER.info("Monitoring thread terminated successfully.")
-            
-            self.stop_event.clear()
-            APP_LOGGER.debug("stop_event cleared.")
-            # 🚨 修正: print() を APP_LOGGER.info() に置き換え
-            APP_LOGGER.info("Monitoring thread shutdown sequence finished.")
-        else:
-            # 🚨 INFO: スレッドがそもそも動いていなかった場合
-            APP_LOGGER.info("Monitoring thread was not running or not found. No action required.")
-            
-        # 2. 低レートへの復帰 (外部コマンド実行) 💥 _enforce_rate() を使用 💥
-        try:
-            # 監視ループで使用されているのと同じ方法で低レートを取得。デフォルトを 59 に変更
-            idle_rate = self.settings.get("default_low_rate", 60) 
-            
-            APP_LOGGER.info("Resetting display rate to idle rate (%s Hz).", idle_rate)
-
-            # 実際のレート変更メソッド _enforce_rate() を呼び出す
-            final_rate = self._enforce_rate(idle_rate) 
-
-            if final_rate is not None:
-                # 成功したら、内部期待値を実際のレートで更新
-                self.current_rate = final_rate
-                APP_LOGGER.info("Successfully reset display rate to idle rate. Final rate: %d Hz", final_rate)
-            else:
-                APP_LOGGER.error("Failed to reset display rate to idle rate (%s Hz): _enforce_rate returned None.", idle_rate)
-
-        except AttributeError:
-            APP_LOGGER.error("Failed to reset display rate: '_enforce_rate' method or related attribute missing.")
-        except Exception as e:
-            APP_LOGGER.error("Failed to reset display rate to idle rate (%s Hz): %s", idle_rate, e)
-
-        # 🚨 DEBUG: 関数終了を記録
-        APP_LOGGER.debug("_stop_monitoring_thread completed.")
+        """監視スレッドを停止します。停止時にディスプレイはアイドルレートへ戻されます。"""
+        self.engine.stop()
 
     def _update_monitoring_state(self, is_enabled: bool):
         """
@@ -1513,82 +940,14 @@ class MainApplication:
         if not is_enabled:
             # 監視OFF時はMONITORING DISABLED
             new_status = f"Status: MONITORING DISABLED ({self.current_rate} Hz)"
-            self.status_message.set(new_status)
-            APP_LOGGER.debug("GUI/Status message explicitly set to: %s", new_status)
+            self._publish_status(new_status, self.current_rate)
+            APP_LOGGER.debug("Status message explicitly published: %s", new_status)
             
         # 監視ON時は、_monitoring_loopに任せるため、ここでは更新しない
         
         # 🚨 DEBUG: 関数終了を記録
         APP_LOGGER.debug("_update_monitoring_state completed.")
 
-    def _get_monitored_process_names(self) -> set:
-        """
-        Extracts a list of monitored process names (executable files) from the settings.
-        """
-        # 🚨 DEBUG: 関数開始を記録
-        APP_LOGGER.debug("Starting extraction of monitored process names from settings.")
-        
-        process_names = set()
-        
-        # 監視対象のゲーム設定が保存されているキーに合わせて修正してください
-        game_profiles = self.settings.get("game_profiles", {})
-        
-        for profile_id in game_profiles:
-            profile = game_profiles[profile_id]
-            # プロファイルに process_name のキーがあることを想定
-            if profile.get("is_enabled", False) and profile.get("process_name"):
-                process_names.add(profile["process_name"].lower())
-                
-        # 🚨 DEBUG: 抽出結果を記録
-        if process_names:
-            APP_LOGGER.debug(
-                "Successfully extracted %d monitored process names: %s", 
-                len(process_names), 
-                ", ".join(sorted(process_names)) # ログに載せる際はソートして見やすくする
-            )
-        else:
-            APP_LOGGER.debug("No enabled game profiles found in settings.")
-            
-        return process_names
-
-    def _check_for_running_games(self) -> bool:
-        """
-        Checks if any monitored game process is currently running.
-        """
-        # 🚨 DEBUG: 関数開始を記録
-        APP_LOGGER.debug("Starting check for running game processes.")
-        
-        monitored_names = self._get_monitored_process_names()
-        
-        if not monitored_names:
-            # 🚨 DEBUG: 監視対象が設定されていないことを記録
-            APP_LOGGER.debug("No enabled processes are configured for monitoring.")
-            return False
-            
-        # 全ての実行中プロセスをチェック
-        # (psutil.process_iter を使用する代わりに、より高速な _get_running_process_names を使用することを推奨しますが、
-        #  ここでは元のコード構造に合わせて psutil.process_iter を保持します)
-        for proc in psutil.process_iter(['name']):
-            try:
-                process_name = proc.info['name']
-                
-                if process_name and process_name.lower() in monitored_names:
-                    # 🚨 修正: print() を APP_LOGGER.debug() に置き換え、メッセージを英語化
-                    APP_LOGGER.debug("Monitored game process [%s] detected as running.", process_name)
-                    return True # 1つでも見つかれば True
-                    
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                # 権限がない、またはプロセスが終了している場合は無視
-                continue
-            except Exception as e:
-                # 予期せぬエラー (念のため)
-                APP_LOGGER.warning("Unexpected error during process iteration: %s", e)
-                continue
-                
-        # 🚨 DEBUG: 監視対象のゲームプロセスが実行されていないことを記録
-        APP_LOGGER.debug("No running processes matched the monitored list.")
-        return False
-
     def _get_app_path(self):
         """アプリケーションの完全な実行パスを取得します（レジストリ登録用）。"""
         # pyinstallerなどでビルドされた場合、sys.executable は .exe ファイルのパスを返します。
@@ -1608,125 +967,86 @@ class MainApplication:
         Returns:
             bool: 操作が成功した場合は True。
         """
-        # スタートアップ登録用のレジストリキー
-        RUN_KEY = r"Software\Microsoft\Windows\CurrentVersion\Run"
-        APP_NAME = "AutoHzSwitcher" # レジストリに登録するアプリ名（任意）
-
-        try:
-            # HKEY_CURRENT_USER を開く (ユーザー固有の設定)
-            # 【★★★ 修正箇所 ★★★】: アクセス権に winreg.KEY_WRITE を明示的に追加
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER,
-                RUN_KEY,
-                0,
-                # winreg.KEY_SET_VALUE | winreg.KEY_READ  <-- 修正前
-                winreg.KEY_SET_VALUE | winreg.KEY_READ | winreg.KEY_WRITE # <-- 修正後
-            )
-
-            if enable:
-                # 登録する場合
-                app_path = self._get_app_path()
-                
-                # コマンドプロンプトやパスにスペースが含まれることを考慮し、引用符で囲みます。
-                command = f'"{app_path}" --silent' # サイレントモードで起動することを想定
-                
-                winreg.SetValueEx(key, APP_NAME, 0, winreg.REG_SZ, command)
-                APP_LOGGER.info("Startup registered successfully: %s", command)
-            else:
-                # 解除する場合
-                try:
-                    winreg.DeleteValue(key, APP_NAME)
-                    APP_LOGGER.info("Startup registration removed successfully.")
-                except FileNotFoundError:
-                    # すでに値がない場合はエラーを出さずに成功とみなす
-                    APP_LOGGER.warning("Startup key not found, registration already removed.")
+        # 💡 レジストリ操作は StartupRegistrar (既定: RegistryStartupRegistrar) に委譲
+        if enable:
+            # 登録する場合
+            app_path = self._get_app_path()
             
-            winreg.CloseKey(key)
-            return True
-
-        except Exception as e:
-            APP_LOGGER.error("Failed to modify startup registration: %s", e)
-            return False       
+            # コマンドプロンプトやパスにスペースが含まれることを考慮し、引用符で囲みます。
+            command = f'"{app_path}" --silent' # サイレントモードで起動することを想定
+            return self.startup_registrar.register(command)
+        
+        # 解除する場合
+        return self.startup_registrar.unregister()
 
-def main():
+def main(config: Optional[LoadedConfig] = None, control_address: Optional[str] = None):
     """
     アプリケーションのメイン処理。多重起動チェックとミューテックス解放を含む。
+
+    Args:
+        config: 起動時に読み込んだ設定 (省略時は MainApplication が読み込む)
+        control_address: 制御チャネルのアドレス (省略時はユーザーごとの既定のアドレス)
     """
     APP_LOGGER.debug("Application startup sequence initiated.")
-    mutex = None 
+    instance_lock = MutexInstanceLock(MUTEX_NAME)
     app = None
 
     try:
-        # 1. ミューテックスを作成/取得 (initial_owner=1 で作成)
-        mutex = win32event.CreateMutex(None, 1, MUTEX_NAME)
-        last_error = win32api.GetLastError() 
-
-        # 2. 多重起動チェック
-        if last_error == winerror.ERROR_ALREADY_EXISTS:
+        # 1. 多重起動チェック (ミューテックスを initial_owner=1 で作成/取得)
+        if not instance_lock.acquire():
             # 既にミューテックスが存在する場合（＝別のインスタンスが実行中の場合）
             APP_LOGGER.info("Another instance is already running. Exiting.")
             
-            # 💥 修正: 所有していないミューテックスは解放せず、ハンドルのみ閉じて終了する。
-            if mutex:
-                try:
-                    win32api.CloseHandle(mutex)
-                except Exception:
-                    pass
-                    
-            # 💡 ToDo: 既に起動しているGUIを前面に持ってくる処理をここに追加する
+            # 💡 通常は起動直後 (forward_command_line) に引き継ぎ済み。実行中のインスタンスが
+            #    制御チャネルを開始する前に起動された場合は、ここで改めて設定画面の表示を依頼する
+            try:
+                forward_to_running_instance("open_settings", address=control_address)
+            except IPCError as e:
+                APP_LOGGER.warning("Failed to hand off to the running instance: %s", e)
             
             sys.exit(0)
             
-        # 3. 初回起動の場合
-        # 既に所有権 (initial_owner=1) を持った状態で、アプリケーションのメイン処理へ
-        else:
-            APP_LOGGER.info("Starting new application instance. Mutex acquired.")
-            app = MainApplication()
-            
-            APP_LOGGER.info("MainApplication instance created successfully.")
+        # 2. 初回起動の場合
+        # 既に所有権を持った状態で、アプリケーションのメイン処理へ
+        APP_LOGGER.info("Starting new application instance. Mutex acquired.")
+        app = MainApplication(config=config, control_address=control_address)
+        
+        APP_LOGGER.info("MainApplication instance created successfully.")
 
-            # アプリケーションオブジェクトにミューテックスの参照を保持 (終了処理のため)
-            app.mutex = mutex 
-            
-            # アプリケーションのメインループを実行 
-            app.run()
-            
-            # app.run() から戻った（終了処理が開始された）
-            APP_LOGGER.critical("Application successfully shut down. Process exiting.")
+        # アプリケーションオブジェクトにロックの参照を保持 (終了処理のため)
+        app.instance_lock = instance_lock 
+        
+        # アプリケーションのメインループを実行 
+        app.run()
+        
+        # app.run() から戻った（終了処理が開始された）
+        APP_LOGGER.critical("Application successfully shut down. Process exiting.")
 
     except Exception as e:
         # CRITICAL: 起動処理で未捕捉の例外が発生した場合を記録
         APP_LOGGER.critical("A critical unhandled exception occurred during startup or main run: %s", e, exc_info=True)
-        # 予期せぬ終了時にミューテックスが残らないよう解放を試みる
-        if app and app.mutex:
-            try:
-                win32event.ReleaseMutex(app.mutex)
-                APP_LOGGER.warning("Released mutex after critical exception.")
-            except Exception:
-                pass
         sys.exit(1)
         
     finally:
-        # 4. ミューテックスの解放とハンドルクローズ
-        # 💥 修正: ReleaseMutex は else ブロック内で処理されているため、ここではハンドルクローズのみ行う。
-        # (ただし、appが正常に作成されなかった場合のフォールバックとして ReleaseMutex を含めることも可能)
-        if mutex:
-             try:
-                win32api.CloseHandle(mutex)
-             except Exception:
-                 pass
+        # 3. ミューテックスの解放とハンドルクローズ (取得していない場合は何もしない)
+        instance_lock.release()
              
 # ----------------------------------------------------------------------
 # メイン実行部
 # ----------------------------------------------------------------------
 if __name__ == "__main__":
-    # 起動時に一度だけロギングを設定
-    # 💡 setup_logging() は main_app.py のどこかで定義されている前提
+    # 起動時に一度だけ設定ファイルを読み込み (移行・検証を含む)、ロギング設定とアプリケーションで共有する
+    startup_config = load_config(get_settings_file_path())
     try:
-        setup_logging() 
+        setup_logging(startup_config.settings) 
     except Exception as e:
         # ロギング設定自体が失敗した場合、コンソールに直接エラーを出力
         print(f"FATAL: Failed to set up logging: {e}", file=sys.stderr)
         sys.exit(1)
+
+    # 制御チャネルのアドレス (省略時はユーザーごとの既定のアドレス。--send で引き継ぐ側と揃える)
+    argument_parser = argparse.ArgumentParser(add_help=False)
+    argument_parser.add_argument("--control-address", default=None)
+    startup_args, _ = argument_parser.parse_known_args(sys.argv[1:])
         
-    main()
\ No newline at end of file
+    main(startup_config, control_address=startup_args.control_address)
\ No newline at end of file
@@ -1,10 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog # filedialog はGUIでファイル選択に必要になる可能性
-import json
 import os
 import sys
 import time
-from typing import Optional, Dict, Any, List, TYPE_CHECKING
+from typing import Optional, Dict, Any, List, Tuple, Callable, TYPE_CHECKING
 import threading 
 from PIL import Image, ImageTk
 import subprocess # 追加
@@ -17,11 +16,13 @@ import logging
 # メインアプリケーションと同様に、ロガーオブジェクトを定義します
 # MainApp側で既に定義されている場合は、ここではインポートのみ行うことも検討しますが、
 # ここでは self.app_core が存在しないため、直接ロガーオブジェクトを使用します。
-APP_LOGGER = logging.getLogger('AutoHzSwitcher') 
+# 💡 サブシステム 'gui' のロガー (トレイメニュー・制御チャネルからログレベルを個別に変更できる)
+APP_LOGGER = logging.getLogger('AutoHzSwitcher.gui') 
 # ----------------------------------------------------------------------
 
 # switcher_utility.py からインポート
 from switcher_utility import resource_path
+from hz_core.i18n import LanguageManager, get_translation_catalog
 
 # 🚨 修正点 2: 外部依存ユーティリティのインポートを確認
 from switcher_utility import get_monitor_capabilities, change_rate, get_running_processes_detailed
@@ -46,79 +47,9 @@ COMMON_FONT_NORMAL = ('Helvetica', COMMON_FONT_SIZE)
 STATUS_FONT = ('Helvetica', 18, 'bold')
 
 
-# --- 言語管理クラス ---
-class LanguageManager:
-    """Manages language resources and retrieves corresponding text from keys."""
-    
-    def __init__(self, language_code: str):
-        # 🚨 DEBUG: インスタンス化を記録
-        APP_LOGGER.debug("Initializing LanguageManager with code: %s", language_code)
-        
-        self.language_code = language_code
-        self.resources: Dict[str, str] = {}
-        self._load_language()
-
-    def _load_language(self):
-        """Loads the JSON file corresponding to the specified language code. (Path resolved)"""
-        
-        # 💥 修正: resource_path 関数を使用して、言語ファイルの正しいパスを取得する
-        # ファイルパスに 'lang/' フォルダを追加
-        lang_file = resource_path(f"lang/{self.language_code}.json")
-        
-        # 🚨 DEBUG: ロード試行を記録
-        APP_LOGGER.debug("Attempting to load language file from: %s", lang_file)
-        
-        try:
-            with open(lang_file, 'r', encoding='utf-8') as f:
-                self.resources = json.load(f)
-            
-            # 🚨 修正: print() を APP_LOGGER.info() に置き換え、メッセージを英語化
-            APP_LOGGER.info("Successfully loaded language resources for: %s", self.language_code)
-            
-        except FileNotFoundError:
-            # 🚨 修正: print() を APP_LOGGER.warning() に置き換え、メッセージを英語化
-            APP_LOGGER.warning(
-                "Language file not found: %s. Falling back to default keys.", 
-                lang_file
-            )
-            self.resources = {}
-            
-        except json.JSONDecodeError as e:
-            # 🚨 修正: print() を APP_LOGGER.error() に置き換え、メッセージを英語化
-            APP_LOGGER.error(
-                "Error decoding JSON in language file %s: %s. Falling back to default keys.", 
-                lang_file, 
-                e
-            )
-            self.resources = {}
-
-    def get(self, key: str, default: Optional[str] = None, **kwargs) -> str:
-        """Retrieves the text corresponding to the key and replaces placeholders."""
-        
-        # 1. 翻訳文字列の取得 (キーがない場合はデフォルト文字列またはMISSING_KEYを返す)
-        text = self.resources.get(key, default or f"MISSING_KEY: {key}")
-        
-        # 🚨 DEBUG: MISSING_KEYが発生した場合のみ警告を出す
-        if text.startswith("MISSING_KEY:"):
-              APP_LOGGER.debug(
-                  "Attempted to retrieve missing language key: %s (Lang: %s)", 
-                  key, self.language_code
-                 )
-              
-        # 2. 🚨 修正: kwargs (フォーマット引数) が渡された場合にのみ .format() を実行する
-        if kwargs:
-            try:
-                return text.format(**kwargs)
-            except KeyError as e:
-                # 渡された kwargs が翻訳文字列内のプレースホルダーをすべて満たさない場合の保険
-                APP_LOGGER.error(
-                    "Missing format key '%s' required by translation text for key '%s'. Returning raw text.",
-                    e, key
-                )
-                return text
-        else:
-            # kwargsが空の場合は、フォーマットせずにそのまま返す
-            return text
+# --- 言語管理 ---
+# 💡 言語リソースは hz_core.i18n の翻訳カタログ (タスクトレイと共有) から取得する。
+#    LanguageManager.get() は辞書の参照のみ (英語へのフォールバックは読み込み時に統合済み)
 
 # AppControllerStub (言語切り替え対応)
 class AppControllerStub:
@@ -176,15 +107,17 @@ class HzSwitcherApp:
         
         APP_LOGGER.debug("Initial language code retrieved from settings: %s", initial_language_code)
         
-        # 2. LanguageManagerに正しい言語コードを渡す
-        # LanguageManagerの定義によっては self.master.available_languages も引数に必要かもしれません
-        # 現状のコードベースの前提に基づき、コードのみを渡します。
-        self.lang = LanguageManager(initial_language_code) 
+        # 2. 共有の翻訳カタログから、その言語の LanguageManager を取得する (読み込み済みならファイルは読まない)
+        self.lang: LanguageManager = get_translation_catalog().load(initial_language_code)
         
         # 3. Tkinter変数の初期値には、GUI表示用の 'language' キー (例: 'English') を使用する
         initial_language_display_name = self.app.settings.get("language", "English")
 
-        master.title(self.lang.get("app_title"))
+        # 💡 翻訳キーを表示するウィジェットの登録簿 ([文字列を設定する関数, キー, 既定の文字列])。
+        #    言語の切り替え時は、ウィジェットを作り直さずにこの登録簿の文字列のみを更新する
+        self._text_bindings: List[Tuple[Callable[[str], None], str, Optional[str]]] = []
+
+        self._bind_text(master.title, "app_title")
         APP_LOGGER.info("GUI Title set to: %s", master.title())
         
         # ★★★ アイコン設定コード ★★★
@@ -271,6 +204,39 @@ class HzSwitcherApp:
         
         APP_LOGGER.info("MainGUI initialization completed.")
 
+    # --- 翻訳キーの登録 (言語切り替え時に文字列のみを更新する) ---
+    def _bind_text(self, apply: Callable[[str], None], key: str, default: Optional[str] = None):
+        """apply に key の翻訳を設定し、言語切り替え時に再設定するため登録します。"""
+        apply(self.lang.get(key, default))
+        self._text_bindings.append((apply, key, default))
+
+    def _translated(self, widget, key: str, default: Optional[str] = None):
+        """ウィジェットの text に key の翻訳を設定して登録し、ウィジェットを返します (grid / pack を続けて呼べる)。"""
+        self._bind_text(lambda text: widget.configure(text=text), key, default)
+        return widget
+
+    def _bind_menu_label(self, menu: tk.Menu, key: str, default: Optional[str] = None):
+        """メニューに直前に追加した項目のラベルを登録します。"""
+        index = menu.index('end')
+        self._bind_text(lambda text: menu.entryconfigure(index, label=text), key, default)
+
+    def _relabel_widgets(self):
+        """登録されたすべてのウィジェットの文字列を現在の言語 (self.lang) で更新します。"""
+        alive = []
+        for binding in self._text_bindings:
+            apply, key, default = binding
+            try:
+                apply(self.lang.get(key, default))
+            except tk.TclError:
+                # 破棄されたウィジェット (閉じたダイアログなど) は登録簿から外す
+                continue
+            alive.append(binding)
+        self._text_bindings = alive
+
+        # 登録簿の外で翻訳を表示している箇所 (モニター取得失敗時のドロップダウン表示)
+        if not self.monitor_capabilities and not self.is_monitor_loading.get() and hasattr(self, 'monitor_dropdown'):
+            self.monitor_dropdown.set(self.lang.get("label_no_monitor_found", "No Monitor Found"))
+
     # MainGUIクラスの内部にこのメソッドを追加してください
     def _create_menubar(self):
         """メインウィンドウの上部にメニューバーを作成し、各種項目を追加します。"""
@@ -283,19 +249,23 @@ class HzSwitcherApp:
         # 2. 【ファイル】メニュー（例：終了）
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label=self.lang.get('menu_file', 'File'), menu=file_menu)
+        self._bind_menu_label(menubar, 'menu_file', 'File')
         # file_menu.add_command(label="設定を保存", command=self.app.save_settings) # 必要に応じて
         file_menu.add_separator()
         file_menu.add_command(label=self.lang.get('menu_exit', 'Exit'), command=self.master.quit) # アプリケーションを完全に終了する場合
+        self._bind_menu_label(file_menu, 'menu_exit', 'Exit')
 
         # 3. 【ヘルプ】メニュー
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label=self.lang.get('menu_help', 'Help'), menu=help_menu)
+        self._bind_menu_label(menubar, 'menu_help', 'Help')
 
         # --- 新機能 A: AppDataフォルダへのジャンプ ---
         help_menu.add_command(
             label=self.lang.get('menu_open_appdata', 'Open Config Folder'),
             command=self._open_appdata_folder
         )
+        self._bind_menu_label(help_menu, 'menu_open_appdata', 'Open Config Folder')
         help_menu.add_separator()
         
         # --- 新機能 B: アプリ情報表示 ---
@@ -303,6 +273,7 @@ class HzSwitcherApp:
             label=self.lang.get('menu_about', 'About Auto Hz Switcher'),
             command=self._show_about_dialog
         )
+        self._bind_menu_label(help_menu, 'menu_about', 'About Auto Hz Switcher')
         APP_LOGGER.debug("Menubar items (File, Help, AppData Jump, About) configured.")
 
     # MainGUIクラスの内部にある _open_appdata_folder メソッドを修正
@@ -692,10 +663,9 @@ class HzSwitcherApp:
             APP_LOGGER.warning("Failed to load app logo %s: %s. Displaying text title instead.", LOGO_FILE_NAME, e)
             
             # ロゴが見つからない場合は代わりにタイトルテキストを表示
-            logo_label = ttk.Label(main_frame, 
-                                            text=self.lang.get('app_title'), 
+            logo_label = self._translated(ttk.Label(main_frame, 
                                             font=('Helvetica', 16, 'bold'), 
-                                            style='TLabel')
+                                            style='TLabel'), 'app_title')
             logo_label.pack(pady=(0, 15))
         # ★★★★★★★★★★★★★★★★★★★★★★★★★★
 
@@ -706,11 +676,10 @@ class HzSwitcherApp:
         lang_frame.grid_columnconfigure(1, weight=1)
         
         # 💡 [修正点 2] 言語設定の見出しに太字フォントを適用
-        ttk.Label(
+        self._translated(ttk.Label(
             lang_frame, 
-            text=self.lang.get("language_setting"),
             font=self.header_font # 👈 フォントを適用
-        ).grid(row=0, column=0, padx=5, sticky='w')
+        ), "language_setting").grid(row=0, column=0, padx=5, sticky='w')
 
         # 1. MainApplicationから利用可能な言語リストを取得 (例: {"ja": "Japanese", "en": "English"})
         self.available_languages = self.app.available_languages 
@@ -772,30 +741,27 @@ class HzSwitcherApp:
 
         # 💡 [修正点 3] 監視設定の見出しに太字フォントを適用
         # タイトルラベルは grid の row=0, column=0, columnspan=2 でフル幅を使う
-        ttk.Label(
+        self._translated(ttk.Label(
             monitoring_control_frame, 
-            text=self.lang.get("monitoring_title"), 
             font=self.header_font
-        ).grid(row=0, column=0, columnspan=2, sticky='w', padx=5, pady=(5, 5)) 
+        ), "monitoring_title").grid(row=0, column=0, columnspan=2, sticky='w', padx=5, pady=(5, 5)) 
         
         # プロセス監視を有効にする チェックボタン (Row 1, Column 0)
-        ttk.Checkbutton(
+        self._translated(ttk.Checkbutton(
             monitoring_control_frame, 
-            text=self.lang.get("enable_monitoring"), 
             variable=self.is_monitoring_enabled,
             command=self._toggle_monitoring 
-        ).grid(row=1, column=0, sticky='w', padx=5, pady=5) # 👈 gridで配置
+        ), "enable_monitoring").grid(row=1, column=0, sticky='w', padx=5, pady=5) # 👈 gridで配置
 
         # --- ★★★ 新規追加: 自動起動チェックボックス ★★★
         self.is_startup_enabled = tk.BooleanVar(value=self.app.settings.get("is_startup_enabled", False))
 
         # Windows起動時に自動実行 チェックボタン (Row 1, Column 1)
-        ttk.Checkbutton(
+        self._translated(ttk.Checkbutton(
             monitoring_control_frame,
-            text=self.lang.get("enable_startup_registration"), 
             variable=self.is_startup_enabled,
             command=self.on_startup_checkbox_toggled 
-        ).grid(row=1, column=1, sticky='w', padx=5, pady=5) # 👈 gridで配置
+        ), "enable_startup_registration").grid(row=1, column=1, sticky='w', padx=5, pady=5) # 👈 gridで配置
         # ---------------------------------------------
 
         ttk.Separator(main_frame, orient='horizontal').pack(fill='x', pady=5)
@@ -807,11 +773,10 @@ class HzSwitcherApp:
         
         # 💡 [修正点 4] グローバルモニター・レート設定の見出しに太字フォントを適用
         # 既存のfontオプションを置き換え
-        ttk.Label(
+        self._translated(ttk.Label(
             global_monitor_frame, 
-            text=self.lang.get("monitor_settings_title"), 
             font=self.header_font # 👈 フォントを適用
-        ).grid(row=0, column=0, columnspan=5, sticky='w', padx=5, pady=(5, 5))
+        ), "monitor_settings_title").grid(row=0, column=0, columnspan=5, sticky='w', padx=5, pady=(5, 5))
         
         global_monitor_frame.grid_columnconfigure(0, weight=0) 
         global_monitor_frame.grid_columnconfigure(1, weight=1) 
@@ -820,35 +785,34 @@ class HzSwitcherApp:
         global_monitor_frame.grid_columnconfigure(4, weight=0) 
 
         # row 1: モニターID / アイドル時低Hz 
-        ttk.Label(global_monitor_frame, text=self.lang.get("monitor_id")).grid(row=1, column=0, padx=(5, 5), pady=5, sticky='w')
+        self._translated(ttk.Label(global_monitor_frame), "monitor_id").grid(row=1, column=0, padx=(5, 5), pady=5, sticky='w')
         self.monitor_dropdown = ttk.Combobox(global_monitor_frame, textvariable=self.selected_monitor_id, state='readonly', width=20)
         self.monitor_dropdown.grid(row=1, column=1, padx=(5, 15), pady=5, sticky='ew') 
         self.monitor_dropdown.bind('<<ComboboxSelected>>', self.update_resolution_dropdown)
 
-        ttk.Label(global_monitor_frame, text=self.lang.get("idle_low_rate")).grid(row=1, column=2, padx=(5, 5), pady=5, sticky='w')
+        self._translated(ttk.Label(global_monitor_frame), "idle_low_rate").grid(row=1, column=2, padx=(5, 5), pady=5, sticky='w')
         self.low_rate_combobox = ttk.Combobox(global_monitor_frame, textvariable=self.default_low_rate, state='readonly', width=10) 
         self.low_rate_combobox.grid(row=1, column=3, padx=(0, 0), pady=5, sticky='w') 
         self.low_rate_combobox.bind('<<ComboboxSelected>>', self._on_idle_rate_changed_and_enforce)
-        ttk.Label(global_monitor_frame, text=self.lang.get("status_hz")).grid(row=1, column=4, padx=(0, 5), pady=5, sticky='w') 
+        self._translated(ttk.Label(global_monitor_frame), "status_hz").grid(row=1, column=4, padx=(0, 5), pady=5, sticky='w') 
 
         # row 2: 解像度 / グローバル高Hz
-        ttk.Label(global_monitor_frame, text=self.lang.get("resolution")).grid(row=2, column=0, padx=(5, 5), pady=5, sticky='w')
+        self._translated(ttk.Label(global_monitor_frame), "resolution").grid(row=2, column=0, padx=(5, 5), pady=5, sticky='w')
         self.resolution_dropdown = ttk.Combobox(global_monitor_frame, textvariable=self.selected_resolution, state='readonly', width=20)
         self.resolution_dropdown.grid(row=2, column=1, padx=(5, 15), pady=5, sticky='ew') 
         self.resolution_dropdown.bind('<<ComboboxSelected>>', self.update_all_rate_dropdowns)
         
-        self.global_high_rate_check = ttk.Checkbutton(
+        self.global_high_rate_check = self._translated(ttk.Checkbutton(
             global_monitor_frame, 
-            text=self.lang.get("use_global_high_rate_check"), 
             variable=self.use_global_high_rate,
             command=self.toggle_global_high_rate_combobox
-        )
+        ), "use_global_high_rate_check")
         self.global_high_rate_check.grid(row=2, column=2, padx=(5, 5), pady=5, sticky='w') 
         self.global_high_rate_combobox = ttk.Combobox(global_monitor_frame, textvariable=self.global_high_rate, state='readonly', width=10) 
         self.global_high_rate_combobox.grid(row=2, column=3, padx=(0, 0), pady=5, sticky='w')
         self.global_high_rate_combobox.bind('<<ComboboxSelected>>', self.update_all_rate_dropdowns)
 
-        ttk.Label(global_monitor_frame, text=self.lang.get("status_hz")).grid(row=2, column=4, padx=(0, 5), pady=5, sticky='w')
+        self._translated(ttk.Label(global_monitor_frame), "status_hz").grid(row=2, column=4, padx=(0, 5), pady=5, sticky='w')
 
         # 🚨 修正の追加: チェックボックスの初期状態をコンボボックスに反映させる
         self.toggle_global_high_rate_combobox()
@@ -860,11 +824,10 @@ class HzSwitcherApp:
         
         # 💡 [修正点 5] ゲーム/アプリケーション設定の見出しに太字フォントを適用
         # 既存のfontオプションを置き換え
-        ttk.Label(
+        self._translated(ttk.Label(
             main_frame, 
-            text=self.lang.get("game_app_title"), 
             font=self.header_font # 👈 フォントを適用
-        ).pack(anchor='w', pady=(5, 5))
+        ), "game_app_title").pack(anchor='w', pady=(5, 5))
         
         # ゲームリスト管理セクション (Treeview) ---
         game_list_frame = ttk.Frame(main_frame)
@@ -879,13 +842,14 @@ class HzSwitcherApp:
         )
 
         # 新しい列の定義: #0 列 (有効/無効のチェックボックス)
-        self.game_tree.heading('#0', text=self.lang.get("enable_abbr", "有効"), anchor='center')
+        self.game_tree.heading('#0', anchor='center')
+        self._bind_text(lambda text: self.game_tree.heading('#0', text=text), "enable_abbr", "有効")
         self.game_tree.column('#0', width=50, anchor='center', stretch=False)
 
         # カラム設定
-        self.game_tree.heading('Name', text=self.lang.get("game_name"))
-        self.game_tree.heading('Process', text=self.lang.get("process_name"))
-        self.game_tree.heading('HighRate', text=self.lang.get("game_high_rate"))
+        self._bind_text(lambda text: self.game_tree.heading('Name', text=text), "game_name")
+        self._bind_text(lambda text: self.game_tree.heading('Process', text=text), "process_name")
+        self._bind_text(lambda text: self.game_tree.heading('HighRate', text=text), "game_high_rate")
         
         # カラム幅設定
         self.game_tree.column('Name', width=150, anchor='w', stretch=True)
@@ -918,17 +882,25 @@ class HzSwitcherApp:
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(fill='x', pady=5)
         
-        ttk.Button(button_frame, text=self.lang.get("add_game"), command=lambda: self._open_game_editor(None)).pack(side='left', padx=5, fill='x', expand=True)
-        ttk.Button(button_frame, text=self.lang.get("edit"), command=self._edit_selected_game).pack(side='left', padx=5, fill='x', expand=True)
-        ttk.Button(button_frame, text=self.lang.get("delete"), command=self._delete_selected_game).pack(side='left', padx=5, fill='x', expand=True)
+        self._translated(ttk.Button(button_frame, command=lambda: self._open_game_editor(None)), "add_game").pack(side='left', padx=5, fill='x', expand=True)
+        self._translated(ttk.Button(button_frame, command=self._edit_selected_game), "edit").pack(side='left', padx=5, fill='x', expand=True)
+        self._translated(ttk.Button(button_frame, command=self._delete_selected_game), "delete").pack(side='left', padx=5, fill='x', expand=True)
 
         # --- 手動操作セクション --- (コメントアウトされているため変更なし)
         # ...
 
-        self.master.protocol("WM_DELETE_WINDOW", self.master.withdraw) 
-        APP_LOGGER.debug("WM_DELETE_WINDOW protocol set to master.withdraw (minimize to tray).")
+        self.master.protocol("WM_DELETE_WINDOW", self._on_window_close) 
+        APP_LOGGER.debug("WM_DELETE_WINDOW protocol set to _on_window_close (minimize to tray).")
         
         APP_LOGGER.debug("GUI widget creation completed.")
+
+    def _on_window_close(self):
+        """ウィンドウの×ボタン: ウィンドウを隠し (トレイに最小化)、メインアプリへ通知します。"""
+        self.master.withdraw()
+        
+        # 💡 メインアプリ側で、非表示のまま保持するか破棄してリソースを解放するかを決定する
+        if hasattr(self.app, 'on_gui_closed'):
+            self.app.on_gui_closed()
     
     def _on_idle_rate_changed_and_enforce(self, event=None):
         """
@@ -958,13 +930,10 @@ class HzSwitcherApp:
             )
             
             try:
-                # コアアプリのレート適用メソッドを呼び出し
-                final_rate = app._enforce_rate(new_rate) 
+                # 監視エンジンのレート適用メソッドを呼び出し (内部状態 current_rate もエンジン側で更新される)
+                final_rate = app.engine.force_rate(new_rate, reason="settings") 
                 
                 if final_rate is not None:
-                    # コアアプリの内部状態を更新
-                    app.current_rate = final_rate 
-                    
                     # GUIのステータス表示も更新する
                     if hasattr(app, '_update_status_display'):
                         app._update_status_display() 
@@ -1056,22 +1025,14 @@ class HzSwitcherApp:
             APP_LOGGER.debug("Called self.app.update_tray_language.")
         # ------------------------------------------------------------------
 
-        # 2. LanguageManagerを新しい言語で再初期化
-        # self.lang = LanguageManager(new_lang_code, self.app.available_languages) # LanguageManagerの引数構成によっては self.app.available_languages も必要
-        self.lang = LanguageManager(new_lang_code) 
-        
-        # 3. GUIを再構築（最も確実な方法）
-        APP_LOGGER.debug("Destroying existing widgets for full GUI reload.")
-        for widget in self.master.winfo_children():
-            widget.destroy()
-
-        self.master.title(self.lang.get("app_title"))
-
-        self._create_widgets()
+        # 2. 新しい言語の LanguageManager を共有の翻訳カタログから取得 (トレイ側で読み込み済みのものを使う)
+        self.lang = get_translation_catalog().load(new_lang_code)
         
-        # 💡 修正: 非同期ローディング処理を呼び出す
-        self._start_monitor_data_loading() 
-        APP_LOGGER.debug("Called _start_monitor_data_loading for language change.")
+        # 3. 🚨 修正: GUIを再構築せず、登録済みのウィジェットの文字列のみを更新する
+        #    (モニター情報の再取得・ゲーム一覧の再描画は行わない)
+        started = time.perf_counter()
+        self._relabel_widgets()
+        APP_LOGGER.debug("Relabeled %d widgets in %.1f ms.", len(self._text_bindings), (time.perf_counter() - started) * 1000)
 
         self._show_notification(
             self.lang.get("notification_success"),
@@ -2490,7 +2451,7 @@ if __name__ == '__main__':
             self.status_message = tk.StringVar(master=self.root, value="Status: Initializing...")
             self.settings = self._load_settings()
             self.language_code = self.settings.get('language', 'en')
-            self.lang = LanguageManager(self.language_code)
+            self.lang = get_translation_catalog().load(self.language_code)
             APP_LOGGER.debug("AppControllerStub initialized with language code: %s", self.language_code)
         
         def _load_settings(self):
@@ -0,0 +1,142 @@
+# platform_windows.py
+# hz_core.platform の Windows 向け実装 (レジストリ / 名前付きミューテックス / pystray)
+
+import logging
+from typing import Any, Callable, Optional
+
+import pystray
+import win32api
+import win32event
+import winerror
+import winreg # Windowsレジストリ操作用の標準モジュール
+
+from hz_core.platform import InstanceLock, StartupRegistrar, TrayIcon
+
+APP_LOGGER = logging.getLogger('AutoHzSwitcher')
+
+
+class RegistryStartupRegistrar(StartupRegistrar):
+    """HKEY_CURRENT_USER の Run キーを使用したスタートアップ登録。"""
+
+    # スタートアップ登録用のレジストリキー
+    RUN_KEY = r"Software\Microsoft\Windows\CurrentVersion\Run"
+
+    def __init__(self, app_name: str = "AutoHzSwitcher"):
+        self.app_name = app_name # レジストリに登録するアプリ名
+
+    def _open_run_key(self):
+        # 【★★★ 修正箇所 ★★★】: アクセス権に winreg.KEY_WRITE を明示的に追加
+        return winreg.OpenKey(
+            winreg.HKEY_CURRENT_USER,
+            self.RUN_KEY,
+            0,
+            winreg.KEY_SET_VALUE | winreg.KEY_READ | winreg.KEY_WRITE
+        )
+
+    def register(self, command: str) -> bool:
+        try:
+            key = self._open_run_key()
+            try:
+                winreg.SetValueEx(key, self.app_name, 0, winreg.REG_SZ, command)
+            finally:
+                winreg.CloseKey(key)
+            APP_LOGGER.info("Startup registered successfully: %s", command)
+            return True
+        except Exception as e:
+            APP_LOGGER.error("Failed to modify startup registration: %s", e)
+            return False
+
+    def unregister(self) -> bool:
+        try:
+            key = self._open_run_key()
+            try:
+                winreg.DeleteValue(key, self.app_name)
+                APP_LOGGER.info("Startup registration removed successfully.")
+            except FileNotFoundError:
+                # すでに値がない場合はエラーを出さずに成功とみなす
+                APP_LOGGER.warning("Startup key not found, registration already removed.")
+            finally:
+                winreg.CloseKey(key)
+            return True
+        except Exception as e:
+            APP_LOGGER.error("Failed to modify startup registration: %s", e)
+            return False
+
+    def is_registered(self) -> bool:
+        try:
+            key = self._open_run_key()
+            try:
+                winreg.QueryValueEx(key, self.app_name)
+                return True
+            finally:
+                winreg.CloseKey(key)
+        except OSError:
+            return False
+
+
+class MutexInstanceLock(InstanceLock):
+    """名前付きミューテックスによる多重起動防止。"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._mutex = None
+        self._owned = False
+
+    def acquire(self) -> bool:
+        # ミューテックスを作成/取得 (initial_owner=1 で作成)
+        self._mutex = win32event.CreateMutex(None, 1, self.name)
+        last_error = win32api.GetLastError()
+
+        if last_error == winerror.ERROR_ALREADY_EXISTS:
+            # 💥 修正: 所有していないミューテックスは解放せず、ハンドルのみ閉じる。
+            self._close_handle()
+            return False
+
+        self._owned = True
+        return True
+
+    def release(self):
+        if self._owned:
+            try:
+                win32event.ReleaseMutex(self._mutex)
+            except Exception:
+                pass
+            self._owned = False
+        self._close_handle()
+
+    def _close_handle(self):
+        if self._mutex:
+            try:
+                win32api.CloseHandle(self._mutex)
+            except Exception:
+                pass
+            self._mutex = None
+
+
+class PystrayTray(TrayIcon):
+    """pystray.Icon をラップしたタスクトレイアイコン。"""
+
+    def __init__(self, name: str, image: Any, title: str, menu: Any, action: Optional[Callable[..., None]] = None):
+        self._icon = pystray.Icon(name, image, title, menu, action=action)
+
+    @property
+    def title(self) -> str:
+        return self._icon.title
+
+    @title.setter
+    def title(self, value: str):
+        self._icon.title = value
+
+    @property
+    def menu(self) -> Any:
+        return self._icon.menu
+
+    @menu.setter
+    def menu(self, value: Any):
+        self._icon.menu = value
+
+    def run(self):
+        self._icon.run()
+
+    def stop(self):
+        self._icon.stop()
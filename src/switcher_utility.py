@@ -7,32 +7,31 @@ import sys
 import os
 import re
 import json
-import psutil # <- プロセス情報を取得するためのライブラリ
 import time
 import logging # ログ記録のために追加
-from typing import List, Dict, Any, Set, Optional # 型ヒントのために追加
+from typing import List, Dict, Any, Set, Optional, Tuple # 型ヒントのために追加
+
+# 💡 プロセス情報の取得は hz_core.process_source の ProcessSource 越しに行う (既定: psutil)
+from hz_core.process_source import ProcessSource, ProcFsProcessSource, PsutilProcessSource
+from hz_core.metrics import METRICS
+from hz_core.paths import get_resource_path
 
 # ----------------------------------------------------------------------
 # 🚨 ロガーオブジェクトの定義 (すべての関数で利用)
 # ----------------------------------------------------------------------
-APP_LOGGER = logging.getLogger('AutoHzSwitcher')
+# 💡 サブシステムごとにログレベルを変更できるよう、子ロガーを使う (hz_core.app_logging.set_log_level)。
+#    ResolutionSwitcher の呼び出しは 'backend'、プロセス一覧の取得は 'scanner'
+APP_LOGGER = logging.getLogger('AutoHzSwitcher.backend')
+SCANNER_LOGGER = logging.getLogger('AutoHzSwitcher.scanner')
 # ----------------------------------------------------------------------
 
 def resource_path(relative_path):
     """
     PyInstallerでバンドルされた環境、または通常のPython環境のいずれで実行されても、
     リソースファイルへの正しい絶対パスを取得します。
+    💡 パスの解決は hz_core.paths に集約 (翻訳カタログなど hz_core 側と同じ基準を使う)
     """
-    # PyInstaller環境では、リソースは一時フォルダに展開され、そのパスが sys._MEIPASS に格納される
-    if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
-        base_path = sys._MEIPASS
-    # 通常のPython環境の場合
-    else:
-        # 💥 修正: スクリプトがあるディレクトリ（src/）の親ディレクトリ（プロジェクトルート）をベースパスとする
-        base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..')) 
-    
-    # ベースパスと相対パスを結合して絶対パスを作成
-    return os.path.join(base_path, relative_path)
+    return get_resource_path(relative_path)
 
 # -------------------------------------------------------------
 # 例：他のモジュールで利用できるように、パスを解決した定数を定義する
@@ -58,7 +57,122 @@ APP_ICON_ICO_PATH = resource_path("images/app_icon.ico")
 RESOLUTION_SWITCHER_EXE_PATH = resource_path("bin/ResolutionSwitcher.exe")
 
 # --- Configuration Settings (Constants) ---
-SWITCHER_PATH = RESOLUTION_SWITCHER_EXE_PATH
+# 💡 環境変数 AUTOHZ_SWITCHER_PATH で差し替え可能 (ResolutionSwitcher.exe が無い環境での
+#    シミュレーター benchmarks/fake_resolution_switcher.py による動作確認・負荷試験用)
+SWITCHER_PATH = os.environ.get("AUTOHZ_SWITCHER_PATH") or RESOLUTION_SWITCHER_EXE_PATH
+
+# --- 外部ツールの起動回数・所要時間のメトリクス (hz_core.metrics) ---
+_HELPER_SPAWNS = METRICS.counter("autohz_helper_spawns_total", "ResolutionSwitcher processes spawned, by command.")
+_HELPER_DURATION = METRICS.histogram("autohz_helper_duration_seconds", "ResolutionSwitcher wall-clock latency, by command.")
+_SCAN_ERRORS = METRICS.counter("autohz_scan_errors_total", "Failed process scans and lookups by exception type.")
+
+
+def _switcher_argv(*args: str) -> List[str]:
+    """
+    ResolutionSwitcher の起動引数 (argv) を組み立てます。
+    シミュレーター (.py) を指定した場合は、現在の Python で実行する (Windows では .py を直接起動できないため)。
+    """
+    if SWITCHER_PATH.lower().endswith('.py'):
+        return [sys.executable, SWITCHER_PATH, *args]
+    return [SWITCHER_PATH, *args]
+
+
+def _run_switcher(command: str, argv: List[str], **kwargs) -> subprocess.CompletedProcess:
+    r"""
+    ResolutionSwitcher を起動し、完了を待ちます (cp932)。
+    command はメトリクスのラベル ("monitor_modes" / "monitors" / "set_rate")。
+
+    🚨 修正: shell=True ではなく引数リストで起動する。POSIX の /bin/sh を経由すると、二重引用符内の
+       バックスラッシュが解釈されてモニター ID (\\.\DISPLAY1 が \.\DISPLAY1 に) が崩れるため
+       (シミュレーターによる動作確認時)。引数の引用はシェルを介さず subprocess に任せる。
+    💡 Windows では、コンソールを持たないトレイアプリから起動するたびにコンソールウィンドウが
+       表示されないよう、CREATE_NO_WINDOW を指定する (shell=True では cmd.exe が非表示で起動されていた)。
+    """
+    if sys.platform == 'win32':
+        kwargs.setdefault('creationflags', subprocess.CREATE_NO_WINDOW)
+    _HELPER_SPAWNS.inc(command=command)
+    started = time.perf_counter()
+    try:
+        return subprocess.run(argv, check=False, text=True, encoding='cp932', **kwargs)
+    finally:
+        _HELPER_DURATION.observe(time.perf_counter() - started, command=command)
+
+# --- ResolutionSwitcher の出力解析 (外部ツールを起動しない純粋関数) ---
+# 💡 レートは "144Hz" のほか "59.94Hz" のような小数も受け付け、整数に切り捨てる
+#    (59.94 Hz は 59 Hz となり、低レートの許容範囲 (hz_core.decision.is_low_rate) に収まる)
+_MODE_PATTERN = re.compile(r"(\d+x\d+)\s+@\s+(\d+(?:\.\d+)?)Hz")
+_NAME_BLOCK_PATTERN = re.compile(r"^\[(.+)\]$")
+_ID_PATTERN = re.compile(r"^ID:\s+(.+)$")
+_RESOLUTION_PATTERN = re.compile(r"^Resolution:\s+\d+x\d+\s+@\s+(\d+(?:\.\d+)?)Hz$")
+
+
+def _parse_rate(rate_str: str) -> int:
+    """"144" / "59.94" のようなレート文字列を整数 (切り捨て) に変換します。"""
+    return int(float(rate_str))
+
+
+def parse_monitor_modes(output: str) -> Dict[str, List[int]]:
+    """--monitor <ID> の出力から {解像度: [レート (降順)]} を返します。"""
+    modes: Dict[str, List[int]] = {}
+    mode_section = False
+
+    for line in output.splitlines():
+        line = line.strip()
+        
+        if line == "[Available Modes]":
+            mode_section = True
+            continue
+            
+        if mode_section:
+            for resolution, rate_str in _MODE_PATTERN.findall(line):
+                rates = modes.setdefault(resolution, [])
+                rate = _parse_rate(rate_str)
+                if rate not in rates:
+                    rates.append(rate)
+
+    for res in modes:
+        modes[res].sort(reverse=True)
+    return modes
+
+
+def parse_monitor_list(output: str) -> List[Tuple[str, str]]:
+    """--monitors の出力から [(モニターID, モニター名)] を出現順に返します。"""
+    monitors: List[Tuple[str, str]] = []
+    current_name = 'Unknown Monitor'
+
+    for line in output.splitlines():
+        line = line.strip()
+        name_block_match = _NAME_BLOCK_PATTERN.match(line)
+        
+        if name_block_match:
+            current_name = name_block_match.group(1).strip()
+            continue
+        
+        id_match = _ID_PATTERN.match(line)
+        if id_match:
+            monitors.append((id_match.group(1).strip(), current_name))
+            current_name = 'Unknown Monitor'
+    return monitors
+
+
+def parse_active_rates(output: str) -> Dict[str, int]:
+    """--monitors の出力から {モニターID: 現在のレート} を返します。"""
+    snapshot: Dict[str, int] = {}
+    current_id = None
+
+    for line in output.splitlines():
+        line = line.strip()
+
+        id_match = _ID_PATTERN.match(line)
+        if id_match:
+            current_id = id_match.group(1).strip()
+            continue
+        
+        # 各モニターのブロック内で、最初の解像度行を現在のレートとする
+        res_match = _RESOLUTION_PATTERN.match(line)
+        if current_id is not None and res_match and current_id not in snapshot:
+            snapshot[current_id] = _parse_rate(res_match.group(1))
+    return snapshot
 
 # --- Core Utility Function: Get Monitor Modes ---
 
@@ -67,20 +181,14 @@ def _get_monitor_modes(monitor_id: str) -> dict:
     指定されたモニターIDがサポートする全ての解像度とレートを取得します。
     """
     
-    full_command = f'"{SWITCHER_PATH}" --monitor "{monitor_id}"'
-    APP_LOGGER.debug("Executing command for monitor modes list: %s", full_command)
+    argv = _switcher_argv('--monitor', monitor_id)
+    APP_LOGGER.debug("Executing command for monitor modes list: %s", subprocess.list2cmdline(argv))
     
     modes = {}
 
     try:
-        result = subprocess.run(
-            full_command, 
-            check=False,
-            shell=True, 
-            capture_output=True, 
-            text=True, 
-            encoding='cp932', # Windowsでの日本語環境に対応
-        )
+        # Windowsでの日本語環境に対応 (cp932)
+        result = _run_switcher("monitor_modes", argv, capture_output=True)
         
         # 終了コードチェック
         if result.returncode != 0:
@@ -89,33 +197,8 @@ def _get_monitor_modes(monitor_id: str) -> dict:
                              result.returncode, monitor_id, error_output)
             return modes # 失敗時は空の辞書を返す
             
-        output = result.stdout
-        
         # --- データ解析処理 ---
-        mode_section = False
-        mode_pattern = re.compile(r"(\d+x\d+)\s+@\s+(\d+)Hz") 
-
-        for line in output.splitlines():
-            line = line.strip()
-            
-            if line == "[Available Modes]":
-                mode_section = True
-                continue
-                
-            if mode_section:
-                matches = mode_pattern.findall(line)
-
-                for resolution, rate_str in matches:
-                    rate = int(rate_str)
-                    
-                    if resolution not in modes:
-                        modes[resolution] = []
-                    
-                    if rate not in modes[resolution]:
-                        modes[resolution].append(rate)
-                        
-        for res in modes:
-            modes[res].sort(reverse=True)
+        modes = parse_monitor_modes(result.stdout)
             
         APP_LOGGER.debug("Successfully parsed monitor modes for ID: %s. Total resolutions found: %d", monitor_id, len(modes))
         return modes
@@ -135,13 +218,8 @@ def get_monitor_capabilities() -> dict:
     APP_LOGGER.info("Starting to retrieve all monitor capabilities.")
     all_capabilities = {}
 
-    full_command_monitors = f'"{SWITCHER_PATH}" --monitors'
-
     try:
-        result = subprocess.run(
-            full_command_monitors, 
-            check=False, shell=True, capture_output=True, text=True, encoding='cp932',
-        )
+        result = _run_switcher("monitors", _switcher_argv('--monitors'), capture_output=True)
         output = result.stdout
         
         if result.returncode != 0:
@@ -150,30 +228,15 @@ def get_monitor_capabilities() -> dict:
                              result.returncode, error_output)
             return {}
         
-        name_block_pattern = re.compile(r"^\[(.+)\]$")
-        id_pattern = re.compile(r"^ID: (.+)$") 
-        
-        current_id = None
-        current_name = 'Unknown Monitor'
-
-        for line in output.splitlines():
-            line = line.strip()
-            name_block_match = name_block_pattern.match(line)
-            id_match = id_pattern.match(line)
+        for current_id, current_name in parse_monitor_list(output):
+            APP_LOGGER.debug("Found monitor: Name='%s', ID='%s'. Retrieving modes...", current_name, current_id)
+            # モード情報を取得
+            all_modes = _get_monitor_modes(current_id) 
             
-            if name_block_match:
-                current_name = name_block_match.group(1).strip()
-            elif id_match:
-                current_id = id_match.group(1).strip()
-                APP_LOGGER.debug("Found monitor: Name='%s', ID='%s'. Retrieving modes...", current_name, current_id)
-                # モード情報を取得
-                all_modes = _get_monitor_modes(current_id) 
-                
-                all_capabilities[current_id] = {
-                    'Name': current_name, 
-                    'Rates': all_modes
-                }
-                current_name = 'Unknown Monitor' 
+            all_capabilities[current_id] = {
+                'Name': current_name, 
+                'Rates': all_modes
+            }
 
         APP_LOGGER.info("Successfully completed monitor capability retrieval. Total monitors: %d", len(all_capabilities))
         return all_capabilities
@@ -182,64 +245,63 @@ def get_monitor_capabilities() -> dict:
         APP_LOGGER.error("Unexpected error in get_monitor_capabilities (Monitor List): %s", e)
         return {}
     
-def get_current_active_rate(monitor_id: str) -> Optional[int]:
+# 💡 --monitors の解析結果 (全モニターの現在レート) のキャッシュ。
+#    ドリフト確認や GUI 表示など、短時間に連続する問い合わせで外部ツールを何度も起動しないために再利用する。
+_active_rates_snapshot: Dict[str, int] = {}
+_active_rates_snapshot_at: float = 0.0
+
+
+def get_active_rates_snapshot(max_age: float = 0.0) -> Dict[str, int]:
     """
-    ResolutionSwitcher.exe --monitors の出力から、指定されたモニターの
-    現在のリフレッシュレートをOSから直接取得します。
+    ResolutionSwitcher.exe --monitors の出力から、全モニターの現在のリフレッシュレートを
+    {モニターID: レート} の辞書で返します。
+
+    Args:
+        max_age: この秒数以内に取得したスナップショットがあれば、外部ツールを起動せずにそれを返します。
+                 0 の場合は常に新しく取得します。
     """
-    APP_LOGGER.debug("Attempting to get current active rate for monitor ID: %s", monitor_id)
-    full_command_monitors = f'"{SWITCHER_PATH}" --monitors'
+    global _active_rates_snapshot, _active_rates_snapshot_at
+
+    if max_age > 0 and _active_rates_snapshot and (time.monotonic() - _active_rates_snapshot_at) <= max_age:
+        return _active_rates_snapshot
 
     try:
-        result = subprocess.run(
-            full_command_monitors, 
-            check=False, shell=True, capture_output=True, text=True, encoding='cp932',
-        )
+        result = _run_switcher("monitors", _switcher_argv('--monitors'), capture_output=True)
         output = result.stdout
         
         if result.returncode != 0:
             APP_LOGGER.error("ResolutionSwitcher --monitors returned non-zero exit status %d.", result.returncode)
-            return None
+            return {}
 
-        # モニターIDと解像度/レートを抽出するための正規表現パターン
-        id_pattern = re.compile(r"^ID:\s+(.+)$", re.MULTILINE) 
-        res_pattern = re.compile(r"^Resolution:\s+\d+x\d+\s+@\s+(\d+)Hz$", re.MULTILINE) 
+        snapshot = parse_active_rates(output)
 
-        current_id = None
-        current_rate = None
+        # 参照の差し替えのみで更新する (読み出し側は古い辞書をそのまま使い続けてよい)
+        _active_rates_snapshot = snapshot
+        _active_rates_snapshot_at = time.monotonic()
+        return snapshot
 
-        for line in output.splitlines():
-            line = line.strip()
+    except Exception as e:
+        APP_LOGGER.error("Unexpected error in get_active_rates_snapshot: %s", e)
+        return {}
 
-            id_match = id_pattern.match(line)
-            res_match = res_pattern.match(line)
 
-            if id_match:
-                # 新しいモニターIDを検出したら、前のモニターの処理を終了
-                if current_id == monitor_id and current_rate is not None:
-                    break 
-                
-                current_id = id_match.group(1).strip()
-                current_rate = None # レートをリセット
-            
-            # 指定されたモニターのブロック内で解像度行をパース
-            if current_id == monitor_id and res_match:
-                rate_str = res_match.group(1)
-                try:
-                    current_rate = int(rate_str)
-                    # 💡 目的のレートを取得したら即座に処理を終了
-                    APP_LOGGER.info("Active rate retrieved for %s: %d Hz", monitor_id, current_rate)
-                    return current_rate
-                except ValueError:
-                    APP_LOGGER.warning("Could not convert rate '%s' to int for monitor %s.", rate_str, monitor_id)
-                    return None
-        
+def get_current_active_rate(monitor_id: str, max_age: float = 0.0) -> Optional[int]:
+    """
+    ResolutionSwitcher.exe --monitors の出力から、指定されたモニターの
+    現在のリフレッシュレートをOSから直接取得します。
+    max_age > 0 の場合、その秒数以内の全モニタースナップショットを再利用します。
+    """
+    APP_LOGGER.debug("Attempting to get current active rate for monitor ID: %s", monitor_id)
+
+    snapshot = get_active_rates_snapshot(max_age=max_age)
+    current_rate = snapshot.get(monitor_id)
+
+    if current_rate is None:
         APP_LOGGER.warning("Could not find active rate for monitor ID: %s in output.", monitor_id)
         return None
 
-    except Exception as e:
-        APP_LOGGER.error("Unexpected error in get_current_active_rate: %s", e)
-        return None
+    APP_LOGGER.info("Active rate retrieved for %s: %d Hz", monitor_id, current_rate)
+    return current_rate
 
 
 # --- Core Utility Function: Change Rate (元のロジックを維持) ---
@@ -249,18 +311,19 @@ def change_rate(target_rate: int, width: int, height: int, monitor_id: str, max_
     指定されたモニターのリフレッシュレートを変更します。
     外部ツール呼び出しが失敗した場合、最大回数まで再試行します。
     """
-    rs_args = (
-        f'--monitor "{monitor_id}" '
-        f'--width {width} '
-        f'--height {height} '
-        f'--refresh {target_rate} '
-    )
-    
-    full_command = (
-        f'"{SWITCHER_PATH}" {rs_args}'
+    argv = _switcher_argv(
+        '--monitor', monitor_id,
+        '--width', str(width),
+        '--height', str(height),
+        '--refresh', str(target_rate),
     )
     
-    APP_LOGGER.info("Attempting to change rate to %d Hz for %s (%dx%d). Command: %s", target_rate, monitor_id, width, height, full_command)
+    APP_LOGGER.info("Attempting to change rate to %d Hz for %s (%dx%d). Command: %s",
+                    target_rate, monitor_id, width, height, subprocess.list2cmdline(argv))
+
+    # レートを変更するため、全モニターのスナップショットキャッシュを無効化する
+    global _active_rates_snapshot_at
+    _active_rates_snapshot_at = 0.0
 
     for attempt in range(max_retries):
         if attempt > 0:
@@ -269,16 +332,7 @@ def change_rate(target_rate: int, width: int, height: int, monitor_id: str, max_
             time.sleep(retry_delay)
             
         try:
-            # shell=True を使用してコマンドを実行 (元のコードに従う)
-            result = subprocess.run(
-                full_command, 
-                check=False, 
-                shell=True, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE, 
-                text=True, 
-                encoding='cp932'
-            ) 
+            result = _run_switcher("set_rate", argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
             error_output = result.stderr.strip() if result.stderr else "（出力なし）"
             
@@ -302,122 +356,122 @@ def change_rate(target_rate: int, width: int, height: int, monitor_id: str, max_
 
 # -------------------------------------------------------------------
 # --- Core Utility Function: Get Running Processes (GUI実装の基盤) ---
+
+# 監視ループ・GUI のプロセス選択画面で共有するプロセスの取得元 (初回使用時に生成する)
+_process_source: Optional[ProcessSource] = None
+
+# 取得元の強制指定 (psutil / procfs)。未指定の場合は自動選択する
+PROCESS_SOURCE_ENV = "AUTOHZ_PROCESS_SOURCE"
+
+
+def create_default_process_source() -> ProcessSource:
+    """
+    既定のプロセスの取得元を生成します。
+    Linux で /proc が読める場合は /proc を直接読む高速な取得元を、それ以外は psutil を使用します。
+    """
+    choice = os.environ.get(PROCESS_SOURCE_ENV, "").strip().lower()
+    if choice == "psutil":
+        return PsutilProcessSource()
+    if choice in ("", "procfs") and sys.platform.startswith("linux"):
+        try:
+            source = ProcFsProcessSource()
+            SCANNER_LOGGER.debug("Using the /proc fast path for process enumeration.")
+            return source
+        except OSError as e:
+            SCANNER_LOGGER.warning("The /proc fast path is unavailable, falling back to psutil: %s", e)
+    return PsutilProcessSource()
+
+
+def get_process_source() -> ProcessSource:
+    """現在のプロセスの取得元を返します。未設定の場合は既定の取得元 (create_default_process_source) を生成します。"""
+    global _process_source
+    if _process_source is None:
+        _process_source = create_default_process_source()
+    return _process_source
+
+
+def set_process_source(source: Optional[ProcessSource]):
+    """プロセスの取得元を差し替えます (None の場合は既定に戻す)。"""
+    global _process_source
+    _process_source = source
+
+
 # =================================================================================
 # 1. 監視スレッド用: プロセス名とパスのみを返す軽量版 
 # =================================================================================
 
-def get_running_processes_simple() -> List[Dict[str, str]]:
+def get_running_processes_simple(source: Optional[ProcessSource] = None) -> List[Dict[str, str]]:
     """
     実行中のプロセス名と実行パスのみを取得する軽量版。監視スレッドでの利用を想定。
     """
     # 🚨 修正: 毎ループ出力される冗長な開始ログを削除
-    # APP_LOGGER.debug("Starting lightweight process list retrieval for monitoring.")
+    # SCANNER_LOGGER.debug("Starting lightweight process list retrieval for monitoring.")
     processes = []
     seen_processes = set()
     
-    # 💡 修正点: フィールドは 'pid', 'name', 'exe' のみ
-    fields = ['pid', 'name', 'exe']
-    
     try:
-        for proc in psutil.process_iter(fields):
-            try:
-                process_name = proc.info.get('name')
-                executable_path = proc.info.get('exe')
+        for info in (source or get_process_source()).iter_processes():
+            process_name = info.name
+            executable_path = info.exe
+            
+            if process_name and executable_path:
+                key = (process_name, executable_path)
                 
-                if process_name and executable_path:
-                    key = (process_name, executable_path)
-                    
-                    # 重複防止
-                    if key not in seen_processes:
-                        processes.append({
-                            "name": process_name,
-                            "path": executable_path,
-                        })
-                        seen_processes.add(key)
-                        
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                continue
-            except Exception as inner_e:
-                # 💡 このデバッグログは、エラー発生時のみ出力されるため維持
-                APP_LOGGER.debug("Failed to get simple info for process in loop: %s", inner_e)
-                continue 
+                # 重複防止
+                if key not in seen_processes:
+                    processes.append({
+                        "name": process_name,
+                        "path": executable_path,
+                    })
+                    seen_processes.add(key)
                 
     except Exception as e:
         # 💡 エラーログは維持
-        APP_LOGGER.error("Error reading processes (simple): %s", e)
+        SCANNER_LOGGER.error("Error reading processes (simple): %s", e)
+        _SCAN_ERRORS.inc(type=type(e).__name__, operation="scan")
         return []
         
     # 🚨 修正: 毎ループ出力される冗長な終了ログを削除
-    # APP_LOGGER.debug("Lightweight process list retrieval complete. Total unique processes: %d", len(processes))
+    # SCANNER_LOGGER.debug("Lightweight process list retrieval complete. Total unique processes: %d", len(processes))
     return processes
 
 # =================================================================================
 # 2. 登録ダイアログ用: CPUとメモリ情報を含む高負荷版 
 # =================================================================================
 
-def get_running_processes_detailed() -> List[Dict[str, Any]]:
+def get_running_processes_detailed(source: Optional[ProcessSource] = None) -> List[Dict[str, Any]]:
     """
     実行中のプロセスの一覧を取得し、名前（.exe）、実行パス、CPU、メモリを返します。
     """
-    APP_LOGGER.debug("Starting detailed process list retrieval for GUI dialog.")
+    SCANNER_LOGGER.debug("Starting detailed process list retrieval for GUI dialog.")
     processes = []
     seen_processes = set()
     
     try:
-        psutil.cpu_percent(interval=None) 
-    except Exception:
-        pass
-        
-    # 取得フィールドを設定
-    fields = ['pid', 'name', 'exe', 'cpu_percent', 'memory_info']
-    
-    try:
-        for proc in psutil.process_iter(fields):
-            try:
-                process_name = proc.info.get('name')
-                executable_path = proc.info.get('exe')
+        for info in (source or get_process_source()).iter_processes(detailed=True):
+            process_name = info.name
+            executable_path = info.exe
+            
+            if process_name and executable_path:
+                key = (process_name, executable_path)
                 
-                if process_name and executable_path:
-                    key = (process_name, executable_path)
-                    
-                    if key not in seen_processes:
+                if key not in seen_processes:
+                    # MB単位に変換 (bytes / 1024 / 1024)
+                    memory_mb = info.memory_rss / (1024 * 1024) if info.memory_rss else 0
                         
-                        # CPU情報の取得
-                        cpu_percent = proc.info.get('cpu_percent', 0.0)
-                        
-                        # 💡 修正点: memory_info を取得し、hasattr() で 'rss' 属性の存在をチェック
-                        mem_info = proc.info.get('memory_info')
-                        memory_mb = 0
-                        
-                        # namedtuple または dict の場合に .rss / ['rss'] が存在するか安全にチェック
-                        if mem_info:
-                            rss_value = getattr(mem_info, 'rss', None)
-                            if rss_value is None and isinstance(mem_info, dict) and 'rss' in mem_info:
-                                rss_value = mem_info['rss']
-                                
-                            if isinstance(rss_value, (int, float)):
-                                # MB単位に変換 (bytes / 1024 / 1024)
-                                memory_mb = rss_value / (1024 * 1024)
-                            
-                        processes.append({
-                            "name": process_name,
-                            "path": executable_path,
-                            "cpu": round(cpu_percent, 1), 
-                            "memory": round(memory_mb) 
-                        })
-                        seen_processes.add(key)
-                        
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                continue
-            except Exception as inner_e:
-                APP_LOGGER.warning("Failed to get detailed info for process %s: %s", proc.info.get('name', 'Unknown'), inner_e)
-                continue 
+                    processes.append({
+                        "name": process_name,
+                        "path": executable_path,
+                        "cpu": round(info.cpu_percent, 1), 
+                        "memory": round(memory_mb) 
+                    })
+                    seen_processes.add(key)
                 
     except Exception as e:
-        APP_LOGGER.error("Error reading detailed processes: %s", e)
+        SCANNER_LOGGER.error("Error reading detailed processes: %s", e)
         return []
         
-    APP_LOGGER.debug("Detailed process list retrieval complete. Total unique processes: %d", len(processes))
+    SCANNER_LOGGER.debug("Detailed process list retrieval complete. Total unique processes: %d", len(processes))
     # デフォルトソート（メモリ降順）を適用
     return sorted(processes, key=lambda x: x['memory'], reverse=True)
 
@@ -428,29 +482,59 @@ def get_all_process_names() -> Set[str]:
     """
     メインアプリの監視ループで使用するために、現在実行中のプロセス名のみのSetを返します。
     """
-    APP_LOGGER.debug("Starting retrieval of all running process names for monitoring set.")
+    SCANNER_LOGGER.debug("Starting retrieval of all running process names for monitoring set.")
     running_names: Set[str] = set()
     try:
-        for proc in psutil.process_iter(['name']):
-             name = proc.info.get('name')
-             if name:
-                 running_names.add(name)
+        for info in get_process_source().iter_processes():
+             if info.name:
+                 running_names.add(info.name)
         
-        APP_LOGGER.debug("Successfully retrieved %d unique process names.", len(running_names))
+        SCANNER_LOGGER.debug("Successfully retrieved %d unique process names.", len(running_names))
         return running_names
         
     except Exception as e:
-        APP_LOGGER.error("Error retrieving all process names for monitoring: %s", e)
+        SCANNER_LOGGER.error("Error retrieving all process names for monitoring: %s", e)
         return set()
 
 
+# -------------------------------------------------------------------
+# --- レート状態ジャーナル用: プロセスの識別情報 (PID + 起動時刻) ---
+
+def find_process_identity(process_name: str) -> Optional[Tuple[int, float]]:
+    """
+    指定した名前のプロセスを 1 つ探し、(pid, create_time) を返します。見つからない場合は None。
+    レート変更時のみ呼び出されるため、監視ループの負荷には影響しません。
+    """
+    try:
+        info = get_process_source().find_by_name(process_name)
+        if info is not None and info.create_time is not None:
+            return info.pid, info.create_time
+    except Exception as e:
+        SCANNER_LOGGER.debug("Failed to resolve process identity for %s: %s", process_name, e)
+        _SCAN_ERRORS.inc(type=type(e).__name__, operation="find_process")
+    return None
+
+
+def is_process_alive(pid: int, create_time: float) -> bool:
+    """
+    指定した PID のプロセスが、記録時と同じ起動時刻で現在も実行中かを返します。
+    PID の再利用による誤判定を防ぐため、起動時刻も比較します。
+    """
+    try:
+        return get_process_source().is_process_alive(pid, create_time)
+    except Exception as e:
+        SCANNER_LOGGER.debug("Failed to verify process %s: %s", pid, e)
+        _SCAN_ERRORS.inc(type=type(e).__name__, operation="is_alive")
+        return False
+
+
 # -------------------------------------------------------------------
 # --- CLI Execution Block (テスト用に利用) ---
 if __name__ == "__main__":
     
     # ロギング設定の基本設定
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    APP_LOGGER.setLevel(logging.DEBUG) # テスト実行時はログレベルをDEBUGに設定
+    logging.getLogger('AutoHzSwitcher').setLevel(logging.DEBUG) # テスト実行時はログレベルをDEBUGに設定
     
     print("\n--- Full Monitor Capabilities Test ---")
     APP_LOGGER.info("--- Starting Full Monitor Capabilities Test ---")
@@ -0,0 +1,100 @@
+# tests/conftest.py
+# 監視エンジンのテスト共通の準備 (src/ を import パスに追加し、メモリ上の実装で MonitorEngine を組み立てる)
+#
+# 💡 ディスプレイ / プロセスは hz_core.fakes を使うため、ResolutionSwitcher.exe / psutil が無い Linux でも実行できる。
+#       python -m pytest -q
+
+import os
+import sys
+import threading
+
+import pytest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from hz_core.engine import MonitorEngine  # noqa: E402
+from hz_core.fakes import FakeDisplayBackend, FakeProcessScanner  # noqa: E402
+from hz_core.metrics import MetricsRegistry  # noqa: E402
+from hz_core.rate_journal import RateJournal  # noqa: E402
+
+MONITOR_ID = r"\\.\DISPLAY1"
+
+
+class ManualClock:
+    """advance() でのみ進む時計 (ドリフト確認の間隔を待たずに進めるため)。"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class CountingDisplayBackend(FakeDisplayBackend):
+    """実レートの読み出し回数も記録する FakeDisplayBackend。"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.get_calls = 0
+
+    def get_active_rate(self, monitor_id, max_age=0.0):
+        self.get_calls += 1
+        return super().get_active_rate(monitor_id, max_age)
+
+
+def make_settings(**overrides):
+    settings = {
+        "selected_monitor_id": MONITOR_ID,
+        "target_resolution": "1920x1080",
+        "is_monitoring_enabled": True,
+        "default_low_rate": 60,
+        "use_global_high_rate": False,
+        "global_high_rate": 144,
+        "drift_policy": "correct",
+        "games": [
+            {"name": "Game A", "process_name": "game_a.exe", "high_rate": 144, "is_enabled": True},
+            {"name": "Game B", "process_name": "game_b.exe", "high_rate": 120, "is_enabled": True},
+        ],
+    }
+    settings.update(overrides)
+    return settings
+
+
+@pytest.fixture
+def clock():
+    return ManualClock()
+
+
+@pytest.fixture
+def make_engine(tmp_path, clock):
+    """MonitorEngine をメモリ上の実装で生成する関数を返します。生成したエンジンはテスト終了時に停止します。"""
+    engines = []
+
+    def factory(settings=None, rates=None, processes=(), supported_rates=None, journal=None, trace_recorder=None):
+        backend = CountingDisplayBackend({MONITOR_ID: 60} if rates is None else rates, supported_rates=supported_rates)
+        scanner = FakeProcessScanner(processes)
+        engine = MonitorEngine(
+            settings if settings is not None else make_settings(),
+            display_backend=backend,
+            process_scanner=scanner,
+            rate_journal=journal if journal is not None else RateJournal(str(tmp_path / "rate_journal.jsonl")),
+            clock=clock,
+            metrics=MetricsRegistry(),
+            trace_recorder=trace_recorder,
+        )
+        engines.append(engine)
+        return engine, backend, scanner
+
+    yield factory
+    for engine in engines:
+        engine.shutdown()
+
+
+def run_tick(engine):
+    """監視スレッドを起動せずに、監視ループの 1 回分を実行します。"""
+    engine._monitoring_tick(threading.Event())
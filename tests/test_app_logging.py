@@ -0,0 +1,192 @@
+# tests/test_app_logging.py
+# ロギング (hz_core.app_logging) の確認: 繰り返しの要約・ローテーション後の圧縮と保持・実行中のレベル変更
+
+import gzip
+import logging
+import os
+
+import pytest
+
+from hz_core import app_logging
+from hz_core.app_logging import (
+    APP_LOGGER_NAME, CompressingRotatingFileHandler, RepeatCollapsingHandler, _LogCompressor,
+    apply_log_levels, get_log_levels, get_subsystem_logger, set_log_level,
+)
+from hz_core.settings import LOG_SUBSYSTEMS
+from tests.conftest import ManualClock
+
+
+class CollectingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def make_record(msg, *args, name="AutoHzSwitcher", level=logging.WARNING):
+    return logging.makeLogRecord({"name": name, "levelno": level, "levelname": logging.getLevelName(level), "msg": msg, "args": args})
+
+
+@pytest.fixture
+def collapsing():
+    clock = ManualClock()
+    target = CollectingHandler()
+    handler = RepeatCollapsingHandler([target], window=60.0, max_tracked=3, clock=clock)
+    return handler, target, clock
+
+
+# --- RepeatCollapsingHandler ---
+
+def test_repeats_are_collapsed_into_a_summary_after_the_window(collapsing):
+    handler, target, clock = collapsing
+    for _ in range(5):
+        handler.handle(make_record("probe failed: %s", "timeout"))
+        clock.advance(1.0)
+    assert target.messages == ["probe failed: timeout"]
+    assert handler.suppressed == 4
+
+    clock.advance(60.0)
+    handler.handle(make_record("probe failed: %s", "timeout"))
+    assert target.messages == [
+        "probe failed: timeout",
+        "Last message repeated 4 times in the last 65 s: probe failed: timeout",
+        "probe failed: timeout",
+    ]
+
+
+def test_expired_summary_is_written_when_another_message_arrives(collapsing):
+    handler, target, clock = collapsing
+    handler.handle(make_record("a"))
+    handler.handle(make_record("a"))
+    clock.advance(61.0)
+    handler.handle(make_record("b"))
+
+    assert target.messages == ["a", "Last message repeated 1 times in the last 61 s: a", "b"]
+
+
+def test_pending_summary_is_written_on_close(collapsing):
+    handler, target, clock = collapsing
+    handler.handle(make_record("a"))
+    handler.handle(make_record("a"))
+    clock.advance(10.0)
+    handler.close()
+
+    assert target.messages[-1] == "Last message repeated 1 times in the last 10 s: a"
+
+
+def test_oldest_message_is_evicted_at_max_tracked(collapsing):
+    handler, target, clock = collapsing
+    handler.handle(make_record("a"))
+    handler.handle(make_record("a"))
+    for text in ("b", "c", "d"):
+        clock.advance(1.0)
+        handler.handle(make_record(text))
+
+    # "a" は追跡から外れる (要約を出力して忘れる) ため、次の "a" はそのまま出力される
+    assert target.messages == ["a", "b", "c", "Last message repeated 1 times in the last 3 s: a", "d"]
+    handler.handle(make_record("a"))
+    assert target.messages[-1] == "a"
+
+
+def test_different_loggers_and_levels_are_tracked_separately(collapsing):
+    handler, target, _ = collapsing
+    handler.handle(make_record("x"))
+    handler.handle(make_record("x", name="AutoHzSwitcher.scanner"))
+    handler.handle(make_record("x", level=logging.ERROR))
+
+    assert target.messages == ["x", "x", "x"]
+
+
+# --- ローテーションと圧縮 ---
+
+def write_segment(path, size, mtime):
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    os.utime(path, (mtime, mtime))
+
+
+def test_rollover_renames_with_timestamp_and_counter(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_logging.time, "strftime", lambda fmt: "20260101-120000")
+    base = str(tmp_path / "AutoHzSwitcher.log")
+    handler = CompressingRotatingFileHandler(base, maxBytes=1024, compression="none", encoding="utf-8")
+    try:
+        for text in ("first", "second"):
+            handler.stream.write(text)
+            handler.doRollover()
+    finally:
+        handler.close()
+
+    names = sorted(os.listdir(tmp_path))
+    assert names == ["AutoHzSwitcher.log", "AutoHzSwitcher.log.20260101-120000", "AutoHzSwitcher.log.20260101-120000.1"]
+    with open(str(tmp_path / "AutoHzSwitcher.log.20260101-120000.1"), encoding="utf-8") as f:
+        assert f.read() == "second"
+
+
+def test_zstd_falls_back_to_gzip_without_zstandard(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_logging, "_zstd_compressor", lambda: None)
+    base = str(tmp_path / "AutoHzSwitcher.log")
+    segment = base + ".20260101-120000"
+    write_segment(segment, 2048, 1_700_000_000)
+
+    compressor = _LogCompressor(base, "zstd", retention_bytes=10 * 1024 * 1024)
+    compressor.close()
+
+    assert not os.path.exists(segment)
+    with gzip.open(segment + ".gz", "rb") as f:
+        assert f.read() == b"x" * 2048
+    # 元のログの更新時刻を引き継ぐ
+    assert os.path.getmtime(segment + ".gz") == 1_700_000_000
+    assert compressor.segments() == [segment + ".gz"]
+
+
+def test_retention_removes_oldest_segments_but_keeps_the_newest(tmp_path):
+    base = str(tmp_path / "AutoHzSwitcher.log")
+    for index, mtime in enumerate((1_700_000_000, 1_700_000_100, 1_700_000_200)):
+        write_segment(f"{base}.2026010{index + 1}-000000", 100, mtime)
+    write_segment(base, 500, 1_700_000_300)  # 書き込み中のログは対象外
+
+    compressor = _LogCompressor(base, "none", retention_bytes=150)
+    compressor.close()
+    assert [os.path.basename(path) for path in compressor.segments()] == ["AutoHzSwitcher.log.20260103-000000"]
+
+    compressor = _LogCompressor(base, "none", retention_bytes=10)
+    compressor.close()
+    assert len(compressor.segments()) == 1
+    assert os.path.exists(base)
+
+
+# --- 実行中のレベル変更 ---
+
+@pytest.fixture
+def restore_levels():
+    loggers = [logging.getLogger(APP_LOGGER_NAME)] + [get_subsystem_logger(name) for name in LOG_SUBSYSTEMS]
+    saved = [logger.level for logger in loggers]
+    yield
+    for logger, level in zip(loggers, saved):
+        logger.setLevel(level)
+
+
+def test_subsystems_inherit_the_global_level_unless_overridden(restore_levels):
+    apply_log_levels({"log_level": "WARNING", "log_levels": {"scanner": "DEBUG"}})
+    assert get_subsystem_logger("scanner").getEffectiveLevel() == logging.DEBUG
+    assert get_subsystem_logger("backend").getEffectiveLevel() == logging.WARNING
+    assert get_log_levels() == {"global": "WARNING", "scanner": "DEBUG", "backend": None, "gui": None}
+
+    set_log_level("ERROR")
+    assert get_subsystem_logger("backend").getEffectiveLevel() == logging.ERROR
+    assert get_subsystem_logger("scanner").getEffectiveLevel() == logging.DEBUG
+
+    levels = set_log_level(None, subsystem="scanner")
+    assert levels["scanner"] is None
+    assert get_subsystem_logger("scanner").getEffectiveLevel() == logging.ERROR
+
+
+def test_invalid_levels_and_subsystems_are_rejected(restore_levels):
+    with pytest.raises(ValueError):
+        set_log_level("VERBOSE")
+    with pytest.raises(ValueError):
+        set_log_level("DEBUG", subsystem="network")
+    with pytest.raises(ValueError):
+        set_log_level(None)
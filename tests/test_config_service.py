@@ -0,0 +1,142 @@
+# tests/test_config_service.py
+# ConfigService の外部変更の再読み込み (アプリ内の変更との統合) の確認
+
+import json
+import os
+
+from hz_core.config_service import ConfigService
+from hz_core.settings import get_default_settings
+
+
+def write_external(path, settings):
+    """外部ツールによる編集を模擬する (mtime を確実に変えるため、書き込み後に進める)。"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(settings, f)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def read_file(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def make_service(tmp_path, **overrides):
+    path = str(tmp_path / "config.json")
+    settings = get_default_settings()
+    settings.update(overrides)
+    write_external(path, settings)
+    return path, ConfigService(path, debounce=0)
+
+
+def test_external_edit_is_reloaded_and_reported(tmp_path):
+    path, service = make_service(tmp_path)
+    changes = []
+    service.add_reload_listener(changes.append)
+
+    external = read_file(path)
+    external["default_low_rate"] = 75
+    write_external(path, external)
+
+    assert service.check_for_changes()
+    assert service.settings["default_low_rate"] == 75
+    assert changes == [{"default_low_rate"}]
+    assert not service.check_for_changes()
+
+
+def test_in_app_changes_survive_an_external_edit(tmp_path):
+    path, service = make_service(tmp_path)
+    shared = service.settings
+    service.debounce = 60  # アプリ内の変更を未保存のまま残す
+    service.settings["global_high_rate"] = 165
+    service.save()
+
+    external = read_file(path)
+    external["default_low_rate"] = 75
+    write_external(path, external)
+
+    assert service.check_for_changes()
+    # 監視スレッドと共有している辞書は差し替えない
+    assert service.settings is shared
+    assert service.settings["default_low_rate"] == 75
+    assert service.settings["global_high_rate"] == 165
+
+    assert service.flush()
+    on_disk = read_file(path)
+    assert on_disk["default_low_rate"] == 75
+    assert on_disk["global_high_rate"] == 165
+    service.close()
+
+
+def test_pending_write_merges_external_edit_instead_of_overwriting(tmp_path):
+    path, service = make_service(tmp_path)
+    service.debounce = 60
+    service.settings["is_monitoring_enabled"] = True
+    service.save()
+
+    external = read_file(path)
+    external["games"] = [{"name": "G", "process_name": "g.exe", "high_rate": 144, "is_enabled": True}]
+    write_external(path, external)
+
+    assert service.flush()
+    on_disk = read_file(path)
+    assert on_disk["is_monitoring_enabled"] is True
+    assert on_disk["games"][0]["process_name"] == "g.exe"
+    service.close()
+
+
+def test_unreadable_external_edit_keeps_current_settings(tmp_path):
+    path, service = make_service(tmp_path, default_low_rate=60)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{ not json")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    assert not service.check_for_changes()
+    assert service.settings["default_low_rate"] == 60
+
+
+class RecordingTimer:
+    """ConfigService の timer_factory 用。start() された遅延書き込みを記録し、fire() で実行する。"""
+
+    def __init__(self, started, delay, callback):
+        self.delay = delay
+        self.callback = callback
+        self.cancelled = False
+        self._started = started
+
+    def start(self):
+        self._started.append(self)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def fire(self):
+        if not self.cancelled:
+            self.callback()
+
+
+def test_in_app_edit_survives_two_external_edits(tmp_path):
+    path, _ = make_service(tmp_path, default_low_rate=60, global_high_rate=144)
+    timers = []
+    service = ConfigService(path, debounce=60, timer_factory=lambda delay, cb: RecordingTimer(timers, delay, cb))
+    service.settings["default_low_rate"] = 75
+    service.save()
+
+    for rate in (165, 240):
+        external = read_file(path)
+        external["global_high_rate"] = rate
+        write_external(path, external)
+        assert service.check_for_changes()
+        assert service.settings["default_low_rate"] == 75
+        assert service.settings["global_high_rate"] == rate
+
+    # 再読み込みで統合した内容の書き込みは、通常の遅延書き込みとして予約される
+    pending = [timer for timer in timers if not timer.cancelled]
+    assert len(pending) == 1
+    pending[0].fire()
+    on_disk = read_file(path)
+    assert on_disk["default_low_rate"] == 75
+    assert on_disk["global_high_rate"] == 240
+    assert not service.is_dirty
+    service.close()
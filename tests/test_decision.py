@@ -0,0 +1,103 @@
+# tests/test_decision.py
+# RuleIndex + decide_target_rate が、分割前の監視ループ (main_app._monitoring_loop) と同じ判定をすることの確認
+
+import itertools
+
+import pytest
+
+from hz_core.decision import RateOverride, decide_target_rate, is_low_rate
+from hz_core.rules import GLOBAL_HIGH_RATE_NAME, RuleIndex
+
+
+def baseline_decision(settings, running_processes, current_rate):
+    """分割前の監視ループの判定部分 (ログ出力を除いてそのまま移したもの)。(target_rate, game_name) を返す。"""
+    global_high_rate_value = settings.get("global_high_rate", 144)
+    use_global_high_rate = settings.get("use_global_high_rate", False)
+    default_low_rate = settings.get("default_low_rate", 60)
+
+    highest_required_rate = default_low_rate
+    is_any_game_running = False
+    current_game_name = None
+
+    for game in settings.get("games", []):
+        if not game.get("is_enabled", False):
+            continue
+        process_name = game.get("process_name")
+        high_rate = game.get("high_rate", 144)
+        if process_name and process_name in running_processes:
+            is_any_game_running = True
+            if use_global_high_rate:
+                highest_required_rate = global_high_rate_value
+                current_game_name = "Global High Rate"
+                break
+            if high_rate > highest_required_rate:
+                highest_required_rate = high_rate
+                current_game_name = game.get('name', process_name)
+
+    target_rate = None
+    is_at_low_rate = current_rate == default_low_rate or current_rate == (default_low_rate - 1)
+    if is_any_game_running:
+        if highest_required_rate != current_rate:
+            target_rate = highest_required_rate
+    elif not is_at_low_rate:
+        target_rate = default_low_rate
+    return target_rate, current_game_name
+
+
+GAMES = [
+    {"name": "Game A", "process_name": "a.exe", "high_rate": 144, "is_enabled": True},
+    {"name": "Game B", "process_name": "b.exe", "high_rate": 165, "is_enabled": True},
+    {"name": "Game C", "process_name": "c.exe", "high_rate": 144, "is_enabled": True},
+    {"name": "Disabled", "process_name": "d.exe", "high_rate": 240, "is_enabled": False},
+    {"name": "Low", "process_name": "e.exe", "high_rate": 50, "is_enabled": True},
+    {"name": "Duplicate A", "process_name": "a.exe", "high_rate": 165, "is_enabled": True},
+]
+PROCESS_SETS = [
+    set(combo)
+    for size in range(4)
+    for combo in itertools.combinations(["a.exe", "b.exe", "c.exe", "d.exe", "e.exe", "explorer.exe"], size)
+]
+
+
+@pytest.mark.parametrize("use_global_high_rate", [False, True])
+@pytest.mark.parametrize("current_rate", [None, 59, 60, 120, 144, 165, 240])
+def test_matches_baseline_loop(use_global_high_rate, current_rate):
+    for games in (GAMES, GAMES[:3], GAMES[3:], []):
+        settings = {
+            "default_low_rate": 60,
+            "use_global_high_rate": use_global_high_rate,
+            "global_high_rate": 240,
+            "games": games,
+        }
+        index = RuleIndex.from_settings(settings)
+        for running in PROCESS_SETS:
+            match = index.evaluate(running)
+            expected_target, expected_game = baseline_decision(settings, running, current_rate)
+            assert decide_target_rate(match, current_rate, 60) == expected_target, (games, running, current_rate)
+            assert match.game_name == expected_game, (games, running)
+
+
+def test_global_high_rate_reports_first_registered_process():
+    index = RuleIndex.from_settings({"use_global_high_rate": True, "global_high_rate": 240, "games": GAMES})
+    match = index.evaluate({"c.exe", "b.exe"})
+    assert match.game_name == GLOBAL_HIGH_RATE_NAME
+    assert match.required_rate == 240
+    assert match.process_name == "b.exe"
+
+
+def test_low_rate_tolerates_fractional_refresh():
+    assert is_low_rate(59, 60)
+    assert is_low_rate(60, 60)
+    assert not is_low_rate(61, 60)
+    assert not is_low_rate(None, 60)
+
+
+def test_override_holds_rate_only_for_the_same_running_games():
+    index = RuleIndex.from_settings({"default_low_rate": 60, "games": GAMES})
+    idle = index.evaluate(set())
+    override = RateOverride.for_match(144, "drift-adopt", idle)
+
+    assert decide_target_rate(idle, 144, 60, override) is None
+    assert decide_target_rate(idle, 60, 60, override) == 144
+    # ゲームの構成が変われば、ルールに従う
+    assert decide_target_rate(index.evaluate({"a.exe"}), 144, 60, override) == 165
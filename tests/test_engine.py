@@ -0,0 +1,238 @@
+# tests/test_engine.py
+# 監視エンジン (MonitorEngine) の動作確認: 起動時のクラッシュ復帰とドリフト補正
+
+import threading
+import time
+
+from hz_core.metrics import METRICS
+from hz_core.rate_journal import RateJournal
+from tests.conftest import MONITOR_ID, make_settings, run_tick
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+# --- 起動時のクラッシュ復帰 ---
+
+def test_recovery_without_journal_returns_stuck_display_to_idle(make_engine):
+    engine, backend, _ = make_engine(rates={MONITOR_ID: 144})
+
+    engine.start()
+
+    assert wait_until(lambda: engine.is_monitoring)
+    assert backend.change_calls[0] == (60, 1920, 1080, MONITOR_ID)
+    assert engine.current_rate == 60
+    assert engine.rate_journal.last_record().reason == "recovery"
+
+
+def test_recovery_without_journal_keeps_rate_of_running_game(make_engine):
+    engine, backend, _ = make_engine(rates={MONITOR_ID: 144}, processes=["game_a.exe"])
+
+    engine.start()
+
+    assert wait_until(lambda: engine.is_monitoring)
+    assert engine.current_rate == 144
+    assert backend.change_calls == []
+
+
+def test_recovery_trusts_low_rate_journal_record_without_probing(make_engine, tmp_path):
+    journal = RateJournal(str(tmp_path / "journal.jsonl"))
+    journal.append(60, "idle")
+    engine, backend, _ = make_engine(settings=make_settings(is_monitoring_enabled=False), journal=journal)
+
+    engine.start()
+
+    assert wait_until(lambda: engine.is_monitoring)
+    assert backend.get_calls == 0
+    assert engine.current_rate == 60
+
+
+def test_recovery_trusts_high_rate_record_while_owner_process_is_alive(make_engine, tmp_path):
+    engine, backend, scanner = make_engine(settings=make_settings(is_monitoring_enabled=False), rates={MONITOR_ID: 144})
+    scanner.start("game_a.exe")
+    pid, create_time = scanner.find_process_identity("game_a.exe")
+    engine.rate_journal.append(144, "game", game_pid=pid, game_create_time=create_time, game_name="game_a.exe")
+
+    engine.start()
+
+    assert wait_until(lambda: engine.is_monitoring)
+    assert backend.get_calls == 0
+    assert engine.current_rate == 144
+
+
+def test_recovery_probes_display_when_owner_process_is_gone(make_engine):
+    engine, backend, scanner = make_engine(rates={MONITOR_ID: 144})
+    engine.rate_journal.append(144, "game", game_pid=4242, game_create_time=1.0, game_name="game_a.exe")
+
+    engine.start()
+
+    assert wait_until(lambda: engine.is_monitoring)
+    assert backend.get_calls >= 1
+    assert backend.change_calls[0][0] == 60
+    assert engine.current_rate == 60
+
+
+# --- 監視ループ ---
+
+def test_tick_switches_to_game_rate_and_back(make_engine):
+    engine, backend, scanner = make_engine()
+
+    scanner.start("game_b.exe")
+    run_tick(engine)
+    assert engine.current_rate == 120
+
+    scanner.start("game_a.exe")
+    run_tick(engine)
+    assert engine.current_rate == 144
+
+    scanner.kill("game_a.exe")
+    scanner.kill("game_b.exe")
+    run_tick(engine)
+    assert engine.current_rate == 60
+    assert [call[0] for call in backend.change_calls] == [120, 144, 60]
+
+
+# --- ドリフト ---
+
+def test_drift_correct_restores_expected_rate(make_engine, clock):
+    engine, backend, scanner = make_engine(processes=["game_a.exe"])
+    run_tick(engine)
+    assert backend.rates[MONITOR_ID] == 144
+
+    # 外部ツールが 60 Hz に戻した
+    backend.rates[MONITOR_ID] = 60
+    clock.advance(engine.DRIFT_FAST_INTERVAL_SECONDS)
+    run_tick(engine)
+
+    assert backend.rates[MONITOR_ID] == 144
+    assert engine.current_rate == 144
+    assert engine.rate_journal.last_record().reason == "drift-correct"
+
+
+def test_drift_metrics_go_to_the_engine_registry(make_engine, clock):
+    global_checks = METRICS.counter("autohz_drift_checks_total").get()
+    engine, backend, _ = make_engine()
+    run_tick(engine)
+    backend.rates[MONITOR_ID] = 144
+    clock.advance(engine.DRIFT_FAST_INTERVAL_SECONDS)
+    run_tick(engine)
+
+    assert engine._metrics.get("autohz_drift_checks_total").get() >= 1
+    assert METRICS.counter("autohz_drift_checks_total").get() == global_checks
+
+
+def test_drift_is_not_checked_before_interval(make_engine, clock):
+    engine, backend, _ = make_engine()
+    run_tick(engine)
+    backend.rates[MONITOR_ID] = 144
+
+    run_tick(engine)
+
+    assert backend.get_calls == 0
+    assert engine.current_rate == 60
+
+
+def test_drift_adopt_keeps_observed_rate_until_games_change(make_engine, clock):
+    engine, backend, scanner = make_engine(settings=make_settings(drift_policy="adopt"))
+    run_tick(engine)
+
+    # ゲーム実行なしの状態で、ユーザーが 144 Hz に変更した
+    backend.rates[MONITOR_ID] = 144
+    clock.advance(engine.DRIFT_FAST_INTERVAL_SECONDS)
+    run_tick(engine)
+    assert engine.current_rate == 144
+    assert engine.rate_journal.last_record().reason == "drift-adopt"
+
+    # 次の tick で低レートへ戻さない
+    run_tick(engine)
+    run_tick(engine)
+    assert backend.change_calls == []
+    assert engine.current_rate == 144
+
+    # ゲームの起動 (構成の変化) で上書きは解除され、ルールに従う
+    scanner.start("game_b.exe")
+    run_tick(engine)
+    assert engine.current_rate == 120
+    scanner.kill("game_b.exe")
+    run_tick(engine)
+    assert engine.current_rate == 60
+    assert [call[0] for call in backend.change_calls] == [120, 60]
+
+
+def test_drift_adopt_while_game_runs_is_kept_for_that_game(make_engine, clock):
+    engine, backend, scanner = make_engine(settings=make_settings(drift_policy="adopt"), processes=["game_a.exe"])
+    run_tick(engine)
+    assert engine.current_rate == 144
+
+    backend.rates[MONITOR_ID] = 165
+    clock.advance(engine.DRIFT_FAST_INTERVAL_SECONDS)
+    run_tick(engine)
+    run_tick(engine)
+    assert engine.current_rate == 165
+    assert [call[0] for call in backend.change_calls] == [144]
+
+    scanner.kill("game_a.exe")
+    run_tick(engine)
+    assert engine.current_rate == 60
+
+
+# --- force_rate (制御コマンド) ---
+
+def test_force_rate_is_held_while_monitoring(make_engine):
+    engine, backend, scanner = make_engine()
+    engine.start()
+    assert wait_until(lambda: engine.is_monitoring)
+
+    assert engine.force_rate(144, reason="ipc") == 144
+    run_tick(engine)
+    run_tick(engine)
+    assert engine.current_rate == 144
+    assert backend.rates[MONITOR_ID] == 144
+
+    scanner.start("game_b.exe")
+    run_tick(engine)
+    assert engine.current_rate == 120
+    assert engine.rate_override is None
+
+
+def test_force_rate_without_monitoring_sets_no_override(make_engine):
+    engine, backend, _ = make_engine(settings=make_settings(is_monitoring_enabled=False))
+
+    assert engine.force_rate(75) == 75
+    assert engine.current_rate == 75
+    assert engine.rate_override is None
+
+
+def test_rate_changes_from_several_threads_are_serialized(make_engine):
+    engine, backend, scanner = make_engine()
+    in_flight = []
+    overlaps = []
+    change_rate = backend.change_rate
+
+    def slow_change_rate(*args):
+        in_flight.append(args)
+        if len(in_flight) > 1:
+            overlaps.append(list(in_flight))
+        time.sleep(0.02)
+        try:
+            return change_rate(*args)
+        finally:
+            in_flight.remove(args)
+
+    backend.change_rate = slow_change_rate
+    scanner.start("game_a.exe")
+    threads = [threading.Thread(target=run_tick, args=(engine,)) for _ in range(3)]
+    threads += [threading.Thread(target=engine.force_rate, args=(rate,)) for rate in (120, 165, 75)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert overlaps == []
+    assert engine.current_rate == backend.rates[MONITOR_ID]
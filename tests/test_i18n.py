@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from hz_core.i18n import TranslationCatalog, get_translation_catalog, set_translation_catalog
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+@pytest.fixture(autouse=True)
+def fresh_catalog():
+    set_translation_catalog(None)
+    yield
+    set_translation_catalog(None)
+
+
+def test_shared_catalog_reads_the_project_lang_dir():
+    catalog = get_translation_catalog()
+
+    assert catalog is get_translation_catalog()
+    assert os.path.samefile(catalog.lang_dir, os.path.join(REPO_ROOT, 'lang'))
+    assert catalog.load("ja").get("status_idle") == "アイドル中"
+    assert catalog.load("ja") is catalog.load("ja")
+
+
+def test_replaced_catalog_is_used_by_every_caller(tmp_path):
+    (tmp_path / 'en.json').write_text(json.dumps({"status_idle": "Resting"}), encoding='utf-8')
+    set_translation_catalog(TranslationCatalog(str(tmp_path)))
+
+    assert get_translation_catalog().load("en").get("status_idle") == "Resting"
+
+
+def test_micro_benchmark_translations_set_up():
+    sys.path.insert(0, os.path.join(REPO_ROOT, 'benchmarks'))
+    try:
+        import micro
+    finally:
+        sys.path.remove(os.path.join(REPO_ROOT, 'benchmarks'))
+
+    for name in ("i18n.language_manager_get", "i18n.language_manager_get_format"):
+        assert micro.BENCHMARKS[name](None)()
+
+
+def test_catalog_does_not_import_app_modules():
+    # hz_core はアプリ側のモジュール (switcher_utility など) に依存しない
+    code = (
+        "import sys\n"
+        "from hz_core.i18n import get_translation_catalog\n"
+        "assert get_translation_catalog().load('en').get('status_idle')\n"
+        "print('switcher_utility' in sys.modules)\n"
+    )
+    env = dict(os.environ, PYTHONPATH=os.path.join(REPO_ROOT, 'src'))
+    result = subprocess.run([sys.executable, '-c', code], env=env, cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == 'False'
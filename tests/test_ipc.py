@@ -0,0 +1,124 @@
+import os
+import stat
+import sys
+import threading
+import time
+from multiprocessing.connection import Client
+
+import pytest
+
+from hz_core import ipc
+from hz_core.ipc import (
+    CONTROL_KEY_FILENAME, ControlServer, IPCError, IPCTimeoutError, NoInstanceError, default_control_address,
+    forward_to_running_instance, load_control_authkey, run_cli_command, send_command,
+)
+from hz_core.paths import APP_DIR_NAME
+
+posix_only = pytest.mark.skipif(sys.platform == 'win32', reason="Unix domain socket permissions")
+
+
+@pytest.fixture(autouse=True)
+def isolated_dirs(tmp_path, monkeypatch):
+    monkeypatch.setenv('LOCALAPPDATA', str(tmp_path / 'appdata'))
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path / 'run'))
+    (tmp_path / 'run').mkdir()
+    return tmp_path
+
+
+@pytest.fixture
+def server():
+    servers = []
+
+    def start(handlers=None, **kwargs):
+        control_server = ControlServer(handlers or {}, **kwargs)
+        assert control_server.start()
+        servers.append(control_server)
+        return control_server
+
+    yield start
+    for control_server in servers:
+        control_server.close()
+
+
+def test_authkey_is_random_per_user_and_reused(isolated_dirs):
+    key = load_control_authkey()
+    key_path = isolated_dirs / 'appdata' / APP_DIR_NAME / CONTROL_KEY_FILENAME
+
+    assert load_control_authkey() == key
+    assert key != load_control_authkey(str(isolated_dirs / 'other.key'))
+    if sys.platform != 'win32':
+        assert stat.S_IMODE(os.stat(key_path).st_mode) == 0o600
+
+
+def test_command_round_trip_with_the_user_key(server):
+    control_server = server({"echo": lambda args: {"echo": args["value"]}})
+
+    assert send_command("echo", {"value": 3}, address=control_server.address) == {"echo": 3}
+
+
+def test_wrong_key_is_rejected_as_an_error_not_a_missing_instance(server, isolated_dirs):
+    control_server = server()
+    other_key = load_control_authkey(str(isolated_dirs / 'other.key'))
+
+    with pytest.raises(IPCError) as excinfo:
+        send_command("ping", address=control_server.address, authkey=other_key)
+    assert not isinstance(excinfo.value, NoInstanceError)
+    # 拒否した接続の後も待ち受けを続ける
+    assert send_command("ping", address=control_server.address) == {"pong": True}
+
+
+@posix_only
+def test_default_socket_is_created_in_a_private_directory(server):
+    address = default_control_address()
+    server(address=address)
+
+    assert stat.S_IMODE(os.stat(os.path.dirname(address)).st_mode) == 0o700
+    assert stat.S_IMODE(os.stat(address).st_mode) & 0o077 == 0
+
+
+@posix_only
+def test_existing_socket_directory_is_tightened(isolated_dirs):
+    address = default_control_address()
+    os.chmod(os.path.dirname(address), 0o755)
+
+    assert default_control_address() == address
+    assert stat.S_IMODE(os.stat(os.path.dirname(address)).st_mode) == 0o700
+
+
+def test_silent_connection_does_not_block_other_clients(server):
+    control_server = server()
+
+    with Client(control_server.address):
+        started = time.monotonic()
+        assert send_command("ping", address=control_server.address, timeout=2.0) == {"pong": True}
+        assert time.monotonic() - started < 1.0
+
+
+def test_server_drops_silent_connection_after_the_deadline(server, monkeypatch):
+    monkeypatch.setattr(ipc, "HANDSHAKE_TIMEOUT_SECONDS", 0.1)
+    control_server = server()
+
+    with Client(control_server.address) as silent:
+        silent.recv_bytes()  # サーバーからのチャレンジ
+        assert silent.poll(2.0)
+        with pytest.raises(EOFError):
+            silent.recv_bytes()
+
+
+@pytest.fixture
+def hung_server(server):
+    release = threading.Event()
+    control_server = server({"hang": lambda args: release.wait(5.0) and {}})
+    yield control_server
+    release.set()
+
+
+def test_client_times_out_on_an_unresponsive_instance(hung_server):
+    with pytest.raises(IPCTimeoutError):
+        send_command("hang", address=hung_server.address, timeout=0.2)
+
+
+def test_timeouts_fall_back_to_startup_or_exit_non_zero(hung_server, capsys):
+    assert forward_to_running_instance("hang", address=hung_server.address, timeout=0.2) is None
+    assert run_cli_command("hang", address=hung_server.address, timeout=0.2) == 1
+    assert "did not respond" in capsys.readouterr().err
@@ -0,0 +1,86 @@
+# tests/test_monitor_lifecycle.py
+# 監視スレッドのライフサイクル (MonitorLifecycle) の確認: 期限内に停止しなかったスレッドの扱い
+
+import threading
+
+import pytest
+
+from hz_core.metrics import MetricsRegistry
+from hz_core.monitor_lifecycle import LifecycleState, MonitorLifecycle
+from tests.test_engine import wait_until
+
+
+class BlockingTick:
+    """release() されるまで戻らない tick。同時に実行中の tick の数を記録する。"""
+
+    def __init__(self):
+        self.entered = threading.Event()
+        self._release = threading.Event()
+        self._lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def __call__(self, stop_event):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        self.entered.set()
+        try:
+            self._release.wait(5.0)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def release(self):
+        self._release.set()
+
+
+@pytest.fixture
+def stuck_lifecycle():
+    tick = BlockingTick()
+    lifecycle = MonitorLifecycle(tick, interval=0.01, stop_timeout=0.05, metrics=MetricsRegistry())
+    assert lifecycle.start()
+    assert tick.entered.wait(5.0)
+    yield lifecycle, tick
+    tick.release()
+    lifecycle.stop()
+
+
+def test_stop_timeout_keeps_stopping_until_the_thread_exits(stuck_lifecycle):
+    lifecycle, tick = stuck_lifecycle
+
+    assert not lifecycle.stop()
+    assert lifecycle.state is LifecycleState.STOPPING
+    # 古いスレッドが tick を実行中の間は、新しいスレッドを起動しない
+    assert not lifecycle.start()
+    assert tick.max_active == 1
+
+    tick.release()
+    assert wait_until(lambda: lifecycle.state is LifecycleState.STOPPED)
+    assert lifecycle.start()
+    assert lifecycle.is_running
+
+
+def test_start_waits_for_the_previous_thread_to_exit(stuck_lifecycle):
+    lifecycle, tick = stuck_lifecycle
+    assert not lifecycle.stop()
+
+    lifecycle.stop_timeout = 5.0
+    threading.Timer(0.05, tick.release).start()
+    assert lifecycle.start()
+    assert lifecycle.is_running
+    assert tick.max_active == 1
+
+
+def test_stop_from_the_monitoring_thread_does_not_linger():
+    stopped = []
+    lifecycle = None
+
+    def tick(stop_event):
+        stopped.append(lifecycle.stop())
+
+    lifecycle = MonitorLifecycle(tick, interval=0.01, metrics=MetricsRegistry())
+    assert lifecycle.start()
+    assert wait_until(lambda: stopped)
+    assert stopped == [True]
+    assert lifecycle.state is LifecycleState.STOPPED
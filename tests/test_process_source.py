@@ -0,0 +1,65 @@
+import os
+import threading
+
+import pytest
+
+from hz_core.metrics import MetricsRegistry
+from hz_core.process_source import NegativeCache, ProcFsProcessSource
+
+pytestmark = pytest.mark.skipif(not os.path.isdir("/proc/self"), reason="Linux /proc is required")
+
+
+class PausingDict(dict):
+    """反復の途中で一時停止し、他のスレッドが同じ辞書を更新できる機会を作る。"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.paused = threading.Event()
+        self.resume = threading.Event()
+
+    def __iter__(self):
+        entries = super().__iter__()
+        yield next(entries)
+        self.paused.set()
+        self.resume.wait(0.5)
+        yield from entries
+
+
+def make_source():
+    return ProcFsProcessSource(negative_cache=NegativeCache(metrics=MetricsRegistry()))
+
+
+def test_cpu_sample_pruning_is_not_interrupted_by_another_scan():
+    # 監視スレッドと GUI のプロセス選択画面が同じ取得元を使う。破棄の反復中に別スレッドが計測値を書き込んでも失敗しない
+    source = make_source()
+    stale = {2 ** 30: (0.0, 0, 0.0), 2 ** 30 + 1: (0.0, 0, 0.0)}
+    source._cpu_samples = PausingDict(stale)
+    errors = []
+
+    def other_scan():
+        source._cpu_samples.paused.wait(5.0)
+        try:
+            source.get_process(os.getpid())
+            source._build(os.getpid(), detailed=True)
+        except Exception as e:  # noqa: BLE001 - スレッド内の失敗をテストへ伝える
+            errors.append(e)
+        finally:
+            source._cpu_samples.resume.set()
+
+    thread = threading.Thread(target=other_scan)
+    thread.start()
+    infos = list(source.iter_processes(detailed=True))
+    thread.join(timeout=5.0)
+
+    assert errors == []
+    assert any(info.pid == os.getpid() for info in infos)
+    assert not set(stale) & set(source._cpu_samples)
+
+
+def test_detailed_scan_reports_cpu_and_memory_for_this_process():
+    source = make_source()
+    list(source.iter_processes(detailed=True))
+
+    info = next(info for info in source.iter_processes(detailed=True) if info.pid == os.getpid())
+    assert info.memory_rss and info.memory_rss > 0
+    assert info.cpu_percent >= 0.0
@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import switcher_utility
+from hz_core.simulator import SimulatedDisplay
+
+FAKE_SWITCHER = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'fake_resolution_switcher.py')
+DISPLAY1 = r"\\.\DISPLAY1"
+
+
+@pytest.fixture
+def sim_state(tmp_path, monkeypatch):
+    state_path = str(tmp_path / 'sim.json')
+    SimulatedDisplay.default(2).save(state_path)
+    monkeypatch.setenv('AUTOHZ_SIM_STATE', state_path)
+    monkeypatch.setattr(switcher_utility, 'SWITCHER_PATH', os.path.abspath(FAKE_SWITCHER))
+    monkeypatch.setattr(switcher_utility, '_active_rates_snapshot_at', 0.0)
+    return state_path
+
+
+def test_change_rate_passes_the_monitor_id_unmangled(sim_state):
+    assert switcher_utility.change_rate(144, 2560, 1440, DISPLAY1, max_retries=1)
+
+    display = SimulatedDisplay.load(sim_state)
+    assert display.active_rate(DISPLAY1) == 144
+    assert switcher_utility.get_current_active_rate(DISPLAY1) == 144
+
+
+def test_change_rate_reports_an_unsupported_mode(sim_state):
+    assert not switcher_utility.change_rate(240, 2560, 1440, DISPLAY1, max_retries=1)
+
+
+def test_monitor_capabilities_are_read_through_the_helper(sim_state):
+    capabilities = switcher_utility.get_monitor_capabilities()
+
+    assert set(capabilities) == {DISPLAY1, r"\\.\DISPLAY2"}
+    assert capabilities[DISPLAY1]['Rates']['2560x1440'][:2] == [165, 144]
+
+
+def test_missing_helper_stops_retrying(monkeypatch, tmp_path):
+    monkeypatch.setattr(switcher_utility, 'SWITCHER_PATH', str(tmp_path / 'ResolutionSwitcher.exe'))
+
+    assert not switcher_utility.change_rate(144, 2560, 1440, DISPLAY1, max_retries=3, retry_delay=5.0)
+
+
+def test_helper_runs_without_a_console_window_on_windows(monkeypatch):
+    calls = []
+    monkeypatch.setattr(sys, 'platform', 'win32')
+    monkeypatch.setattr(subprocess, 'CREATE_NO_WINDOW', 0x08000000, raising=False)
+    monkeypatch.setattr(subprocess, 'run', lambda argv, **kwargs: calls.append((argv, kwargs)))
+
+    switcher_utility._run_switcher("monitors", ["ResolutionSwitcher.exe", "--monitors"], capture_output=True)
+
+    argv, kwargs = calls[0]
+    assert argv == ["ResolutionSwitcher.exe", "--monitors"]
+    assert kwargs["creationflags"] == 0x08000000
+    assert "shell" not in kwargs
@@ -0,0 +1,60 @@
+# tests/test_trace.py
+# 監視セッションの記録 (TraceRecorder) と再生 (replay_trace) の一致の確認
+
+import pytest
+
+from hz_core.trace import TraceRecorder, read_trace, replay_trace
+from tests.conftest import MONITOR_ID, make_settings, run_tick
+from tests.test_engine import wait_until
+
+
+@pytest.fixture
+def recorder(tmp_path, clock):
+    recorder = TraceRecorder(str(tmp_path / "session.jsonl"), clock=clock)
+    yield recorder
+    recorder.close()
+
+
+def replay(recorder, without_overrides=False):
+    recorder.close()
+    records = [r for r in read_trace(recorder.path) if not (without_overrides and r["k"] == "override")]
+    return replay_trace(records)
+
+
+def test_replay_honours_adopted_drift_rate(make_engine, clock, recorder):
+    engine, backend, scanner = make_engine(settings=make_settings(drift_policy="adopt"), trace_recorder=recorder)
+    run_tick(engine)
+    backend.rates[MONITOR_ID] = 144
+    clock.advance(engine.DRIFT_FAST_INTERVAL_SECONDS)
+    run_tick(engine)
+    run_tick(engine)
+    scanner.start("game_b.exe")
+    run_tick(engine)
+    scanner.kill("game_b.exe")
+    run_tick(engine)
+
+    recorder.flush()
+    assert any(r["k"] == "override" and r["rate"] == 144 for r in read_trace(recorder.path))
+    report = replay(recorder)
+    assert report.identical, [m.to_dict() for m in report.mismatches]
+    assert report.decisions == 2
+    # 上書きを考慮しない再生では、採用したレートを低レートへ戻す判定になる
+    assert not replay(recorder, without_overrides=True).identical
+
+
+def test_replay_honours_forced_rate_until_games_change(make_engine, recorder):
+    engine, backend, scanner = make_engine(trace_recorder=recorder)
+    engine.start()
+    assert wait_until(lambda: engine.is_monitoring)
+
+    assert engine.force_rate(144, reason="ipc") == 144
+    run_tick(engine)
+    scanner.start("game_b.exe")
+    run_tick(engine)
+    engine.clear_rate_override()
+    recorder.flush()
+    records = list(read_trace(recorder.path))
+    assert [r.get("reason") for r in records if r["k"] == "override"] == ["ipc", None]
+
+    report = replay(recorder)
+    assert report.identical, [m.to_dict() for m in report.mismatches]